@@ -20,6 +20,20 @@ except ImportError:
     lpy_installed = False
 
 
+# Generate the index used to import registered components on demand. The
+# module is loaded directly as it only depends on the standard library.
+try:
+    import importlib.util
+    _registry_spec = importlib.util.spec_from_file_location(
+        'ygg_registry', os.path.join(ROOT_PATH, 'yggdrasil', 'registry.py'))
+    _registry = importlib.util.module_from_spec(_registry_spec)
+    _registry_spec.loader.exec_module(_registry)
+    _registry.write_index()
+except BaseException:  # pragma: Python 2
+    warnings.warn("Could not generate the component index. It will be "
+                  "generated the first time it is needed.")
+
+
 # Attempt to install matlab engine
 if install_matlab_engine.install_matlab(as_user=('--user' in sys.argv)):
     matlab_installed = True
@@ -150,6 +164,9 @@ setup(
                             'yggtime_lang=yggdrasil.command_line:yggtime_lang',
                             'yggtime_os=yggdrasil.command_line:yggtime_os',
                             'yggtime_py=yggdrasil.command_line:yggtime_py',
+                            'yggtime_engine=yggdrasil.command_line:yggtime_engine',
+                            'yggtime_startup=yggdrasil.command_line:yggtime_startup',
+                            'yggtime_micro=yggdrasil.command_line:yggtime_micro',
                             'yggtime_paper=yggdrasil.command_line:yggtime_paper',
                             'yggvalidate=yggdrasil.command_line:validate_yaml'],
     },
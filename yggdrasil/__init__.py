@@ -7,21 +7,9 @@ import logging
 import subprocess
 import importlib
 from ._version import get_versions
-_test_package_name = None
-_test_package = None
-order = ['pytest', 'nose']
-# order = ['nose', 'pytest']
-try:
-    _test_package_name = order[0]
-    _test_package = importlib.import_module(_test_package_name)
-except ImportError:  # pragma: debug
-    try:
-        _test_package_name = order[1]
-        _test_package = importlib.import_module(_test_package_name)
-    except ImportError:
-        _test_package_name = None
-        _test_package = None
-    
+_test_package_order = ['pytest', 'nose']
+# _test_package_order = ['nose', 'pytest']
+
 
 if platform._is_win:  # pragma: windows
     # This is required to fix crash on Windows in case of Ctrl+C
@@ -29,6 +17,23 @@ if platform._is_win:  # pragma: windows
     os.environ['FOR_DISABLE_CONSOLE_CTRL_HANDLER'] = 'T'
 
 
+def get_test_package():
+    r"""Import the first available test runner. This is done when tests are
+    run rather than on import to keep importing yggdrasil fast.
+
+    Returns:
+        tuple: The name of the test package and the imported module. Both are
+            None if none of the supported test packages are installed.
+
+    """
+    for name in _test_package_order:
+        try:
+            return name, importlib.import_module(name)
+        except ImportError:  # pragma: debug
+            pass
+    return None, None  # pragma: debug
+
+
 def run_tsts(verbose=True, nocapture=True, stop=True,
              nologcapture=True, withcoverage=True):  # pragma: no cover
     r"""Run tests for the package. Relative paths are interpreted to be
@@ -48,6 +53,7 @@ def run_tsts(verbose=True, nocapture=True, stop=True,
             which invokes coverage. Defaults to True.
 
     """
+    _test_package_name, _test_package = get_test_package()
     if _test_package is None:
         raise RuntimeError("Could not locate test runner pytest or nose.")
     elif _test_package_name == 'pytest':
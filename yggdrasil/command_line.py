@@ -4,7 +4,7 @@ import sys
 import copy
 import logging
 import traceback
-from yggdrasil import runner, schema, config, timing, yamlfile
+from yggdrasil import runner, schema, config, timing, yamlfile, registry
 from yggdrasil.drivers import GCCModelDriver
 
 
@@ -13,10 +13,18 @@ def yggrun():
     prog = sys.argv[0].split(os.path.sep)[-1]
     # Print help
     if '-h' in sys.argv:
-        print('Usage: yggrun [YAMLFILE1] [YAMLFILE2]...')
+        print('Usage: yggrun [--profile[=DIR]] [YAMLFILE1] [YAMLFILE2]...')
         return
-    models = sys.argv[1:]
-    yggRunner = runner.get_runner(models, ygg_debug_prefix=prog)
+    models = []
+    kwargs = {}
+    for x in sys.argv[1:]:
+        if x == '--profile':
+            kwargs['profile_dir'] = 'ygg_profile'
+        elif x.startswith('--profile='):
+            kwargs['profile_dir'] = x.split('=', 1)[1]
+        else:
+            models.append(x)
+    yggRunner = runner.get_runner(models, ygg_debug_prefix=prog, **kwargs)
     try:
         yggRunner.run()
         yggRunner.debug("runner returns, exiting")
@@ -67,11 +75,12 @@ def rebuild_c_api():
 
 
 def regen_schema():
-    r"""Regenerate the yggdrasil schema."""
+    r"""Regenerate the yggdrasil schema and component index."""
     if os.path.isfile(schema._schema_fname):
         os.remove(schema._schema_fname)
     schema.clear_schema()
     schema.init_schema()
+    registry.write_index()
 
 
 def validate_yaml():
@@ -106,6 +115,80 @@ def yggtime_py():
     timing.plot_scalings(compare='python')
 
 
+def yggtime_engine():
+    r"""Plot timing statistics comparing the thread and async connection
+    engines."""
+    timing.plot_scalings(compare='connection_engine')
+
+
+def yggtime_startup():
+    r"""Compare the time required to launch Python models in new processes
+    and from a zygote."""
+    out = timing.time_model_startup()
+    for k in ['cold', 'warm']:
+        print('%s: %f s (min %f s)' % (k, sum(out[k]) / len(out[k]),
+                                       min(out[k])))
+
+
+def yggtime_micro():
+    r"""Time the serializer, datatype, comm, and connection layers
+    separately within a single process and compare the results to a
+    baseline if one is provided. The process exits with a non-zero status
+    if any benchmark is slower than the baseline by more than the threshold."""
+    import argparse
+    from yggdrasil import microbench
+    parser = argparse.ArgumentParser(description=yggtime_micro.__doc__)
+    parser.add_argument('--layers', nargs='+', choices=microbench._layers,
+                        help='Layers to time. Defaults to all layers.')
+    parser.add_argument('--types', nargs='+', dest='msg_types',
+                        choices=microbench._message_types,
+                        help='Message types to time. Defaults to all types.')
+    parser.add_argument('--sizes', nargs='+', type=float,
+                        help='Approximate message sizes (in bytes).')
+    parser.add_argument('--comm', dest='comm_type',
+                        help='Comm type used by the comm & connection layers.')
+    parser.add_argument('--compression',
+                        help=('Codec used to compress messages (see '
+                              'yggdrasil.compression).'))
+    parser.add_argument('--log-level', dest='log_level',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help=('Level that logging should be set to while '
+                              'timing (e.g. INFO to time the per-message '
+                              'overhead of disabled debug messages).'))
+    parser.add_argument('--nmsg', type=int, default=10,
+                        help='Number of messages in each timed run.')
+    parser.add_argument('--nrep', type=int, default=5,
+                        help='Number of timed runs for each benchmark.')
+    parser.add_argument('--output', default=microbench.default_filename(),
+                        help='File where results should be saved.')
+    parser.add_argument('--baseline',
+                        help='File containing results to compare against.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help=('Fractional increase in time that is '
+                              'considered a regression.'))
+    args = parser.parse_args(sys.argv[1:])
+    results = microbench.run_benchmarks(
+        layers=args.layers, msg_types=args.msg_types, sizes=args.sizes,
+        comm_type=args.comm_type, nmsg=args.nmsg, nrep=args.nrep,
+        compression=args.compression, log_level=args.log_level)
+    microbench.save(args.output, results)
+    print("Results saved to %s" % args.output)
+    if args.baseline:
+        comparison = microbench.compare(results, microbench.load(args.baseline),
+                                        threshold=args.threshold)
+        regressions = []
+        for k, v in comparison.items():
+            print('%s: %g -> %g s/msg (x%.2f)%s'
+                  % (k, v['baseline'], v['result'], v['ratio'],
+                     ' REGRESSION' if v['regression'] else ''))
+            if v['regression']:
+                regressions.append(k)
+        if regressions:
+            print("%d benchmark(s) regressed by more than %g%%."
+                  % (len(regressions), 100 * args.threshold))
+            sys.exit(1)
+
+
 def yggtime_paper():
     r"""Create plots for timing."""
     _lang_list = timing._lang_list
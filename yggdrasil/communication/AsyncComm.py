@@ -1,5 +1,6 @@
 import uuid
 import threading
+from yggdrasil import backwards, tools
 from yggdrasil.communication import CommBase
 
 
@@ -54,6 +55,14 @@ class AsyncComm(CommBase.CommBase):
             for v in self._work_comms.values():
                 v.printStatus(nindent=nindent + 1)
 
+    @property
+    def is_coalescing(self):
+        r"""bool: True if sent messages are combined. Messages are not
+        combined if there is not a backlog thread to send messages that have
+        waited longer than coalesce_delay."""
+        return ((not self.dont_backlog)
+                and super(AsyncComm, self).is_coalescing)
+
     @property
     def backlog_thread(self):
         r"""tools.YggThread: Thread that will handle sinding or receiving
@@ -116,6 +125,7 @@ class AsyncComm(CommBase.CommBase):
         r"""Stop the asynchronous backlog, turning this into a direct comm."""
         self._close_backlog(wait=True)
         self.dont_backlog = True
+        self.flush_coalesced()
 
     @property
     def is_open(self):
@@ -236,12 +246,13 @@ class AsyncComm(CommBase.CommBase):
         r"""Add a message to the backlog of received messages.
 
         Args:
-            msg (str): Received message that should be backlogged.
+            msg (str): Received message that should be backlogged. Combined
+                messages are split so that each is counted.
 
         """
         with self.backlog_thread.lock:
             self.debug("Added %d bytes to recv backlog.", len(msg))
-            self._backlog_recv.append(msg)
+            self._backlog_recv += CommBase.unpack_coalesced(msg)
             self.backlog_recv_ready.set()
 
     def add_backlog_send(self, msg, **kwargs):
@@ -293,13 +304,25 @@ class AsyncComm(CommBase.CommBase):
             self.debug("Backlog closed")
             self._close_backlog()
             return
+        if self.is_coalescing:
+            # Combined messages are added directly to the backlog as
+            # _safe_send will block while the comm is being closed. The lock
+            # is held until the message is added so that messages (including
+            # EOF) sent by flush_coalesced cannot be added before it.
+            with self._coalesce_lock:
+                msg = self.pop_coalesced(force=False)
+                if msg is not None:
+                    self.add_backlog_send(msg)
+                    self._n_sent += 1
+                    self._last_send = backwards.clock_time()
+                    self.metrics.bytes_sent += len(msg)
         if not self.send_backlog():  # pragma: debug
             self.debug("Stopping because send_backlog failed")
             self._close_backlog()
             return
         self.periodic_debug('run_backlog_send', period=1000)(
             "Sleeping (is_confirmed_send=%s)",
-            str(self.is_confirmed_send))
+            tools.LazyFormat(lambda: self.is_confirmed_send))
         self.sleep()
 
     def run_backlog_recv(self):
@@ -319,7 +342,7 @@ class AsyncComm(CommBase.CommBase):
             return
         self.periodic_debug('run_backlog_recv', period=1000)(
             "Sleeping (is_confirmed_recv=%s)",
-            str(self.is_confirmed_recv))
+            tools.LazyFormat(lambda: self.is_confirmed_recv))
         self.sleep()
 
     def send_backlog(self):
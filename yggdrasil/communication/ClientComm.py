@@ -59,6 +59,19 @@ class ClientComm(CommBase.CommBase):
         """
         return get_comm_class().is_installed(language=language)
 
+    def get_metrics(self):
+        r"""Get a summary of the performance metrics for the comm and the
+        request comm that it wraps.
+
+        Returns:
+            dict: Metrics for the comm with the metrics for the request comm
+                under 'comms'.
+
+        """
+        out = super(ClientComm, self).get_metrics()
+        out['comms'] = [self.ocomm.get_metrics()]
+        return out
+
     @property
     def maxMsgSize(self):
         r"""int: Maximum size of a single message that should be sent."""
@@ -1,10 +1,13 @@
 import os
 import copy
 import uuid
+import struct
 import atexit
 import threading
 from logging import info
-from yggdrasil import backwards, tools, serialize
+from collections import OrderedDict
+from yggdrasil import backwards, tools, serialize, tracing, compression
+from yggdrasil.metrics import CommMetrics
 from yggdrasil.tools import YGG_MSG_EOF
 from yggdrasil.communication import (
     new_comm, get_comm, get_comm_class, determine_suffix)
@@ -20,6 +23,68 @@ _registered_servers = dict()
 _registered_comms = dict()
 _server_lock = threading.RLock()
 _registry_lock = threading.RLock()
+# Prefix for messages containing several messages coalesced by the sending
+# comm. Messages sent by comms that are not files always start with the
+# header prefix so coalesced messages can be distinguished from them.
+_coalesce_prefix = b'YGG_COALESCE:'
+_coalesce_size = struct.Struct('<Q')
+
+
+def pack_coalesced(msgs):
+    r"""Combine serialized messages into a single message.
+
+    Args:
+        msgs (list): Serialized messages.
+
+    Returns:
+        bytes: The prefix, the number of messages, the size of each message,
+            and the messages.
+
+    """
+    header = [_coalesce_prefix, _coalesce_size.pack(len(msgs))]
+    header += [_coalesce_size.pack(len(x)) for x in msgs]
+    return b''.join(header + msgs)
+
+
+def unpack_coalesced(msg):
+    r"""Split a message produced by pack_coalesced into the original
+    serialized messages.
+
+    Args:
+        msg (bytes): Received message.
+
+    Returns:
+        list: Serialized messages. If msg was not produced by pack_coalesced,
+            the list will only contain msg.
+
+    """
+    if not (isinstance(msg, backwards.bytes_type)
+            and msg.startswith(_coalesce_prefix)):
+        return [msg]
+    pos = len(_coalesce_prefix)
+    nmsg = _coalesce_size.unpack_from(msg, pos)[0]
+    pos += _coalesce_size.size
+    sizes = [_coalesce_size.unpack_from(msg, pos + i * _coalesce_size.size)[0]
+             for i in range(nmsg)]
+    pos += nmsg * _coalesce_size.size
+    out = []
+    for x in sizes:
+        out.append(msg[pos:(pos + x)])
+        pos += x
+    return out
+
+
+def coalesce_overhead(nmsg):
+    r"""Get the number of bytes added to messages by pack_coalesced.
+
+    Args:
+        nmsg (int): Number of messages.
+
+    Returns:
+        int: Size of the prefix and sizes.
+
+    """
+    return len(_coalesce_prefix) + (nmsg + 1) * _coalesce_size.size
 
 
 def is_registered(comm_class, key):
@@ -256,6 +321,43 @@ class CommBase(tools.YggClass):
             as a check that the correct class is being created. Defaults to None.
         matlab (bool, optional): True if the comm will be accessed by Matlab
             code. Defaults to False.
+        compression (str, optional): Name of the codec that should be used to
+            compress the bodies of sent messages (see yggdrasil.compression).
+            The codec is recorded in the header so received messages are
+            decompressed regardless of this option. Defaults to None and
+            messages are not compressed. Messages must be received by Python
+            comms (e.g. connection drivers or Python models) and the runner
+            disables compression for connections that send to models in
+            other languages. Files are not compressed.
+        compression_threshold (int, optional): Size (in bytes) that a message
+            body must reach for it to be compressed. Defaults to 1024.
+        block_encode (bool, optional): If True, sent containers (lists, tuples,
+            and dictionaries) with many elements of the same scalar type are
+            encoded as a single block rather than element by element. Blocks
+            can only be decoded by Python so messages must be received by
+            Python comms (e.g. connection drivers or Python models). Defaults
+            to None and blocks are not used unless the runner enables them
+            for a connection that only sends to Python models. Files are not
+            block encoded.
+        coalesce_messages (int, optional): Maximum number of consecutive
+            messages that should be combined and sent as a single message.
+            Combined messages are split by the receiving comm so they must be
+            received by Python comms (e.g. connection drivers). Defaults to 0
+            and messages are not combined. Files are not combined.
+        coalesce_bytes (int, optional): Maximum size (in bytes) of the
+            messages that are combined. Messages larger than this are sent
+            on their own. Defaults to 65536.
+        coalesce_delay (float, optional): Maximum time (in seconds) that a
+            message will wait to be combined with those sent after it before
+            it is sent. Defaults to 0.01.
+        pickle_protocol (int, optional): Highest pickle protocol that the
+            receiver can load. If provided, pickle serializers that do not
+            set the protocol or out_of_band options explicitly select them
+            based on it (see PickleSerialize.negotiate_protocol). Defaults to
+            None and the protocol is only negotiated if the runner sets it
+            for a connection that only sends to Python models or if the comm
+            is a send interface for a model, in which case the protocol
+            supported by the runner (YGG_PICKLE_PROTOCOL) is used.
         **kwargs: Additional keywords arguments are passed to parent class.
 
     Attributes:
@@ -287,6 +389,18 @@ class CommBase(tools.YggClass):
         recv_converter (func): Converter that should be used on received objects.
         send_converter (func): Converter that should be used on sent objects.
         matlab (bool): True if the comm will be accessed by Matlab code.
+        compression (str): Name of the codec used to compress sent messages.
+        compression_threshold (int): Size (in bytes) that a message body must
+            reach for it to be compressed.
+        block_encode (bool): True if homogeneous containers are encoded as a
+            single block.
+        coalesce_messages (int): Maximum number of messages combined into a
+            single message.
+        coalesce_bytes (int): Maximum size (in bytes) of combined messages.
+        coalesce_delay (float): Maximum time (in seconds) that a message will
+            wait to be combined.
+        pickle_protocol (int): Highest pickle protocol that the receiver can
+            load.
         maxMsgSize (int): Maximum size of a single message that should be sent.
 
     Raises:
@@ -309,10 +423,20 @@ class CommBase(tools.YggClass):
                           'send_converter': {'type': 'function'},
                           'field_names': {'type': 'array', 'items': {'type': 'string'}},
                           'field_units': {'type': 'array', 'items': {'type': 'string'}},
-                          'as_array': {'type': 'boolean', 'default': False}}
+                          'as_array': {'type': 'boolean', 'default': False},
+                          'compression': {'type': 'string'},
+                          'compression_threshold': {
+                              'type': 'int',
+                              'default': compression._default_threshold},
+                          'block_encode': {'type': 'boolean'},
+                          'coalesce_messages': {'type': 'int', 'default': 0},
+                          'coalesce_bytes': {'type': 'int', 'default': 65536},
+                          'coalesce_delay': {'type': 'float', 'default': 0.01},
+                          'pickle_protocol': {'type': 'int'}}
     _default_serializer = DefaultSerialize
     is_file = False
     _maxMsgSize = 0
+    _sends_frames = False
 
     def __init__(self, name, address=None, direction='send',
                  dont_open=False, is_interface=False, recv_timeout=0.0,
@@ -351,6 +475,12 @@ class CommBase(tools.YggClass):
         self.close_on_eof_recv = close_on_eof_recv
         self.close_on_eof_send = close_on_eof_send
         self._last_header = None
+        self._last_recv_raw = None
+        self._coalesce_lock = threading.RLock()
+        self._coalesced_send = []
+        self._coalesced_send_size = 0
+        self._coalesced_send_t0 = None
+        self._coalesced_recv = []
         self._work_comms = {}
         self.single_use = single_use
         self._used = False
@@ -360,6 +490,8 @@ class CommBase(tools.YggClass):
         self._bound = False
         self._last_send = None
         self._last_recv = None
+        self.metrics = CommMetrics()
+        self._tracing = tracing.is_enabled()
         self._timeout_drain = False
         self._server_class = CommServer
         self._server_kwargs = {}
@@ -417,6 +549,14 @@ class CommBase(tools.YggClass):
                 continue
             default = v.get('default', None)
             setattr(self, k, kwargs.get(k, default))
+        # Negotiate pickle options with the receiver
+        if ((self.pickle_protocol is None) and self.is_interface
+                and (self.direction == 'send')):
+            self.pickle_protocol = os.environ.get('YGG_PICKLE_PROTOCOL', None)
+        if ((self.pickle_protocol is not None) and (not self.is_file)
+                and hasattr(self.serializer.__class__, 'negotiate_protocol')):
+            self.pickle_protocol = int(self.pickle_protocol)
+            self.serializer.negotiate_protocol(self.pickle_protocol)
 
     @classmethod
     def get_testing_options(cls, **kwargs):
@@ -457,6 +597,28 @@ class CommBase(tools.YggClass):
         print('%s%-15s: %s' % (prefix, 'nsent', self._n_sent))
         print('%s%-15s: %s' % (prefix, 'nrecv', self._n_recv))
 
+    def get_metrics(self):
+        r"""Get a summary of the performance metrics for the comm.
+
+        Returns:
+            dict: Message and byte counts and histograms of the time spent
+                serializing, deserializing, sending, receiving, and waiting
+                for confirmation as well as the sampled backlog.
+
+        """
+        out = OrderedDict([('name', self.name),
+                           ('comm', self.__class__.__name__),
+                           ('direction', self.direction),
+                           ('messages_sent', self._n_sent),
+                           ('messages_recv', self._n_recv)])
+        out.update(self.metrics.to_dict())
+        return out
+
+    def sample_backlog(self):
+        r"""Record the number of messages waiting in the connection."""
+        if self.is_open:
+            self.metrics.add('backlog', self.n_msg)
+
     @classmethod
     def is_installed(cls, language=None):
         r"""Determine if the necessary libraries are installed for this
@@ -510,6 +672,13 @@ class CommBase(tools.YggClass):
         r"""int: Maximum size of a single message that should be sent."""
         return self._maxMsgSize
 
+    @property
+    def last_recv_raw(self):
+        r"""bytes: Last message received as it was received (including the
+        header), None if the last message was received in multiple parts or
+        did not have a header."""
+        return self._last_recv_raw
+
     @property
     def empty_bytes_msg(self):
         r"""str: Empty serialized message."""
@@ -694,6 +863,7 @@ class CommBase(tools.YggClass):
         if self.direction == 'recv':
             self.wait_for_confirm(timeout=self._timeout_drain)
         else:
+            self.flush_coalesced()
             self.drain_messages(variable='n_msg_send')
             self.wait_for_confirm(timeout=self._timeout_drain)
         self.debug("Finished (timeout_drain = %s)", str(self._timeout_drain))
@@ -749,6 +919,7 @@ class CommBase(tools.YggClass):
         self.debug('')
         if direction is None:
             direction = self.direction
+        t0 = backwards.clock_time()
         T = self.start_timeout(t=timeout, key_suffix='.wait_for_confirm')
         flag = False
         while (not T.is_out) and (not getattr(self, 'is_confirmed_%s' % direction)):
@@ -760,6 +931,7 @@ class CommBase(tools.YggClass):
         self.stop_timeout(key_suffix='.wait_for_confirm')
         if not flag:
             flag = getattr(self, 'is_confirmed_%s' % direction)
+        self.metrics.add('confirm_time', backwards.clock_time() - t0)
         self.debug('Done confirming')
         return flag
 
@@ -1120,17 +1292,29 @@ class CommBase(tools.YggClass):
         # Don't send metadata for files
         # kwargs.setdefault('dont_encode', self.is_file)
         kwargs.setdefault('no_metadata', self.is_file)
-        return self.serializer.serialize(*args, **kwargs)
+        if not self.is_file:
+            kwargs.setdefault('compression', self.compression)
+            kwargs.setdefault('compression_threshold',
+                              self.compression_threshold)
+            kwargs.setdefault('block_encode', bool(self.block_encode))
+        t0 = backwards.clock_time()
+        out = self.serializer.serialize(*args, **kwargs)
+        self.metrics.add('serialize_time', backwards.clock_time() - t0)
+        return out
 
     def deserialize(self, *args, **kwargs):
         r"""Deserialize a message using the associated deserializer."""
         # Don't serialize files using JSON
         # kwargs.setdefault('dont_decode', self.is_file)
-        return self.serializer.deserialize(*args, **kwargs)
+        t0 = backwards.clock_time()
+        out = self.serializer.deserialize(*args, **kwargs)
+        self.metrics.add('deserialize_time', backwards.clock_time() - t0)
+        return out
 
     # SEND METHODS
     def _safe_send(self, *args, **kwargs):
         r"""Send message checking if is 1st message and then waiting."""
+        t0 = backwards.clock_time()
         if (not self._used) and self._multiple_first_send:
             out = self._send_1st(*args, **kwargs)
         else:
@@ -1138,9 +1322,13 @@ class CommBase(tools.YggClass):
                 if self.is_closed:  # pragma: debug
                     return False
                 out = self._send(*args, **kwargs)
+        t1 = backwards.clock_time()
+        self.metrics.add('send_time', t1 - t0)
         if out:
             self._n_sent += 1
-            self._last_send = backwards.clock_time()
+            self._last_send = t1
+            if args:
+                self.metrics.bytes_sent += len(args[0])
         return out
     
     def _send_1st(self, *args, **kwargs):
@@ -1255,14 +1443,24 @@ class CommBase(tools.YggClass):
             flag = True
             # Covert object
             msg_ = self.apply_send_converter(msg)
+            # Add hop to message trace
+            if self._tracing and (not self.is_file):
+                header_kwargs = dict(header_kwargs or {})
+                header_kwargs['trace'] = tracing.add_hop(
+                    header_kwargs.get('trace', None), self.name + ':send')
             # Serialize
             add_sinfo = (self._send_serializer and (not self.is_file))
             if add_sinfo:
-                self.debug('Sending sinfo: %s', self.serializer.serializer_info)
+                self.debug('Sending sinfo: %s', tools.LazyFormat(
+                    lambda: self.serializer.serializer_info))
             msg_s = self.serialize(msg_, header_kwargs=header_kwargs,
                                    add_serializer_info=add_sinfo)
-            # Create work comm if message too large to be sent all at once
-            if (len(msg_s) > self.maxMsgSize) and (self.maxMsgSize != 0):
+            # Create work comm if message too large to be sent all at once,
+            # unless it is made up of frames that can be sent as a single
+            # multipart message
+            if ((len(msg_s) > self.maxMsgSize) and (self.maxMsgSize != 0)
+                    and not (self._sends_frames
+                             and isinstance(msg_s, tools.MessageFrames))):
                 if header_kwargs is None:
                     header_kwargs = dict()
                 work_comm = self.create_work_comm()
@@ -1272,6 +1470,9 @@ class CommBase(tools.YggClass):
                 #     work_comm = self.get_work_comm(header_kwargs)
                 header_kwargs = self.workcomm2header(work_comm, **header_kwargs)
                 msg_s = self.serialize(msg_, header_kwargs=header_kwargs)
+            if ((isinstance(msg_s, tools.MessageFrames)
+                 and (not self._sends_frames))):
+                msg_s = msg_s.join()
         return flag, msg_s, header_kwargs
 
     def send(self, *args, **kwargs):
@@ -1331,9 +1532,20 @@ class CommBase(tools.YggClass):
         if not flag:
             return flag
         msg_len = len(msg_s)
+        # Combine small messages, sending any waiting messages before
+        # messages that cannot be combined (e.g. EOF or messages with send
+        # options) so order is preserved
+        if self.is_coalescing:
+            if ((isinstance(msg_s, backwards.bytes_type)
+                    and (msg_s != self.eof_msg)
+                    and (msg_len <= self.coalesce_limit) and (not kwargs))):
+                return self._send_coalesced(msg_s)
+            if not self.flush_coalesced():  # pragma: debug
+                return False
         # Sent first part of message
         self.special_debug('Sending %d bytes', msg_len)
-        if (msg_len < self.maxMsgSize) or (self.maxMsgSize == 0):
+        if (((msg_len < self.maxMsgSize) or (self.maxMsgSize == 0)
+             or isinstance(msg_s, tools.MessageFrames))):
             flag = self._safe_send(msg_s, **kwargs)
         else:
             flag = self._safe_send(msg_s[:self.maxMsgSize])
@@ -1349,6 +1561,95 @@ class CommBase(tools.YggClass):
             self.special_debug('Failed to send %d bytes', msg_len)
         return flag
 
+    @property
+    def is_coalescing(self):
+        r"""bool: True if sent messages are combined."""
+        return ((self.direction == 'send') and (not self.is_file)
+                and bool(self.coalesce_messages)
+                and (self.coalesce_messages > 1))
+
+    @property
+    def coalesce_limit(self):
+        r"""int: Maximum size (in bytes) of the messages that are combined."""
+        out = self.coalesce_bytes
+        if self.maxMsgSize != 0:
+            out = min(out, self.maxMsgSize
+                      - coalesce_overhead(self.coalesce_messages) - 1)
+        return out
+
+    def _send_coalesced(self, msg_s):
+        r"""Add a serialized message to those waiting to be combined, sending
+        the combined message if coalesce_messages, coalesce_bytes, or
+        coalesce_delay is reached.
+
+        Args:
+            msg_s (bytes): Serialized message.
+
+        Returns:
+            bool: Success or failure of sending the combined message. True
+                if the message is still waiting.
+
+        """
+        with self._coalesce_lock:
+            if ((self._coalesced_send_size + len(msg_s))
+                    > self.coalesce_limit):
+                if not self.flush_coalesced():  # pragma: debug
+                    return False
+            if not self._coalesced_send:
+                self._coalesced_send_t0 = backwards.clock_time()
+            self._coalesced_send.append(msg_s)
+            self._coalesced_send_size += len(msg_s)
+            return self.flush_coalesced(force=False)
+
+    def pop_coalesced(self, force=True):
+        r"""Combine the messages waiting to be sent into a single message.
+
+        Args:
+            force (bool, optional): If False, messages are only combined if
+                coalesce_messages, coalesce_bytes, or coalesce_delay is
+                reached. Defaults to True.
+
+        Returns:
+            bytes: Combined message, None if there are not any messages to
+                send.
+
+        """
+        with self._coalesce_lock:
+            if not self._coalesced_send:
+                return None
+            if not (force
+                    or (len(self._coalesced_send) >= self.coalesce_messages)
+                    or (self._coalesced_send_size >= self.coalesce_limit)
+                    or ((backwards.clock_time() - self._coalesced_send_t0)
+                        >= self.coalesce_delay)):
+                return None
+            msgs = self._coalesced_send
+            self._coalesced_send = []
+            self._coalesced_send_size = 0
+            self._coalesced_send_t0 = None
+        self.debug("Combining %d messages", len(msgs))
+        if len(msgs) == 1:
+            return msgs[0]
+        return pack_coalesced(msgs)
+
+    def flush_coalesced(self, force=True):
+        r"""Send the messages waiting to be combined.
+
+        Args:
+            force (bool, optional): If False, messages are only sent if
+                coalesce_messages, coalesce_bytes, or coalesce_delay is
+                reached. Defaults to True.
+
+        Returns:
+            bool: Success or failure of sending the messages.
+
+        """
+        with self._coalesce_lock:
+            msg = self.pop_coalesced(force=force)
+            if msg is None:
+                return True
+            return self._safe_send(msg)
+
     def send_nolimit(self, *args, **kwargs):
         r"""Alias for send."""
         return self.send(*args, **kwargs)
@@ -1377,10 +1678,24 @@ class CommBase(tools.YggClass):
         with self._closing_thread.lock:
             if self.is_closed:
                 return (False, self.empty_bytes_msg)
+            if self._coalesced_recv:
+                # Bytes were counted when the combined message was received
+                self._n_recv += 1
+                self._last_recv = backwards.clock_time()
+                self.metrics.add('recv_time', 0.0)
+                return (True, self._coalesced_recv.pop(0))
+            t0 = backwards.clock_time()
             out = self._recv(*args, **kwargs)
+            t1 = backwards.clock_time()
+        self.metrics.add('recv_time', t1 - t0)
         if out[0] and out[1]:
             self._n_recv += 1
-            self._last_recv = backwards.clock_time()
+            self._last_recv = t1
+            self.metrics.bytes_recv += len(out[1])
+            msgs = unpack_coalesced(out[1])
+            if len(msgs) > 1:
+                self._coalesced_recv = msgs[1:]
+                out = (out[0], msgs[0])
         return out
 
     def _recv(self, *args, **kwargs):
@@ -1480,6 +1795,17 @@ class CommBase(tools.YggClass):
             msg = msg_
         if not second_pass:
             self._last_header = header
+        if ((second_pass or header.get('incomplete', False)
+             or ('id' not in header))):
+            self._last_recv_raw = None
+        else:
+            self._last_recv_raw = s_msg
+        if ((self._tracing and flag and ('id' in header)
+             and (not header.get('incomplete', False))
+             and (not header.get('raw', False)))):
+            header['trace'] = tracing.add_hop(header.get('trace', None),
+                                              self.name + ':recv')
+            tracing.record(header['trace'])
         if not header.get('incomplete', False):
             # if not self._used:
             #     self.serializer = serialize.get_serializer(**header)
@@ -1583,6 +1909,12 @@ class CommBase(tools.YggClass):
         self._n_recv = 0
         self._last_send = None
         self._last_recv = None
+        with self._coalesce_lock:
+            self._coalesced_send = []
+            self._coalesced_send_size = 0
+            self._coalesced_send_t0 = None
+        self._coalesced_recv = []
+        self.metrics.reset()
 
     # Send/recv dictionary of fields
     def send_dict(self, args_dict, **kwargs):
@@ -74,7 +74,10 @@ class FileComm(CommBase.CommBase):
          'in_temp': {'type': 'boolean', 'default': False},
          'is_series': {'type': 'boolean', 'default': False},
          'wait_for_creation': {'type': 'float', 'default': 0.0}},
-        remove_keys=['commtype', 'datatype'], **DirectSerialize._schema_properties)
+        remove_keys=['commtype', 'datatype', 'compression',
+                     'compression_threshold', 'block_encode',
+                     'coalesce_messages', 'coalesce_bytes', 'coalesce_delay'],
+        **DirectSerialize._schema_properties)
     _default_serializer = DirectSerialize
     _attr_conv = ['newline', 'platform_newline']
     _default_extension = '.txt'
@@ -75,6 +75,19 @@ class ForkComm(CommBase.CommBase):
         for x in self.comm_list:
             x.printStatus(nindent=nindent + 1)
 
+    def get_metrics(self):
+        r"""Get a summary of the performance metrics for the comm and the
+        comms it forks to/from.
+
+        Returns:
+            dict: Metrics for the comm with the metrics for each of the
+                forked comms under 'comms'.
+
+        """
+        out = super(ForkComm, self).get_metrics()
+        out['comms'] = [x.get_metrics() for x in self.comm_list]
+        return out
+
     def __len__(self):
         return len(self.comm_list)
 
@@ -116,8 +129,10 @@ class ForkComm(CommBase.CommBase):
 
     @property
     def opp_comms(self):
-        r"""dict: Name/address pairs for opposite comms."""
-        out = super(ForkComm, self).opp_comms
+        r"""dict: Name/address pairs for opposite comms. Only the forked
+        comms are included as the list of addresses for the fork cannot be
+        passed to a model via an environment variable."""
+        out = {}
         for x in self.comm_list:
             out.update(**x.opp_comms)
         return out
@@ -0,0 +1,171 @@
+import os
+import numpy as np
+from yggdrasil import backwards, serialize, units
+from yggdrasil.communication import FileComm
+from yggdrasil.schema import register_component, inherit_schema
+from yggdrasil.serialize.NumpySerialize import (
+    NumpySerialize, read_npy_header, write_npy_header)
+
+
+@register_component
+class NumpyFileComm(FileComm.FileComm):
+    r"""Class for handling I/O from/to a table stored as a structured array
+    in a numpy .npy file on disk. Each message sent is appended to the table
+    as rows and the entire table is received as a single message. Files
+    written by this comm can be loaded (and memory mapped) using numpy.load.
+
+    Args:
+        name (str): The environment variable where file path is stored.
+        field_names (list, optional): Names of the columns in the table.
+        field_units (list, optional): Units of the columns in the table.
+        **kwargs: Additional keywords arguments are passed to parent class.
+
+    """
+
+    _filetype = 'numpy'
+    _schema_properties = inherit_schema(
+        FileComm.FileComm._schema_properties,
+        {'field_names': {'type': 'array', 'items': {'type': 'string'}},
+         'field_units': {'type': 'array', 'items': {'type': 'string'}}})
+    _default_serializer = NumpySerialize
+    _default_extension = '.npy'
+
+    def _init_before_open(self, **kwargs):
+        r"""Set up dataio and attributes."""
+        kwargs['open_as_binary'] = True
+        self._npy_header = None
+        super(NumpyFileComm, self)._init_before_open(**kwargs)
+        self.read_meth = 'read'
+
+    @classmethod
+    def get_testing_options(cls, **kwargs):
+        r"""Method to return a dictionary of testing options for this class.
+
+        Returns:
+            dict: Dictionary of variables to use for testing. Key/value pairs:
+                kwargs (dict): Keyword arguments for comms tested with the
+                    provided content.
+                send (list): List of objects to send to test file.
+                recv (list): List of objects that will be received from a test
+                    file that was sent the messages in 'send'.
+                contents (bytes): Bytes contents of test file created by sending
+                    the messages in 'send'.
+
+        """
+        out = super(NumpyFileComm, cls).get_testing_options(**kwargs)
+        field_names = [backwards.as_str(x) for
+                       x in out['kwargs']['field_names']]
+        field_units = [backwards.as_str(x) for
+                       x in out['kwargs']['field_units']]
+        lst = out['send'][0]
+        out['recv'] = [[units.add_units(
+            np.hstack([units.get_data(x[i]) for x in out['send']]), u)
+            for i, u in enumerate(field_units)]]
+        out['dict'] = {k: v for k, v in zip(field_names, lst)}
+        out['msg_array'] = serialize.list2numpy(lst, names=field_names)
+        out['field_names'] = field_names
+        out['field_units'] = field_units
+        return out
+
+    @property
+    def open_mode(self):
+        r"""str: Mode that should be used to open the file. Files are opened
+        for reading and writing when appending so that the number of rows in
+        the header can be updated."""
+        if self.direction == 'recv':
+            return 'rb'
+        if self.append and os.path.isfile(self.current_address):
+            return 'r+b'
+        return 'wb'
+
+    def _open(self):
+        r"""Open the file, reading the existing header if appending."""
+        super(NumpyFileComm, self)._open()
+        self._npy_header = None
+        if (self.direction == 'send') and (self.open_mode == 'r+b'):
+            self.fd.seek(0, os.SEEK_END)
+            if self.fd.tell() > 0:
+                self.fd.seek(0)
+                self._npy_header = read_npy_header(self.fd)
+                self.fd.seek(0, os.SEEK_END)
+
+    def _recv(self, timeout=0):
+        r"""Read the array from the file. If the array has already been read
+        from the file, any rows appended since are returned with a header.
+
+        Args:
+            timeout (float, optional): Time in seconds to wait for a message.
+                Defaults to self.recv_timeout. Unused.
+
+        Returns:
+            tuple (bool, bytes): Success or failure of reading from the file
+                and the read message.
+
+        """
+        try:
+            out = self.fd.read()
+        except BaseException:  # pragma: debug
+            # Use this to catch case where close called during receive.
+            out = backwards.as_bytes('')
+        if (len(out) > 0) and (self._npy_header is not None):
+            dtype, shape, offset = self._npy_header
+            rowsize = dtype.itemsize * int(np.prod(shape[1:]))
+            nrow = len(out) // rowsize
+            if (nrow * rowsize) < len(out):  # pragma: debug
+                # Leave partially written rows for the next read
+                self.fd.seek(nrow * rowsize - len(out), os.SEEK_CUR)
+                out = out[:(nrow * rowsize)]
+            if nrow == 0:  # pragma: debug
+                return (True, self.empty_bytes_msg)
+            out = write_npy_header(dtype, (nrow, ) + tuple(shape[1:])) + out
+        elif len(out) > 0:
+            self._npy_header = read_npy_header(out)
+        if len(out) == 0:
+            if self.advance_in_series():
+                self.debug("Advanced to %d", self._series_index)
+                self._npy_header = None
+                return self._recv()
+            out = self.eof_msg
+        return (True, out)
+
+    def _send(self, msg):
+        r"""Write message to a file, appending the rows to the array that is
+        already in the file if there is one.
+
+        Args:
+            msg (bytes, str): Data to write to the file.
+
+        Returns:
+            bool: Success or failure of writing to the file.
+
+        Raises:
+            TypeError: If the data type of the rows does not match the
+                array already in the file.
+
+        """
+        if (msg == self.eof_msg) or (self._npy_header is None):
+            if msg != self.eof_msg:
+                self._npy_header = read_npy_header(msg)
+            return super(NumpyFileComm, self)._send(msg)
+        dtype, shape, offset = read_npy_header(msg)
+        old_dtype, old_shape, old_offset = self._npy_header
+        if (dtype != old_dtype) or (shape[1:] != old_shape[1:]):
+            raise TypeError(("Rows of type %s cannot be appended to an array "
+                             + "of type %s.") % (dtype, old_dtype))
+        new_shape = (old_shape[0] + shape[0], ) + tuple(shape[1:])
+        header = write_npy_header(dtype, new_shape, offset=old_offset)
+        try:
+            self.fd.seek(0, os.SEEK_END)
+            self.fd.write(msg[offset:])
+            self.fd.seek(0)
+            self.fd.write(header)
+            self.fd.seek(0, os.SEEK_END)
+            self.fd.flush()
+        except (AttributeError, ValueError):  # pragma: debug
+            if self.is_open:
+                raise
+            return False
+        self._npy_header = (dtype, new_shape, old_offset)
+        if self.is_series:
+            self.advance_in_series()
+        return True
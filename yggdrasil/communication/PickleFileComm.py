@@ -1,7 +1,8 @@
 from yggdrasil import backwards
 from yggdrasil.communication import FileComm
-from yggdrasil.schema import register_component
-from yggdrasil.serialize.PickleSerialize import PickleSerialize
+from yggdrasil.schema import register_component, inherit_schema
+from yggdrasil.serialize.PickleSerialize import (
+    PickleSerialize, get_oob_frames, _oob_prefix, _oob_size)
 
 
 @register_component
@@ -10,15 +11,23 @@ class PickleFileComm(FileComm.FileComm):
 
     Args:
         name (str): The environment variable where file path is stored.
+        out_of_band (bool, optional): If True, buffers are stored out-of-band
+            after each pickle (see PickleSerialize). Defaults to False so that
+            the file can be read using pickle.load.
         **kwargs: Additional keywords arguments are passed to parent class.
 
     """
 
     _filetype = 'pickle'
+    _schema_properties = inherit_schema(
+        FileComm.FileComm._schema_properties,
+        dict(PickleSerialize._schema_properties,
+             out_of_band={'type': 'boolean', 'default': False}))
     _default_serializer = PickleSerialize
 
     def __init__(self, name, **kwargs):
         kwargs.setdefault('readmeth', 'read')
+        kwargs.setdefault('out_of_band', False)
         super(PickleFileComm, self).__init__(name, **kwargs)
 
     @classmethod
@@ -56,10 +65,15 @@ class PickleFileComm(FileComm.FileComm):
         flag, msg = super(PickleFileComm, self)._recv(timeout=timeout)
         # Rewind file if message contains more than one pickle
         if msg != self.eof_msg:
-            fd = backwards.BytesIO(msg)
-            backwards.pickle.load(fd)
-            used = fd.tell()
+            if msg.startswith(_oob_prefix):
+                frames = get_oob_frames(msg)
+                used = (len(_oob_prefix) + (len(frames) + 1) * _oob_size.size
+                        + sum([x.nbytes for x in frames]))
+            else:
+                fd = backwards.BytesIO(msg)
+                backwards.pickle.load(fd)
+                used = fd.tell()
+                fd.close()
             self.fd.seek(prev_pos + used)
             msg = msg[:used]
-            fd.close()
         return flag, msg
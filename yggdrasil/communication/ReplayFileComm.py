@@ -0,0 +1,179 @@
+import os
+import time
+import struct
+from yggdrasil import backwards
+from yggdrasil.communication import FileComm
+from yggdrasil.schema import register_component, inherit_schema
+from yggdrasil.serialize.DefaultSerialize import DefaultSerialize
+
+
+# Each record is prefixed by the time (in seconds) that the message was
+# written relative to the first message and the size of the message
+_record_header = struct.Struct('<dQ')
+
+
+def read_index(fname):
+    r"""Read the index of the records in a replay log without reading the
+    messages.
+
+    Args:
+        fname (str): Full path to the log.
+
+    Returns:
+        list: Tuples of the offset of each message in the file, the time that
+            the message was recorded relative to the first message, and the
+            size of the message.
+
+    """
+    out = []
+    fsize = os.path.getsize(fname)
+    with open(fname, 'rb') as fd:
+        pos = 0
+        while (pos + _record_header.size) <= fsize:
+            fd.seek(pos)
+            t, size = _record_header.unpack(fd.read(_record_header.size))
+            pos += _record_header.size
+            if (pos + size) > fsize:  # pragma: debug
+                # Incomplete record at the end of the log
+                break
+            out.append((pos, t, size))
+            pos += size
+    return out
+
+
+@register_component
+class ReplayFileComm(FileComm.FileComm):
+    r"""Class for recording messages to and replaying messages from a binary
+    log on disk. Each message is stored as a record containing the time
+    that it was written, its size, and the serialized message including the
+    header so that the type of the messages can be recovered when they are
+    replayed. Logs are created by sending to this comm or by setting the
+    'record' option for a connection and can be replayed into a model by
+    using the log as an input with the 'replay' filetype.
+
+    Args:
+        name (str): The environment variable where file path is stored.
+        realtime (bool, optional): If True, messages are received with the
+            same delay between them as when they were recorded. Defaults to
+            False and messages are received as fast as possible.
+        **kwargs: Additional keywords arguments are passed to parent class.
+
+    """
+
+    _filetype = 'replay'
+    _schema_properties = inherit_schema(
+        FileComm.FileComm._schema_properties,
+        {'realtime': {'type': 'boolean', 'default': False}})
+    _default_serializer = DefaultSerialize
+    _default_extension = '.ygglog'
+
+    def _init_before_open(self, **kwargs):
+        r"""Set up dataio and attributes."""
+        kwargs['open_as_binary'] = True
+        self._t0_send = None
+        self._t0_recv = None
+        super(ReplayFileComm, self)._init_before_open(**kwargs)
+
+    @classmethod
+    def get_testing_options(cls, **kwargs):
+        r"""Method to return a dictionary of testing options for this class.
+
+        Returns:
+            dict: Dictionary of variables to use for testing. Key/value pairs:
+                kwargs (dict): Keyword arguments for comms tested with the
+                    provided content.
+                send (list): List of objects to send to test file.
+                recv (list): List of objects that will be received from a test
+                    file that was sent the messages in 'send'.
+                contents (bytes): Bytes contents of test file created by sending
+                    the messages in 'send'.
+
+        """
+        out = super(ReplayFileComm, cls).get_testing_options(**kwargs)
+        out['recv'] = out['send']
+        out['exact_contents'] = False  # Contains time stamps and message IDs
+        seri = cls._default_serializer()
+        contents = []
+        for i, x in enumerate(out['send']):
+            msg = seri.serialize(x, add_serializer_info=(i == 0))
+            contents.append(_record_header.pack(0.0, len(msg)) + msg)
+        out['contents'] = b''.join(contents)
+        return out
+
+    def serialize(self, *args, **kwargs):
+        r"""Serialize a message, including the header so that the type can be
+        recovered when the message is replayed."""
+        kwargs['no_metadata'] = False
+        if self._send_serializer:
+            kwargs['add_serializer_info'] = True
+        return super(ReplayFileComm, self).serialize(*args, **kwargs)
+
+    def record(self, msg):
+        r"""Write a message that was already serialized (including the header)
+        by another comm to the log.
+
+        Args:
+            msg (bytes): Serialized message.
+
+        Returns:
+            bool: Success or failure of writing to the file.
+
+        """
+        return self._safe_send(msg)
+
+    def _send(self, msg):
+        r"""Write a message to the log as a record.
+
+        Args:
+            msg (bytes): Serialized message.
+
+        Returns:
+            bool: Success or failure of writing to the file.
+
+        """
+        if msg != self.eof_msg:
+            t = backwards.clock_time()
+            if self._t0_send is None:
+                self._t0_send = t
+            msg = _record_header.pack(t - self._t0_send, len(msg)) + msg
+        return super(ReplayFileComm, self)._send(msg)
+
+    def _recv(self, timeout=0):
+        r"""Read the next record from the log, waiting until the time that
+        the message should be replayed if realtime is True.
+
+        Args:
+            timeout (float, optional): Time in seconds to wait for a message.
+                Defaults to self.recv_timeout. Unused.
+
+        Returns:
+            tuple (bool, bytes): Success or failure of reading from the file
+                and the read message.
+
+        """
+        try:
+            prefix = self.fd.read(_record_header.size)
+            if len(prefix) == _record_header.size:
+                t, size = _record_header.unpack(prefix)
+                out = self.fd.read(size)
+                if len(out) < size:  # pragma: debug
+                    out = b''
+            else:
+                out = b''
+        except BaseException:  # pragma: debug
+            # Use this to catch case where close called during receive.
+            out = b''
+        if len(out) == 0:
+            if self.advance_in_series():
+                self.debug("Advanced to %d", self._series_index)
+                self._t0_recv = None
+                return self._recv()
+            return (True, self.eof_msg)
+        if self.realtime:
+            now = backwards.clock_time()
+            if self._t0_recv is None:
+                self._t0_recv = now - t
+            delay = self._t0_recv + t - now
+            if delay > 0:
+                time.sleep(delay)
+        return (True, out)
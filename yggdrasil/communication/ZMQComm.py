@@ -207,7 +207,11 @@ def bind_socket(socket, address, retry_timeout=-1, nretry=1):
     
 class ZMQProxy(CommBase.CommServer):
     r"""Start a proxy in a new thread for a server address. A client-side
-    address will be randomly generated.
+    address will be randomly generated. Messages are forwarded from the
+    client(s) to the server(s) by libzmq's steerable proxy so that forwarding
+    does not require Python. The proxy is stopped by sending 'TERMINATE' to
+    its control socket. If the installed version of pyzmq does not provide a
+    steerable proxy, messages are forwarded by a polling loop instead.
 
     Args:
         srv_address (str): Address that should face the server(s).
@@ -227,10 +231,13 @@ class ZMQProxy(CommBase.CommServer):
     Attributes:
         srv_address (str): Address that faces the server(s).
         cli_address (str): Address that faces the client(s).
+        control_address (str): Address of the proxy's control socket.
         context (zmq.Context): ZeroMQ context that will be used.
         srv_socket (zmq.Socket): Socket facing client(s).
         cli_socket (zmq.Socket): Socket facing server(s).
+        control_socket (zmq.Socket): Socket receiving proxy commands.
         cli_count (int): Number of clients that have connected to this proxy.
+        native (bool): True if messages are forwarded by libzmq.
 
     """
     def __init__(self, srv_address, context=None, retry_timeout=-1,
@@ -241,16 +248,20 @@ class ZMQProxy(CommBase.CommServer):
         for k in ['protocol', 'host', 'port']:
             cli_param[k] = kwargs.pop(k, srv_param[k])
         context = context or _global_context
-        # Create new address for the frontend
+        self.context = context
+        self.native = hasattr(zmq, 'proxy_steerable')
+        # Create new address for the frontend. Clients are DEALER sockets so
+        # a DEALER frontend fair-queues their messages without adding the
+        # identity frames that a ROUTER would.
         if cli_param['protocol'] in ['inproc', 'ipc']:
             cli_param['host'] = get_ipc_host()
         cli_address = format_address(cli_param['protocol'], cli_param['host'])
-        self.cli_socket = context.socket(zmq.ROUTER)
+        self.cli_socket = context.socket(zmq.DEALER)
         self.cli_address = bind_socket(self.cli_socket, cli_address,
                                        nretry=nretry,
                                        retry_timeout=retry_timeout)
         self.cli_socket.setsockopt(zmq.LINGER, 0)
-        CommBase.register_comm('ZMQComm', 'ROUTER_server_' + self.cli_address,
+        CommBase.register_comm('ZMQComm', 'DEALER_client_' + self.cli_address,
                                self.cli_socket)
         # Bind backend
         self.srv_socket = context.socket(zmq.DEALER)
@@ -260,51 +271,72 @@ class ZMQProxy(CommBase.CommServer):
                                        retry_timeout=retry_timeout)
         CommBase.register_comm('ZMQComm', 'DEALER_server_' + self.srv_address,
                                self.srv_socket)
-        # Set up poller
-        # self.poller = zmq.Poller()
-        # self.poller.register(frontend, zmq.POLLIN)
+        # Bind control
+        self.control_address = 'inproc://ZMQProxy.control.%s' % str(uuid.uuid4())
+        self.control_socket = context.socket(zmq.PAIR)
+        self.control_socket.setsockopt(zmq.LINGER, 0)
+        self.control_socket.bind(self.control_address)
+        self._control_client = None
         self.reply_socket = None
         # Set name
         super(ZMQProxy, self).__init__(self.srv_address, self.cli_address, **kwargs)
         self.name = 'ZMQProxy.%s' % srv_address
 
-    def client_recv(self):
-        r"""Receive single message from the client."""
+    def send_control(self, command):
+        r"""Send a command to the proxy's control socket.
+
+        Args:
+            command (bytes): Command that should be sent ('TERMINATE',
+                'PAUSE', 'RESUME' or 'STATISTICS').
+
+        Returns:
+            bool: True if the command was sent, False otherwise.
+
+        """
         with self.lock:
-            if not self.was_break:
-                return self.cli_socket.recv_multipart()
-            else:  # pragma: debug
-                return None
-
-    def server_send(self, msg):
-        r"""Send single message to the server."""
-        if msg is None:  # pragma: debug
-            return
-        while not self.was_break:
+            if self.control_socket is None:
+                return False
+            if self._control_client is None:
+                self._control_client = self.context.socket(zmq.PAIR)
+                self._control_client.setsockopt(zmq.LINGER, 0)
+                self._control_client.connect(self.control_address)
             try:
-                self.srv_socket.send(msg, zmq.NOBLOCK)
-                # self.srv_socket.send_multipart(msg, zmq.NOBLOCK)
-                break
-            except zmq.ZMQError:
-                self.sleep(0.0001)
-
-    def poll(self):
-        # socks = dict(self.poller.poll())
-        # return (socks.get(self.cli_socket) == zmq.POLLIN)
-        with self.lock:
-            if self.was_break:  # pragma: debug
+                self._control_client.send(backwards.as_bytes(command), zmq.NOBLOCK)
+            except zmq.ZMQError:  # pragma: debug
                 return False
-        out = self.cli_socket.poll(timeout=1, flags=zmq.POLLIN)
-        return (out == zmq.POLLIN)
+        return True
 
     def run_loop(self):
         r"""Forward messages from client to server."""
-        if self.poll():
-            message = self.client_recv()
-            if message is not None:
-                self.debug('Forwarding message of size %d from %s',
-                           len(message[1]), message[0])
-                self.server_send(message[1])
+        if self.native:
+            # Blocks until TERMINATE is received on the control socket
+            try:
+                zmq.proxy_steerable(self.cli_socket, self.srv_socket,
+                                    None, self.control_socket)
+            except zmq.ZMQError as e:  # pragma: debug
+                if e.errno != zmq.ETERM:
+                    self.exception("Error in proxy")
+            self.set_break_flag()
+            return
+        # Fall back to forwarding messages in Python
+        if self.control_socket.poll(timeout=0, flags=zmq.POLLIN):
+            if self.control_socket.recv() == b'TERMINATE':
+                self.set_break_flag()
+                return
+        if self.cli_socket.poll(timeout=1, flags=zmq.POLLIN):
+            message = self.cli_socket.recv_multipart()
+            self.debug('Forwarding message of size %d', len(message[-1]))
+            while not self.was_break:
+                try:
+                    self.srv_socket.send_multipart(message, zmq.NOBLOCK)
+                    break
+                except zmq.ZMQError:
+                    self.sleep(0.0001)
+
+    def terminate(self, *args, **kwargs):
+        r"""Stop the proxy via the control socket before joining the thread."""
+        self.send_control(b'TERMINATE')
+        super(ZMQProxy, self).terminate(*args, **kwargs)
 
     def after_loop(self):
         r"""Close sockets after the loop finishes."""
@@ -318,13 +350,13 @@ class ZMQProxy(CommBase.CommServer):
     def close_sockets(self):
         r"""Close the sockets."""
         self.debug('Closing sockets')
-        if self.cli_socket:
-            self.cli_socket.close()
-            self.cli_socket = None
-        if self.srv_socket:
-            self.srv_socket.close()
-            self.srv_socket = None
-        CommBase.unregister_comm('ZMQComm', 'ROUTER_server_' + self.cli_address)
+        with self.lock:
+            for k in ['cli_socket', 'srv_socket', 'control_socket',
+                      '_control_client']:
+                if getattr(self, k, None) is not None:
+                    getattr(self, k).close()
+                    setattr(self, k, None)
+        CommBase.unregister_comm('ZMQComm', 'DEALER_client_' + self.cli_address)
         CommBase.unregister_comm('ZMQComm', 'DEALER_server_' + self.srv_address)
 
 
@@ -365,6 +397,7 @@ class ZMQComm(AsyncComm.AsyncComm):
     # Based on limit of 32bit int, this could be 2**30, but this is
     # too large for stack allocation in C so 2**20 will be used.
     _maxMsgSize = 2**20
+    _sends_frames = True
     
     def _init_before_open(self, context=None, socket_type=None,
                           socket_action=None, topic_filter='',
@@ -618,7 +651,7 @@ class ZMQComm(AsyncComm.AsyncComm):
         r"""Unbind from address."""
         with self.socket_lock:
             if self._bound:
-                self.debug('Unbinding from %s' % self.address)
+                self.debug('Unbinding from %s', self.address)
                 try:
                     self.socket.unbind(self.address)
                 except zmq.ZMQError:  # pragma: debug
@@ -1005,7 +1038,9 @@ class ZMQComm(AsyncComm.AsyncComm):
         r"""Send a message.
 
         Args:
-            msg (str, bytes): Message to be sent.
+            msg (str, bytes, tools.MessageFrames): Message to be sent.
+                Messages made up of frames are sent as multipart messages
+                without copying the frames.
             topic (str, optional): Filter that should be sent with the
                 message for 'PUB' sockets. Defaults to ''.
             identity (str, optional): Identify of identified worker that
@@ -1024,7 +1059,12 @@ class ZMQComm(AsyncComm.AsyncComm):
             identity = self.dealer_identity
         topic = backwards.as_bytes(topic)
         identity = backwards.as_bytes(identity)
-        if self.socket_type_name == 'PUB':
+        if isinstance(msg, tools.MessageFrames):
+            if self.socket_type_name == 'PUB':
+                total_msg = msg.prepend(topic + _flag_zmq_filter)
+            else:
+                total_msg = msg
+        elif self.socket_type_name == 'PUB':
             total_msg = topic + _flag_zmq_filter + msg
         else:
             total_msg = msg
@@ -1038,7 +1078,11 @@ class ZMQComm(AsyncComm.AsyncComm):
                 self.special_debug("Sending %d bytes to %s", len(total_msg), self.address)
                 if self.socket_type_name == 'ROUTER':
                     self.socket.send(identity, zmq.SNDMORE)
-                self.socket.send(total_msg, **kwargs)
+                if isinstance(total_msg, tools.MessageFrames):
+                    self.socket.send_multipart(total_msg.frames, copy=False,
+                                               **kwargs)
+                else:
+                    self.socket.send(total_msg, **kwargs)
                 self.special_debug("Sent %d bytes to %s", len(total_msg), self.address)
                 self._n_zmq_sent += 1
             except zmq.ZMQError as e:  # pragma: debug
@@ -1086,6 +1130,12 @@ class ZMQComm(AsyncComm.AsyncComm):
                     self._recv_identities.add(identity)
                 kwargs.setdefault('flags', flags)
                 total_msg = self.socket.recv(**kwargs)
+                # Join the frames of messages sent as multipart messages
+                if self.socket.getsockopt(zmq.RCVMORE):
+                    frames = [total_msg]
+                    while self.socket.getsockopt(zmq.RCVMORE):
+                        frames.append(self.socket.recv(**kwargs))
+                    total_msg = b''.join(frames)
             except zmq.ZMQError:  # pragma: debug
                 self.exception("Error receiving")
                 return (False, self.empty_bytes_msg)
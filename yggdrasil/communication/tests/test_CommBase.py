@@ -1,6 +1,9 @@
 import os
 import uuid
-from yggdrasil import backwards
+import json
+import shutil
+import tempfile
+from yggdrasil import backwards, metrics, tracing
 from yggdrasil.tests import YggTestClassInfo, assert_equal
 from yggdrasil.communication import new_comm, get_comm, CommBase
 
@@ -22,6 +25,16 @@ def test_registry():
     assert(not CommBase.unregister_comm(comm_class, key))
 
 
+def test_coalesced():
+    r"""Test combining and splitting messages."""
+    msgs = [b'YGG_MSG_HEAD1', b'', b'YGG_MSG_HEAD' + 100 * b'x']
+    msg = CommBase.pack_coalesced(msgs)
+    assert_equal(len(msg), (sum([len(x) for x in msgs])
+                            + CommBase.coalesce_overhead(len(msgs))))
+    assert_equal(CommBase.unpack_coalesced(msg), msgs)
+    assert_equal(CommBase.unpack_coalesced(msgs[0]), msgs[:1])
+
+
 class TestCommBase(YggTestClassInfo):
     r"""Tests for CommBase communication class.
 
@@ -452,6 +465,58 @@ class TestCommBase(YggTestClassInfo):
         self.recv_instance.close()
         self.recv_instance.purge()
 
+    def test_metrics(self):
+        r"""Test collection of performance metrics."""
+        self.do_send_recv()
+        send_metrics = self.send_instance.get_metrics()
+        recv_metrics = self.recv_instance.get_metrics()
+        json.dumps(send_metrics)
+        json.dumps(recv_metrics)
+        totals = metrics.summarize({'send': {'ocomm': send_metrics},
+                                    'recv': {'icomm': recv_metrics}})
+        if self.comm in ['CommBase', 'AsyncComm']:
+            self.assert_equal(totals['messages_sent'], 0)
+        else:
+            self.assert_greater(totals['bytes_sent'], 0)
+            self.assert_greater(totals['bytes_recv'], 0)
+            self.assert_greater(totals['serialize_time']['count'], 0)
+            self.assert_greater(totals['deserialize_time']['count'], 0)
+            self.assert_greater(totals['recv_time']['count'], 0)
+        self.recv_instance.sample_backlog()
+        backlog = self.recv_instance.get_metrics()['backlog']
+        if backlog['count']:
+            self.assert_equal(backlog['max'], 0)
+
+    def test_tracing(self):
+        r"""Test adding hops to the trace of a message."""
+        if self.comm in ['CommBase', 'AsyncComm'] or self.instance.is_file:
+            return
+        old_dir = os.environ.get('YGG_TRACE_DIR', None)
+        trace_dir = tempfile.mkdtemp()
+        os.environ['YGG_TRACE_DIR'] = trace_dir
+        try:
+            comms = [self.send_instance, self.recv_instance]
+            for x in comms[:2]:
+                # Messages are sent/received by wrapped comms
+                comms += getattr(x, 'comm_list', [])
+                for k in ['icomm', 'ocomm']:
+                    if isinstance(getattr(x, k, None), CommBase.CommBase):
+                        comms.append(getattr(x, k))
+            for x in comms:
+                x._tracing = True
+            self.do_send_recv()
+            traces = tracing.load_traces(trace_dir)
+            self.assert_greater(len(traces), 0)
+            for x in traces:
+                hops = [h[0].split(':')[-1] for h in tracing.parse_trace(x)[1]]
+                self.assert_equal(hops, ['send', 'recv'])
+        finally:
+            if old_dir is None:
+                del os.environ['YGG_TRACE_DIR']
+            else:  # pragma: debug
+                os.environ['YGG_TRACE_DIR'] = old_dir
+            shutil.rmtree(trace_dir)
+
     def test_send_recv_dict(self):
         r"""Test send/recv message as dict."""
         msg_send = self.testing_options['dict']
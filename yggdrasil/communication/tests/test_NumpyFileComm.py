@@ -0,0 +1,33 @@
+import numpy as np
+from yggdrasil.communication import new_comm
+from yggdrasil.communication.tests import test_FileComm as parent
+
+
+class TestNumpyFileComm(parent.TestFileComm):
+    r"""Test for NumpyFileComm communication class."""
+
+    comm = 'NumpyFileComm'
+
+    def test_load(self):
+        r"""Test that the file can be memory mapped by numpy."""
+        for x in self.testing_options['send']:
+            flag = self.send_instance.send(x)
+            assert(flag)
+        arr = np.load(self.send_instance.address, mmap_mode='r')
+        self.assert_equal(list(arr.dtype.names),
+                          self.testing_options['field_names'])
+        self.assert_equal(
+            len(arr), sum([len(x[0]) for x in self.testing_options['send']]))
+
+    def test_append_error(self):
+        r"""Test error when appending rows with a different type."""
+        flag = self.send_instance.send(self.testing_options['send'][0])
+        assert(flag)
+        kwargs = self.send_inst_kwargs
+        kwargs['append'] = True
+        for k in ['field_names', 'field_units', 'type', 'items']:
+            kwargs.pop(k, None)
+        new_inst = new_comm('append%s' % self.uuid, **kwargs)
+        flag = new_inst.send(np.zeros(3, dtype=[('a', 'f8')]))
+        assert(not flag)
+        self.remove_instance(new_inst)
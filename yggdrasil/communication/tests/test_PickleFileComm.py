@@ -1,3 +1,6 @@
+import numpy as np
+from yggdrasil.communication import new_comm
+from yggdrasil.serialize import PickleSerialize
 from yggdrasil.communication.tests import test_FileComm as parent
 
 
@@ -5,3 +8,30 @@ class TestPickleFileComm(parent.TestFileComm):
     r"""Test for PickleFileComm communication class."""
 
     comm = 'PickleFileComm'
+
+    def test_out_of_band(self):
+        r"""Test sending/receiving pickles with out-of-band buffers."""
+        objs = [{'a': np.arange(i + 3), 'b': 'c'} for i in range(2)]
+        kwargs = self.send_inst_kwargs
+        kwargs['out_of_band'] = True
+        send_inst = new_comm('oob%s' % self.uuid, **kwargs)
+        recv_inst = None
+        try:
+            for x in objs:
+                flag = send_inst.send(x)
+                assert(flag)
+            with open(send_inst.address, 'rb') as fd:
+                msg = fd.read()
+            if PickleSerialize._oob_available:
+                assert(msg.startswith(PickleSerialize._oob_prefix))
+            recv_inst = new_comm('oob%s' % self.uuid,
+                                 **send_inst.opp_comm_kwargs())
+            for x in objs:
+                flag, y = recv_inst.recv()
+                assert(flag)
+                np.testing.assert_array_equal(y['a'], x['a'])
+                self.assert_equal(y['b'], x['b'])
+        finally:
+            self.remove_instance(send_inst)
+            if recv_inst is not None:
+                self.remove_instance(recv_inst)
@@ -0,0 +1,42 @@
+from yggdrasil import backwards
+from yggdrasil.communication import new_comm
+from yggdrasil.communication.ReplayFileComm import read_index
+from yggdrasil.communication.tests import test_FileComm as parent
+
+
+class TestReplayFileComm(parent.TestFileComm):
+    r"""Test for ReplayFileComm communication class."""
+
+    comm = 'ReplayFileComm'
+
+    def test_read_index(self):
+        r"""Test reading the index of records in a log."""
+        for x in self.testing_options['send']:
+            flag = self.send_instance.send(x)
+            assert(flag)
+        index = read_index(self.send_instance.address)
+        self.assert_equal(len(index), len(self.testing_options['send']))
+        times = [x[1] for x in index]
+        self.assert_equal(times, sorted(times))
+        self.assert_equal(times[0], 0.0)
+
+    def test_realtime(self):
+        r"""Test replaying messages with the recorded timing."""
+        delay = 0.2
+        for x in self.testing_options['send']:
+            flag = self.send_instance.send(x)
+            assert(flag)
+            self.send_instance.sleep(delay)
+        kwargs = self.send_instance.opp_comm_kwargs()
+        kwargs['realtime'] = True
+        recv_inst = new_comm('realtime%s' % self.uuid, **kwargs)
+        try:
+            t0 = backwards.clock_time()
+            for x in self.testing_options['recv']:
+                flag, y = recv_inst.recv()
+                assert(flag)
+                self.assert_msg_equal(y, x)
+            t1 = backwards.clock_time()
+            assert((t1 - t0) >= (delay * (len(self.testing_options['recv']) - 1)))
+        finally:
+            self.remove_instance(recv_inst)
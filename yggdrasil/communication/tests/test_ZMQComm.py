@@ -1,8 +1,10 @@
 import unittest
 import zmq
 import copy
-from yggdrasil import platform
+import numpy as np
+from yggdrasil import platform, backwards
 from yggdrasil.tests import assert_raises, assert_equal
+from yggdrasil.serialize import PickleSerialize
 from yggdrasil.communication import new_comm
 from yggdrasil.communication.tests import test_AsyncComm
 from yggdrasil.communication import ZMQComm, IPCComm
@@ -59,6 +61,35 @@ def test_error_on_send_open_twice():
         comm1.close()
 
         
+@unittest.skipIf(not _zmq_installed, "ZMQ library not installed")
+def test_ZMQProxy():
+    r"""Test forwarding messages through the proxy and stopping it via the
+    control socket, both natively and with the Python loop."""
+    for native in [True, False]:
+        srv_address = ZMQComm.format_address('tcp', 'localhost')
+        proxy = ZMQComm.ZMQProxy(srv_address, nretry=4, retry_timeout=0.01)
+        proxy.native = (native and proxy.native)
+        context = proxy.context
+        cli = context.socket(zmq.DEALER)
+        cli.setsockopt(zmq.LINGER, 0)
+        cli.connect(proxy.cli_address)
+        srv = context.socket(zmq.DEALER)
+        srv.setsockopt(zmq.LINGER, 0)
+        srv.connect(proxy.srv_address)
+        try:
+            proxy.start()
+            cli.send(b'test message')
+            assert(srv.poll(timeout=5000, flags=zmq.POLLIN))
+            assert_equal(srv.recv_multipart(), [b'test message'])
+            proxy.terminate()
+            assert(not proxy.is_alive())
+            assert(proxy.cli_socket is None)
+            assert(not proxy.send_control(b'TERMINATE'))
+        finally:
+            cli.close()
+            srv.close()
+
+
 @unittest.skipIf(not _zmq_installed, "ZMQ library not installed")
 class TestZMQComm(test_AsyncComm.TestAsyncComm):
     r"""Test for ZMQComm communication class."""
@@ -120,6 +151,106 @@ class TestZMQCommTCP(TestZMQComm):
 
     protocol = 'tcp'
 
+    def test_send_recv_pickle_frames(self):
+        r"""Test sending pickles with out-of-band buffers as multipart
+        messages, including ones larger than maxMsgSize."""
+        msg_send = {'a': np.arange(self.send_instance.maxMsgSize // 4),
+                    'b': 'c'}
+        kwargs = self.send_inst_kwargs
+        kwargs.update(serializer_class=PickleSerialize.PickleSerialize,
+                      pickle_protocol=backwards.pickle.HIGHEST_PROTOCOL)
+        send_inst = new_comm('pickle%s' % self.uuid, **kwargs)
+        recv_inst = None
+        try:
+            assert_equal(send_inst.serializer.out_of_band,
+                         PickleSerialize._oob_available)
+            recv_inst = new_comm('pickle%s' % self.uuid,
+                                 **send_inst.opp_comm_kwargs())
+            assert(send_inst.send(msg_send))
+            flag, msg_recv = recv_inst.recv(timeout=self.timeout)
+            assert(flag)
+            np.testing.assert_array_equal(msg_recv['a'], msg_send['a'])
+            assert_equal(msg_recv['b'], msg_send['b'])
+            if PickleSerialize._oob_available:
+                assert(not send_inst._work_comms)
+        finally:
+            self.remove_instance(send_inst)
+            if recv_inst is not None:
+                self.remove_instance(recv_inst)
+
+    
+class TestZMQCommTCP_compressed(TestZMQCommTCP):
+    r"""Test for ZMQComm communication class with compressed messages."""
+
+    @property
+    def send_inst_kwargs(self):
+        r"""dict: Keyword arguments for send instance."""
+        out = super(TestZMQCommTCP_compressed, self).send_inst_kwargs
+        out.update(compression='zlib', compression_threshold=0)
+        return out
+
+
+class TestZMQCommTCP_block(TestZMQCommTCP):
+    r"""Test for ZMQComm communication class with block encoded containers."""
+
+    @property
+    def send_inst_kwargs(self):
+        r"""dict: Keyword arguments for send instance."""
+        out = super(TestZMQCommTCP_block, self).send_inst_kwargs
+        out.update(block_encode=True)
+        return out
+
+    def test_send_recv_block(self):
+        r"""Test sending and receiving a list encoded as a block."""
+        msg_send = [float(i) for i in range(100)]
+        assert(self.send_instance.send(msg_send))
+        flag, msg_recv = self.recv_instance.recv(timeout=self.timeout)
+        assert(flag)
+        assert_equal(msg_recv, msg_send)
+        assert(isinstance(self.recv_instance.serializer.typedef['items'], dict))
+
+
+class TestZMQCommTCP_coalesced(TestZMQCommTCP):
+    r"""Test for ZMQComm communication class with combined messages."""
+
+    @property
+    def send_inst_kwargs(self):
+        r"""dict: Keyword arguments for send instance."""
+        out = super(TestZMQCommTCP_coalesced, self).send_inst_kwargs
+        out.update(coalesce_messages=3)
+        return out
+
+    def test_send_recv_coalesced(self):
+        r"""Test that consecutive messages are combined and split."""
+        # Only send when the number of messages is reached
+        self.send_instance.coalesce_delay = self.timeout
+        msgs = [self.test_msg + backwards.as_bytes(str(i)) for i in range(3)]
+        for x in msgs:
+            assert(self.send_instance.send(x))
+        assert_equal(self.send_instance._n_sent, 1)
+        for x in msgs:
+            flag, msg_recv = self.recv_instance.recv(timeout=self.timeout)
+            assert(flag)
+            assert_equal(msg_recv, x)
+        assert_equal(self.recv_instance._n_recv, len(msgs))
+
+    def test_send_recv_coalesced_order(self, nmsg=50):
+        r"""Test that messages combined by the backlog thread are received
+        in order and before the EOF."""
+        self.send_instance.coalesce_delay = 0.0
+        msgs = [self.test_msg + backwards.as_bytes(str(i)) for i in range(nmsg)]
+        for x in msgs:
+            assert(self.send_instance.send(x))
+        assert(self.send_instance.send_eof())
+        for x in msgs:
+            flag, msg_recv = self.recv_instance.recv(timeout=self.timeout)
+            assert(flag)
+            assert_equal(msg_recv, x)
+        # The receive comm is closed when the EOF is received
+        flag, msg_recv = self.recv_instance.recv(timeout=self.timeout)
+        assert(not flag)
+        assert(self.recv_instance.is_eof(msg_recv))
+
     
 @unittest.skipIf(not _ipc_installed, "IPC library not installed")
 class TestZMQCommIPC(TestZMQComm):
@@ -0,0 +1,135 @@
+r"""Codecs for compressing the bodies of messages sent by comms. When a comm
+is created with the 'compression' option, message bodies at least
+'compression_threshold' bytes in size are compressed using the named codec
+before being sent and the codec is recorded in the message header under
+'compression' so that receiving comms decompress the body regardless of
+their own settings. Codecs using zlib, bz2, and lzma from the standard
+library are registered by default and additional codecs can be added via
+register_codec."""
+import zlib
+import bz2
+import time
+from collections import OrderedDict
+try:
+    import lzma
+except ImportError:  # pragma: Python 2
+    lzma = None
+
+
+if hasattr(time, 'perf_counter'):  # pragma: Python 3
+    _timer = time.perf_counter
+else:  # pragma: Python 2
+    _timer = time.time
+_codecs = OrderedDict()
+_default_threshold = 1024
+
+
+def register_codec(name, compress, decompress):
+    r"""Register a codec that can be used to compress messages.
+
+    Args:
+        name (str): Name used to select the codec via the 'compression' comm
+            option. This is also recorded in the header of compressed messages
+            so the same codec must be registered by the receiving process.
+        compress (func): Function that takes bytes and returns compressed
+            bytes.
+        decompress (func): Function that takes the bytes returned by compress
+            and returns the original bytes.
+
+    """
+    _codecs[name] = (compress, decompress)
+
+
+def get_codec(name):
+    r"""Get the functions for a registered codec.
+
+    Args:
+        name (str): Name of a registered codec.
+
+    Returns:
+        tuple(func, func): Compression and decompression functions.
+
+    Raises:
+        ValueError: If there is not a codec registered under name.
+
+    """
+    if name not in _codecs:
+        raise ValueError("Unsupported compression codec '%s'. Registered "
+                         "codecs are: %s" % (name, list(_codecs.keys())))
+    return _codecs[name]
+
+
+def compress(data, name):
+    r"""Compress data using a registered codec.
+
+    Args:
+        data (bytes): Data to compress.
+        name (str): Name of a registered codec.
+
+    Returns:
+        bytes: Compressed data.
+
+    """
+    return get_codec(name)[0](data)
+
+
+def decompress(data, name):
+    r"""Decompress data using a registered codec.
+
+    Args:
+        data (bytes): Data to decompress.
+        name (str): Name of the codec used to compress the data.
+
+    Returns:
+        bytes: Decompressed data.
+
+    """
+    return get_codec(name)[1](data)
+
+
+def benchmark(data, codecs=None, nrep=5):
+    r"""Time compressing and decompressing data with each codec to assess the
+    tradeoff between CPU time and the number of bytes sent.
+
+    Args:
+        data (bytes): Data to compress (e.g. a serialized message).
+        codecs (list, optional): Names of codecs to time. Defaults to all
+            registered codecs.
+        nrep (int, optional): Number of times each codec is timed. The
+            minimum time is reported. Defaults to 5.
+
+    Returns:
+        OrderedDict: Mapping from codec name to a dictionary containing the
+            ratio of the compressed size to the original size ('ratio') and
+            the minimum time (in seconds) required to compress ('compress')
+            and decompress ('decompress') the data.
+
+    """
+    if codecs is None:
+        codecs = list(_codecs.keys())
+    out = OrderedDict()
+    for name in codecs:
+        fcomp, fdecomp = get_codec(name)
+        tcomp = []
+        tdecomp = []
+        for i in range(nrep):
+            t0 = _timer()
+            cdata = fcomp(data)
+            t1 = _timer()
+            fdecomp(cdata)
+            t2 = _timer()
+            tcomp.append(t1 - t0)
+            tdecomp.append(t2 - t1)
+        out[name] = OrderedDict([('ratio', float(len(cdata)) / len(data)),
+                                 ('compress', min(tcomp)),
+                                 ('decompress', min(tdecomp))])
+    return out
+
+
+# The fastest levels are used for the default codecs as messages are
+# compressed on the critical path between models
+register_codec('zlib', lambda x: zlib.compress(x, 1), zlib.decompress)
+register_codec('bz2', lambda x: bz2.compress(x, 1), bz2.decompress)
+if lzma is not None:  # pragma: Python 3
+    register_codec('lzma', lambda x: lzma.compress(x, preset=0),
+                   lzma.decompress)
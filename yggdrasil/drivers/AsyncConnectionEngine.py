@@ -0,0 +1,196 @@
+"""Module for running connection drivers on a single asyncio event loop."""
+import threading
+from yggdrasil import tools, profiling
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # pragma: Python 2
+    asyncio = None
+
+
+class AsyncConnectionEngine(tools.YggThread):
+    r"""Thread running an asyncio event loop that schedules the loops of
+    many connection drivers. Each driver's before_loop, iterations of
+    run_loop, and after_loop (which may block while comms connect, send, or
+    drain) are run one at a time in an executor with a single worker that
+    is dedicated to that driver, so a blocked driver cannot starve the
+    others. The event loop schedules a driver's next step when its previous
+    one completes and reschedules drivers that are waiting on messages after
+    their sleeptime rather than having them sleep. Because each driver's
+    steps run on the same worker thread, profiling and main thread
+    termination are handled as they are in ConnectionDriver.run.
+
+    Args:
+        name (str, optional): Name of the engine. Defaults to
+            'AsyncConnectionEngine'.
+        **kwargs: Additional keyword arguments are passed to the parent class.
+
+    Attributes:
+        loop (asyncio.AbstractEventLoop): Event loop running the drivers.
+        drivers (dict): Drivers scheduled on the engine keyed by uuid.
+        executors (dict): Executor running the steps of each driver keyed
+            by uuid.
+
+    Raises:
+        RuntimeError: If asyncio is not available.
+
+    """
+
+    def __init__(self, name='AsyncConnectionEngine', **kwargs):
+        if asyncio is None:  # pragma: Python 2
+            raise RuntimeError("The async connection engine requires asyncio.")
+        super(AsyncConnectionEngine, self).__init__(name, **kwargs)
+        self.loop = None
+        self.drivers = {}
+        self.executors = {}
+        self._done = {}
+        self._profiles = {}
+        self._loop_ready = threading.Event()
+
+    def run(self):
+        r"""Run the event loop until the engine is stopped."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._loop_ready.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+            for ev in self._done.values():
+                ev.set()
+
+    def start(self, *args, **kwargs):
+        r"""Start the engine thread and wait for the event loop to run."""
+        super(AsyncConnectionEngine, self).start(*args, **kwargs)
+        self._loop_ready.wait(self.timeout)
+
+    def stop(self):
+        r"""Stop the event loop and wait for the engine thread to exit."""
+        self.debug('')
+        with self.lock:
+            self.set_terminated_flag()
+        if self.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.join(self.timeout)
+        with self.lock:
+            executors = list(self.executors.values())
+            self.executors.clear()
+        for x in executors:
+            x.shutdown(wait=False)
+        self.debug('Returning')
+
+    def add_driver(self, drv):
+        r"""Begin running the loop for a driver on the engine.
+
+        Args:
+            drv (ConnectionDriver): Driver that should be run.
+
+        """
+        if not self.was_started:
+            self.start()
+        with self.lock:
+            self.drivers[drv.uuid] = drv
+            self.executors[drv.uuid] = ThreadPoolExecutor(max_workers=1)
+            self._done[drv.uuid] = threading.Event()
+        self.loop.call_soon_threadsafe(self._before_loop, drv)
+
+    def is_running(self, drv):
+        r"""Determine if a driver's loop is still running on the engine.
+
+        Args:
+            drv (ConnectionDriver): Driver to check.
+
+        Returns:
+            bool: True if the driver is running, False otherwise.
+
+        """
+        ev = self._done.get(drv.uuid, None)
+        return (ev is not None) and (not ev.is_set())
+
+    def join_driver(self, drv, timeout=None):
+        r"""Wait for a driver's loop to finish.
+
+        Args:
+            drv (ConnectionDriver): Driver to wait for.
+            timeout (float, optional): Maximum time that should be waited.
+                Defaults to None and is infinite.
+
+        """
+        ev = self._done.get(drv.uuid, None)
+        if ev is not None:
+            ev.wait(timeout)
+
+    def _run_in_executor(self, drv, func, callback):
+        r"""Run a function in a driver's executor.
+
+        Args:
+            drv (ConnectionDriver): Driver that the function is for.
+            func (callable): Function that should be run.
+            callback (callable): Method of the engine that should be called
+                with the driver and the future when the function completes.
+
+        """
+        fut = self.loop.run_in_executor(self.executors[drv.uuid], func)
+        fut.add_done_callback(lambda f: callback(drv, f))
+
+    def _before_loop(self, drv):
+        r"""Start profiling the driver's worker and run before_loop."""
+        def func():
+            self._profiles[drv.uuid] = profiling.start()
+            drv.before_loop()
+        self._run_in_executor(drv, func, self._on_before_loop)
+
+    def _on_before_loop(self, drv, fut):
+        r"""Set the loop flag and schedule the first iteration."""
+        if fut.exception() is not None:  # pragma: debug
+            drv.error("BEFORE LOOP ERROR: %s", fut.exception())
+            drv.set_break_flag()
+        if not drv.was_break:
+            drv.set_loop_flag()
+        self._step(drv)
+
+    def _iterate(self, drv):
+        r"""Perform one iteration of a driver's loop."""
+        if drv.main_terminated and (not drv._1st_main_terminated):  # pragma: debug
+            drv.on_main_terminated()
+        else:
+            drv.run_loop()
+
+    def _after_loop(self, drv):
+        r"""Run after_loop and write the profile of the driver's worker."""
+        try:
+            drv.after_loop()
+        finally:
+            profiling.stop(self._profiles.pop(drv.uuid, None),
+                           label='connection_%s' % drv.name)
+
+    def _step(self, drv):
+        r"""Run one iteration of a driver's loop in its executor or, if the
+        loop was broken, run after_loop."""
+        if drv.was_break:
+            self._run_in_executor(drv, lambda: self._after_loop(drv),
+                                  self._on_after_loop)
+        else:
+            self._run_in_executor(drv, lambda: self._iterate(drv),
+                                  self._on_step)
+
+    def _on_step(self, drv, fut):
+        r"""Check the result of a loop iteration and reschedule the driver."""
+        if fut.exception() is not None:  # pragma: debug
+            drv.error("ENGINE LOOP ERROR: %s", fut.exception())
+            drv.set_break_flag()
+        if (not drv.was_break) and (getattr(drv, 'state', None) == 'waiting'):
+            self.loop.call_later(drv.sleeptime, self._step, drv)
+        else:
+            self._step(drv)
+
+    def _on_after_loop(self, drv, fut):
+        r"""Mark the driver as finished and shut down its executor."""
+        if fut.exception() is not None:  # pragma: debug
+            drv.error("AFTER LOOP ERROR: %s", fut.exception())
+        with self.lock:
+            self.drivers.pop(drv.uuid, None)
+            executor = self.executors.pop(drv.uuid, None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+        self._done[drv.uuid].set()
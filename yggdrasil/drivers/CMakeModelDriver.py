@@ -146,7 +146,9 @@ class CMakeModelDriver(ModelDriver):
             Defaults to [].
         preserve_cache (bool, optional): If True the cmake cache will be kept
             following the run, otherwise all files created by cmake will be
-            cleaned up. Defaults to False.
+            cleaned up. If True and the compile cache is enabled (config
+            option ('c', 'compile_cache')), subsequent builds are incremental.
+            Defaults to False.
         **kwargs: Additional keyword arguments are passed to parent class.
 
     Attributes:
@@ -243,12 +245,18 @@ class CMakeModelDriver(ModelDriver):
                 self.error(backwards.as_unicode(output))
                 raise RuntimeError("CMake config failed with code %d." % exit_code)
             self.debug('Config output: \n%s' % output)
-        # Build
-        build_cmd = ['cmake', '--build', self.builddir, '--clean-first']
+        # Build (incrementally if the build tree is preserved between runs
+        # and the compile cache is enabled) using all available cores
+        build_cmd = ['cmake', '--build', self.builddir]
+        if not (self.preserve_cache and GCCModelDriver.is_compile_cache_enabled()):
+            build_cmd.append('--clean-first')
         if self.target is not None:
             build_cmd += ['--target', self.target]
+        build_env = os.environ.copy()
+        build_env.setdefault('CMAKE_BUILD_PARALLEL_LEVEL',
+                             str(GCCModelDriver.get_compile_jobs()))
         self.info(' '.join(build_cmd))
-        comp_process = tools.popen_nobuffer(build_cmd)
+        comp_process = tools.popen_nobuffer(build_cmd, env=build_env)
         output, err = comp_process.communicate()
         exit_code = comp_process.returncode
         if exit_code != 0:  # pragma: debug
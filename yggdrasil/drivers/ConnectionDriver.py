@@ -2,7 +2,9 @@
 import os
 import numpy as np
 import threading
-from yggdrasil import backwards
+from collections import OrderedDict
+from yggdrasil import backwards, profiling, tools
+from yggdrasil.metrics import Histogram
 from yggdrasil.communication import new_comm, get_comm_class
 from yggdrasil.drivers.Driver import Driver
 from yggdrasil.schema import get_schema
@@ -35,6 +37,12 @@ class ConnectionDriver(Driver):
         onexit (str, optional): Class method that should be called when the
             corresponding model exits, but before the driver is shut down.
             Defaults to None.
+        record (str, optional): Path to a log that every message received by
+            the connection should be recorded to (see
+            :class:`yggdrasil.communication.ReplayFileComm.ReplayFileComm`).
+            Relative paths are relative to the working directory. The log
+            can be replayed into a model via an input with the 'replay'
+            filetype. Defaults to None and messages are not recorded.
         **kwargs: Additonal keyword arguments are passed to the parent class.
 
     Attributes:
@@ -55,6 +63,13 @@ class ConnectionDriver(Driver):
             loop.
         onexit (str): Class method that should be called when the corresponding
             model exits, but before the driver is shut down.
+        recorder (ReplayFileComm): Comm that received messages are recorded
+            to. None if messages are not recorded.
+        engine (AsyncConnectionEngine): Engine that the driver loop should be
+            run on instead of a dedicated thread. None if the driver runs in
+            its own thread.
+        process_time (Histogram): Histogram of the time (in seconds) spent
+            processing (translating) each message.
 
     """
 
@@ -63,6 +78,7 @@ class ConnectionDriver(Driver):
     _ocomm_type = 'DefaultComm'
     _direction = 'any'
     _schema_type = 'connection'
+    _backlog_sample_interval = 16
     _schema_required = ['inputs', 'outputs']
     _schema_properties = {
         'inputs': {'type': 'array', 'minItems': 1,
@@ -72,7 +88,8 @@ class ConnectionDriver(Driver):
                     'items': {'anyOf': [{'$ref': '#/definitions/comm'},
                                         {'$ref': '#/definitions/file'}]}},
         'translator': {'type': 'array', 'items': {'type': 'function'}},
-        'onexit': {'type': 'string'}}
+        'onexit': {'type': 'string'},
+        'record': {'type': 'string'}}
 
     @property
     def _is_input(self):
@@ -84,7 +101,8 @@ class ConnectionDriver(Driver):
         r"""bool: True if the connection is retreiving output from a model."""
         return (self._direction == 'output')
 
-    def __init__(self, name, translator=None, single_use=False, onexit=None, **kwargs):
+    def __init__(self, name, translator=None, single_use=False, onexit=None,
+                 record=None, **kwargs):
         super(ConnectionDriver, self).__init__(name, **kwargs)
         # Translator
         if translator is None:
@@ -112,10 +130,17 @@ class ConnectionDriver(Driver):
         self.nproc = 0
         self.nsent = 0
         self.nskip = 0
+        self.process_time = Histogram(scale=1.0e-6)
         self.state = 'started'
         self.close_state = ''
+        self.engine = None
+        self.recorder = None
         # Add comms and print debug info
         self._init_comms(name, **kwargs)
+        if record is not None:
+            self.recorder = new_comm(
+                self.name + '_record', comm='ReplayFileComm', direction='send',
+                address=os.path.join(self.working_dir, record), dont_open=True)
         # self.debug('    env: %s', str(self.env))
         self.debug(('\n' + 80 * '=' + '\n'
                     + 'class = %s\n'
@@ -176,7 +201,7 @@ class ConnectionDriver(Driver):
                 comm_kws['env'] = kwargs.pop('comm_env')
         if any_files and (io == 'input'):
             kwargs.setdefault('timeout_send_1st', 60)
-        self.debug('%s comm_kws:\n%s', attr_comm, self.pprint(comm_kws, 1))
+        self.debug('%s comm_kws:\n%s', attr_comm, self.lazy_pprint(comm_kws, 1))
         setattr(self, attr_comm, new_comm(comm_kws.pop('name'), **comm_kws))
         setattr(self, '%s_kws' % attr_comm, comm_kws)
         if touches_model:
@@ -195,7 +220,7 @@ class ConnectionDriver(Driver):
             raise
         # Apply keywords dependent on comms
         self.timeout_send_1st = kwargs.pop('timeout_send_1st', self.timeout)
-        self.debug('Final env:\n%s', self.pprint(self.env, 1))
+        self.debug('Final env:\n%s', self.lazy_pprint(self.env, 1))
         
     def wait_for_route(self, timeout=None):
         r"""Wait until messages have been routed."""
@@ -243,6 +268,8 @@ class ConnectionDriver(Driver):
             try:
                 self.icomm.open()
                 self.ocomm.open()
+                if self.recorder is not None:
+                    self.recorder.open()
             except BaseException:
                 self.close_comm()
                 raise
@@ -268,6 +295,8 @@ class ConnectionDriver(Driver):
                     self.ocomm.close()
             except BaseException as e:
                 oe = e
+            if getattr(self, 'recorder', None) is not None:
+                self.recorder.close()
             if ie:
                 raise ie
             if oe:
@@ -283,7 +312,31 @@ class ConnectionDriver(Driver):
         self.stop_timeout()
         if not self.is_comm_open:
             raise Exception("Connection never finished opening.")
-        super(ConnectionDriver, self).start()
+        if self.engine is not None:
+            self.set_started_flag()
+            self.before_start()
+            self.engine.add_driver(self)
+        else:
+            super(ConnectionDriver, self).start()
+
+    def is_alive(self):
+        r"""bool: True if the driver loop is running, either in a thread or
+        on an engine."""
+        if getattr(self, 'engine', None) is not None:
+            return self.engine.is_running(self)
+        return super(ConnectionDriver, self).is_alive()
+
+    def join(self, timeout=None):
+        r"""Wait for the driver loop to finish.
+
+        Args:
+            timeout (float, optional): Maximum time that should be waited.
+                Defaults to None and is infinite.
+
+        """
+        if self.engine is not None:
+            return self.engine.join_driver(self, timeout=timeout)
+        return super(ConnectionDriver, self).join(timeout)
 
     def graceful_stop(self, timeout=None, **kwargs):
         r"""Stop the driver, first waiting for the input comm to be empty.
@@ -309,7 +362,7 @@ class ConnectionDriver(Driver):
         r"""Drain input and then close it."""
         self.debug('')
         if (self.onexit not in [None, 'on_model_exit', 'pass']):
-            self.debug("Calling onexit = '%s'" % self.onexit)
+            self.debug("Calling onexit = '%s'", self.onexit)
             getattr(self, self.onexit)()
         self.drain_input(timeout=self.timeout)
         self.set_close_state('model exit')
@@ -365,8 +418,26 @@ class ConnectionDriver(Driver):
         msg += end_msg
         print(msg)
 
+    def get_metrics(self):
+        r"""Get a summary of the performance metrics for the connection.
+
+        Returns:
+            dict: Message counts, a histogram of the time spent processing
+                messages, and the metrics for the input and output comms.
+
+        """
+        return OrderedDict([('name', self.name),
+                            ('driver', self.__class__.__name__),
+                            ('state', self.state),
+                            ('nrecv', self.nrecv), ('nproc', self.nproc),
+                            ('nskip', self.nskip), ('nsent', self.nsent),
+                            ('process_time', self.process_time.to_dict()),
+                            ('icomm', self.icomm.get_metrics()),
+                            ('ocomm', self.ocomm.get_metrics())])
+
     def confirm_input(self, timeout=None):
         r"""Confirm receipt of messages from input comm."""
+        t0 = backwards.clock_time()
         T = self.start_timeout(timeout)
         while not T.is_out:  # pragma: debug
             with self.lock:
@@ -376,9 +447,11 @@ class ConnectionDriver(Driver):
                     break
             self.sleep(10 * self.sleeptime)
         self.stop_timeout()
+        self.icomm.metrics.add('confirm_time', backwards.clock_time() - t0)
 
     def confirm_output(self, timeout=None):
         r"""Confirm receipt of messages from output comm."""
+        t0 = backwards.clock_time()
         T = self.start_timeout(timeout)
         while not T.is_out:  # pragma: debug
             with self.lock:
@@ -388,6 +461,7 @@ class ConnectionDriver(Driver):
                     break
             self.sleep(10 * self.sleeptime)
         self.stop_timeout()
+        self.ocomm.metrics.add('confirm_time', backwards.clock_time() - t0)
 
     def drain_input(self, timeout=None):
         r"""Drain messages from input comm."""
@@ -421,7 +495,7 @@ class ConnectionDriver(Driver):
         try:
             self.open_comm()
             self.sleep()  # Help ensure senders/receivers connected before messages
-            self.debug('Running in %s, is_valid = %s', os.getcwd(), str(self.is_valid))
+            self.debug('Running in %s, is_valid = %s', os.getcwd(), self.is_valid)
             assert(self.is_valid)
         except BaseException:  # pragma: debug
             self.printStatus()
@@ -487,6 +561,28 @@ class ConnectionDriver(Driver):
         self.debug('After EOF')
         return False
 
+    def record_message(self, msg):
+        r"""Record a received message to the log. The serialized message is
+        written directly if the input comm received one that includes the
+        header, otherwise the message is serialized by the recorder.
+
+        Args:
+            msg (obj): Received message.
+
+        Returns:
+            bool: Success or failure of recording the message.
+
+        """
+        raw = self.icomm.last_recv_raw
+        if raw is not None:
+            return self.recorder.record(raw)
+        if self.recorder._send_serializer and self.icomm.serializer._initialized:
+            sinfo = self.icomm.serializer.typedef
+            sinfo.update(self.icomm.serializer.serializer_info)
+            sinfo.pop('seritype', None)
+            self.recorder.serializer.initialize_serializer(sinfo)
+        return self.recorder.send(msg)
+
     def on_message(self, msg):
         r"""Process a message.
 
@@ -503,18 +599,30 @@ class ConnectionDriver(Driver):
             msg = t(msg)
         return msg
 
+    def _format_serializers(self):
+        r"""Format the serializer info and type definitions of both comms
+        for debug messages. This is called via tools.LazyFormat so that the
+        properties (which copy their values) are only evaluated if the
+        message is emitted.
+
+        Returns:
+            str: Formatted serializer information.
+
+        """
+        out = ''
+        for k in ['icomm', 'ocomm']:
+            serializer = getattr(self, k).serializer
+            out += '  %s:\n    sinfo:\n%s\n    typedef:\n%s\n' % (
+                k, self.pprint(serializer.serializer_info, 2),
+                self.pprint(serializer.typedef, 2))
+        return out.rstrip('\n')
+
     def update_serializer(self, msg):
         r"""Update the serializer for the output comm based on input."""
         sinfo = self.icomm.serializer.typedef
         sinfo.update(self.icomm.serializer.serializer_info)
         sinfo.pop('seritype', None)
-        self.debug('Before update:\n'
-                   + '  icomm:\n    sinfo:\n%s\n    typedef:\n%s\n'
-                   + '  ocomm:\n    sinfo:\n%s\n    typedef:\n%s',
-                   self.pprint(self.icomm.serializer.serializer_info, 2),
-                   self.pprint(self.icomm.serializer.typedef, 2),
-                   self.pprint(self.ocomm.serializer.serializer_info, 2),
-                   self.pprint(self.ocomm.serializer.typedef, 2))
+        self.debug('Before update:\n%s', tools.LazyFormat(self._format_serializers))
         self.ocomm.serializer.initialize_serializer(sinfo)
         self.ocomm.serializer.update_serializer(skip_type=True,
                                                 **self.icomm._last_header)
@@ -546,13 +654,7 @@ class ConnectionDriver(Driver):
         #     self.ocomm.serializer.update_serializer(**sinfo)
         # else:
         #     self.ocomm.serializer.initialize_serializer(sinfo)
-        self.debug('After update:\n'
-                   + '  icomm:\n    sinfo:\n%s\n    typedef:\n%s\n'
-                   + '  ocomm:\n    sinfo:\n%s\n    typedef:\n%s',
-                   self.pprint(self.icomm.serializer.serializer_info, 2),
-                   self.pprint(self.icomm.serializer.typedef, 2),
-                   self.pprint(self.ocomm.serializer.serializer_info, 2),
-                   self.pprint(self.ocomm.serializer.typedef, 2))
+        self.debug('After update:\n%s', tools.LazyFormat(self._format_serializers))
 
     def _send_message(self, *args, **kwargs):
         r"""Send a single message.
@@ -673,6 +775,15 @@ class ConnectionDriver(Driver):
         self.stop_timeout()
         self.set_close_state(state)
 
+    def run(self, *args, **kwargs):
+        r"""Run the driver loop, profiling the thread if profiling is
+        enabled."""
+        prof = profiling.start()
+        try:
+            super(ConnectionDriver, self).run(*args, **kwargs)
+        finally:
+            profiling.stop(prof, label='connection_%s' % self.name)
+
     def run_loop(self):
         r"""Run the driver. Continue looping over messages until there are not
         any left or the communication channel is closed.
@@ -694,10 +805,19 @@ class ConnectionDriver(Driver):
         if self.icomm.is_empty_recv(msg):
             self.state = 'waiting'
             self.verbose_debug(':run: Waiting for next message.')
-            self.sleep()
+            # Send combined messages that have waited long enough
+            with self.lock:
+                if self.ocomm.is_coalescing:
+                    self.ocomm.flush_coalesced(force=False)
+            # The engine reschedules waiting drivers without blocking
+            if self.engine is None:
+                self.sleep()
             return
         self.nrecv += 1
         self.state = 'received'
+        if ((self.nrecv - 1) % self._backlog_sample_interval) == 0:
+            self.icomm.sample_backlog()
+            self.ocomm.sample_backlog()
         if isinstance(msg, backwards.bytes_type):
             self.debug('Received message that is %d bytes from %s.',
                        len(msg), self.icomm.address)
@@ -707,9 +827,14 @@ class ConnectionDriver(Driver):
         else:
             self.debug('Received message of type %s from %s',
                        type(msg), self.icomm.address)
+        if self.recorder is not None:
+            if not self.record_message(msg):  # pragma: debug
+                self.error('Could not record message.')
         # Process message
         self.state = 'processing'
+        t0 = backwards.clock_time()
         msg = self.on_message(msg)
+        self.process_time.add(backwards.clock_time() - t0)
         if msg is False:  # pragma: debug
             self.error('Could not process message.')
             self.set_break_flag()
@@ -722,9 +847,13 @@ class ConnectionDriver(Driver):
         self.nproc += 1
         self.state = 'processed'
         self.debug('Processed message.')
-        # Send a message
+        # Send a message, continuing the trace of the received message
         self.state = 'sending'
-        ret = self.send_message(msg)
+        send_kws = {}
+        header = getattr(self.icomm, '_last_header', None)
+        if isinstance(header, dict) and ('trace' in header):
+            send_kws['header_kwargs'] = {'trace': header['trace']}
+        ret = self.send_message(msg, **send_kws)
         if ret is False:
             self.error('Could not send message.')
             self.set_break_flag()
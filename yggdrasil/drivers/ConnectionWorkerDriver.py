@@ -0,0 +1,469 @@
+"""Module for running connection drivers in a pool of worker processes."""
+import os
+import copy
+import signal
+import traceback
+import threading
+import multiprocessing
+import multiprocessing.connection
+from yggdrasil import tools
+from yggdrasil.config import cfg_logging
+from yggdrasil.drivers import create_driver
+from yggdrasil.drivers.Driver import Driver
+
+
+def _driver_status(drv):
+    r"""Get the status of a driver hosted by a worker.
+
+    Args:
+        drv (Driver): Driver to get the status of.
+
+    Returns:
+        dict: Status of the driver.
+
+    """
+    return {'is_alive': drv.is_alive(),
+            'was_started': drv.was_started,
+            'was_loop': drv.was_loop,
+            'was_terminated': drv.was_terminated,
+            'errors': list(drv.errors),
+            'state': getattr(drv, 'state', '')}
+
+
+def _watch_driver(key, drv, events, lock):
+    r"""Push the status of a driver hosted by a worker to the runner once the
+    driver enters its loop (or exits before doing so) and again once it
+    exits.
+
+    Args:
+        key (str): Key identifying the driver.
+        drv (Driver): Driver that should be watched.
+        events (multiprocessing.Connection): Worker end of the channel that
+            status updates are pushed over.
+        lock (threading.Lock): Lock controlling access to events.
+
+    """
+    for wait in [drv.wait_for_loop, drv.join]:
+        wait()
+        try:
+            with lock:
+                events.send((key, _driver_status(drv)))
+        except (EOFError, OSError):  # pragma: debug
+            return
+
+
+def _connection_worker(conn, namespace=None, rank=None, events=None):
+    r"""Main loop for a worker process hosting connection drivers. Requests
+    are received from the runner over the control connection as tuples of
+    the form (command, key, args, kwargs) and each one is answered with a
+    tuple of the form (flag, result) where flag is either 'ok' or 'error'.
+    Changes in the status of the drivers are pushed to the runner as tuples
+    of the form (key, status) over the events connection.
+
+    Args:
+        conn (multiprocessing.Connection): Worker end of the control channel.
+        namespace (str, optional): Namespace for the drivers. Defaults to None.
+        rank (int, optional): Rank of the integration. Defaults to None.
+        events (multiprocessing.Connection, optional): Worker end of the
+            channel that status updates are pushed over. Defaults to None
+            and status updates are not pushed.
+
+    """
+    # Interrupts are handled by the runner which will terminate the drivers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    cfg_logging()
+    drivers = {}
+    events_lock = threading.Lock()
+    while True:
+        try:
+            cmd, key, args, kwargs = conn.recv()
+        except (EOFError, OSError):  # pragma: debug
+            cmd, key, args, kwargs = ('shutdown', None, (), {})
+        try:
+            if cmd == 'create':
+                yml = args[0]
+                curpath = os.getcwd()
+                if 'working_dir' in yml:
+                    os.chdir(yml['working_dir'])
+                try:
+                    drv = create_driver(yml=yml, namespace=namespace, rank=rank,
+                                        **yml)
+                finally:
+                    os.chdir(curpath)
+                drivers[key] = drv
+                out = {'env': drv.env, 'comm_env': drv.comm_env,
+                       'comm_address': getattr(drv, 'comm_address', None)}
+            elif cmd == 'call':
+                out = getattr(drivers[key], args[0])(*args[1:], **kwargs)
+                if (args[0] == 'start') and (events is not None):
+                    watcher = threading.Thread(
+                        target=_watch_driver,
+                        args=(key, drivers[key], events, events_lock),
+                        name='%s.watcher' % drivers[key].name)
+                    watcher.daemon = True
+                    watcher.start()
+            elif cmd == 'status':
+                out = _driver_status(drivers[key])
+            elif cmd == 'shutdown':
+                for drv in drivers.values():
+                    if drv.is_alive():  # pragma: debug
+                        drv.terminate()
+                    drv.cleanup()
+                out = None
+            else:  # pragma: debug
+                raise ValueError("Unrecognized worker command '%s'." % cmd)
+            flag = 'ok'
+        except BaseException:
+            flag, out = ('error', traceback.format_exc())
+        try:
+            conn.send((flag, out))
+        except (EOFError, OSError):  # pragma: debug
+            break
+        if cmd == 'shutdown':
+            break
+    conn.close()
+    if events is not None:
+        with events_lock:
+            events.close()
+
+
+class ConnectionWorkerPool(tools.YggClass):
+    r"""Pool of worker processes that host connection drivers on behalf of
+    the runner so that message processing is not limited to one core.
+
+    Args:
+        nworkers (int): Number of worker processes that should be started.
+        namespace (str, optional): Namespace for drivers created by the
+            workers. Defaults to None.
+        rank (int, optional): Rank of the integration. Defaults to None.
+        start_method (str, optional): Method that should be used to start
+            the worker processes. Defaults to 'spawn' so that the workers do
+            not inherit the runner's ZeroMQ context.
+        **kwargs: Additional keyword arguments are passed to the parent class.
+
+    Attributes:
+        nworkers (int): Number of worker processes.
+        processes (list): Worker processes.
+        connections (list): Runner ends of the control channels for each
+            worker.
+        events (list): Runner ends of the channels that each worker pushes
+            status updates over.
+        locks (list): Locks controlling access to each control channel.
+        assigned (list): Number of drivers assigned to each worker.
+
+    """
+
+    def __init__(self, nworkers, namespace=None, rank=None,
+                 start_method='spawn', **kwargs):
+        super(ConnectionWorkerPool, self).__init__('ConnectionWorkerPool',
+                                                   **kwargs)
+        if nworkers < 1:
+            raise ValueError("At least one worker is required (%d requested)."
+                             % nworkers)
+        self.nworkers = nworkers
+        self.processes = []
+        self.connections = []
+        self.events = []
+        self.locks = []
+        self.assigned = []
+        self._callbacks = {}
+        self._closed = False
+        ctx = multiprocessing.get_context(start_method)
+        for i in range(nworkers):
+            conn, child_conn = ctx.Pipe()
+            events, child_events = ctx.Pipe(duplex=False)
+            p = ctx.Process(target=_connection_worker,
+                            args=(child_conn, namespace, rank, child_events),
+                            name='%s.worker%d' % (self.name, i))
+            p.daemon = True
+            p.start()
+            child_conn.close()
+            child_events.close()
+            self.processes.append(p)
+            self.connections.append(conn)
+            self.events.append(events)
+            self.locks.append(threading.RLock())
+            self.assigned.append(0)
+        self._listener = threading.Thread(target=self._listen,
+                                          name='%s.listener' % self.name)
+        self._listener.daemon = True
+        self._listener.start()
+        self.debug("Started %d connection workers", nworkers)
+
+    def register(self, i, key, callback):
+        r"""Register a function that should be called with the status updates
+        pushed by a worker for a driver.
+
+        Args:
+            i (int): Index of the worker hosting the driver.
+            key (str): Key identifying the driver.
+            callback (callable): Function that should be called with each
+                status update. If the worker exits, it is called with a
+                status indicating that the driver is no longer alive.
+
+        """
+        self._callbacks[key] = (i, callback)
+
+    def _listen(self):
+        r"""Pass the status updates pushed by the workers to the registered
+        callbacks until all of the workers have exited."""
+        events = list(self.events)
+        while events:
+            for conn in multiprocessing.connection.wait(events):
+                try:
+                    key, status = conn.recv()
+                except (EOFError, OSError):
+                    # Drivers on workers that exit are no longer running
+                    events.remove(conn)
+                    i = self.events.index(conn)
+                    for worker, callback in list(self._callbacks.values()):
+                        if worker == i:
+                            callback({'is_alive': False})
+                    continue
+                if key in self._callbacks:
+                    self._callbacks[key][1](status)
+
+    def assign(self):
+        r"""Select the worker with the fewest drivers assigned to it.
+
+        Returns:
+            int: Index of the selected worker.
+
+        """
+        i = self.assigned.index(min(self.assigned))
+        self.assigned[i] += 1
+        return i
+
+    def is_alive(self, i):
+        r"""Determine if a worker can accept requests.
+
+        Args:
+            i (int): Index of the worker.
+
+        Returns:
+            bool: True if the worker process is running, False otherwise.
+
+        """
+        return (not self._closed) and self.processes[i].is_alive()
+
+    def call(self, i, cmd, key=None, *args, **kwargs):
+        r"""Send a request to a worker and wait for the response.
+
+        Args:
+            i (int): Index of the worker that should handle the request.
+            cmd (str): Worker command ('create', 'call', 'status' or
+                'shutdown').
+            key (str, optional): Key identifying the driver that the request
+                is for. Defaults to None.
+            *args: Additional arguments are passed to the command.
+            **kwargs: Additional keyword arguments are passed to the command.
+
+        Returns:
+            object: Result returned by the worker.
+
+        Raises:
+            RuntimeError: If the worker is not running or raises an error
+                while processing the request.
+
+        """
+        with self.locks[i]:
+            if not self.is_alive(i):
+                raise RuntimeError("Connection worker %d is not running." % i)
+            self.connections[i].send((cmd, key, args, kwargs))
+            try:
+                flag, out = self.connections[i].recv()
+            except EOFError:  # pragma: debug
+                raise RuntimeError("Connection worker %d exited during '%s'."
+                                   % (i, cmd))
+        if flag == 'error':
+            raise RuntimeError("Error in connection worker %d:\n%s" % (i, out))
+        return out
+
+    def shutdown(self):
+        r"""Stop any drivers still running on the workers and then stop the
+        worker processes."""
+        if self._closed:
+            return
+        for i in range(self.nworkers):
+            if self.is_alive(i):
+                try:
+                    self.call(i, 'shutdown')
+                except RuntimeError:  # pragma: debug
+                    self.exception("Error shutting down connection worker %d", i)
+        self._closed = True
+        for p, conn in zip(self.processes, self.connections):
+            p.join(self.timeout)
+            if p.is_alive():  # pragma: debug
+                self.error("Connection worker %s did not exit, terminating.",
+                           p.name)
+                p.terminate()
+                p.join(self.timeout)
+            conn.close()
+        self._listener.join(self.timeout)
+        for conn in self.events:
+            conn.close()
+        self.debug('Returning')
+
+
+class ConnectionWorkerDriver(Driver):
+    r"""Stand-in for a connection driver that is running in a worker process.
+    The worker pushes the status of the remote driver when it enters its loop
+    and when it exits, and the thread exits when the remote driver does so
+    that the runner can treat it like any other driver.
+
+    Args:
+        name (str): Driver name.
+        yml (dict): Yaml specification for the connection driver that should
+            be created by the worker.
+        pool (ConnectionWorkerPool): Pool that should host the driver.
+        **kwargs: Additional keyword arguments are passed to the parent class.
+
+    Attributes:
+        pool (ConnectionWorkerPool): Pool hosting the driver.
+        worker (int): Index of the worker hosting the driver.
+        comm_address (str): Address of the remote driver's comm for server
+            and client drivers.
+        remote_status (dict): Last status reported by the remote driver.
+        remote_loop_event (threading.Event): Event set when the remote driver
+            enters its loop or exits.
+        remote_exit_event (threading.Event): Event set when the remote driver
+            exits.
+
+    """
+
+    def __init__(self, name, yml, pool, **kwargs):
+        super(ConnectionWorkerDriver, self).__init__(name, yml=yml, **kwargs)
+        self.pool = pool
+        self.worker = pool.assign()
+        self.remote_status = {}
+        self.remote_loop_event = threading.Event()
+        self.remote_exit_event = threading.Event()
+        self._nerrors_remote = 0
+        remote_yml = dict((k, copy.deepcopy(v)) for k, v in yml.items()
+                          if k != 'instance')
+        info = self.pool.call(self.worker, 'create', self.uuid, remote_yml)
+        self.env.update(info['env'])
+        self.comm_env.update(info['comm_env'])
+        self.comm_address = info['comm_address']
+        self.pool.register(self.worker, self.uuid, self.on_remote_status)
+        self.debug("Created on worker %d", self.worker)
+
+    def remote(self, method, *args, **kwargs):
+        r"""Call a method of the remote driver.
+
+        Args:
+            method (str): Name of the method that should be called.
+            *args: Additional arguments are passed to the method.
+            **kwargs: Additional keyword arguments are passed to the method.
+
+        Returns:
+            object: Result of the remote method call.
+
+        """
+        return self.pool.call(self.worker, 'call', self.uuid, method,
+                              *args, **kwargs)
+
+    def on_remote_status(self, status):
+        r"""Update the status with one reported by the remote driver, copying
+        any new errors.
+
+        Args:
+            status (dict): Status of the remote driver.
+
+        """
+        self.remote_status.update(status)
+        new_errors = status.get('errors', [])[self._nerrors_remote:]
+        if new_errors:
+            self._nerrors_remote += len(new_errors)
+            self.errors += new_errors
+        if not status['is_alive']:
+            self.remote_exit_event.set()
+            self.remote_loop_event.set()
+        elif status.get('was_loop', False):
+            self.remote_loop_event.set()
+
+    def update_status(self):
+        r"""Request the status from the remote driver, copying any new errors.
+        The status is also pushed by the worker when it changes so this is
+        only needed to get the current state.
+
+        Returns:
+            dict: Status of the remote driver.
+
+        """
+        if not self.pool.is_alive(self.worker):
+            self.on_remote_status({'is_alive': False})
+        else:
+            self.on_remote_status(
+                self.pool.call(self.worker, 'status', self.uuid))
+        return self.remote_status
+
+    @property
+    def state(self):
+        r"""str: Descriptor of last action taken by the remote driver."""
+        return self.remote_status.get('state', '')
+
+    def start(self):
+        r"""Start the remote driver before the monitoring thread."""
+        self.remote('start')
+        super(ConnectionWorkerDriver, self).start()
+
+    def before_loop(self):
+        r"""Wait for the remote driver to enter its loop."""
+        super(ConnectionWorkerDriver, self).before_loop()
+        self.remote_loop_event.wait(self.timeout)
+        if not self.remote_status.get('was_loop', False):  # pragma: debug
+            self.error("Remote driver did not enter loop.")
+            self.set_break_flag()
+
+    def run_loop(self):
+        r"""Wait for the remote driver to exit."""
+        if self.remote_exit_event.wait(self.longsleep):
+            self.debug("Remote driver finished")
+            self.set_break_flag()
+
+    def on_model_exit(self):
+        r"""Trigger model exit on the remote driver."""
+        self.remote('on_model_exit')
+        super(ConnectionWorkerDriver, self).on_model_exit()
+
+    def on_client_exit(self):
+        r"""Trigger client exit on the remote driver."""
+        self.remote('on_client_exit')
+
+    def graceful_stop(self):
+        r"""Gracefully stop the remote driver."""
+        self.remote('stop')
+        super(ConnectionWorkerDriver, self).graceful_stop()
+
+    def do_terminate(self):
+        r"""Terminate the remote driver."""
+        if self.pool.is_alive(self.worker):
+            self.remote('terminate')
+        super(ConnectionWorkerDriver, self).do_terminate()
+
+    def cleanup(self):
+        r"""Clean up the remote driver."""
+        if self.pool.is_alive(self.worker):
+            self.remote('cleanup')
+        super(ConnectionWorkerDriver, self).cleanup()
+
+    def printStatus(self):
+        r"""Print the status of the remote driver."""
+        if self.pool.is_alive(self.worker):
+            self.remote('printStatus',
+                        beg_msg='worker%d:' % self.worker)
+
+    def get_metrics(self):
+        r"""Get the performance metrics from the remote driver.
+
+        Returns:
+            dict: Metrics for the remote connection driver, None if the
+                worker is no longer running.
+
+        """
+        if self.pool.is_alive(self.worker):
+            out = self.remote('get_metrics')
+            out['worker'] = self.worker
+            return out
+        return None
@@ -1,7 +1,14 @@
 import os
+import re
 import copy
+import uuid
+import shutil
+import hashlib
 import logging
-from yggdrasil import platform, tools
+import multiprocessing
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+from yggdrasil import platform, tools, backwards
 from yggdrasil.config import ygg_cfg
 from yggdrasil.drivers.ModelDriver import ModelDriver
 from yggdrasil.schema import register_component, inherit_schema
@@ -34,6 +41,9 @@ _api_shared_c = os.path.join(_incl_interface, _prefix + 'ygg' + _shared_ext)
 _api_shared_cpp = os.path.join(_incl_interface, _prefix + 'ygg++' + _shared_ext)
 _c_installed = ((len(tools.get_installed_comm(language='c')) > 0)
                 and (ygg_cfg.get('c', 'rapidjson_include', None) is not None))
+_include_regex = re.compile(br'^\s*#\s*include\s*["<]([^">]+)[">]', re.MULTILINE)
+_file_cache = OrderedDict()
+_file_cache_size = 1024
 
 
 def get_zmq_flags(for_cmake=False, for_api=False):
@@ -202,8 +212,195 @@ def get_cc(cpp=False, shared=False, static=False, linking=False):
     return cc
 
 
+def get_compile_cache_dir():
+    r"""Get the directory where cached compilation products are stored. This
+    is set by the config option ('c', 'compile_cache_dir') and defaults to
+    ~/.cache/yggdrasil/compile.
+
+    Returns:
+        str: Full path to the compile cache directory.
+
+    """
+    out = ygg_cfg.get('c', 'compile_cache_dir', None)
+    if out is None:
+        out = os.path.join(os.path.expanduser('~'), '.cache', 'yggdrasil',
+                           'compile')
+    return os.path.abspath(os.path.expanduser(out))
+
+
+def is_compile_cache_enabled():
+    r"""Determine if compilation products should be cached based on the
+    config option ('c', 'compile_cache').
+
+    Returns:
+        bool: True if the compile cache should be used, False otherwise.
+
+    """
+    return (ygg_cfg.get('c', 'compile_cache', 'True').lower() == 'true')
+
+
+def get_compile_jobs():
+    r"""Get the number of source files that should be compiled in parallel
+    based on the config option ('c', 'compile_jobs'). A value of 0 (the
+    default) uses the number of cores.
+
+    Returns:
+        int: Number of parallel compilation jobs.
+
+    """
+    out = int(ygg_cfg.get('c', 'compile_jobs', 0))
+    if out < 1:
+        try:
+            out = multiprocessing.cpu_count()
+        except NotImplementedError:  # pragma: debug
+            out = 1
+    return out
+
+
+def get_include_dirs(flags):
+    r"""Get the include directories from a set of compiler flags.
+
+    Args:
+        flags (list): Compiler flags.
+
+    Returns:
+        list: Include directories.
+
+    """
+    out = []
+    flags = list(flags)
+    for i, x in enumerate(flags):
+        if x in ['-I', '/I']:
+            if (i + 1) < len(flags):
+                out.append(flags[i + 1])
+        elif x.startswith('-I') or x.startswith('/I'):
+            out.append(x[2:])
+    return out
+
+
+def _file_info(fname):
+    r"""Get the hash and included files for a file. The file is read and
+    hashed each time (so that edits are detected even when the modification
+    time and size do not change), but the included files are cached by the
+    hash of the contents.
+
+    Args:
+        fname (str): Full path to the file.
+
+    Returns:
+        tuple(str, list): Hash of the file contents and the names of the
+            files included by it.
+
+    """
+    with open(fname, 'rb') as fd:
+        contents = fd.read()
+    key = hashlib.sha256(contents).hexdigest()
+    includes = _file_cache.pop(key, None)
+    if includes is None:
+        includes = [backwards.as_str(x) for x in
+                    _include_regex.findall(contents)]
+    _file_cache[key] = includes
+    while len(_file_cache) > _file_cache_size:
+        _file_cache.popitem(last=False)
+    return (key, includes)
+
+
+def find_includes(src, include_dirs=None):
+    r"""Recursively locate the headers included by a source file. Only
+    headers located in the directory containing the including file or in
+    one of the include directories are returned, so system headers are not
+    tracked.
+
+    Args:
+        src (str): Full path to the source file.
+        include_dirs (list, optional): Include directories that should be
+            searched. Defaults to [].
+
+    Returns:
+        list: Full paths to the included headers.
+
+    """
+    if include_dirs is None:
+        include_dirs = []
+    out = []
+    stack = [os.path.abspath(src)]
+    while stack:
+        fname = stack.pop()
+        for x in _file_info(fname)[1]:
+            for d in [os.path.dirname(fname)] + include_dirs:
+                xpath = os.path.normpath(os.path.join(d, x))
+                if os.path.isfile(xpath):
+                    if xpath not in out:
+                        out.append(xpath)
+                        stack.append(xpath)
+                    break
+    return out
+
+
+def get_compile_hash(args, src, include_dirs=None):
+    r"""Get a hash identifying the product of compiling a source file from
+    the compiler, flags, and contents of the source file and the headers it
+    includes.
+
+    Args:
+        args (list): Compilation command without the output file.
+        src (str): Full path to the source file.
+        include_dirs (list, optional): Include directories that should be
+            searched for headers. Defaults to [].
+
+    Returns:
+        str: Hash for the compilation.
+
+    """
+    h = hashlib.sha256()
+    h.update(backwards.as_bytes('\0'.join(args)))
+    for x in [os.path.abspath(src)] + find_includes(src, include_dirs):
+        h.update(backwards.as_bytes('\0%s\0%s' % (x, _file_info(x)[0])))
+    return h.hexdigest()
+
+
+def _copy_file(src, dst):
+    r"""Copy a file such that the destination is only ever complete."""
+    tmp = '%s.%s.tmp' % (dst, str(uuid.uuid4()))
+    shutil.copyfile(src, tmp)
+    try:
+        os.rename(tmp, dst)
+    except OSError:  # pragma: windows
+        if os.path.isfile(dst):
+            os.remove(dst)
+        os.rename(tmp, dst)
+
+
+def call_parallel(calls, njobs=None):
+    r"""Call a set of functions in parallel threads. Compilers run in
+    subprocesses so threads are sufficient to use all of the cores.
+
+    Args:
+        calls (list): Function, argument, keyword argument tuples for each
+            call that should be made.
+        njobs (int, optional): Maximum number of calls that should be run at
+            once. Defaults to the value returned by get_compile_jobs.
+
+    Returns:
+        list: Values returned by each call.
+
+    """
+    if njobs is None:
+        njobs = get_compile_jobs()
+    njobs = min(njobs, len(calls))
+    if njobs <= 1:
+        return [f(*a, **kw) for f, a, kw in calls]
+    pool = ThreadPool(njobs)
+    try:
+        out = pool.map(lambda x: x[0](*x[1], **x[2]), calls)
+    finally:
+        pool.close()
+        pool.join()
+    return out
+
+
 def call_compile(src, out=None, flags=[], overwrite=False, verbose=False,
-                 cpp=None, working_dir=None):
+                 cpp=None, working_dir=None, cache=None):
     r"""Compile a source file, checking for errors.
 
     Args:
@@ -222,6 +419,12 @@ def call_compile(src, out=None, flags=[], overwrite=False, verbose=False,
             is written in C++. Defaults to False.
         working_dir (str, optional): Working directory that input file paths are
             relative to. Defaults to current working directory.
+        cache (bool, optional): If True, the compile cache is checked for an
+            object produced from the same compiler, flags, source, and headers
+            before compiling and the result is added to the cache after
+            compiling. If the cache is used, an existing output file is only
+            kept if it matches the cached object. Defaults to the value
+            returned by is_compile_cache_enabled.
 
     Returns:
         str: Full path to compiled source.
@@ -230,6 +433,8 @@ def call_compile(src, out=None, flags=[], overwrite=False, verbose=False,
     # Set defaults
     if working_dir is None:
         working_dir = os.getcwd()
+    if cache is None:
+        cache = is_compile_cache_enabled()
     flags = copy.deepcopy(flags)
     if platform._is_win:  # pragma: windows
         flags = ['/W4', '/Zi', "/EHsc"] + flags
@@ -273,13 +478,26 @@ def call_compile(src, out=None, flags=[], overwrite=False, verbose=False,
         out = os.path.normpath(os.path.join(working_dir, out))
     # Construct arguments
     args = [cc, "-c"] + flags + [src]
+    cache_file = None
+    if cache:
+        include_dirs = get_include_dirs(flags)
+        cache_key = get_compile_hash(args, src, include_dirs=include_dirs)
+        cache_file = os.path.join(get_compile_cache_dir(), cache_key[:2],
+                                  cache_key + os.path.splitext(out)[-1])
     if not platform._is_win:
         args += ["-o", out]
     else:  # pragma: windows
         args.insert(1, '/Fo%s' % out)
     # Check for file
+    if (cache_file is not None) and os.path.isfile(cache_file):
+        if (((not overwrite) and os.path.isfile(out)
+             and (_file_info(out)[0] == _file_info(cache_file)[0]))):
+            return out
+        _copy_file(cache_file, out)
+        logging.debug("Using cached %s for %s" % (cache_file, out))
+        return out
     if os.path.isfile(out):
-        if overwrite:
+        if overwrite or cache:
             os.remove(out)
         else:
             return out
@@ -299,11 +517,19 @@ def call_compile(src, out=None, flags=[], overwrite=False, verbose=False,
     if verbose:  # pragma: debug
         print(' '.join(args))
         tools.print_encoded(output, end="")
+    if cache_file is not None:
+        try:
+            if not os.path.isdir(os.path.dirname(cache_file)):
+                os.makedirs(os.path.dirname(cache_file))
+            _copy_file(out, cache_file)
+        except (IOError, OSError):  # pragma: debug
+            logging.warning("Could not add %s to the compile cache." % out)
     return out
 
 
 def call_link(obj, out=None, flags=[], overwrite=False, verbose=False,
-              cpp=False, shared=False, static=False, working_dir=None):
+              cpp=False, shared=False, static=False, working_dir=None,
+              cache=None):
     r"""Compile a source file, checking for errors.
 
     Args:
@@ -326,6 +552,9 @@ def call_link(obj, out=None, flags=[], overwrite=False, verbose=False,
             static library. Defaults to False.
         working_dir (str, optional): Working directory that input file paths are
             relative to. Defaults to current working directory.
+        cache (bool, optional): If True, an existing output file is only kept
+            if it is newer than all of the object files. Defaults to the value
+            returned by is_compile_cache_enabled.
 
     Returns:
         str: Full path to compiled source.
@@ -334,6 +563,8 @@ def call_link(obj, out=None, flags=[], overwrite=False, verbose=False,
     # Set defaults
     if working_dir is None:
         working_dir = os.getcwd()
+    if cache is None:
+        cache = is_compile_cache_enabled()
     flags = copy.deepcopy(flags)
     if not isinstance(obj, list):
         obj = [obj]
@@ -349,6 +580,10 @@ def call_link(obj, out=None, flags=[], overwrite=False, verbose=False,
         out = os.path.normpath(os.path.join(working_dir, out))
     # Check for file
     if os.path.isfile(out):
+        if cache and (not overwrite):
+            out_time = os.path.getmtime(out)
+            overwrite = any((os.path.getmtime(x) > out_time) for x in obj
+                            if os.path.isfile(x))
         if overwrite:
             os.remove(out)
         else:
@@ -437,14 +672,11 @@ def build_api(cpp=False, overwrite=False, as_shared=False):
     ccflags0, ldflags0 = get_flags(for_api=True, cpp=cpp)
     if platform._is_linux:
         ccflags0.append('-fPIC')
-    # Compile C++ wrapper for data types
-    fname_obj.append(build_datatypes(just_obj=True,
-                                     overwrite=overwrite))
-    # Compile object for the interface
-    fname_api_base = api_src
-    fname_api_out = call_compile(fname_api_base, flags=ccflags0,
-                                 overwrite=overwrite)
-    fname_obj.append(fname_api_out)
+    # Compile C++ wrapper for data types and object for the interface
+    fname_obj += call_parallel(
+        [(build_datatypes, (), dict(just_obj=True, overwrite=overwrite)),
+         (call_compile, (api_src, ), dict(flags=ccflags0,
+                                          overwrite=overwrite))])
     # Build static library
     out = call_link(fname_obj, api_lib, cpp=True, overwrite=overwrite)
     return out
@@ -544,17 +776,15 @@ def do_compile(src, out=None, cc=None, ccflags=None, ldflags=None,
     src_base, src_ext = os.path.splitext(src[0])
     cpp = (src_ext not in ['.c'])
     ccflags0, ldflags0 = get_flags(cpp=cpp)
-    # Compile C++ wrapper
-    fname_lib_out = build_datatypes(just_obj=True, overwrite=False)
-    # Compile each source file
-    fname_src_obj = []
+    # Compile C++ wrapper and each source file
+    calls = [(build_datatypes, (), dict(just_obj=True, overwrite=False))]
     for isrc in src:
-        fname_src_obj.append(call_compile(isrc,
-                                          flags=copy.deepcopy(ccflags0 + ccflags),
-                                          overwrite=overwrite,
-                                          working_dir=working_dir,
-                                          verbose=verbose))
-    fname_src_obj.append(fname_lib_out)
+        calls.append((call_compile, (isrc, ),
+                      dict(flags=copy.deepcopy(ccflags0 + ccflags),
+                           overwrite=overwrite, working_dir=working_dir,
+                           verbose=verbose)))
+    fname_src_obj = call_parallel(calls)
+    fname_src_obj.append(fname_src_obj.pop(0))
     # Link compile objects
     out = call_link(fname_src_obj, out, cpp=True,
                     flags=copy.deepcopy(ldflags0 + ldflags),
@@ -579,12 +809,16 @@ class GCCModelDriver(ModelDriver):
             on Linux/MacOS. Defaults to cl on Windows.
         overwrite (bool, optional): If True, any existing object or executable
             files for the model are overwritten, otherwise they will only be
-            compiled if they do not exist. Defaults to True. Setting this to
-            False can be done to improve performance after debugging is complete,
-            but this dosn't check if the source files should be changed, so
-            users should make sure they recompile after any changes. The value
-            of this keyword also determines whether or not any compilation
-            products are cleaned up after a run.
+            compiled if they do not exist. Defaults to True. If the compile
+            cache is enabled (config option ('c', 'compile_cache')), objects
+            are copied from the cache instead of being recompiled when the
+            source, included headers, compiler, and flags are unchanged and
+            existing objects are only kept if they are up to date. If the
+            cache is disabled, existing products are used without checking
+            if the source files have changed, so users should make sure they
+            recompile after any changes. The value of this keyword also
+            determines whether or not any compilation products are cleaned
+            up after a run.
         **kwargs: Additional keyword arguments are passed to parent class.
 
     Attributes (in additon to parent class's):
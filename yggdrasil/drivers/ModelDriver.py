@@ -3,7 +3,9 @@ import sys
 import copy
 import warnings
 from pprint import pformat
-from yggdrasil import platform, tools
+from collections import OrderedDict
+from yggdrasil import platform, tools, backwards, model_cache
+from yggdrasil.communication import new_comm, get_comm
 from yggdrasil.drivers.Driver import Driver
 from threading import Event
 try:
@@ -36,6 +38,13 @@ class ModelDriver(Driver):
         valgrind_flags (list, optional): Flags to pass to valgrind. Defaults to [].
         model_index (int, optional): Index of model in list of models being run.
             Defaults to 0.
+        cache (bool, optional): If True, all of the input to the model is
+            received before it is started and, if the model was previously
+            run with the same input, arguments, and source, the output from
+            that run is sent in place of running the model (see
+            :mod:`yggdrasil.model_cache`). The model must receive all of its
+            input before sending output that other models depend on.
+            Defaults to False.
         **kwargs: Additional keyword arguments are passed to parent class.
 
     Attributes:
@@ -52,13 +61,36 @@ class ModelDriver(Driver):
         with_valgrind (bool): If True, the command is run with valgrind.
         valgrind_flags (list): Flags to pass to valgrind.
         model_index (int): Index of model in list of models being run.
+        cache (bool): If True, the output of the model is cached based on its
+            input.
+        output_mux (OutputMultiplexer): Multiplexer that should forward the
+            model's output. If None (the default), a thread is started to
+            read the output of the model.
+        output_done (threading.Event): Event set by the multiplexer when the
+            end of the model's output is reached.
 
     Raises:
         RuntimeError: If both with_strace and with_valgrind are True.
+        ValueError: If cache is True and the model is a server or client.
 
     """
 
     _language = 'executable'
+    # True if the language interface can decode containers that were encoded
+    # as a single block (see CommBase's block_encode option)
+    _decodes_blocks = False
+    # Highest pickle protocol that the language interface can load or None
+    # if it cannot load pickles (see CommBase's pickle_protocol option)
+    _pickle_protocol = None
+    # True if the language interface can decompress messages (see CommBase's
+    # compression option)
+    _decompresses = False
+    # Schema properties that do not affect the model's output or that are
+    # already included in the key identifying cached output
+    _cache_key_exclude = ['name', 'language', 'args', 'inputs', 'outputs',
+                          'working_dir', 'is_server', 'client_of', 'cache',
+                          'with_strace', 'strace_flags', 'with_valgrind',
+                          'valgrind_flags']
     _schema_type = 'model'
     _schema_required = ['name', 'language', 'args', 'working_dir']
     _schema_properties = {
@@ -79,7 +111,8 @@ class ModelDriver(Driver):
                          'items': {'type': 'string'}},
         'with_valgrind': {'type': 'boolean', 'default': False},
         'valgrind_flags': {'type': 'array', 'default': ['--leak-check=full'],  # '-v'
-                           'items': {'type': 'string'}}}
+                           'items': {'type': 'string'}},
+        'cache': {'type': 'boolean', 'default': False}}
 
     def __init__(self, name, args, model_index=0, **kwargs):
         for k, v in self._schema_properties.items():
@@ -98,6 +131,8 @@ class ModelDriver(Driver):
         self.model_process = None
         self.queue = Queue()
         self.queue_thread = None
+        self.output_mux = None
+        self.output_done = None
         self.event_process_kill_called = Event()
         self.event_process_kill_complete = Event()
         # Strace/valgrind
@@ -106,6 +141,15 @@ class ModelDriver(Driver):
         if (((self.with_strace or self.with_valgrind)
              and platform._is_win)):  # pragma: windows
             raise RuntimeError("strace/valgrind options invalid on windows.")
+        # Output cache
+        if self.cache and (self.is_server or self.client_of):
+            raise ValueError("The output of servers and clients cannot be "
+                             + "cached.")
+        self._cache_key = None
+        self._cache_hit = False
+        self._cache_comms = []
+        self._cache_threads = OrderedDict()
+        self._cache_outputs = OrderedDict()
         self.model_index = model_index
         self.env_copy = ['LANG', 'PATH', 'USER']
         self._exit_line = b'EXIT'
@@ -131,10 +175,139 @@ class ModelDriver(Driver):
         env.update(os.environ)
         env['YGG_SUBPROCESS'] = "True"
         env['YGG_MODEL_INDEX'] = str(self.model_index)
+        env['YGG_PICKLE_PROTOCOL'] = str(backwards.pickle.HIGHEST_PROTOCOL)
         return env
 
+    def get_cache_channels(self, direction):
+        r"""Get the names and addresses of the comms the model uses to
+        communicate with its input or output drivers.
+
+        Args:
+            direction (str): 'input' or 'output'.
+
+        Returns:
+            list: Name/address pairs for the comms.
+
+        """
+        out = []
+        for x in self.yml.get('%s_drivers' % direction, []):
+            out += sorted(x['instance'].env.items())
+        return out
+
+    def get_cache_parameters(self):
+        r"""Get the environment variables and parameters of the model that
+        should be included in the key identifying its cached output.
+
+        Returns:
+            dict: Keyword arguments for model_cache.get_cache_key (env and
+                parameters).
+
+        """
+        channels = set(k for d in ['input', 'output']
+                       for k, v in self.get_cache_channels(d))
+        env = dict((k, v) for k, v in self.env.items() if k not in channels)
+        parameters = {}
+        for k in self._schema_properties.keys():
+            if k in self._cache_key_exclude:
+                continue
+            v = getattr(self, k, self.yml.get(k, None))
+            if v is not None:
+                parameters[k] = v
+        return dict(env=env, parameters=parameters)
+
+    def start_cached(self):
+        r"""Receive the model's input and send the cached output if the model
+        was run previously with the same input. Otherwise the model's
+        environment is updated so that it receives the recorded input and
+        its output is forwarded (and recorded) by threads. This is called
+        from the driver's thread (see before_loop) so that the runner can
+        start the models producing the input.
+
+        Returns:
+            bool: True if the cached output was sent and the model should
+                not be run, False otherwise.
+
+        """
+        icomms = OrderedDict()
+        for k, v in self.get_cache_channels('input'):
+            icomms[k] = get_comm(k, address=v, direction='recv',
+                                 no_suffix=True)
+            self._cache_comms.append(icomms[k])
+        self.debug("Recording input from %s", list(icomms.keys()))
+        inputs = model_cache.record_streams(
+            icomms, timeout=self.longsleep, stop_flag=lambda: self.was_break)
+        self._cache_key = model_cache.get_cache_key(
+            self._language, self.args, inputs, working_dir=self.working_dir,
+            **self.get_cache_parameters())
+        outputs = model_cache.load_outputs(self._cache_key)
+        ochannels = self.get_cache_channels('output')
+        if ((outputs is not None)
+                and (sorted(outputs.keys()) == sorted(dict(ochannels).keys()))):
+            self.info("Sending cached output (key = %s)", self._cache_key)
+            for k, v in ochannels:
+                ocomm = get_comm(k, address=v, direction='send', no_suffix=True)
+                self._cache_comms.append(ocomm)
+                model_cache.send_stream(ocomm, *outputs[k])
+            self._cache_hit = True
+            return True
+        self.debug("Output not cached (key = %s)", self._cache_key)
+        for k, v in inputs.items():
+            pcomm = new_comm(k, direction='send', no_suffix=True)
+            self._cache_comms.append(pcomm)
+            self.env[k] = pcomm.opp_address
+            self._cache_threads[k] = tools.YggThread(
+                target=model_cache.send_stream, args=(pcomm, ) + tuple(v),
+                name=self.name + '.CacheInput.' + k)
+        for k, v in ochannels:
+            pcomm = new_comm(k, direction='recv', no_suffix=True,
+                             recv_timeout=False)
+            ocomm = get_comm(k, address=v, direction='send', no_suffix=True)
+            self._cache_comms += [pcomm, ocomm]
+            self.env[k] = pcomm.opp_address
+            self._cache_threads[k] = tools.YggThread(
+                target=self._forward_cached_output, args=(k, pcomm, ocomm),
+                name=self.name + '.CacheOutput.' + k)
+        for x in self._cache_threads.values():
+            x.start()
+        return False
+
+    def _forward_cached_output(self, name, icomm, ocomm):
+        r"""Forward output from the model, recording it for the cache.
+
+        Args:
+            name (str): Name of the output channel.
+            icomm (CommBase): Comm receiving output from the model.
+            ocomm (CommBase): Comm sending output to the output driver.
+
+        """
+        self._cache_outputs[name] = model_cache.recv_stream(icomm, ocomm)
+
+    def finish_cached(self):
+        r"""Wait for the model's input and output to be forwarded, save the
+        output to the cache if the model was successful, and close the comms
+        used."""
+        for x in self._cache_threads.values():
+            x.join(self.timeout)
+        if ((self._cache_threads and (self.model_process is not None)
+             and (self.model_process.returncode == 0)
+             and (len(self._cache_outputs) == len(self.get_cache_channels(
+                 'output'))))):
+            self.debug("Saving output to the cache (key = %s)",
+                       self._cache_key)
+            model_cache.save_outputs(self._cache_key, self._cache_outputs)
+        for x in self._cache_comms:
+            x.linger_close()
+        self._cache_comms = []
+
     def before_start(self):
         r"""Actions to perform before the run starts."""
+        if self.cache:
+            # The process is started in before_loop after the input is recorded
+            return
+        self.start_model_process()
+
+    def start_model_process(self):
+        r"""Start the process running the model and forwarding its output."""
         env = self.set_env()
         pre_args = []
         if self.with_strace:
@@ -146,15 +319,30 @@ class ModelDriver(Driver):
         elif self.with_valgrind:
             pre_args += ['valgrind'] + self.valgrind_flags
         # print(pre_args + self.args)
-        self.model_process = tools.YggPopen(pre_args + self.args, env=env,
-                                            cwd=self.working_dir,
-                                            forward_signals=False,
-                                            shell=platform._is_win)
-        # Start thread to queue output
+        self.model_process = self.create_process(pre_args + self.args, env)
+        # Forward output using the multiplexer or a thread to queue output
+        if self.output_mux is not None:
+            self.output_done = self.output_mux.register(
+                self.name, self.model_process.stdout)
+            return
         self.queue_thread = tools.YggThreadLoop(target=self.enqueue_output_loop,
                                                 name=self.name + '.EnqueueLoop')
         self.queue_thread.start()
 
+    def create_process(self, args, env):
+        r"""Start the process running the model.
+
+        Args:
+            args (list): Command line arguments for the model.
+            env (dict): Environment variables for the model.
+
+        Returns:
+            :class:`yggdrasil.tools.YggPopen`: Process running the model.
+
+        """
+        return tools.YggPopen(args, env=env, cwd=self.working_dir,
+                              forward_signals=False, shell=platform._is_win)
+
     def enqueue_output_loop(self):
         r"""Keep passing lines to queue."""
         # if self.model_process_complete:
@@ -184,11 +372,23 @@ class ModelDriver(Driver):
 
     def before_loop(self):
         r"""Actions before loop."""
+        if self.cache:
+            if self.start_cached():
+                return
+            self.start_model_process()
         self.debug('Running %s from %s with cwd %s and env %s',
                    self.args, os.getcwd(), self.working_dir, pformat(self.env))
 
     def run_loop(self):
         r"""Loop to check if model is still running and forward output."""
+        if self._cache_hit:
+            self.set_break_flag()
+            return
+        if self.output_done is not None:
+            if self.output_done.wait(self.longsleep):
+                self.debug("No more output")
+                self.set_break_flag()
+            return
         # Continue reading until there is not any output
         try:
             line = self.queue.get_nowait()
@@ -211,6 +411,11 @@ class ModelDriver(Driver):
         r"""Actions to perform after run_loop has finished. Mainly checking
         if there was an error and then handling it."""
         self.debug('')
+        if (self.output_done is not None) and (not self.output_done.is_set()):
+            self.info("Output still being forwarded")
+            # Loop was broken from outside, kill the process
+            self.kill_process()
+            return
         if self.queue_thread is not None:
             self.queue_thread.join(self.sleeptime)
             if self.queue_thread.is_alive():
@@ -225,6 +430,8 @@ class ModelDriver(Driver):
                 return
         self.wait_process(self.timeout, key_suffix='.after_loop')
         self.kill_process()
+        if self.cache:
+            self.finish_cached()
 
     @property
     def model_process_complete(self):
@@ -278,10 +485,15 @@ class ModelDriver(Driver):
                 except BaseException:  # pragma: debug
                     self.exception("Error killing model process")
             assert(self.model_process_complete)
-            if self.model_process.returncode != 0:
+            if ((self.model_process is not None)
+                    and (self.model_process.returncode != 0)):
                 self.error("return code of %s indicates model error.",
                            str(self.model_process.returncode))
             self.event_process_kill_complete.set()
+            if self.output_done is not None:
+                if not self.output_done.wait(self.timeout):  # pragma: debug
+                    self.debug("Unregistering output from the multiplexer.")
+                    self.output_mux.unregister(self.model_process.stdout)
             if self.queue_thread is not None:
                 if not self.was_break:  # pragma: debug
                     # Wait for messages to be printed
@@ -0,0 +1,226 @@
+"""Module for forwarding the output of many models from a single thread."""
+import os
+import sys
+import threading
+from yggdrasil import tools, platform, backwards
+try:
+    import selectors
+except ImportError:  # pragma: Python 2
+    selectors = None
+
+
+class OutputMultiplexer(tools.YggThreadLoop):
+    r"""Thread that forwards the output of all of the models in a run to
+    stdout using a single selector over the model output pipes rather than
+    a reading thread for each model. Output that is available on a pipe is
+    read as a block and complete lines are forwarded together with a single
+    flush.
+
+    Args:
+        name (str, optional): Name of the multiplexer. Defaults to
+            'OutputMultiplexer'.
+        prefix (bool, optional): If True, each line is prefixed with the name
+            of the model that produced it. Defaults to True.
+        log_dir (str, optional): Directory where the output of each model
+            should also be written to a file named '<model>.log'. Defaults to
+            None and output is not logged.
+        stream (file, optional): Stream that output should be forwarded to.
+            Defaults to sys.stdout.
+        **kwargs: Additional keyword arguments are passed to the parent class.
+
+    Attributes:
+        prefix (bool): If True, lines are prefixed with model names.
+        log_dir (str): Directory where model output is logged.
+        stream (file): Stream that output is forwarded to.
+        selector (selectors.BaseSelector): Selector monitoring model pipes.
+
+    Raises:
+        RuntimeError: If the selector cannot be used with pipes on this
+            platform.
+
+    """
+
+    _block_size = 65536
+
+    def __init__(self, name='OutputMultiplexer', prefix=True, log_dir=None,
+                 stream=None, **kwargs):
+        if not self.is_installed():  # pragma: windows
+            raise RuntimeError("The output multiplexer requires selectors "
+                               "that support pipes.")
+        super(OutputMultiplexer, self).__init__(name, **kwargs)
+        if stream is None:
+            stream = sys.stdout
+        self.prefix = prefix
+        self.log_dir = log_dir
+        self.stream = stream
+        self.selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        self.selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._sources = {}
+
+    @classmethod
+    def is_installed(cls):
+        r"""Determine if the multiplexer can be used on the current machine.
+
+        Returns:
+            bool: True if selectors can be used with pipes, False otherwise.
+
+        """
+        return (selectors is not None) and (not platform._is_win)
+
+    def wake(self):
+        r"""Interrupt the selector so that changes take effect."""
+        if self._wake_w is None:
+            return
+        try:
+            os.write(self._wake_w, b'\0')
+        except OSError:  # pragma: debug
+            pass
+
+    def set_break_flag(self):
+        r"""Set the break flag and interrupt the selector."""
+        super(OutputMultiplexer, self).set_break_flag()
+        self.wake()
+
+    def register(self, name, pipe):
+        r"""Begin forwarding output from a pipe, starting the multiplexer if
+        it has not been started.
+
+        Args:
+            name (str): Name of the model producing the output.
+            pipe (file): Pipe that output should be read from.
+
+        Returns:
+            threading.Event: Event that will be set when the end of the
+                output is reached or the pipe is unregistered.
+
+        """
+        done = threading.Event()
+        logfile = None
+        if self.log_dir is not None:
+            if not os.path.isdir(self.log_dir):
+                os.makedirs(self.log_dir)
+            logfile = open(os.path.join(self.log_dir, name + '.log'), 'ab')
+        source = {'name': name, 'pipe': pipe, 'done': done, 'logfile': logfile,
+                  'prefix': backwards.as_bytes(name + ': '), 'partial': b''}
+        with self.lock:
+            self._sources[pipe.fileno()] = source
+            self.selector.register(pipe.fileno(), selectors.EVENT_READ, source)
+            if not self.was_started:
+                self.start()
+        self.wake()
+        return done
+
+    def unregister(self, pipe):
+        r"""Stop forwarding output from a pipe, flushing any partial line.
+
+        Args:
+            pipe (file): Pipe that should no longer be read.
+
+        """
+        with self.lock:
+            source = self._sources.pop(pipe.fileno(), None)
+            if source is None:
+                return
+            if self.selector is not None:
+                try:
+                    self.selector.unregister(pipe.fileno())
+                except (KeyError, ValueError):  # pragma: debug
+                    pass
+            self.write(self.format(source, b'', final=True))
+            if source['logfile'] is not None:
+                source['logfile'].close()
+            try:
+                pipe.close()
+            except BaseException:  # pragma: debug
+                pass
+        self.debug("End of %s output", source['name'])
+        source['done'].set()
+
+    def format(self, source, data, final=False):
+        r"""Split output into complete lines, prefixing them if necessary.
+
+        Args:
+            source (dict): Information about the pipe the output came from.
+            data (bytes): Output read from the pipe.
+            final (bool, optional): If True, any partial line is returned as
+                well. Defaults to False.
+
+        Returns:
+            bytes: Complete lines that should be forwarded.
+
+        """
+        if source['logfile'] is not None:
+            source['logfile'].write(data)
+        data = source['partial'] + data
+        if final:
+            if data and (not data.endswith(b'\n')):
+                data += b'\n'
+            source['partial'] = b''
+        else:
+            idx = data.rfind(b'\n') + 1
+            data, source['partial'] = data[:idx], data[idx:]
+        if self.prefix and data:
+            lines = data.splitlines(True)
+            data = b''.join(source['prefix'] + x for x in lines)
+        return data
+
+    def write(self, data):
+        r"""Write output to the stream.
+
+        Args:
+            data (bytes): Output that should be written.
+
+        """
+        if not data:
+            return
+        tools.print_encoded(data, end="", file=self.stream)
+        self.stream.flush()
+
+    def run_loop(self):
+        r"""Forward any output that is available."""
+        events = self.selector.select(self.timeout)
+        out = []
+        closed = []
+        for key, mask in events:
+            if key.data is None:
+                os.read(self._wake_r, self._block_size)
+                continue
+            try:
+                data = os.read(key.fd, self._block_size)
+            except OSError:  # pragma: debug
+                data = b''
+            if data:
+                out.append(self.format(key.data, data))
+            else:
+                closed.append(key.data['pipe'])
+        self.write(b''.join(out))
+        for pipe in closed:
+            self.unregister(pipe)
+
+    def after_loop(self):
+        r"""Flush and close any pipes that are still registered."""
+        super(OutputMultiplexer, self).after_loop()
+        with self.lock:
+            sources = list(self._sources.values())
+        for source in sources:
+            self.unregister(source['pipe'])
+        self.close()
+
+    def close(self):
+        r"""Close the selector."""
+        with self.lock:
+            if self.selector is None:
+                return
+            self.selector.close()
+            self.selector = None
+            for fd in [self._wake_r, self._wake_w]:
+                os.close(fd)
+            self._wake_r = self._wake_w = None
+
+    def stop(self):
+        r"""Stop forwarding output and wait for the thread to exit."""
+        if self.was_started:
+            self.terminate()
+        else:
+            self.close()
@@ -3,6 +3,7 @@
 #
 import os
 import sys
+from yggdrasil import backwards, profiling
 from yggdrasil.drivers.ModelDriver import ModelDriver
 from yggdrasil.schema import register_component
 
@@ -23,9 +24,18 @@ class PythonModelDriver(ModelDriver):
         \*\*kwargs: Additional keyword arguments are passed to parent class's
             __init__ method.
 
+    Attributes:
+        zygote (:class:`yggdrasil.zygote.PythonZygote`): Zygote that the
+            model process should be forked from. If None (the default), the
+            model is run in a new Python process.
+
     """
 
     _language = 'python'
+    _decodes_blocks = True
+    _decompresses = True
+    # Models are run by the same interpreter as yggdrasil (sys.executable)
+    _pickle_protocol = backwards.pickle.HIGHEST_PROTOCOL
 
     def __init__(self, name, args, **kwargs):
         super(PythonModelDriver, self).__init__(name, args, **kwargs)
@@ -34,6 +44,32 @@ class PythonModelDriver(ModelDriver):
         if 'python' not in self.args[0] or self.args[0].endswith('.py'):
             python_exec = sys.executable
             self.args = [python_exec] + self.args
+        self.zygote = None
+
+    def create_process(self, args, env):
+        r"""Start the process running the model, forking it from the zygote
+        if there is one and the model is a Python script. If profiling is
+        enabled, Python scripts are run under cProfile.
+
+        Args:
+            args (list): Command line arguments for the model.
+            env (dict): Environment variables for the model.
+
+        Returns:
+            object: Process running the model.
+
+        """
+        is_script = ((len(args) > 1) and (args[0] == sys.executable)
+                     and args[1].endswith('.py'))
+        prof_file = profiling.get_filename('model_%s' % self.name)
+        if (self.zygote is not None) and is_script:
+            self.debug("Forking model from zygote")
+            if prof_file is not None:
+                env = dict(env, YGG_PROFILE_FILE=prof_file)
+            return self.zygote.launch(args[1:], env, self.working_dir)
+        if (prof_file is not None) and is_script:
+            args = [args[0], '-m', 'cProfile', '-o', prof_file] + args[1:]
+        return super(PythonModelDriver, self).create_process(args, env)
 
     @classmethod
     def is_installed(self):
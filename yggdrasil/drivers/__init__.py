@@ -54,7 +54,9 @@ def import_all_drivers():
 __all__ = ['import_driver', 'create_driver', 'Driver',
            'ModelDriver', 'PythonModelDriver', 'GCCModelDriver',
            'MakeModelDriver', 'MatlabModelDriver', 'LPyModelDriver',
-           'ConnectionDriver', 'InputDriver', 'OutputDriver',
+           'ConnectionDriver', 'ConnectionWorkerDriver',
+           'AsyncConnectionEngine', 'OutputMultiplexer',
+           'InputDriver', 'OutputDriver',
            'FileInputDriver', 'FileOutputDriver',
            'ClientDriver', 'ServerDriver',
            'RMQInputDriver', 'RMQOutputDriver',
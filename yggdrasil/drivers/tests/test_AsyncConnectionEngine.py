@@ -0,0 +1,88 @@
+import uuid
+import threading
+from yggdrasil.tests import assert_equal
+from yggdrasil.drivers import create_driver
+from yggdrasil.drivers.AsyncConnectionEngine import AsyncConnectionEngine
+
+
+def test_AsyncConnectionEngine():
+    r"""Test running connection drivers on the async engine."""
+    engine = AsyncConnectionEngine()
+    drivers = []
+    try:
+        for i in range(3):
+            name = 'TestAsyncConnectionEngine_%d_%s' % (i, str(uuid.uuid4()))
+            drv = create_driver('ConnectionDriver', name,
+                                namespace='TESTING_%s' % name)
+            drv.engine = engine
+            drivers.append(drv)
+        for drv in drivers:
+            drv.start()
+        assert(engine.is_alive())
+        for drv in drivers:
+            drv.wait_for_loop()
+            assert(drv.was_loop)
+            assert(drv.is_alive())
+        assert_equal(len(engine.drivers), len(drivers))
+        for drv in drivers:
+            drv.terminate()
+            assert(not drv.is_alive())
+            drv.join(0)
+            assert(not drv.errors)
+        assert_equal(len(engine.drivers), 0)
+    finally:
+        for drv in drivers:
+            drv.cleanup()
+        engine.stop()
+    assert(not engine.is_alive())
+
+
+def test_AsyncConnectionEngine_blocking():
+    r"""Test that a driver blocked in its loop does not block the event
+    loop or the other drivers."""
+    engine = AsyncConnectionEngine()
+    drivers = []
+    for i in range(2):
+        name = 'TestAsyncConnectionEngine_blocking_%d_%s' % (i, str(uuid.uuid4()))
+        drv = create_driver('ConnectionDriver', name,
+                            namespace='TESTING_%s' % name)
+        drv.engine = engine
+        drivers.append(drv)
+    blocked = threading.Event()
+    release = threading.Event()
+    stepped = threading.Event()
+    run_loop = [drv.run_loop for drv in drivers]
+
+    def blocking_run_loop():
+        blocked.set()
+        release.wait(drivers[0].timeout)
+        run_loop[0]()
+
+    def counting_run_loop():
+        stepped.set()
+        run_loop[1]()
+
+    drivers[0].run_loop = blocking_run_loop
+    drivers[1].run_loop = counting_run_loop
+    try:
+        drivers[0].start()
+        assert(blocked.wait(drivers[0].timeout))
+        called = threading.Event()
+        engine.loop.call_soon_threadsafe(called.set)
+        assert(called.wait(drivers[0].timeout))
+        drivers[1].start()
+        assert(stepped.wait(drivers[1].timeout))
+        assert(not release.is_set())
+        release.set()
+        for drv in drivers:
+            drv.terminate()
+            assert(not drv.is_alive())
+            drv.join(0)
+            assert(not drv.errors)
+        assert_equal(len(engine.executors), 0)
+    finally:
+        release.set()
+        for drv in drivers:
+            drv.cleanup()
+        engine.stop()
+    assert(not engine.is_alive())
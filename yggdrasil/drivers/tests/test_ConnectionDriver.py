@@ -1,4 +1,5 @@
 import uuid
+import json
 import unittest
 from yggdrasil import tools, backwards
 from yggdrasil.tests import MagicTestError, assert_raises
@@ -310,6 +311,16 @@ class TestConnectionDriver(TestConnectionParam, parent.TestDriver):
                 assert(flag)
                 self.assert_msg_equal(msg_recv, self.msg_long)
 
+    def test_metrics(self):
+        r"""Test collection of performance metrics."""
+        self.test_send_recv()
+        out = self.instance.get_metrics()
+        json.dumps(out)
+        self.assert_equal(out['nrecv'], self.instance.nrecv)
+        self.assert_equal(out['process_time']['count'], self.instance.nrecv)
+        self.assert_equal(out['icomm']['name'], self.instance.icomm.name)
+        self.assert_equal(out['ocomm']['name'], self.instance.ocomm.name)
+
     def assert_before_stop(self, check_open=True):
         r"""Assertions to make before stopping the driver instance."""
         super(TestConnectionDriver, self).assert_before_stop()
@@ -346,6 +357,30 @@ class TestConnectionDriverFork(TestConnectionDriver):
         return out
 
 
+class TestConnectionDriverCoalesced(TestConnectionDriver):
+    r"""Test class for the ConnectionDriver class with combined messages."""
+
+    @property
+    def inst_kwargs(self):
+        r"""dict: Keyword arguments for tested class."""
+        out = super(TestConnectionDriverCoalesced, self).inst_kwargs
+        out['ocomm_kws']['coalesce_messages'] = 3
+        return out
+
+    def test_send_recv_coalesced(self):
+        r"""Test that messages are combined by the connection and split."""
+        nmsg = 5
+        # Remaining messages are sent with EOF or after the delay
+        self.instance.ocomm.coalesce_delay = 1.0
+        for i in range(nmsg):
+            assert(self.send_comm.send(self.test_msg))
+        for i in range(nmsg):
+            flag, msg_recv = self.recv_comm.recv(self.timeout)
+            assert(flag)
+            self.assert_msg_equal(msg_recv, self.test_msg)
+        assert(self.instance.ocomm._n_sent < nmsg)
+
+
 def direct_translate(msg):
     r"""Test translator that just returns passed message."""
     return msg
@@ -0,0 +1,70 @@
+import os
+import uuid
+from yggdrasil.tests import assert_raises, assert_equal
+from yggdrasil.drivers.ConnectionWorkerDriver import (
+    ConnectionWorkerPool, ConnectionWorkerDriver)
+
+
+def test_ConnectionWorkerPool():
+    r"""Test assignment, errors, and shutdown for the worker pool."""
+    assert_raises(ValueError, ConnectionWorkerPool, 0)
+    pool = ConnectionWorkerPool(2)
+    try:
+        assert_equal([pool.assign() for _ in range(4)], [0, 1, 0, 1])
+        assert(pool.is_alive(0))
+        assert_raises(RuntimeError, pool.call, 0, 'invalid')
+        assert_raises(RuntimeError, pool.call, 1, 'status', 'missing')
+    finally:
+        pool.shutdown()
+    assert(not pool.is_alive(0))
+    assert_raises(RuntimeError, pool.call, 0, 'status', 'missing')
+    pool.shutdown()
+
+
+def test_ConnectionWorkerDriver():
+    r"""Test running a connection driver on a worker."""
+    name = 'TestConnectionWorker_%s' % str(uuid.uuid4())
+    yml = {'name': name, 'driver': 'ConnectionDriver',
+           'working_dir': os.getcwd(), 'models': []}
+    pool = ConnectionWorkerPool(1)
+    try:
+        drv = ConnectionWorkerDriver(name, yml, pool,
+                                     namespace='TESTING_%s' % name)
+        assert('instance' not in yml)
+        assert(drv.comm_env)
+        drv.start()
+        drv.wait_for_loop()
+        assert(drv.was_loop)
+        assert(not drv.errors)
+        assert(drv.is_alive())
+        drv.printStatus()
+        drv.terminate()
+        assert(not drv.is_alive())
+        assert(not drv.update_status()['is_alive'])
+        drv.cleanup()
+    finally:
+        pool.shutdown()
+
+
+def test_ConnectionWorkerDriver_push():
+    r"""Test that the status of the remote driver is pushed by the worker."""
+    name = 'TestConnectionWorker_%s' % str(uuid.uuid4())
+    yml = {'name': name, 'driver': 'ConnectionDriver',
+           'working_dir': os.getcwd(), 'models': []}
+    pool = ConnectionWorkerPool(1)
+    try:
+        drv = ConnectionWorkerDriver(name, yml, pool,
+                                     namespace='TESTING_%s' % name)
+        drv.start()
+        drv.wait_for_loop()
+        assert(drv.remote_status['was_loop'])
+        assert(drv.remote_status['is_alive'])
+        # The driver exits when the remote driver does without requesting
+        # the status
+        drv.remote('terminate')
+        drv.wait(drv.timeout)
+        assert(not drv.is_alive())
+        assert(not drv.remote_status['is_alive'])
+        drv.cleanup()
+    finally:
+        pool.shutdown()
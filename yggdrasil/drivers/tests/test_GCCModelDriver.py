@@ -1,11 +1,15 @@
 import os
+import shutil
+import tempfile
 import unittest
 from yggdrasil import platform, tools
 from yggdrasil.tests import scripts, assert_raises, assert_equal
 import yggdrasil.drivers.tests.test_ModelDriver as parent
+from yggdrasil.config import ygg_cfg
 from yggdrasil.drivers.GCCModelDriver import (
     GCCModelDriver, get_zmq_flags, get_ipc_flags, get_flags,
-    build_datatypes, build_api, build_regex_win32)
+    build_datatypes, build_api, build_regex_win32, get_include_dirs,
+    find_includes, get_compile_hash, call_compile, call_parallel)
 
 
 _driver_installed = GCCModelDriver.is_installed()
@@ -35,6 +39,80 @@ def test_get_flags():
         assert_equal(len(ld), 0)
 
 
+def test_get_include_dirs():
+    r"""Test get_include_dirs."""
+    assert_equal(get_include_dirs(['-Ia', '-I', 'b', '-Wall', '/Ic']),
+                 ['a', 'b', 'c'])
+
+
+def test_find_includes():
+    r"""Test find_includes and get_compile_hash."""
+    tempdir = tempfile.mkdtemp()
+    try:
+        src = os.path.join(tempdir, 'test.c')
+        incl = os.path.join(tempdir, 'include')
+        os.mkdir(incl)
+        with open(src, 'w') as fd:
+            fd.write('#include <stdio.h>\n#include "a.h"\n')
+        with open(os.path.join(incl, 'a.h'), 'w') as fd:
+            fd.write('#include "b.h"\n')
+        with open(os.path.join(incl, 'b.h'), 'w') as fd:
+            fd.write('#define B 1\n')
+        assert_equal(find_includes(src), [])
+        assert_equal(find_includes(src, [incl]),
+                     [os.path.join(incl, 'a.h'), os.path.join(incl, 'b.h')])
+        h1 = get_compile_hash(['cc'], src, [incl])
+        assert_equal(get_compile_hash(['cc'], src, [incl]), h1)
+        assert(get_compile_hash(['cc', '-O2'], src, [incl]) != h1)
+        with open(os.path.join(incl, 'b.h'), 'w') as fd:
+            fd.write('#define B 22\n')
+        h2 = get_compile_hash(['cc'], src, [incl])
+        assert(h2 != h1)
+        # Edits that preserve the size and modification time are detected
+        st = os.stat(os.path.join(incl, 'b.h'))
+        with open(os.path.join(incl, 'b.h'), 'w') as fd:
+            fd.write('#define B 33\n')
+        os.utime(os.path.join(incl, 'b.h'), (st.st_atime, st.st_mtime))
+        assert(get_compile_hash(['cc'], src, [incl]) != h2)
+    finally:
+        shutil.rmtree(tempdir)
+
+
+def test_call_parallel():
+    r"""Test call_parallel."""
+    calls = [(max, (i, 2), {}) for i in range(4)]
+    assert_equal(call_parallel(calls), [2, 2, 2, 3])
+    assert_equal(call_parallel(calls, njobs=1), [2, 2, 2, 3])
+
+
+@unittest.skipIf(not _driver_installed, "C Library not installed")
+def test_compile_cache():
+    r"""Test use of the compile cache."""
+    tempdir = tempfile.mkdtemp()
+    old_cache = ygg_cfg.get('c', 'compile_cache_dir', '')
+    ygg_cfg.set('c', 'compile_cache_dir', os.path.join(tempdir, 'cache'))
+    try:
+        src = os.path.join(tempdir, 'test.c')
+        with open(src, 'w') as fd:
+            fd.write('int test(void) { return 1; }\n')
+        out = call_compile(src, cache=True)
+        assert(os.listdir(os.path.join(tempdir, 'cache')))
+        os.remove(out)
+        assert_equal(call_compile(src, cache=True), out)
+        assert(os.path.isfile(out))
+        # Stale objects are replaced
+        with open(src, 'w') as fd:
+            fd.write('int test(void) { return 2; }\n')
+        with open(out, 'rb') as fd:
+            old_obj = fd.read()
+        call_compile(src, cache=True)
+        with open(out, 'rb') as fd:
+            assert(fd.read() != old_obj)
+    finally:
+        ygg_cfg.set('c', 'compile_cache_dir', old_cache)
+        shutil.rmtree(tempdir)
+
+
 @unittest.skipIf(not _driver_installed, "C Library not installed")
 def test_build_shared():
     r"""Test building libraries as shared."""
@@ -0,0 +1,72 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+from yggdrasil import backwards
+from yggdrasil.tests import assert_equal
+from yggdrasil.drivers.OutputMultiplexer import OutputMultiplexer
+
+
+_mux_installed = OutputMultiplexer.is_installed()
+
+
+def run_models(mux, nmodels=3, nlines=5):
+    r"""Run processes that print lines and register them with a multiplexer."""
+    code = ('import sys\n'
+            'for i in range(%d):\n'
+            '    print("line%%d" %% i)\n'
+            'sys.stdout.write("partial")\n') % nlines
+    procs = []
+    events = []
+    for i in range(nmodels):
+        p = subprocess.Popen([sys.executable, '-c', code],
+                             stdout=subprocess.PIPE)
+        procs.append(p)
+        events.append(mux.register('model%d' % i, p.stdout))
+    for p, ev in zip(procs, events):
+        p.wait()
+        assert(ev.wait(10))
+
+
+@unittest.skipIf(not _mux_installed, "Multiplexer not supported")
+def test_OutputMultiplexer():
+    r"""Test forwarding output from several processes."""
+    stream = tempfile.TemporaryFile(mode='w+')
+    log_dir = tempfile.mkdtemp()
+    mux = OutputMultiplexer(stream=stream, log_dir=log_dir)
+    try:
+        run_models(mux)
+        assert(mux.is_alive())
+        mux.stop()
+        assert(not mux.is_alive())
+        stream.seek(0)
+        lines = stream.read().splitlines()
+        assert_equal(len(lines), 18)
+        for i in range(3):
+            x = ['model%d: line%d' % (i, j) for j in range(5)]
+            x.append('model%d: partial' % i)
+            assert_equal([l for l in lines if l.startswith('model%d:' % i)], x)
+            with open(os.path.join(log_dir, 'model%d.log' % i), 'rb') as fd:
+                assert_equal(backwards.as_str(fd.read()).splitlines(),
+                             ['line%d' % j for j in range(5)] + ['partial'])
+    finally:
+        stream.close()
+        shutil.rmtree(log_dir)
+
+
+@unittest.skipIf(not _mux_installed, "Multiplexer not supported")
+def test_OutputMultiplexer_noprefix():
+    r"""Test forwarding output without prefixes."""
+    stream = tempfile.TemporaryFile(mode='w+')
+    mux = OutputMultiplexer(stream=stream, prefix=False)
+    try:
+        run_models(mux, nmodels=1, nlines=2)
+        mux.stop()
+        stream.seek(0)
+        assert_equal(stream.read(), 'line0\nline1\npartial\n')
+    finally:
+        stream.close()
+    # Stopping without starting
+    OutputMultiplexer().stop()
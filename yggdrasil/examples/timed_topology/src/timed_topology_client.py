@@ -0,0 +1,30 @@
+from __future__ import print_function
+import sys
+from yggdrasil.interface.YggInterface import YggRpcClient, YggOutput
+
+
+def run(args):
+    msg_count = int(args[0])
+    msg_size = int(args[1])
+    print('Hello from Python topology_client: msg_count = %d, msg_size = %d' % (
+        msg_count, msg_size))
+
+    # RPC & output channel names are passed by the benchmark
+    rpc = YggRpcClient(args[2], '%s', '%s')
+    outf = YggOutput(args[3])
+
+    # Call the server multiple times, logging the responses
+    test_msg = b'0' * msg_size
+    for i in range(msg_count):
+        ret, result = rpc.call(test_msg)
+        if not ret:
+            raise RuntimeError('topology_client(P): CALL ERROR ON MSG %d' % i)
+        ret = outf.send(result[0])
+        if not ret:
+            raise RuntimeError('topology_client(P): SEND ERROR ON MSG %d' % i)
+
+    print('Goodbye from Python client. Made %d calls.' % msg_count)
+
+
+if __name__ == '__main__':
+    run(sys.argv[1:])
@@ -0,0 +1,32 @@
+from __future__ import print_function
+import sys
+from yggdrasil.interface.YggInterface import YggInput, YggOutput
+
+
+def run(args):
+    print('Hello from Python topology_dst')
+
+    # Input & output channel names are passed by the benchmark
+    inq = YggInput(args[0])
+    outf = YggOutput(args[1])
+
+    # Forward messages (or table rows) until the input channel is closed
+    count = 0
+    while True:
+        ret, buf = inq.recv()
+        if not ret:
+            print("topology_dst(P): Input channel closed")
+            break
+        if isinstance(buf, (list, tuple)):
+            ret = outf.send(*buf)
+        else:
+            ret = outf.send(buf)
+        if not ret:
+            raise RuntimeError("topology_dst(P): SEND ERROR ON MSG %d" % count)
+        count += 1
+
+    print('Goodbye from Python destination. Received %d messages.' % count)
+
+
+if __name__ == '__main__':
+    run(sys.argv[1:])
@@ -0,0 +1,28 @@
+from __future__ import print_function
+import sys
+from yggdrasil.interface.YggInterface import YggRpcServer
+
+
+def run(args):
+    print('Hello from Python topology_server')
+
+    # Server name is passed by the benchmark
+    rpc = YggRpcServer(args[0], '%s', '%s')
+
+    # Echo requests until all of the clients have disconnected
+    count = 0
+    while True:
+        ret, request = rpc.recv()
+        if not ret:
+            print('topology_server(P): End of input')
+            break
+        ret = rpc.send(request[0])
+        if not ret:
+            raise RuntimeError('topology_server(P): SEND ERROR ON MSG %d' % count)
+        count += 1
+
+    print('Goodbye from Python server. Received %d requests.' % count)
+
+
+if __name__ == '__main__':
+    run(sys.argv[1:])
@@ -0,0 +1,27 @@
+from __future__ import print_function
+import sys
+from yggdrasil.interface.YggInterface import YggOutput
+
+
+def run(args):
+    msg_count = int(args[0])
+    msg_size = int(args[1])
+    channel = args[2]
+    print('Hello from Python topology_src: msg_count = %d, msg_size = %d' % (
+        msg_count, msg_size))
+
+    # Output channel name is passed by the benchmark
+    outq = YggOutput(channel)
+
+    # Send test message multiple times
+    test_msg = b'0' * msg_size
+    for i in range(msg_count):
+        ret = outq.send(test_msg)
+        if not ret:
+            raise RuntimeError('topology_src(P): SEND ERROR ON MSG %d' % i)
+
+    print('Goodbye from Python source. Sent %d messages.' % msg_count)
+
+
+if __name__ == '__main__':
+    run(sys.argv[1:])
@@ -201,9 +201,7 @@ def normalize_instance(obj, schema, **kwargs):
 
 
 def import_all_classes():
-    r"""Import all metaschema classes (types and properties)."""
+    r"""Import all metaschema classes (types and properties). Classes are
+    otherwise imported as they are needed."""
     import_all_properties()
     import_all_types()
-
-
-import_all_classes()
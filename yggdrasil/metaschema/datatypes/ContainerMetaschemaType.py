@@ -1,6 +1,8 @@
+from yggdrasil import backwards
 from yggdrasil.metaschema.datatypes import (
     get_type_class, complete_typedef, encode_data, encode_data_readable)
-from yggdrasil.metaschema.datatypes.MetaschemaType import MetaschemaType
+from yggdrasil.metaschema.datatypes.MetaschemaType import (
+    MetaschemaType, block_encoding_enabled)
 
 
 class ContainerMetaschemaType(MetaschemaType):
@@ -13,6 +15,8 @@ class ContainerMetaschemaType(MetaschemaType):
     _container_type = None
     _json_type = None
     _json_property = None
+    _block_types = ['int', 'uint', 'float', 'complex']
+    _block_min_items = 32
 
     def __init__(self, *args, **kwargs):
         self._typecls = self._container_type()
@@ -80,9 +84,75 @@ class ContainerMetaschemaType(MetaschemaType):
             out = container[index]
         return out
 
+    @classmethod
+    def is_block_typedef(cls, typedef):
+        r"""Determine if elements with a type definition can be encoded
+        together as a single block.
+
+        Args:
+            typedef (dict): Element type definition.
+
+        Returns:
+            bool: True if elements with the type definition can be encoded
+                as a block, False otherwise.
+
+        """
+        return (isinstance(typedef, dict)
+                and (typedef.get('type', None) in cls._block_types)
+                and ('precision' in typedef))
+
+    @classmethod
+    def _get_block_typedef(cls, typedef):
+        r"""Get the type definition shared by all of the elements in the
+        container if they can be encoded together as a single block.
+
+        Args:
+            typedef (dict): Type definition for the container.
+
+        Returns:
+            dict: Type definition for the elements, None if the elements
+                cannot be encoded as a block.
+
+        """
+        return None
+
+    @classmethod
+    def _to_block(cls, container, typedef):
+        r"""Get the elements in the container in the order that they should
+        be encoded in a block.
+
+        Args:
+            container (obj): Object containing the elements.
+            typedef (dict): Type definition for the container.
+
+        Returns:
+            list: Elements in the container, None if the container cannot be
+                encoded as a block.
+
+        """
+        raise NotImplementedError("This must be overwritten by the subclass.")
+
+    @classmethod
+    def _from_block(cls, values, typedef):
+        r"""Create a container from the elements decoded from a block.
+
+        Args:
+            values (list): Elements decoded from the block.
+            typedef (dict): Type definition for the container.
+
+        Returns:
+            obj: Container with the elements.
+
+        """
+        raise NotImplementedError("This must be overwritten by the subclass.")
+
     @classmethod
     def encode_data(cls, obj, typedef):
-        r"""Encode an object's data.
+        r"""Encode an object's data. If block encoding is enabled (see
+        MetaschemaType.block_encoding_enabled), containers with at least
+        _block_min_items elements that share the same scalar type definition
+        are encoded as a single block. Blocks can only be decoded by Python
+        so other containers are encoded element by element.
 
         Args:
             obj (object): Object to encode.
@@ -93,6 +163,14 @@ class ContainerMetaschemaType(MetaschemaType):
             string: Encoded object.
 
         """
+        vtypedef = None
+        if block_encoding_enabled():
+            vtypedef = cls._get_block_typedef(typedef)
+        if vtypedef is not None:
+            values = cls._to_block(obj, typedef)
+            if (values is not None) and (len(values) >= cls._block_min_items):
+                vcls = get_type_class(vtypedef['type'])
+                return vcls.encode_data_block(values, vtypedef)
         container = cls._container_type()
         for k, v in cls._iterate(obj):
             vtypedef = None
@@ -138,6 +216,11 @@ class ContainerMetaschemaType(MetaschemaType):
             object: Decoded object.
 
         """
+        if isinstance(obj, backwards.string_types):
+            vtypedef = cls._get_block_typedef(typedef)
+            vcls = get_type_class(vtypedef['type'])
+            return cls._from_block(vcls.decode_data_block(obj, vtypedef),
+                                   typedef)
         container = cls._container_type()
         for k, v in cls._iterate(obj):
             vtypedef = cls._get_element(typedef[cls._json_property], k, {})
@@ -4,6 +4,10 @@ from yggdrasil.metaschema.datatypes import register_type, compare_schema
 from yggdrasil.metaschema.datatypes.MetaschemaType import MetaschemaType
 
 
+# Results of validating objects that share a dispatch key
+_validate_cache = {}
+
+
 def create_fixed_type_class(name, description, base, fixed_properties,
                             target_globals=None, **kwargs):
     r"""Create a fixed class.
@@ -171,17 +175,28 @@ class FixedMetaschemaType(MetaschemaType):
             bool: True if the object could be of this type, False otherwise.
 
         """
+        from yggdrasil.metaschema.properties.TypeMetaschemaProperty import (
+            get_dispatch_key)
+        # Objects with the same dispatch key validate identically
+        key = get_dispatch_key(obj)
+        if key is not None:
+            key = (cls, key)
+            if _validate_cache.get(key, False):
+                return True
         if not super(FixedMetaschemaType, cls).validate(obj,
                                                         raise_errors=raise_errors):
-            return False
-        try:
-            jsonschema.validate(obj, cls.updated_fixed_properties(obj),
-                                cls=cls.validator())
-        except (jsonschema.exceptions.ValidationError, AssertionError):
-            if raise_errors:
-                raise
-            return False
-        return True
+            out = False
+        else:
+            try:
+                cls.validate_instance(obj, cls.updated_fixed_properties(obj))
+                out = True
+            except (jsonschema.exceptions.ValidationError, AssertionError):
+                if raise_errors:
+                    raise
+                out = False
+        if key is not None:
+            _validate_cache[key] = out
+        return out
 
     # This code was unused by any of the test cases, but is kept in case it is
     # needed in the future
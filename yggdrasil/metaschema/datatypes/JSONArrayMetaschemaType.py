@@ -1,5 +1,5 @@
 import numpy as np
-import pandas as pd
+from yggdrasil.serialize import PandasDataFrame
 from yggdrasil.metaschema.datatypes import register_type
 from yggdrasil.metaschema.datatypes.ContainerMetaschemaType import (
     ContainerMetaschemaType)
@@ -15,7 +15,7 @@ class JSONArrayMetaschemaType(ContainerMetaschemaType):
     definition_properties = ContainerMetaschemaType.definition_properties
     metadata_properties = ContainerMetaschemaType.metadata_properties + ['items']
     extract_properties = ContainerMetaschemaType.extract_properties + ['items']
-    python_types = (list, tuple, np.ndarray, pd.DataFrame)
+    python_types = (list, tuple, np.ndarray, PandasDataFrame)
     _replaces_existing = True
 
     _container_type = list
@@ -80,7 +80,7 @@ class JSONArrayMetaschemaType(ContainerMetaschemaType):
 
         """
         from yggdrasil.serialize import pandas2list, numpy2list, dict2list
-        if isinstance(obj, pd.DataFrame):
+        if isinstance(obj, PandasDataFrame):
             obj = pandas2list(obj)
         elif isinstance(obj, np.ndarray) and (len(obj.dtype) > 0):
             obj = numpy2list(obj)
@@ -109,6 +109,54 @@ class JSONArrayMetaschemaType(ContainerMetaschemaType):
         for k, v in enumerate(container):
             yield (k, v)
 
+    @classmethod
+    def _get_block_typedef(cls, typedef):
+        r"""Get the type definition shared by all of the elements in the
+        container if they can be encoded together as a single block.
+
+        Args:
+            typedef (dict): Type definition for the container.
+
+        Returns:
+            dict: Type definition for the elements, None if the elements
+                cannot be encoded as a block.
+
+        """
+        items = typedef.get(cls._json_property, None)
+        if cls.is_block_typedef(items):
+            return items
+        return None
+
+    @classmethod
+    def _to_block(cls, container, typedef):
+        r"""Get the elements in the container in the order that they should
+        be encoded in a block.
+
+        Args:
+            container (obj): Object containing the elements.
+            typedef (dict): Type definition for the container.
+
+        Returns:
+            list: Elements in the container, None if the container cannot be
+                encoded as a block.
+
+        """
+        return list(container)
+
+    @classmethod
+    def _from_block(cls, values, typedef):
+        r"""Create a container from the elements decoded from a block.
+
+        Args:
+            values (list): Elements decoded from the block.
+            typedef (dict): Type definition for the container.
+
+        Returns:
+            obj: Container with the elements.
+
+        """
+        return list(values)
+
     @classmethod
     def _assign(cls, container, index, value):
         r"""Assign an element in the container to the specified value.
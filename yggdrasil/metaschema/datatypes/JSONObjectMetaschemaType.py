@@ -1,5 +1,5 @@
 import numpy as np
-import pandas as pd
+from yggdrasil.serialize import PandasDataFrame
 from yggdrasil.metaschema.datatypes import register_type
 from yggdrasil.metaschema.datatypes.ContainerMetaschemaType import (
     ContainerMetaschemaType)
@@ -44,7 +44,7 @@ class JSONObjectMetaschemaType(ContainerMetaschemaType):
 
         """
         from yggdrasil.serialize import pandas2dict, numpy2dict, list2dict
-        if isinstance(obj, pd.DataFrame):
+        if isinstance(obj, PandasDataFrame):
             obj = pandas2dict(obj)
         elif isinstance(obj, np.ndarray) and (len(obj.dtype) > 0):
             obj = numpy2dict(obj)
@@ -67,6 +67,62 @@ class JSONObjectMetaschemaType(ContainerMetaschemaType):
         for k, v in container.items():
             yield (k, v)
 
+    @classmethod
+    def _get_block_typedef(cls, typedef):
+        r"""Get the type definition shared by all of the elements in the
+        container if they can be encoded together as a single block.
+
+        Args:
+            typedef (dict): Type definition for the container.
+
+        Returns:
+            dict: Type definition for the elements, None if the elements
+                cannot be encoded as a block.
+
+        """
+        props = typedef.get(cls._json_property, None)
+        if (not isinstance(props, dict)) or (len(props) < 2):
+            return None
+        props = list(props.values())
+        if cls.is_block_typedef(props[0]) and all(
+                x == props[0] for x in props[1:]):
+            return props[0]
+        return None
+
+    @classmethod
+    def _to_block(cls, container, typedef):
+        r"""Get the elements in the container in the order that they should
+        be encoded in a block (sorted by key).
+
+        Args:
+            container (obj): Object containing the elements.
+            typedef (dict): Type definition for the container.
+
+        Returns:
+            list: Elements in the container, None if the container cannot be
+                encoded as a block.
+
+        """
+        keys = sorted(typedef[cls._json_property].keys())
+        if sorted(container.keys()) != keys:
+            return None
+        return [container[k] for k in keys]
+
+    @classmethod
+    def _from_block(cls, values, typedef):
+        r"""Create a container from the elements decoded from a block.
+
+        Args:
+            values (list): Elements decoded from the block.
+            typedef (dict): Type definition for the container.
+
+        Returns:
+            obj: Container with the elements.
+
+        """
+        keys = sorted(typedef[cls._json_property].keys())
+        return cls._container_type(zip(keys, values))
+
     @classmethod
     def _assign(cls, container, index, value):
         r"""Assign an element in the container to the specified value.
@@ -1,19 +1,63 @@
+import re
 import copy
+import json
 import uuid
 import pprint
+import itertools
+import threading
+import contextlib
 import jsonschema
-from yggdrasil import backwards, tools
+from collections import OrderedDict
+from yggdrasil import backwards, tools, compression as compression_codecs
 from yggdrasil.metaschema import get_metaschema, get_validator, encoder
 from yggdrasil.metaschema.datatypes import (
     MetaschemaTypeError, compare_schema, YGG_MSG_HEAD, get_type_class,
     conversions)
 from yggdrasil.metaschema.properties import get_metaschema_property
 
+_validator_cache = threading.local()
+_validator_cache_size = 1000
+_block_encoding = threading.local()
+# Headers begin with the fields that change between messages
+_header_dynamic_regex = re.compile(
+    br'^\{"id":"[^"\\]*","size":\d+(?:,"trace":"[^"\\]*")?')
+
 
 def _get_single_array_element(arr):
     return arr[0]
 
 
+def block_encoding_enabled():
+    r"""Determine if homogeneous containers can be encoded as a single block
+    in the current thread (see block_encoding).
+
+    Returns:
+        bool: True if block encoding is enabled, False otherwise.
+
+    """
+    return getattr(_block_encoding, 'enabled', False)
+
+
+@contextlib.contextmanager
+def block_encoding(enabled=True):
+    r"""Context in which homogeneous containers with enough elements are
+    encoded as a single block (see ContainerMetaschemaType.encode_data).
+    Blocks can only be decoded by Python so this should only be enabled if
+    the message will be received by a Python comm.
+
+    Args:
+        enabled (bool, optional): If True, block encoding is enabled within
+            the context. Defaults to True.
+
+    """
+    prev = block_encoding_enabled()
+    _block_encoding.enabled = enabled
+    try:
+        yield
+    finally:
+        _block_encoding.enabled = prev
+
+
 class MetaschemaType(object):
     r"""Base type that should be subclassed by user defined types. Attributes
     should be overwritten to match the type.
@@ -56,6 +100,10 @@ class MetaschemaType(object):
     
     def __init__(self, **typedef):
         self._typedef = {}
+        self._header_template = None
+        self._header_checked = None
+        self._msg_id_prefix = str(uuid.uuid4())
+        self._msg_id_count = itertools.count()
         typedef.setdefault('type', self.name)
         self.update_typedef(**typedef)
 
@@ -225,7 +273,10 @@ class MetaschemaType(object):
         if not cls.validate(obj):
             raise MetaschemaTypeError("Object could not be encoded as '%s' type."
                                       % cls.name)
-        out = copy.deepcopy(kwargs)
+        if kwargs:
+            out = copy.deepcopy(kwargs)
+        else:
+            out = {}
         for x in cls.properties:
             itypedef = typedef.get(x, out.get(x, None))
             if x == 'type':
@@ -307,6 +358,7 @@ class MetaschemaType(object):
             self._typedef[k] = kwargs.pop(k)
         # Validate
         self.validate_definition(self._typedef)
+        self._header_checked = None
         return kwargs
 
     @classmethod
@@ -319,6 +371,66 @@ class MetaschemaType(object):
         r"""JSON schema validator for the meta schema that includes added types."""
         return get_validator()
 
+    @classmethod
+    def get_validator_instance(cls, key, schema):
+        r"""Get a validator instance for a schema. The schema is checked
+        against the metaschema and the validator is created on first use.
+        Validators are reused for subsequent calls with the same key and are
+        cached separately for each thread as resolving references is not
+        thread safe. Cached validators are discarded if the validator class
+        changes.
+
+        Args:
+            key (str): Key identifying the schema for this type class.
+            schema (dict, function): Schema or a function that returns the
+                schema. Functions are only called if the validator must be
+                created.
+
+        Returns:
+            jsonschema.IValidator: Validator for the schema.
+
+        """
+        validator_class = cls.validator()
+        cache = getattr(_validator_cache, 'validators', None)
+        if ((cache is None)
+                or (_validator_cache.validator_class is not validator_class)):
+            cache = OrderedDict()
+            _validator_cache.validators = cache
+            _validator_cache.validator_class = validator_class
+        out = cache.get((cls, key), None)
+        if out is None:
+            if callable(schema):
+                schema = schema()
+            else:
+                schema = copy.deepcopy(schema)
+            validator_class.check_schema(schema)
+            out = validator_class(schema)
+            cache[(cls, key)] = out
+            if len(cache) > _validator_cache_size:
+                cache.popitem(last=False)
+        return out
+
+    @classmethod
+    def validate_schema(cls, obj, key, schema):
+        r"""Validate an object against a schema using a cached validator. As
+        with jsonschema.validate, the most relevant error is raised.
+
+        Args:
+            obj (object): Object to validate.
+            key (str): Key identifying the schema for this type class.
+            schema (dict, function): Schema or a function that returns the
+                schema.
+
+        Raises:
+            jsonschema.exceptions.ValidationError: If the object is not
+                valid.
+
+        """
+        validator = cls.get_validator_instance(key, schema)
+        error = jsonschema.exceptions.best_match(validator.iter_errors(obj))
+        if error is not None:
+            raise error
+
     @classmethod
     def definition_schema(cls):
         r"""JSON schema for validating a type definition schema."""
@@ -353,7 +465,7 @@ class MetaschemaType(object):
             if type_cls.is_fixed and type_cls.issubtype(cls.name):
                 obj = type_cls.typedef_fixed2base(obj)
         # jsonschema.validate(obj, cls.metaschema(), cls=cls.validator())
-        jsonschema.validate(obj, cls.metadata_schema(), cls=cls.validator())
+        cls.validate_schema(obj, 'metadata', cls.metadata_schema)
 
     @classmethod
     def validate_definition(cls, obj):
@@ -364,7 +476,7 @@ class MetaschemaType(object):
 
         """
         # jsonschema.validate(obj, cls.metaschema(), cls=cls.validator())
-        jsonschema.validate(obj, cls.definition_schema(), cls=cls.validator())
+        cls.validate_schema(obj, 'definition', cls.definition_schema)
 
     @classmethod
     def validate_instance(cls, obj, typedef):
@@ -376,7 +488,13 @@ class MetaschemaType(object):
 
         """
         # cls.validate_definition(typedef)
-        jsonschema.validate(obj, typedef, cls=cls.validator())
+        try:
+            key = 'instance:' + json.dumps(typedef, sort_keys=True)
+        except (TypeError, ValueError):
+            # Type definitions that cannot be serialized are not cached
+            jsonschema.validate(obj, typedef, cls=cls.validator())
+            return
+        cls.validate_schema(obj, key, typedef)
 
     @classmethod
     def normalize_definition(cls, obj):
@@ -576,7 +694,69 @@ class MetaschemaType(object):
         out = cls.transform_type(out, typedef)
         return out
 
-    def serialize(self, obj, no_metadata=False, dont_encode=False, **kwargs):
+    def get_message_id(self):
+        r"""Get an ID for the next message. IDs are composed of a UUID
+        generated once for the type instance and a counter that is
+        incremented for each message, so they are unique without generating
+        a new UUID for every message.
+
+        Returns:
+            str: Message ID.
+
+        """
+        return '%s-%d' % (self._msg_id_prefix, next(self._msg_id_count))
+
+    def encode_header(self, metadata):
+        r"""Encode message metadata as a header. The fields that are the same
+        from message to message are encoded once and cached so that only the
+        message ID and size need to be encoded for each message. The ID and
+        size are placed at the beginning of the header so that the cached
+        fields can be identified by get_static_header on receipt. Message
+        traces (see yggdrasil.tracing) change with every message and are
+        placed after the size.
+
+        Args:
+            metadata (dict): Message metadata including 'id' and 'size'.
+
+        Returns:
+            bytes: Encoded header.
+
+        """
+        static = {k: v for k, v in metadata.items()
+                  if k not in ['id', 'size', 'trace']}
+        if (self._header_template is None) or (self._header_template[0] != static):
+            if static:
+                tail = b',' + encoder.encode_json(static)[1:]
+            else:
+                tail = b'}'
+            self._header_template = (copy.deepcopy(static), tail)
+        out = (b'{"id":' + encoder.encode_json(metadata['id'])
+               + b',"size":' + backwards.as_bytes(str(int(metadata['size']))))
+        if 'trace' in metadata:
+            out += b',"trace":' + encoder.encode_json(metadata['trace'])
+        return out + self._header_template[1]
+
+    @classmethod
+    def get_static_header(cls, header):
+        r"""Get the part of an encoded header that does not change between
+        messages with the same metadata.
+
+        Args:
+            header (bytes): Header encoded by encode_header.
+
+        Returns:
+            bytes: Header without the message ID, size, and trace, None if
+                the header was not encoded by encode_header.
+
+        """
+        match = _header_dynamic_regex.match(header)
+        if match is None:
+            return None
+        return header[match.end():]
+
+    def serialize(self, obj, no_metadata=False, dont_encode=False,
+                  compression=None, compression_threshold=None,
+                  block_encode=False, **kwargs):
         r"""Serialize a message.
 
         Args:
@@ -586,21 +766,35 @@ class MetaschemaType(object):
             dont_encode (bool, optional): If True, the input message will not
                 be encoded using type specific or JSON encoding. Defaults to
                 False.
+            compression (str, optional): Name of the codec (see
+                yggdrasil.compression) that should be used to compress the
+                message body. The codec is recorded in the metadata under
+                'compression'. Defaults to None and the body is not
+                compressed. Compression requires metadata and is not applied
+                if no_metadata is True.
+            compression_threshold (int, optional): Size (in bytes) that the
+                message body must reach for it to be compressed. Defaults to
+                None and yggdrasil.compression._default_threshold is used.
+            block_encode (bool, optional): If True, homogeneous containers
+                with enough elements are encoded as a single block. Blocks can
+                only be decoded by Python. Defaults to False.
             **kwargs: Additional keyword arguments are added to the metadata.
 
         Returns:
-            bytes, str: Serialized message.
+            bytes, str, tools.MessageFrames: Serialized message. Raw messages
+                made up of frames are returned as frames.
 
         """
-        if ((isinstance(obj, backwards.bytes_type)
+        if ((isinstance(obj, (backwards.bytes_type, tools.MessageFrames))
              and ((obj == tools.YGG_MSG_EOF) or kwargs.get('raw', False)
                   or dont_encode))):
             metadata = kwargs
             data = obj
             is_raw = True
         else:
-            metadata, data = self.encode(obj, typedef=self._typedef,
-                                         typedef_validated=True, **kwargs)
+            with block_encoding(block_encode):
+                metadata, data = self.encode(obj, typedef=self._typedef,
+                                             typedef_validated=True, **kwargs)
             is_raw = False
         for k in ['size', 'data']:
             if k in metadata:
@@ -609,9 +803,20 @@ class MetaschemaType(object):
             data = encoder.encode_json(data)
         if no_metadata:
             return data
+        if compression and (data != tools.YGG_MSG_EOF):
+            if compression_threshold is None:
+                compression_threshold = compression_codecs._default_threshold
+            if len(data) >= compression_threshold:
+                if isinstance(data, tools.MessageFrames):
+                    data = data.join()
+                data = compression_codecs.compress(data, compression)
+                metadata['compression'] = compression
         metadata['size'] = len(data)
-        metadata.setdefault('id', str(uuid.uuid4()))
-        metadata = encoder.encode_json(metadata)
+        if 'id' not in metadata:
+            metadata['id'] = self.get_message_id()
+        metadata = self.encode_header(metadata)
+        if isinstance(data, tools.MessageFrames):
+            return data.prepend(YGG_MSG_HEAD + metadata + YGG_MSG_HEAD)
         msg = YGG_MSG_HEAD + metadata + YGG_MSG_HEAD + data
         return msg
     
@@ -640,6 +845,7 @@ class MetaschemaType(object):
         if not isinstance(msg, backwards.bytes_type):
             raise TypeError("Message to be deserialized is not bytes type.")
         # Check for header
+        static = None
         if YGG_MSG_HEAD in msg:
             if metadata is not None:
                 raise ValueError("Metadata in header and provided by keyword.")
@@ -647,6 +853,7 @@ class MetaschemaType(object):
             if len(metadata) == 0:
                 metadata = dict(size=len(data))
             else:
+                static = self.get_static_header(metadata)
                 metadata = encoder.decode_json(metadata)
         else:
             data = msg
@@ -658,6 +865,9 @@ class MetaschemaType(object):
                     raise ValueError("Header marker not in message.")
         # Set flags based on data
         metadata['incomplete'] = (len(data) < metadata['size'])
+        if metadata.get('compression', None) and data and (
+                not metadata['incomplete']):
+            data = compression_codecs.decompress(data, metadata['compression'])
         if (data == tools.YGG_MSG_EOF):
             metadata['raw'] = True
         # Return based on flags
@@ -670,6 +880,18 @@ class MetaschemaType(object):
             return data, metadata
         else:
             data = encoder.decode_json(data)
-            obj = self.decode(metadata, data, self._typedef,
-                              typedef_validated=True)
+            # Headers matching the last one checked are not checked again
+            if (static is None) or (static != self._header_checked):
+                checked = self.check_encoded(metadata, self._typedef,
+                                             typedef_validated=True)
+                if checked:
+                    self._header_checked = static
+            else:
+                checked = True
+            if checked:
+                obj = self.transform_type(self.decode_data(data, metadata),
+                                          self._typedef)
+            else:
+                obj = self.decode(metadata, data, self._typedef,
+                                  typedef_validated=True)
         return obj, metadata
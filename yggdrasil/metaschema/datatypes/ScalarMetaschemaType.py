@@ -160,6 +160,44 @@ class ScalarMetaschemaType(MetaschemaType):
         out = cls.as_python_type(out, typedef)
         return out
 
+    @classmethod
+    def encode_data_block(cls, objs, typedef):
+        r"""Encode the data for a set of objects that share the same type
+        definition as a single block.
+
+        Args:
+            objs (list): Objects to encode.
+            typedef (dict): Type definition shared by the objects.
+
+        Returns:
+            string: Encoded block.
+
+        """
+        dtype = ScalarMetaschemaProperties.definition2dtype(typedef)
+        arr = np.array([units.get_data(x) for x in objs], dtype=dtype)
+        return backwards.base64_encode(arr.tobytes()).decode('ascii')
+
+    @classmethod
+    def decode_data_block(cls, obj, typedef):
+        r"""Decode a block encoded by encode_data_block.
+
+        Args:
+            obj (string): Encoded block to decode.
+            typedef (dict): Type definition shared by the objects in the block.
+
+        Returns:
+            list: Decoded objects.
+
+        """
+        bytes = backwards.base64_decode(obj.encode('ascii'))
+        dtype = ScalarMetaschemaProperties.definition2dtype(typedef)
+        arr = np.frombuffer(bytes, dtype=dtype)
+        unit_str = typedef.get('units', None)
+        return [cls.as_python_type(cls.from_array(arr[i:(i + 1)],
+                                                  unit_str=unit_str,
+                                                  dtype=dtype), typedef)
+                for i in range(len(arr))]
+
     @classmethod
     def transform_type(cls, obj, typedef=None):
         r"""Transform an object based on type info.
@@ -1,7 +1,7 @@
 import copy
 import jsonschema
 from yggdrasil.metaschema.datatypes import (
-    register_type, get_type_class, _type_registry)
+    register_type, get_type_class, get_registered_types)
 from yggdrasil.metaschema.properties import get_metaschema_property
 from yggdrasil.metaschema.datatypes.JSONObjectMetaschemaType import (
     JSONObjectMetaschemaType)
@@ -17,7 +17,8 @@ def _normalize_schema(validator, ref, instance, schema):
     # if isinstance(instance, str):
     #     instance = dict(type=instance)
     # return instance
-    if isinstance(instance, str) and (instance in _type_registry):
+    type_registry = get_registered_types()
+    if isinstance(instance, str) and (instance in type_registry):
         instance = {'type': instance}
     elif isinstance(instance, dict):
         if len(instance) == 0:
@@ -38,7 +39,7 @@ def _normalize_schema(validator, ref, instance, schema):
                 instance = {'type': 'object', 'properties': instance}
             else:
                 if len(valid_types) > 1:
-                    valid_type_classes = sorted([_type_registry[t] for t in valid_types],
+                    valid_type_classes = sorted([type_registry[t] for t in valid_types],
                                                 key=_specificity_sort_key)
                     s_max = valid_type_classes[0].specificity
                     valid_types = []
@@ -138,18 +139,23 @@ class SchemaMetaschemaType(JSONObjectMetaschemaType):
                                                          raise_errors=raise_errors):
             return False
         try:
-            x = copy.deepcopy(cls.metaschema())
-            x.setdefault('required', [])
-            if 'type' not in x['required']:
-                x['required'].append('type')
-            x['additionalProperties'] = False
-            jsonschema.validate(obj, x, cls=cls.validator())
+            cls.validate_schema(obj, 'schema', cls._validation_schema)
         except jsonschema.exceptions.ValidationError:
             if raise_errors:
                 raise
             return False
         return True
 
+    @classmethod
+    def _validation_schema(cls):
+        r"""dict: Schema used to validate type definitions."""
+        x = copy.deepcopy(cls.metaschema())
+        x.setdefault('required', [])
+        if 'type' not in x['required']:
+            x['required'].append('type')
+        x['additionalProperties'] = False
+        return x
+
     @classmethod
     def normalize(cls, obj):
         r"""Normalize an object, if possible, to conform to this type.
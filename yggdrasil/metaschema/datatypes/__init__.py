@@ -3,13 +3,18 @@ import glob
 import jsonschema
 import copy
 import importlib
+import threading
 from collections import OrderedDict
+from yggdrasil import registry
 from yggdrasil.metaschema.encoder import decode_json
 from yggdrasil.metaschema.properties import get_metaschema_property
 
 
 _jsonschema_ver_maj = int(float(jsonschema.__version__.split('.')[0]))
 _type_registry = OrderedDict()
+_type_registry_complete = False
+_type_registry_importing = False
+_type_registry_lock = threading.RLock()
 _schema_dir = os.path.join(os.path.dirname(__file__), 'schemas')
 _base_validator = jsonschema.validators.validator_for({"$schema": ""})
 YGG_MSG_HEAD = b'YGG_MSG_HEAD'
@@ -139,11 +144,30 @@ def get_registered_types():
         dict: Registered type/class pairs.
 
     """
+    import_all_types()
     return _type_registry
 
 
 def import_all_types():
     r"""Import all types to ensure they are registered."""
+    global _type_registry_complete, _type_registry_importing
+    if _type_registry_complete:
+        return
+    with _type_registry_lock:
+        # Calls made by this thread while the types are imported return
+        # immediately, other threads wait for the imports to finish
+        if _type_registry_complete or _type_registry_importing:
+            return
+        _type_registry_importing = True
+        try:
+            _import_all_types()
+            _type_registry_complete = True
+        finally:
+            _type_registry_importing = False
+
+
+def _import_all_types():
+    r"""Import the modules containing the types."""
     for x in glob.glob(os.path.join(os.path.dirname(__file__), '*.py')):
         type_mod = os.path.basename(x)[:-3]
         if not type_mod.startswith('__'):
@@ -201,6 +225,10 @@ def get_type_class(type_name):
         class: Type class.
 
     """
+    if type_name not in _type_registry:
+        # Components registered dynamically are not in the index
+        if not registry.import_component('type', type_name):
+            import_all_types()
     if type_name not in _type_registry:
         raise ValueError("Class for type '%s' could not be found." % type_name)
     return _type_registry[type_name]
@@ -244,7 +272,7 @@ def guess_type_from_msg(msg):
         if YGG_MSG_HEAD in msg:
             _, metadata, data = msg.split(YGG_MSG_HEAD, 2)
             metadata = decode_json(metadata)
-            cls = _type_registry[metadata['type']]
+            cls = get_type_class(metadata['type'])
         else:
             raise Exception
         return cls
@@ -4,6 +4,7 @@ from yggdrasil import serialize
 from yggdrasil.tests import assert_equal
 from yggdrasil.metaschema.datatypes.JSONArrayMetaschemaType import (
     JSONArrayMetaschemaType)
+from yggdrasil.metaschema.datatypes.MetaschemaType import block_encoding
 from yggdrasil.metaschema.datatypes.tests import test_MetaschemaType as parent
 from yggdrasil.metaschema.datatypes.tests import (
     test_ContainerMetaschemaType as container_utils)
@@ -77,3 +78,33 @@ class TestJSONArrayMetaschemaType(parent.TestMetaschemaType):
         r"""Test error on validation of non-structured array."""
         self.assert_raises(ValueError, self.import_cls.validate,
                            np.zeros(5), raise_errors=True)
+
+    def test_block(self):
+        r"""Test encoding homogeneous items as a single block."""
+        x = [float(i) for i in range(100)]
+        # Items are encoded separately unless block encoding is enabled
+        typedef = self.import_cls.encode_type(x)
+        assert(isinstance(typedef['items'], list))
+        assert(isinstance(self.import_cls.encode_data(x, typedef), list))
+        inst = self.import_cls()
+        msg = inst.serialize(x)
+        assert_equal(inst.deserialize(msg)[0], x)
+        with block_encoding():
+            typedef = self.import_cls.encode_type(x)
+            assert_equal(typedef['items'], {'type': 'float', 'precision': 64,
+                                            'units': ''})
+            encoded = self.import_cls.encode_data(x, typedef)
+            assert(isinstance(encoded, str))
+            assert_equal(self.import_cls.decode_data(encoded, typedef), x)
+            # Heterogeneous or few items are encoded separately
+            for y in [x[:-1] + [1], [1.0, 2.0]]:
+                ytypedef = self.import_cls.encode_type(y)
+                assert(isinstance(ytypedef['items'], list))
+                assert(isinstance(self.import_cls.encode_data(y, ytypedef),
+                                  list))
+        # Without block encoding, a shared item definition is expanded
+        assert(isinstance(self.import_cls.encode_data(x, typedef), list))
+        inst = self.import_cls()
+        block_msg = inst.serialize(x, block_encode=True)
+        assert(len(block_msg) < len(msg))
+        assert_equal(inst.deserialize(block_msg)[0], x)
@@ -4,6 +4,7 @@ from yggdrasil import serialize
 from yggdrasil.tests import assert_equal
 from yggdrasil.metaschema.datatypes.JSONObjectMetaschemaType import (
     JSONObjectMetaschemaType)
+from yggdrasil.metaschema.datatypes.MetaschemaType import block_encoding
 from yggdrasil.metaschema.datatypes.tests import test_MetaschemaType as parent
 from yggdrasil.metaschema.datatypes.tests import (
     test_ContainerMetaschemaType as container_utils)
@@ -31,6 +32,27 @@ def test_coerce():
         do_send_recv(y)
 
 
+def test_block():
+    r"""Test encoding homogeneous properties as a single block."""
+    x = {'f%d' % i: float(i) for i in range(100)}
+    typedef = JSONObjectMetaschemaType.encode_type(x)
+    # Properties are encoded separately unless block encoding is enabled
+    assert(isinstance(JSONObjectMetaschemaType.encode_data(x, typedef), dict))
+    with block_encoding():
+        encoded = JSONObjectMetaschemaType.encode_data(x, typedef)
+        assert(isinstance(encoded, str))
+        assert_equal(JSONObjectMetaschemaType.decode_data(encoded, typedef), x)
+        # Missing keys prevent encoding as a block
+        y = copy.deepcopy(x)
+        del y['f0']
+        assert(isinstance(JSONObjectMetaschemaType.encode_data(y, typedef),
+                          dict))
+        # Small containers are encoded element by element
+        y = {'a': 1.0, 'b': 2.0}
+        assert(isinstance(JSONObjectMetaschemaType.encode_data(
+            y, JSONObjectMetaschemaType.encode_type(y)), dict))
+
+
 class TestJSONObjectMetaschemaType(parent.TestMetaschemaType):
     r"""Test class for JSONObjectMetaschemaType class."""
 
@@ -1,9 +1,82 @@
 import numpy as np
 import copy
+import json
 import pprint
+import threading
 import jsonschema
-from yggdrasil.metaschema.datatypes import MetaschemaTypeError, YGG_MSG_HEAD
-from yggdrasil.tests import YggTestClassInfo
+from yggdrasil.metaschema.datatypes import (
+    MetaschemaTypeError, YGG_MSG_HEAD, get_type_class)
+from yggdrasil.tests import YggTestClassInfo, assert_raises
+
+
+def test_validator_instance():
+    r"""Test that validator instances are reused within a thread."""
+    cls = get_type_class('object')
+    typedef = {'type': 'object', 'properties': {'a': {'type': 'integer'}}}
+    key = 'test_validator_instance'
+    v1 = cls.get_validator_instance(key, typedef)
+    assert(cls.get_validator_instance(key, typedef) is v1)
+    cls.validate_schema({'a': 1}, key, typedef)
+    assert_raises(jsonschema.exceptions.ValidationError,
+                  cls.validate_schema, {'a': 'b'}, key, typedef)
+    out = []
+    thread = threading.Thread(
+        target=lambda: out.append(cls.get_validator_instance(key, typedef)))
+    thread.start()
+    thread.join()
+    assert(out[0] is not v1)
+
+
+def test_validation_cache(nrep=10):
+    r"""Test that validating instances against a type definition reuses the
+    cached validator rather than creating one on every call as
+    jsonschema.validate does."""
+    cls = get_type_class('object')
+    typedef = {'type': 'object',
+               'properties': {'a': {'type': 'integer'},
+                              'b': {'type': 'array',
+                                    'items': {'type': 'number'}}}}
+    obj = {'a': 1, 'b': [1.0, 2.0, 3.0]}
+    key = 'instance:' + json.dumps(typedef, sort_keys=True)
+    cls.validate_instance(obj, typedef)
+    v1 = cls.get_validator_instance(key, None)
+    assert(v1 is not None)
+    for _ in range(nrep):
+        cls.validate_instance(obj, typedef)
+        assert(cls.get_validator_instance(key, None) is v1)
+    assert_raises(jsonschema.exceptions.ValidationError,
+                  cls.validate_instance, {'a': 'b'}, typedef)
+    assert(cls.get_validator_instance(key, None) is v1)
+
+
+def test_header_template():
+    r"""Test that header fields are cached between messages."""
+    x = get_type_class('array')()
+    msg1 = x.serialize([1.0, 2])
+    msg2 = x.serialize([3.0, 4])
+    head1 = msg1.split(YGG_MSG_HEAD)[1]
+    head2 = msg2.split(YGG_MSG_HEAD)[1]
+    assert(head1 != head2)
+    static = x.get_static_header(head1)
+    assert(static is not None)
+    assert(x.get_static_header(head2) == static)
+    assert(x.get_static_header(b'{"size":1}') is None)
+    meta1 = x.deserialize(msg1)[1]
+    assert(x._header_checked == static)
+    obj2, meta2 = x.deserialize(msg2)
+    assert(obj2 == [3.0, 4])
+    assert(meta1['id'] != meta2['id'])
+    assert(meta1['id'].startswith(x._msg_id_prefix))
+    # IDs provided by the caller are preserved
+    msg3 = x.serialize([5.0, 6], id='test_id')
+    assert(x.deserialize(msg3)[1]['id'] == 'test_id')
+    # Traces change with every message and are not part of the static header
+    msg4 = x.serialize([7.0, 8], trace='abc;a:send@1.000000')
+    head4 = msg4.split(YGG_MSG_HEAD)[1]
+    assert(x.get_static_header(head4) == static)
+    obj4, meta4 = x.deserialize(msg4)
+    assert(obj4 == [7.0, 8])
+    assert(meta4['trace'] == 'abc;a:send@1.000000')
 
 
 class TestMetaschemaType(YggTestClassInfo):
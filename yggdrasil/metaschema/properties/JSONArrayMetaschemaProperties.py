@@ -2,6 +2,11 @@ import copy
 from yggdrasil.metaschema.datatypes import encode_type, compare_schema
 from yggdrasil.metaschema.properties import register_metaschema_property
 from yggdrasil.metaschema.properties.MetaschemaProperty import MetaschemaProperty
+from yggdrasil.metaschema.properties.TypeMetaschemaProperty import (
+    get_dispatch_key)
+
+
+_fixed_typedef_types = (int, float, complex)
 
 
 @register_metaschema_property
@@ -14,13 +19,43 @@ class ItemsMetaschemaProperty(MetaschemaProperty):
 
     @classmethod
     def encode(cls, instance, typedef=None):
-        r"""Encoder for the 'items' container property."""
-        if isinstance(typedef, (list, tuple)):
-            typedef_list = typedef
-        else:
+        r"""Encoder for the 'items' container property. If block encoding
+        is enabled, a single type definition is not provided for each item,
+        and there are enough items that all share the same scalar type
+        definition, the shared type definition is returned so that the items
+        can be encoded as a single block."""
+        from yggdrasil.metaschema.datatypes.MetaschemaType import (
+            block_encoding_enabled)
+        from yggdrasil.metaschema.datatypes.ContainerMetaschemaType import (
+            ContainerMetaschemaType)
+        shared = (not isinstance(typedef, (list, tuple)))
+        if shared:
             typedef_list = [copy.deepcopy(typedef) for x in instance]
+        else:
+            typedef_list = typedef
         assert(len(typedef_list) == len(instance))
-        return [encode_type(v, typedef=t) for v, t in zip(instance, typedef_list)]
+        out = []
+        known = {}
+        reused = []
+        for v, t in zip(instance, typedef_list):
+            # Items of these types always have the same type definition
+            k = type(v)
+            if (shared and (k in _fixed_typedef_types)
+                    and (get_dispatch_key(v) is not None)):
+                if k not in known:
+                    known[k] = encode_type(v, typedef=t)
+                reused.append(len(out))
+                out.append(known[k])
+            else:
+                out.append(encode_type(v, typedef=t))
+        if (shared and block_encoding_enabled()
+                and (len(out) >= ContainerMetaschemaType._block_min_items)
+                and ContainerMetaschemaType.is_block_typedef(out[0])
+                and all(x == out[0] for x in out[1:])):
+            return out[0]
+        for i in reused:
+            out[i] = copy.deepcopy(out[i])
+        return out
 
     @classmethod
     def compare(cls, prop1, prop2, root1=None, root2=None):
@@ -1,13 +1,55 @@
+import types
+import numpy as np
+from yggdrasil import backwards
 from yggdrasil.metaschema.datatypes import (
     get_registered_types, get_type_class, MetaschemaTypeError)
 from yggdrasil.metaschema.properties import register_metaschema_property
 from yggdrasil.metaschema.properties.MetaschemaProperty import MetaschemaProperty
 
 
+# Python types for which the encoded type depends only on the Python type
+_dispatch_python_types = (
+    bool, float, complex, type(None), list, tuple, types.FunctionType,
+    types.BuiltinFunctionType, types.MethodType, backwards.bytes_type,
+    backwards.unicode_type)
+_int64_min = int(np.iinfo(np.int64).min)
+_int64_max = int(np.iinfo(np.int64).max)
+
+
 def _specificity_sort_key(item):
     return -item[1].specificity
 
 
+def get_dispatch_key(instance):
+    r"""Get the key used to look up the encoded type of an object in the
+    type dispatch table. Objects that share a key are guaranteed to be
+    encoded as the same type.
+
+    Args:
+        instance (object): Object to get the key for.
+
+    Returns:
+        object: Hashable key for the object, None if the encoded type cannot
+            be determined from the Python type (e.g. dictionaries that may
+            match the schema of a more specific type).
+
+    """
+    t = type(instance)
+    if t in _dispatch_python_types:
+        return t
+    if t is int:
+        # Integers outside the range of int64 map to different dtypes
+        if _int64_min <= instance <= _int64_max:
+            return t
+        return None
+    dtype = getattr(instance, 'dtype', None)
+    if isinstance(dtype, np.dtype):
+        ndim = getattr(instance, 'ndim', None)
+        if isinstance(ndim, int):
+            return (t, dtype, min(ndim, 2))
+    return None
+
+
 @register_metaschema_property
 class TypeMetaschemaProperty(MetaschemaProperty):
     r"""Type property with validation of new properties."""
@@ -15,6 +57,27 @@ class TypeMetaschemaProperty(MetaschemaProperty):
     name = 'type'
     _replaces_existing = True
     _validate = False
+    _dispatch = {}
+    _dispatch_order = []
+
+    @classmethod
+    def get_probe_order(cls):
+        r"""Get the order in which registered types are tried when
+        determining the type of an object that is not in the dispatch table.
+        The dispatch table is cleared if types were registered since the
+        order was last determined.
+
+        Returns:
+            list: Names and classes of registered types in the order of
+                decreasing specificity.
+
+        """
+        type_registry = get_registered_types()
+        if len(cls._dispatch_order) != len(type_registry):
+            cls._dispatch.clear()
+            cls._dispatch_order = sorted(type_registry.items(),
+                                         key=_specificity_sort_key)
+        return cls._dispatch_order
 
     @classmethod
     def encode(cls, instance, typedef=None):
@@ -30,9 +93,14 @@ class TypeMetaschemaProperty(MetaschemaProperty):
             object: Encoded property for instance.
 
         """
-        type_registry = get_registered_types()
-        for t, cls in sorted(type_registry.items(), key=_specificity_sort_key):
-            if cls.validate(instance):
+        probe_order = cls.get_probe_order()
+        key = get_dispatch_key(instance)
+        if key in cls._dispatch:
+            return cls._dispatch[key]
+        for t, type_cls in probe_order:
+            if type_cls.validate(instance):
+                if key is not None:
+                    cls._dispatch[key] = t
                 return t
         raise MetaschemaTypeError(
             "Could not encode 'type' property for Python type: %s"
@@ -1,11 +1,16 @@
 import os
 import glob
 import importlib
+import threading
 from collections import OrderedDict
+from yggdrasil import registry
 from yggdrasil.metaschema.properties import MetaschemaProperty
 
 
 _metaschema_properties = OrderedDict()
+_metaschema_properties_complete = False
+_metaschema_properties_importing = False
+_metaschema_properties_lock = threading.RLock()
 
 
 def register_metaschema_property(prop_class):
@@ -57,6 +62,7 @@ def get_registered_properties():
         dict: Registered property/class pairs.
 
     """
+    import_all_properties()
     return _metaschema_properties
 
 
@@ -72,6 +78,10 @@ def get_metaschema_property(property_name, skip_generic=False):
         MetaschemaProperty: Associated property class.
 
     """
+    if property_name not in _metaschema_properties:
+        # Components registered dynamically are not in the index
+        if not registry.import_component('property', property_name):
+            import_all_properties()
     if property_name in _metaschema_properties:
         return _metaschema_properties[property_name]
     else:
@@ -83,6 +93,24 @@ def get_metaschema_property(property_name, skip_generic=False):
 
 def import_all_properties():
     r"""Import all types to ensure they are registered."""
+    global _metaschema_properties_complete, _metaschema_properties_importing
+    if _metaschema_properties_complete:
+        return
+    with _metaschema_properties_lock:
+        # Calls made by this thread while the properties are imported return
+        # immediately, other threads wait for the imports to finish
+        if _metaschema_properties_complete or _metaschema_properties_importing:
+            return
+        _metaschema_properties_importing = True
+        try:
+            _import_all_properties()
+            _metaschema_properties_complete = True
+        finally:
+            _metaschema_properties_importing = False
+
+
+def _import_all_properties():
+    r"""Import the modules containing the properties."""
     for x in glob.glob(os.path.join(os.path.dirname(__file__), '*.py')):
         mod = os.path.basename(x)[:-3]
         if not mod.startswith('__'):
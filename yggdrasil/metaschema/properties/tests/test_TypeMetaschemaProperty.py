@@ -1,4 +1,7 @@
 import numpy as np
+from yggdrasil.tests import assert_equal
+from yggdrasil.metaschema.properties.TypeMetaschemaProperty import (
+    get_dispatch_key)
 from yggdrasil.metaschema.properties.tests import (
     test_MetaschemaProperty as parent)
 
@@ -18,3 +21,19 @@ class TestTypeMetaschemaProperty(parent.TestMetaschemaProperty):
                                ('ply', 'object')]
         self._invalid_compare = [('int', 'float'), ('array', 'object'),
                                  ('ply', 'array'), ('1darray', 'scalar')]
+
+    def test_dispatch(self):
+        r"""Test that types resolved via the dispatch table match probing."""
+        objs = [1, 2**70, 1.0, True, None, 'a', b'a', [1], (1, ), {},
+                np.int8(1), np.float32(1), np.zeros(3), np.zeros((3, 3)),
+                np.zeros(3, dtype=[('a', 'f8')])]
+        self.import_cls._dispatch.clear()
+        probed = [self.import_cls.encode(x) for x in objs]
+        assert_equal([self.import_cls.encode(x) for x in objs], probed)
+        for x in [2**70, {}]:
+            assert(get_dispatch_key(x) is None)
+        assert(get_dispatch_key(1.0) in self.import_cls._dispatch)
+        assert_equal(get_dispatch_key(np.zeros(3)),
+                     get_dispatch_key(np.ones(4)))
+        assert(get_dispatch_key(np.zeros(3))
+               != get_dispatch_key(np.zeros((3, 3))))
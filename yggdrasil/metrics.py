@@ -0,0 +1,277 @@
+r"""Lightweight performance metrics for comms and connection drivers.
+Counters and histograms are updated on every message so updates are kept
+to a few arithmetic operations. Updates are not locked, so counts may be
+off slightly when a comm is used from multiple threads at once."""
+import os
+import json
+import uuid
+import math
+import threading
+from collections import OrderedDict
+from yggdrasil import tools
+
+
+class Histogram(object):
+    r"""Histogram with logarithmic (base 2) bins.
+
+    Args:
+        scale (float, optional): Value corresponding to the upper edge of
+            the first bin. Defaults to 1.0.
+
+    Attributes:
+        scale (float): Value corresponding to the upper edge of the first
+            bin.
+        count (int): Number of values added.
+        total (float): Sum of the values added.
+        min (float): Smallest value added.
+        max (float): Largest value added.
+        bins (dict): Mapping from bin index to the number of values in the
+            bin. Bin i contains values in [scale * 2**(i - 1), scale * 2**i).
+
+    """
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self.reset()
+
+    def reset(self):
+        r"""Remove all values from the histogram."""
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.bins = {}
+
+    def add(self, value):
+        r"""Add a value to the histogram.
+
+        Args:
+            value (float): Value to add.
+
+        """
+        self.count += 1
+        self.total += value
+        if (self.min is None) or (value < self.min):
+            self.min = value
+        if (self.max is None) or (value > self.max):
+            self.max = value
+        if value > 0:
+            ibin = max(math.frexp(value / self.scale)[1], 0)
+        else:
+            ibin = 0
+        self.bins[ibin] = self.bins.get(ibin, 0) + 1
+
+    def to_dict(self):
+        r"""Get a JSON serializable summary of the histogram.
+
+        Returns:
+            dict: Count, total, mean, extrema, and the number of values in
+                each non-empty bin keyed by the upper edge of the bin.
+
+        """
+        out = OrderedDict([('count', self.count), ('total', self.total),
+                           ('mean', None), ('min', self.min),
+                           ('max', self.max), ('bins', OrderedDict())])
+        if self.count:
+            out['mean'] = float(self.total) / self.count
+        for i in sorted(self.bins.keys()):
+            out['bins']['%g' % (self.scale * (2 ** i))] = self.bins[i]
+        return out
+
+
+def merge_histograms(a, b):
+    r"""Combine two histogram summaries.
+
+    Args:
+        a (dict): Histogram summary returned by Histogram.to_dict.
+        b (dict): Histogram summary returned by Histogram.to_dict.
+
+    Returns:
+        dict: Summary of the combined histograms.
+
+    """
+    out = OrderedDict([('count', a['count'] + b['count']),
+                       ('total', a['total'] + b['total']),
+                       ('mean', None)])
+    for k, fext in [('min', min), ('max', max)]:
+        vals = [x[k] for x in [a, b] if x[k] is not None]
+        out[k] = fext(vals) if vals else None
+    if out['count']:
+        out['mean'] = float(out['total']) / out['count']
+    bins = dict(a['bins'])
+    for k, v in b['bins'].items():
+        bins[k] = bins.get(k, 0) + v
+    out['bins'] = OrderedDict([(k, bins[k]) for k in
+                               sorted(bins.keys(), key=float)])
+    return out
+
+
+class CommMetrics(object):
+    r"""Counters and histograms describing the traffic on a comm.
+
+    Attributes:
+        bytes_sent (int): Number of bytes sent.
+        bytes_recv (int): Number of bytes received.
+        histograms (dict): Histograms of times (in seconds) spent
+            serializing ('serialize_time') & deserializing
+            ('deserialize_time') messages, blocked in send ('send_time') &
+            recv ('recv_time') calls, and waiting for confirmation
+            ('confirm_time') as well as the number of messages waiting in
+            the connection when sampled ('backlog').
+
+    """
+
+    _time_scale = 1.0e-6
+    _histograms = ['serialize_time', 'deserialize_time', 'send_time',
+                   'recv_time', 'confirm_time', 'backlog']
+
+    def __init__(self):
+        self.histograms = OrderedDict()
+        for k in self._histograms:
+            if k.endswith('_time'):
+                self.histograms[k] = Histogram(scale=self._time_scale)
+            else:
+                self.histograms[k] = Histogram()
+        self.reset()
+
+    def reset(self):
+        r"""Reset all of the counters and histograms."""
+        self.bytes_sent = 0
+        self.bytes_recv = 0
+        for v in self.histograms.values():
+            v.reset()
+
+    def add(self, key, value):
+        r"""Add a value to a histogram.
+
+        Args:
+            key (str): Name of the histogram.
+            value (float): Value to add.
+
+        """
+        self.histograms[key].add(value)
+
+    def to_dict(self):
+        r"""Get a JSON serializable summary of the metrics.
+
+        Returns:
+            dict: Counters and histogram summaries.
+
+        """
+        out = OrderedDict([('bytes_sent', self.bytes_sent),
+                           ('bytes_recv', self.bytes_recv)])
+        for k, v in self.histograms.items():
+            out[k] = v.to_dict()
+        return out
+
+
+def summarize(connections):
+    r"""Total the comm metrics for a set of connections.
+
+    Args:
+        connections (dict): Mapping from connection name to the metrics
+            returned by the connection driver's get_metrics method.
+
+    Returns:
+        dict: Totals of the counters and combined histograms for all of the
+            comms belonging to the connections (including forked comms).
+
+    """
+    out = OrderedDict()
+
+    def add_comm(x):
+        for k, v in x.items():
+            if k == 'comms':
+                for ix in v:
+                    add_comm(ix)
+            elif isinstance(v, dict):
+                if k in out:
+                    out[k] = merge_histograms(out[k], v)
+                else:
+                    out[k] = v
+            elif isinstance(v, int) and not isinstance(v, bool):
+                out[k] = out.get(k, 0) + v
+
+    for x in connections.values():
+        for io in ['icomm', 'ocomm']:
+            if io in x:
+                add_comm(x[io])
+    return out
+
+
+def write_metrics(fname, metrics):
+    r"""Write metrics to a JSON file. The metrics are written to a temporary
+    file that is then moved into place so that readers polling the file
+    during a run do not see a partially written file.
+
+    Args:
+        fname (str): Full path to the file.
+        metrics (dict): Metrics to write.
+
+    """
+    fdir = os.path.dirname(os.path.abspath(fname))
+    if not os.path.isdir(fdir):
+        os.makedirs(fdir)
+    tmp = '%s.%s.tmp' % (fname, str(uuid.uuid4()))
+    with open(tmp, 'w') as fd:
+        json.dump(metrics, fd, indent=4)
+        fd.write('\n')
+    try:
+        os.rename(tmp, fname)
+    except OSError:  # pragma: windows
+        if os.path.isfile(fname):
+            os.remove(fname)
+        os.rename(tmp, fname)
+
+
+class MetricsReporter(tools.YggThreadLoop):
+    r"""Thread that periodically collects metrics and writes them to a file.
+
+    Args:
+        collect (function): Function returning the metrics that should be
+            written.
+        fname (str): Full path to the file that metrics should be written
+            to.
+        interval (float): Time in seconds between writes.
+        name (str, optional): Name of the thread. Defaults to
+            'MetricsReporter'.
+        **kwargs: Additional keyword arguments are passed to the parent class.
+
+    Attributes:
+        collect (function): Function returning the metrics.
+        fname (str): File that metrics are written to.
+        interval (float): Time in seconds between writes.
+
+    """
+
+    def __init__(self, collect, fname, interval, name='MetricsReporter',
+                 **kwargs):
+        super(MetricsReporter, self).__init__(name, **kwargs)
+        self.collect = collect
+        self.fname = fname
+        self.interval = interval
+        self._wake = threading.Event()
+
+    def set_break_flag(self):
+        r"""Set the break flag and interrupt the wait between writes."""
+        super(MetricsReporter, self).set_break_flag()
+        self._wake.set()
+
+    def run_loop(self):
+        r"""Wait for the interval and then write the metrics."""
+        self._wake.wait(self.interval)
+        if self.was_break:
+            return
+        try:
+            write_metrics(self.fname, self.collect())
+        except BaseException:  # pragma: debug
+            self.exception("Error writing metrics to %s", self.fname)
+
+    def stop(self):
+        r"""Stop writing metrics and wait for the thread to exit."""
+        if self.was_started:
+            self.terminate()
+
+
+__all__ = ['Histogram', 'CommMetrics', 'merge_histograms', 'summarize',
+           'write_metrics', 'MetricsReporter']
@@ -0,0 +1,493 @@
+r"""In-process micro-benchmarks for the layers messages pass through.
+Unlike the timings in yggdrasil.timing, which time entire integrations
+(including launching processes and the runner), these benchmarks time each
+layer separately from within a single process so that regressions can be
+attributed to a layer. Layers (from the bottom up) are:
+
+* datatype: encoding/decoding messages via the metaschema type
+  (MetaschemaType.serialize/deserialize).
+* serialize: serializing/deserializing messages via the serializer
+  (e.g. DefaultSerialize.serialize/deserialize).
+* comm: sending/receiving messages between a pair of comms.
+* connection: sending/receiving messages between a pair of comms connected
+  by a ConnectionDriver.
+
+Each layer includes the layers below it so the difference between two
+adjacent layers is the cost of the upper layer. Benchmarks can also be run
+with message bodies compressed (see yggdrasil.compression) to assess the
+tradeoff between CPU time and the number of bytes sent, or at a specific
+log level to assess the per-message overhead of logging (e.g. INFO, the
+level used in production, versus DEBUG). Results are saved in the
+same perf json format as the results from yggdrasil.timing so that they
+can be loaded by perf (without requiring perf to run the benchmarks)."""
+import os
+import sys
+import time
+import json
+import uuid
+import socket
+import logging
+import datetime
+import multiprocessing
+import numpy as np
+from collections import OrderedDict
+from yggdrasil import tools, backwards, platform
+
+
+if hasattr(time, 'perf_counter'):  # pragma: Python 3
+    _timer = time.perf_counter
+else:  # pragma: Python 2
+    _timer = time.time
+_layers = ['datatype', 'serialize', 'comm', 'connection']
+_message_types = ['bytes', 'scalar', 'ndarray', 'table', 'ply', 'obj',
+                  'pandas']
+_fixed_size_types = ['scalar']
+# Encoding geometries scales poorly with size so large sizes are not timed
+_max_sizes = {'ply': 10000, 'obj': 10000}
+_default_sizes = [100, 10000, 1000000]
+
+
+def get_message(msg_type, size):
+    r"""Create a test message of a given type and approximate size.
+
+    Args:
+        msg_type (str): Type of message. One of 'bytes', 'scalar', 'ndarray'
+            (1D float array), 'table' (list of columns with mixed types),
+            'ply', 'obj', or 'pandas' (data frame).
+        size (int): Approximate size of the message data in bytes. This is
+            ignored for fixed size types (e.g. 'scalar').
+
+    Returns:
+        object: Test message.
+
+    Raises:
+        ValueError: If msg_type is not supported.
+
+    """
+    size = int(size)
+    if msg_type == 'bytes':
+        return size * b'0'
+    elif msg_type == 'scalar':
+        return np.float64(1.5)
+    elif msg_type == 'ndarray':
+        return np.arange(max(size // 8, 1), dtype='float64')
+    elif msg_type == 'table':
+        nrow = max(size // 17, 1)
+        return [np.array(nrow * [b'name'], dtype='S5'),
+                np.arange(nrow, dtype='int32'),
+                np.ones(nrow, dtype='float64')]
+    elif msg_type == 'pandas':
+        import pandas
+        nrow = max(size // 12, 1)
+        return pandas.DataFrame(OrderedDict(
+            [('count', np.arange(nrow, dtype='int32')),
+             ('size', np.ones(nrow, dtype='float64'))]))
+    elif msg_type in ['ply', 'obj']:
+        nvert = max(size // 24, 3)
+        verts = [{'x': float(i), 'y': 0.0, 'z': 1.0} for i in range(nvert)]
+        if msg_type == 'ply':
+            from yggdrasil.metaschema.datatypes.PlyMetaschemaType import PlyDict
+            faces = [{'vertex_index': [np.int32(i), np.int32(i + 1),
+                                       np.int32(i + 2)]}
+                     for i in range(nvert - 2)]
+            return PlyDict(vertices=verts, faces=faces)
+        from yggdrasil.metaschema.datatypes.ObjMetaschemaType import ObjDict
+        faces = [[{'vertex_index': i + j} for j in range(3)]
+                 for i in range(nvert - 2)]
+        return ObjDict(vertices=verts, faces=faces)
+    raise ValueError("Unsupported message type: '%s'" % msg_type)
+
+
+def get_serializer(msg_type):
+    r"""Create a serializer for a type of message.
+
+    Args:
+        msg_type (str): Type of message (see get_message).
+
+    Returns:
+        DefaultSerialize: Serializer.
+
+    """
+    if msg_type == 'pandas':
+        from yggdrasil.serialize.PandasSerialize import PandasSerialize
+        return PandasSerialize()
+    from yggdrasil.serialize.DefaultSerialize import DefaultSerialize
+    return DefaultSerialize()
+
+
+def entry_name(layer, comm_type, msg_type, size):
+    r"""Get a unique identifier for a benchmark following the convention
+    used by yggdrasil.timing.TimedRun.entry_name.
+
+    Args:
+        layer (str): Layer being timed.
+        comm_type (str): Comm type used by the layer ('none' for layers that
+            do not use a comm).
+        msg_type (str): Type of message.
+        size (int): Approximate size of messages in bytes.
+
+    Returns:
+        str: Benchmark name.
+
+    """
+    return 'micro(%s,%s,%s,%s,%s,%d)' % (
+        platform._platform, backwards._python_version, layer, comm_type,
+        msg_type, size)
+
+
+def time_datatype(msg, msg_type, nmsg, compression=None, **kwargs):
+    r"""Time encoding/decoding messages via the metaschema type.
+
+    Args:
+        msg (object): Message to encode/decode.
+        msg_type (str): Type of message.
+        nmsg (int): Number of messages to encode/decode.
+        compression (str, optional): Codec used to compress messages.
+            Defaults to None and messages are not compressed.
+        **kwargs: Additional keyword arguments are ignored.
+
+    Returns:
+        float: Time (in seconds) required to encode and decode nmsg messages.
+
+    Raises:
+        ValueError: If the message type is not encoded by a metaschema type.
+
+    """
+    seri = get_serializer(msg_type)
+    if hasattr(seri, 'func_serialize'):
+        raise ValueError("Messages of type '%s' are not encoded by a "
+                         "metaschema type." % msg_type)
+    seri.initialize_from_message(msg)
+    datatype = seri.datatype
+    t0 = _timer()
+    for i in range(nmsg):
+        datatype.deserialize(datatype.serialize(msg, compression=compression))
+    return _timer() - t0
+
+
+def time_serialize(msg, msg_type, nmsg, compression=None, **kwargs):
+    r"""Time serializing/deserializing messages via the serializer.
+
+    Args:
+        msg (object): Message to serialize/deserialize.
+        msg_type (str): Type of message.
+        nmsg (int): Number of messages to serialize/deserialize.
+        compression (str, optional): Codec used to compress messages.
+            Defaults to None and messages are not compressed.
+        **kwargs: Additional keyword arguments are ignored.
+
+    Returns:
+        float: Time (in seconds) required to serialize and deserialize nmsg
+            messages.
+
+    """
+    seri = get_serializer(msg_type)
+    deseri = get_serializer(msg_type)
+    t0 = _timer()
+    for i in range(nmsg):
+        deseri.deserialize(seri.serialize(msg, compression=compression))
+    return _timer() - t0
+
+
+def _send_recv(send_comm, recv_comm, msg, nmsg):
+    r"""Send messages from one comm and receive them from another.
+
+    Args:
+        send_comm (CommBase): Comm to send messages with.
+        recv_comm (CommBase): Comm to receive messages with.
+        msg (object): Message to send.
+        nmsg (int): Number of messages to send.
+
+    Returns:
+        float: Time (in seconds) required to send and receive nmsg messages.
+
+    Raises:
+        RuntimeError: If a message could not be sent or received.
+
+    """
+    t0 = _timer()
+    for i in range(nmsg):
+        if not send_comm.send(msg):  # pragma: debug
+            raise RuntimeError("Failed to send message %d." % i)
+        flag, _ = recv_comm.recv(timeout=60.0)
+        if not flag:  # pragma: debug
+            raise RuntimeError("Failed to receive message %d." % i)
+    return _timer() - t0
+
+
+def time_comm(msg, msg_type, nmsg, comm_type=None, compression=None):
+    r"""Time sending/receiving messages between a pair of comms.
+
+    Args:
+        msg (object): Message to send/receive.
+        msg_type (str): Type of message.
+        nmsg (int): Number of messages to send/receive.
+        comm_type (str, optional): Comm type. Defaults to the default comm.
+        compression (str, optional): Codec used to compress messages.
+            Defaults to None and messages are not compressed.
+
+    Returns:
+        float: Time (in seconds) required to send and receive nmsg messages.
+
+    """
+    from yggdrasil.communication import new_comm, get_comm
+    name = 'microbench_%s' % str(uuid.uuid4())[:8]
+    send_comm = new_comm(name, comm=comm_type, direction='send',
+                         serializer=get_serializer(msg_type),
+                         compression=compression)
+    recv_comm = None
+    try:
+        recv_comm = get_comm(name, **send_comm.opp_comm_kwargs())
+        return _send_recv(send_comm, recv_comm, msg, nmsg)
+    finally:
+        send_comm.close()
+        if recv_comm is not None:
+            recv_comm.close()
+
+
+def time_connection(msg, msg_type, nmsg, comm_type=None, compression=None):
+    r"""Time sending/receiving messages between a pair of comms connected
+    by a ConnectionDriver.
+
+    Args:
+        msg (object): Message to send/receive.
+        msg_type (str): Type of message.
+        nmsg (int): Number of messages to send/receive.
+        comm_type (str, optional): Comm type. Defaults to the default comm.
+        compression (str, optional): Codec used to compress messages sent
+            to and from the connection. Defaults to None and messages are
+            not compressed.
+
+    Returns:
+        float: Time (in seconds) required to send and receive nmsg messages.
+
+    """
+    from yggdrasil.communication import new_comm
+    from yggdrasil.drivers.ConnectionDriver import ConnectionDriver
+    name = 'microbench_%s' % str(uuid.uuid4())[:8]
+    drv = ConnectionDriver(name, icomm_kws={'comm': comm_type},
+                           ocomm_kws={'comm': comm_type,
+                                      'compression': compression})
+    send_comm = None
+    recv_comm = None
+    try:
+        drv.start()
+        send_kws = drv.icomm.opp_comm_kwargs()
+        send_kws['serializer'] = get_serializer(msg_type)
+        send_kws['compression'] = compression
+        send_comm = new_comm(name, **send_kws)
+        recv_comm = new_comm(name, **drv.ocomm.opp_comm_kwargs())
+        return _send_recv(send_comm, recv_comm, msg, nmsg)
+    finally:
+        for x in [send_comm, recv_comm]:
+            if x is not None:
+                x.close()
+        drv.terminate()
+
+
+_layer_funcs = {'datatype': time_datatype,
+                'serialize': time_serialize,
+                'comm': time_comm,
+                'connection': time_connection}
+
+
+def run_benchmarks(layers=None, msg_types=None, sizes=None, comm_type=None,
+                   nmsg=10, nrep=5, compression=None, log_level=None):
+    r"""Time each layer for a set of message types and sizes.
+
+    Args:
+        layers (list, optional): Layers to time. Defaults to all layers.
+        msg_types (list, optional): Message types to time. Defaults to all
+            message types.
+        sizes (list, optional): Approximate message sizes (in bytes) to time.
+            Defaults to [100, 1e4, 1e6]. Only the smallest size is timed for
+            fixed size message types (e.g. 'scalar') and sizes larger than
+            1e4 are not timed for geometries ('ply' & 'obj').
+        comm_type (str, optional): Comm type used by the 'comm' and
+            'connection' layers. Defaults to the default comm.
+        nmsg (int, optional): Number of messages in each timed run. Defaults
+            to 10.
+        nrep (int, optional): Number of timed runs for each benchmark.
+            Defaults to 5.
+        compression (str, optional): Codec used to compress messages (see
+            yggdrasil.compression). If provided, '+<codec>' is appended to
+            the comm type in the benchmark names. Defaults to None and
+            messages are not compressed.
+        log_level (str, optional): Name of the level (e.g. 'INFO') that the
+            yggdrasil logger should be set to while the benchmarks are run.
+            If provided, '+<level>' is appended to the comm type in the
+            benchmark names. Defaults to None and the configured level is
+            used.
+
+    Returns:
+        dict: Benchmark results in the perf json format. Values are the
+            time (in seconds) per message for each run. Benchmarks that
+            raise an error are logged and skipped.
+
+    """
+    if layers is None:
+        layers = _layers
+    if msg_types is None:
+        msg_types = _message_types
+    if sizes is None:
+        sizes = _default_sizes
+    if comm_type is None:
+        comm_type = tools.get_default_comm()
+    sizes = sorted([int(x) for x in sizes])
+    logger = logging.getLogger('yggdrasil')
+    old_level = logger.level
+    if log_level:
+        logger.setLevel(log_level.upper())
+    try:
+        benchmarks = _run_benchmarks(layers, msg_types, sizes, comm_type,
+                                     nmsg, nrep, compression, log_level)
+        effective_level = logging.getLevelName(logger.getEffectiveLevel())
+    finally:
+        logger.setLevel(old_level)
+    metadata = {'cpu_count': multiprocessing.cpu_count(),
+                'hostname': socket.gethostname(),
+                'log_level': effective_level,
+                'platform': platform._platform,
+                'python_executable': sys.executable,
+                'python_version': backwards._python_version,
+                'timer': _timer.__name__,
+                'unit': 'second'}
+    return {'benchmarks': benchmarks, 'metadata': metadata, 'version': '1.0'}
+
+
+def _run_benchmarks(layers, msg_types, sizes, comm_type, nmsg, nrep,
+                    compression, log_level):
+    r"""Time each layer for a set of message types and sizes. See
+    run_benchmarks for a description of the arguments.
+
+    Returns:
+        list: Benchmark entries in the perf json format.
+
+    """
+    benchmarks = []
+    for layer in layers:
+        func = _layer_funcs[layer]
+        icomm_type = comm_type if layer in ['comm', 'connection'] else 'none'
+        if compression:
+            icomm_type += '+' + compression
+        if log_level:
+            icomm_type += '+' + log_level.lower()
+        for msg_type in msg_types:
+            for size in sizes:
+                fixed = (msg_type in _fixed_size_types)
+                if ((fixed and (size != sizes[0]))
+                        or (size > _max_sizes.get(msg_type, size))):
+                    continue
+                name = entry_name(layer, icomm_type, msg_type, size)
+                try:
+                    msg = get_message(msg_type, size)
+                    # Warm up (e.g. initialize serializers & import modules)
+                    func(msg, msg_type, 1, comm_type=comm_type,
+                         compression=compression)
+                    runs = []
+                    for i in range(nrep):
+                        date = datetime.datetime.now().isoformat(' ')
+                        t = func(msg, msg_type, nmsg, comm_type=comm_type,
+                                 compression=compression)
+                        runs.append({'metadata': {'date': date,
+                                                  'duration': t},
+                                     'values': [t / nmsg]})
+                except Exception as e:
+                    logging.error("Error running benchmark %s: %s", name, e)
+                    continue
+                logging.info("%s: %g s/msg", name,
+                             np.mean([x['values'][0] for x in runs]))
+                benchmarks.append({'metadata': {'name': name, 'loops': nmsg},
+                                   'runs': runs})
+    return benchmarks
+
+
+def get_values(results):
+    r"""Get the values for each benchmark in a set of results.
+
+    Args:
+        results (dict): Benchmark results in the perf json format.
+
+    Returns:
+        dict: Mapping from benchmark name to the list of values.
+
+    """
+    out = OrderedDict()
+    for b in results['benchmarks']:
+        values = []
+        for r in b['runs']:
+            values += r.get('values', [])
+        out[b['metadata']['name']] = values
+    return out
+
+
+def compare(results, baseline, threshold=0.1):
+    r"""Compare benchmark results to a baseline.
+
+    Args:
+        results (dict): Benchmark results in the perf json format.
+        baseline (dict): Baseline benchmark results in the perf json format.
+        threshold (float, optional): Fractional increase in the median time
+            that is considered a regression. Defaults to 0.1.
+
+    Returns:
+        dict: Mapping from the name of each benchmark present in both the
+            results and the baseline to a dictionary containing the median
+            time in the baseline ('baseline') & results ('result'), the
+            ratio of the two ('ratio'), and whether or not it is a
+            regression ('regression').
+
+    """
+    base = get_values(baseline)
+    out = OrderedDict()
+    for k, v in get_values(results).items():
+        if (not v) or (not base.get(k, [])):
+            continue
+        x = OrderedDict([('baseline', float(np.median(base[k]))),
+                         ('result', float(np.median(v)))])
+        x['ratio'] = x['result'] / x['baseline']
+        x['regression'] = bool(x['ratio'] > (1.0 + threshold))
+        out[k] = x
+    return out
+
+
+def load(fname):
+    r"""Load benchmark results from a file.
+
+    Args:
+        fname (str): Full path to the perf json file.
+
+    Returns:
+        dict: Benchmark results.
+
+    """
+    with open(fname, 'r') as fd:
+        return json.load(fd)
+
+
+def save(fname, results):
+    r"""Save benchmark results to a file.
+
+    Args:
+        fname (str): Full path to the perf json file.
+        results (dict): Benchmark results.
+
+    """
+    fdir = os.path.dirname(os.path.abspath(fname))
+    if not os.path.isdir(fdir):
+        os.makedirs(fdir)
+    with open(fname, 'w') as fd:
+        json.dump(results, fd, sort_keys=True, separators=(',', ':'))
+        fd.write("\n")
+
+
+def default_filename():
+    r"""Get the default file for benchmark results following the convention
+    used by yggdrasil.timing.TimedRun.
+
+    Returns:
+        str: Full path to the file.
+
+    """
+    return os.path.join(os.getcwd(), 'micro_%s_py%s.json' % (
+        platform._platform, backwards._python_version.replace('.', '')))
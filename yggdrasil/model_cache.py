@@ -0,0 +1,286 @@
+r"""Memoization of the output of deterministic models. When a model is run
+with the 'cache' option, the complete stream of messages on each of the
+model's inputs is received before the model is started and a key is computed
+from the model's language, command line arguments and other parameters
+(including the contents of any that are files), working directory,
+environment variables, and the input messages. If the output
+messages for that key were saved by a previous run, they are sent to the
+model's outputs in place of running the model. Otherwise the model is run
+with the recorded input messages and the messages it sends to its outputs
+are saved under the key once it exits successfully. Cached outputs are
+stored in the directory set by the config option ('model', 'cache_dir')."""
+import os
+import copy
+import json
+import uuid
+import pickle
+import hashlib
+from collections import OrderedDict
+import yggdrasil
+from yggdrasil import backwards
+from yggdrasil.config import ygg_cfg
+
+
+_cache_version = 2
+
+
+def get_cache_dir():
+    r"""Get the directory where cached model outputs are stored. This is set
+    by the config option ('model', 'cache_dir') and defaults to
+    ~/.cache/yggdrasil/models.
+
+    Returns:
+        str: Full path to the cache directory.
+
+    """
+    out = ygg_cfg.get('model', 'cache_dir', None)
+    if out is None:
+        out = os.path.join(os.path.expanduser('~'), '.cache', 'yggdrasil',
+                           'models')
+    return os.path.abspath(os.path.expanduser(out))
+
+
+def _add_file_contents(contents, x, working_dir):
+    r"""Add a value to the contents used to compute a cache key, including
+    the contents of the file it names if it is a path to an existing file.
+
+    Args:
+        contents (list): Contents that the value should be added to.
+        x (str): Value to add.
+        working_dir (str): Directory that relative paths are relative to.
+
+    """
+    contents.append(x)
+    fname = os.path.join(working_dir, x)
+    if os.path.isfile(fname):
+        with open(fname, 'rb') as fd:
+            contents.append(fd.read())
+
+
+def get_cache_key(language, args, inputs, working_dir=None, env=None,
+                  parameters=None):
+    r"""Get a key identifying the output of a model run with a set of inputs.
+
+    Args:
+        language (str): Language of the model.
+        args (list): Command line arguments used to run the model. The
+            contents of arguments that are files are included in the key so
+            that changes to the model source invalidate the cache.
+        inputs (OrderedDict): Mapping from the names of the model's input
+            channels to the serializer information and messages received on
+            them (as returned by recv_stream).
+        working_dir (str, optional): Directory that the model is run in and
+            that relative paths in args and parameters are relative to.
+            Defaults to the current working directory.
+        env (dict, optional): Environment variables set for the model, not
+            including the addresses of its channels. Defaults to {}.
+        parameters (dict, optional): Other model parameters that affect the
+            output (e.g. compilation flags or additional source files). As
+            for args, the contents of string values (or strings in list
+            values) that are files are included in the key. Defaults to {}.
+
+    Returns:
+        str: Hex digest identifying the model output.
+
+    """
+    if working_dir is None:
+        working_dir = os.getcwd()
+    if env is None:
+        env = {}
+    if parameters is None:
+        parameters = {}
+    h = hashlib.sha256()
+    contents = [str(_cache_version), yggdrasil.__version__, language,
+                os.path.abspath(working_dir)]
+    for a in args:
+        _add_file_contents(contents, a, working_dir)
+    contents.append(json.dumps(env, sort_keys=True, default=str))
+    for k in sorted(parameters.keys()):
+        v = parameters[k]
+        contents += [k, json.dumps(v, sort_keys=True, default=str)]
+        for x in (v if isinstance(v, list) else [v]):
+            if isinstance(x, backwards.string_types):
+                _add_file_contents(contents, backwards.as_str(x), working_dir)
+    for k, v in inputs.items():
+        contents += [k, pickle.dumps(v, protocol=2)]
+    for x in contents:
+        h.update(backwards.as_bytes(x))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def _get_cache_file(key):
+    r"""Get the path to the file where the output for a key is stored.
+
+    Args:
+        key (str): Key identifying the model output.
+
+    Returns:
+        str: Full path to the cache file.
+
+    """
+    return os.path.join(get_cache_dir(), 'model_%s.pkl' % key)
+
+
+def load_outputs(key):
+    r"""Load cached model output.
+
+    Args:
+        key (str): Key identifying the model output.
+
+    Returns:
+        OrderedDict: Mapping from the names of the model's output channels to
+            the serializer information and messages sent to them, None if
+            the output is not cached or the cache file cannot be read.
+
+    """
+    fname = _get_cache_file(key)
+    if not os.path.isfile(fname):
+        return None
+    try:
+        with open(fname, 'rb') as fd:
+            return pickle.load(fd)
+    except BaseException:  # pragma: debug
+        # Corrupt cache files are regenerated
+        return None
+
+
+def save_outputs(key, outputs):
+    r"""Save model output to the cache. Errors writing to the cache (e.g. if
+    the directory is not writable) are ignored.
+
+    Args:
+        key (str): Key identifying the model output.
+        outputs (OrderedDict): Mapping from the names of the model's output
+            channels to the serializer information and messages sent to them.
+
+    """
+    fname = _get_cache_file(key)
+    tmp = '%s.%s.tmp' % (fname, str(uuid.uuid4()))
+    try:
+        if not os.path.isdir(os.path.dirname(fname)):
+            os.makedirs(os.path.dirname(fname))
+        with open(tmp, 'wb') as fd:
+            pickle.dump(outputs, fd, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            os.rename(tmp, fname)
+        except OSError:  # pragma: windows
+            if os.path.isfile(fname):
+                os.remove(fname)
+            os.rename(tmp, fname)
+    except BaseException:  # pragma: debug
+        if os.path.isfile(tmp):
+            os.remove(tmp)
+
+
+def get_serializer_info(comm):
+    r"""Get the information required to initialize a serializer so that it
+    produces the same messages as the serializer for a comm.
+
+    Args:
+        comm (:class:`yggdrasil.communication.CommBase.CommBase`): Comm
+            with an initialized serializer.
+
+    Returns:
+        dict: Serializer information.
+
+    """
+    sinfo = copy.deepcopy(comm.serializer.typedef)
+    sinfo.update(comm.serializer.serializer_info)
+    sinfo.pop('seritype', None)
+    return sinfo
+
+
+def recv_stream(icomm, ocomm=None, timeout=None, stop_flag=None):
+    r"""Receive messages from a comm until EOF, forwarding them to a second
+    comm if one is provided.
+
+    Args:
+        icomm (:class:`yggdrasil.communication.CommBase.CommBase`): Comm that
+            messages should be received from.
+        ocomm (:class:`yggdrasil.communication.CommBase.CommBase`, optional):
+            Comm that messages (and the EOF) should be forwarded to.
+        timeout (float, optional): Time (in seconds) that each receive should
+            wait for a message. Defaults to None and the comm's recv_timeout
+            is used.
+        stop_flag (callable, optional): Function that is called each time a
+            receive does not return a message and returns True if receiving
+            should be stopped before an EOF. Defaults to None.
+
+    Returns:
+        tuple(dict, list): Serializer information for the received messages
+            (None if only an EOF was received) and the received messages.
+
+    Raises:
+        RuntimeError: If the comm is closed or stop_flag returns True before
+            an EOF is received or if a message cannot be forwarded.
+
+    """
+    kwargs = {}
+    if timeout is not None:
+        kwargs['timeout'] = timeout
+    sinfo = None
+    messages = []
+    while True:
+        flag, msg = icomm.recv(**kwargs)
+        if icomm.is_eof(msg):
+            break
+        if not flag:
+            raise RuntimeError("Comm '%s' closed before EOF was received."
+                               % icomm.name)
+        if icomm.is_empty_recv(msg):
+            if (stop_flag is not None) and stop_flag():
+                raise RuntimeError("Stopped receiving from comm '%s' before "
+                                   "EOF was received." % icomm.name)
+            continue
+        if sinfo is None:
+            sinfo = get_serializer_info(icomm)
+            if ocomm is not None:
+                ocomm.serializer.initialize_serializer(sinfo)
+        messages.append(msg)
+        if (ocomm is not None) and (not ocomm.send(msg)):  # pragma: debug
+            raise RuntimeError("Failed to forward message to comm '%s'."
+                               % ocomm.name)
+    if ocomm is not None:
+        ocomm.send_eof()
+    return sinfo, messages
+
+
+def send_stream(ocomm, sinfo, messages):
+    r"""Send messages recorded by recv_stream to a comm followed by an EOF.
+
+    Args:
+        ocomm (:class:`yggdrasil.communication.CommBase.CommBase`): Comm that
+            the messages should be sent to.
+        sinfo (dict): Serializer information for the messages.
+        messages (list): Messages that should be sent.
+
+    Raises:
+        RuntimeError: If a message cannot be sent.
+
+    """
+    if sinfo is not None:
+        ocomm.serializer.initialize_serializer(sinfo)
+    for msg in messages:
+        if not ocomm.send(msg):  # pragma: debug
+            raise RuntimeError("Failed to send message to comm '%s'."
+                               % ocomm.name)
+    ocomm.send_eof()
+
+
+def record_streams(comms, **kwargs):
+    r"""Receive the messages on a set of comms until EOF.
+
+    Args:
+        comms (OrderedDict): Mapping from channel names to comms.
+        **kwargs: Additional keyword arguments are passed to recv_stream.
+
+    Returns:
+        OrderedDict: Mapping from channel names to the serializer information
+            and messages received (as returned by recv_stream).
+
+    """
+    out = OrderedDict()
+    for k, v in comms.items():
+        out[k] = recv_stream(v, **kwargs)
+    return out
@@ -0,0 +1,151 @@
+r"""Profiling of the processes and threads in an integration. When profiling
+is enabled (by setting the environment variable 'YGG_PROFILE_DIR'), the
+runner, each connection driver thread, and each Python model are profiled
+using cProfile and a profile is written to the profile directory for each
+one. Profiles are named using a label identifying the process or thread
+(e.g. 'runner', 'connection_<name>', 'model_<name>') and the runner merges
+them into a summary of the top functions once the run is complete."""
+import os
+import re
+import glob
+import cProfile
+import pstats
+from yggdrasil import backwards
+
+
+_summary_file = 'summary.txt'
+
+
+def get_profile_dir():
+    r"""Get the directory that profiles should be written to.
+
+    Returns:
+        str: Directory, None if profiling is not enabled.
+
+    """
+    return os.environ.get('YGG_PROFILE_DIR', None) or None
+
+
+def is_enabled():
+    r"""Determine if profiling is enabled.
+
+    Returns:
+        bool: True if profiling is enabled, False otherwise.
+
+    """
+    return (get_profile_dir() is not None)
+
+
+def get_filename(label, profile_dir=None):
+    r"""Get the name of the file that the profile for a process or thread
+    should be written to.
+
+    Args:
+        label (str): Label identifying the process or thread. Characters
+            that are not valid in file names are replaced with underscores.
+        profile_dir (str, optional): Directory containing the profiles.
+            Defaults to get_profile_dir().
+
+    Returns:
+        str: Full path to the profile file, None if profiling is not
+            enabled.
+
+    """
+    if profile_dir is None:
+        profile_dir = get_profile_dir()
+        if profile_dir is None:
+            return None
+    label = re.sub(r'[^\w.-]', '_', label)
+    return os.path.join(profile_dir, '%s.prof' % label)
+
+
+def start():
+    r"""Start profiling the current thread if profiling is enabled.
+
+    Returns:
+        cProfile.Profile: Profiler that was started, None if profiling is
+            not enabled.
+
+    """
+    if not is_enabled():
+        return None
+    prof = cProfile.Profile()
+    prof.enable()
+    return prof
+
+
+def stop(prof, label=None, fname=None):
+    r"""Stop a profiler and write the profile to a file.
+
+    Args:
+        prof (cProfile.Profile): Profiler returned by start. If None, nothing
+            is done.
+        label (str, optional): Label identifying the process or thread that
+            is used to determine the file name (see get_filename).
+        fname (str, optional): Full path to the file that the profile should
+            be written to. Takes precedence over label.
+
+    Returns:
+        str: File that the profile was written to, None if it was not
+            written.
+
+    """
+    if prof is None:
+        return None
+    prof.disable()
+    if fname is None:
+        fname = get_filename(label)
+        if fname is None:  # pragma: debug
+            return None
+    prof.dump_stats(fname)
+    return fname
+
+
+def summarize(profile_dir, nfunc=20, sort_keys=('tottime', 'cumulative')):
+    r"""Merge the profiles in a directory into a summary of the functions
+    where the most time was spent.
+
+    Args:
+        profile_dir (str): Directory containing profiles.
+        nfunc (int, optional): Number of functions to include in the summary.
+            Defaults to 20.
+        sort_keys (tuple, optional): Keys used to sort the functions.
+            Defaults to ('tottime', 'cumulative').
+
+    Returns:
+        str: Summary, empty if there are not any profiles.
+
+    """
+    files = sorted(glob.glob(os.path.join(profile_dir, '*.prof')))
+    if not files:
+        return ''
+    stream = backwards.StringIO()
+    stream.write('Merged profiles:\n')
+    for x in files:
+        stream.write('    %s\n' % os.path.basename(x))
+    stats = pstats.Stats(files[0], stream=stream)
+    for x in files[1:]:
+        stats.add(x)
+    stats.sort_stats(*sort_keys).print_stats(nfunc)
+    return stream.getvalue()
+
+
+def write_summary(profile_dir, fname=None, **kwargs):
+    r"""Write a summary of the profiles in a directory to a file.
+
+    Args:
+        profile_dir (str): Directory containing profiles.
+        fname (str, optional): Full path to the file that the summary should
+            be written to. Defaults to 'summary.txt' in profile_dir.
+        **kwargs: Additional keyword arguments are passed to summarize.
+
+    Returns:
+        str: Summary that was written.
+
+    """
+    if fname is None:
+        fname = os.path.join(profile_dir, _summary_file)
+    out = summarize(profile_dir, **kwargs)
+    with open(fname, 'w') as fd:
+        fd.write(out)
+    return out
@@ -0,0 +1,245 @@
+r"""Static index of the components (serializers, data types, and metaschema
+properties) that register themselves when their module is imported. The
+index maps the name of each component to the module that defines it so
+that only the modules that are actually used need to be imported. It is
+generated from the source (without importing it) when the package is built
+and is regenerated on the fly if it is missing."""
+import os
+import ast
+import glob
+import json
+import importlib
+from collections import OrderedDict
+
+
+_index_fname = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '.ygg_registry.json'))
+_index = None
+_pkg_dir = os.path.dirname(os.path.abspath(__file__))
+_registries = OrderedDict([
+    ('serializer', {'package': 'yggdrasil.serialize',
+                    'pattern': '*Serialize.py',
+                    'decorators': ['register_serializer'],
+                    'attribute': '_seritype'}),
+    ('type', {'package': 'yggdrasil.metaschema.datatypes',
+              'pattern': '*.py',
+              'decorators': ['register_type', 'register_type_from_file'],
+              'attribute': 'name',
+              'schema_dir': 'schemas'}),
+    ('property', {'package': 'yggdrasil.metaschema.properties',
+                  'pattern': '*.py',
+                  'decorators': ['register_metaschema_property'],
+                  'attribute': 'name'})])
+
+
+def _get_str(node):
+    r"""Get the value of a node if it is a string literal.
+
+    Args:
+        node (ast.AST): Syntax tree node.
+
+    Returns:
+        str: String value if the node is a string literal, None otherwise.
+
+    """
+    if isinstance(node, getattr(ast, 'Constant', ())):
+        value = node.value
+    else:  # pragma: Python 2
+        value = getattr(node, 's', None)
+    if isinstance(value, str):
+        return value
+    return None
+
+
+def _get_decorator_name(node):
+    r"""Get the name of the function used as a decorator.
+
+    Args:
+        node (ast.AST): Decorator node.
+
+    Returns:
+        str: Name of the decorator function.
+
+    """
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return getattr(node, 'id', None)
+
+
+def _get_schema_title(fname):
+    r"""Get the title of a type from the schema file defining it.
+
+    Args:
+        fname (str): Full path to the schema file.
+
+    Returns:
+        str: Title of the schema, None if the file does not exist.
+
+    """
+    if not os.path.isfile(fname):  # pragma: debug
+        return None
+    with open(fname, 'r') as fd:
+        return json.load(fd).get('title', None)
+
+
+def scan_module(fname, decorators, attribute, schema_dir=None):
+    r"""Locate the names of components registered in a module by parsing
+    (not importing) the module.
+
+    Args:
+        fname (str): Full path to the module.
+        decorators (list): Names of decorators that register components.
+        attribute (str): Name of the class attribute containing the name
+            that a component is registered under.
+        schema_dir (str, optional): Directory containing schema files that
+            components may be registered from. Defaults to None.
+
+    Returns:
+        list: Names of the components registered by the module.
+
+    """
+    with open(fname, 'r') as fd:
+        tree = ast.parse(fd.read(), filename=fname)
+    schema_files = []
+    if schema_dir is not None:
+        for node in ast.walk(tree):
+            x = _get_str(node)
+            if (x is not None) and x.endswith('.json'):
+                schema_files.append(os.path.join(schema_dir, x))
+    out = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        idec = [_get_decorator_name(x) for x in node.decorator_list]
+        if not any(x in decorators for x in idec):
+            continue
+        if any(x.endswith('_from_file') for x in idec):
+            for x in schema_files:
+                name = _get_schema_title(x)
+                if (name is not None) and (name not in out):
+                    out.append(name)
+            continue
+        for x in node.body:
+            if ((isinstance(x, ast.Assign) and (len(x.targets) == 1)
+                 and (getattr(x.targets[0], 'id', None) == attribute))):
+                name = _get_str(x.value)
+                if name is not None:
+                    out.append(name)
+                break
+    return out
+
+
+def create_index():
+    r"""Create the index by parsing the modules in each registry.
+
+    Returns:
+        dict: Mapping from registry name to a mapping from component name
+            to the name of the module that registers it.
+
+    """
+    out = OrderedDict()
+    for k, v in _registries.items():
+        out[k] = OrderedDict()
+        pkg_dir = os.path.join(_pkg_dir, *v['package'].split('.')[1:])
+        schema_dir = None
+        if 'schema_dir' in v:
+            schema_dir = os.path.join(pkg_dir, v['schema_dir'])
+        for x in sorted(glob.glob(os.path.join(pkg_dir, v['pattern']))):
+            mod = os.path.basename(x)[:-3]
+            if mod.startswith('__'):
+                continue
+            for name in scan_module(x, v['decorators'], v['attribute'],
+                                    schema_dir=schema_dir):
+                out[k].setdefault(name, '%s.%s' % (v['package'], mod))
+    return out
+
+
+def write_index(fname=None):
+    r"""Generate the index and write it to a file.
+
+    Args:
+        fname (str, optional): Full path to the file where the index should
+            be saved. Defaults to _index_fname.
+
+    Returns:
+        dict: Index that was written.
+
+    """
+    global _index
+    if fname is None:
+        fname = _index_fname
+    out = create_index()
+    with open(fname, 'w') as fd:
+        json.dump(out, fd, indent=4)
+        fd.write('\n')
+    if fname == _index_fname:
+        _index = out
+    return out
+
+
+def load_index():
+    r"""Load the index, creating it if it dosn't exist.
+
+    Returns:
+        dict: Mapping from registry name to a mapping from component name
+            to the name of the module that registers it.
+
+    """
+    global _index
+    if _index is None:
+        if os.path.isfile(_index_fname):
+            with open(_index_fname, 'r') as fd:
+                _index = json.load(fd)
+        else:  # pragma: debug
+            try:
+                write_index()
+            except (IOError, OSError):
+                _index = create_index()
+    return _index
+
+
+def clear_index():
+    r"""Clear the loaded index so that it is reloaded on next use."""
+    global _index
+    _index = None
+
+
+def get_module(registry, name):
+    r"""Get the name of the module that registers a component.
+
+    Args:
+        registry (str): Name of the registry ('serializer', 'type', or
+            'property').
+        name (str): Name of the component.
+
+    Returns:
+        str: Name of the module, None if the component is not in the index.
+
+    Raises:
+        ValueError: If registry is not a valid registry.
+
+    """
+    if registry not in _registries:
+        raise ValueError("Unsupported registry: '%s'" % registry)
+    return load_index().get(registry, {}).get(name, None)
+
+
+def import_component(registry, name):
+    r"""Import the module that registers a component.
+
+    Args:
+        registry (str): Name of the registry ('serializer', 'type', or
+            'property').
+        name (str): Name of the component.
+
+    Returns:
+        bool: True if the module was located and imported, False otherwise.
+
+    """
+    mod = get_module(registry, name)
+    if mod is None:
+        return False
+    importlib.import_module(mod)
+    return True
@@ -4,14 +4,23 @@ import logging
 # import atexit
 import os
 import time
+import shutil
+import tempfile
 import signal
+import threading
 from pprint import pformat
+from collections import OrderedDict
 from itertools import chain
 import socket
 from yggdrasil.tools import YggClass
 from yggdrasil.config import ygg_cfg, cfg_environment
-from yggdrasil import platform, backwards, yamlfile
-from yggdrasil.drivers import create_driver
+from yggdrasil import (
+    platform, backwards, yamlfile, metrics, tracing, profiling)
+from yggdrasil.drivers import create_driver, import_driver
+from yggdrasil.drivers.ConnectionWorkerDriver import (
+    ConnectionWorkerPool, ConnectionWorkerDriver)
+from yggdrasil.drivers.AsyncConnectionEngine import AsyncConnectionEngine
+from yggdrasil.drivers.OutputMultiplexer import OutputMultiplexer
 
 
 COLOR_TRACE = '\033[30;43;22m'
@@ -54,6 +63,54 @@ class YggRunner(YggClass):
             Defaults to environment variable 'RMQ_DEBUG'.
         ygg_debug_prefix (str, optional): Prefix for Ygg debug messages.
             Defaults to namespace.
+        connection_workers (int, optional): Number of worker processes that
+            connection drivers should be distributed across. If 0, connection
+            drivers are run as threads in the runner process. Defaults to
+            the config option ('parallel', 'connection_workers').
+        connection_engine (str, optional): How connection drivers in the
+            runner process should be run. 'thread' runs each driver in its
+            own thread while 'async' runs all of them on a single asyncio
+            event loop. Defaults to the config option ('parallel',
+            'connection_engine').
+        parallel_startup (bool, optional): If True, drivers are created and
+            started concurrently, with connections created after the
+            connections they pair with and models created/started as soon as
+            their own connections are ready. Defaults to the config option
+            ('parallel', 'parallel_startup').
+        multiplex_output (bool, optional): If True, the output of all models
+            is forwarded by a single multiplexer thread rather than a thread
+            for each model. Defaults to the config option ('debug',
+            'multiplex_output') or True if model_log_dir is provided.
+        prefix_output (bool, optional): If True and the output is
+            multiplexed, each line of model output is prefixed with the
+            model name. Defaults to the config option ('debug',
+            'prefix_output').
+        model_log_dir (str, optional): Directory where the output of each
+            model should also be written to a file named '<model>.log'.
+            Defaults to the config option ('debug', 'model_log_dir'). If
+            provided, the output is multiplexed.
+        python_zygote (bool, optional): If True, Python models are forked
+            from a zygote process that has yggdrasil and common dependencies
+            already imported rather than started in new interpreters.
+            Defaults to the config option ('parallel', 'python_zygote').
+        metrics_file (str, optional): File that performance metrics for the
+            connections should be written to as JSON at the end of the run.
+            Defaults to the config option ('debug', 'metrics_file'). If not
+            provided, metrics are not written.
+        metrics_interval (float, optional): Time in seconds between writes
+            of the metrics to metrics_file while the models are running. If
+            0, the metrics are only written at the end of the run. Defaults
+            to the config option ('debug', 'metrics_interval').
+        trace_file (str, optional): File that traces of the messages passed
+            between models should be written to (in the Chrome trace event
+            format) at the end of the run. If provided, tracing is enabled
+            for all comms in the run. Defaults to the config option
+            ('debug', 'trace_file').
+        profile_dir (str, optional): Directory that profiles of the runner,
+            each connection driver thread, and each Python model should be
+            written to along with a merged summary of the top functions at
+            the end of the run. If provided, profiling is enabled. Defaults
+            to the config option ('debug', 'profile_dir').
 
     Attributes:
         namespace (str): Name that should be used to uniquely identify any RMQ
@@ -67,13 +124,49 @@ class YggRunner(YggClass):
             drivers.
         interrupt_time (float): Time of last interrupt signal.
         error_flag (bool): True if one or more models raises an error.
+        connection_workers (int): Number of worker processes for connection
+            drivers.
+        connection_pool (ConnectionWorkerPool): Pool of worker processes
+            hosting connection drivers. None if connection_workers is 0.
+        connection_engine (str): How connection drivers are run ('thread' or
+            'async').
+        engine (AsyncConnectionEngine): Engine running connection drivers
+            when connection_engine is 'async'. None otherwise.
+        parallel_startup (bool): True if drivers are created and started
+            concurrently.
+        phase_times (dict): Times at which the sub-phases of loading and
+            starting drivers were completed.
+        multiplex_output (bool): True if model output is multiplexed.
+        prefix_output (bool): True if multiplexed output is prefixed with
+            model names.
+        model_log_dir (str): Directory where model output is logged.
+        output_mux (OutputMultiplexer): Multiplexer forwarding model output
+            when multiplex_output is True. None otherwise.
+        python_zygote (bool): True if Python models are forked from a zygote.
+        zygote (PythonZygote): Zygote that Python models are forked from when
+            python_zygote is True. None otherwise.
+        metrics_file (str): File that connection metrics are written to.
+        metrics_interval (float): Time in seconds between writes of the
+            connection metrics while models are running.
+        metrics_reporter (MetricsReporter): Thread writing the metrics
+            periodically when metrics_interval is greater than 0. None
+            otherwise.
+        trace_file (str): File that message traces are written to.
+        trace_dir (str): Temporary directory that the processes in the run
+            record message traces in when tracing is enabled.
+        profile_dir (str): Directory that profiles are written to when
+            profiling is enabled.
 
     ..todo:: namespace, host, and rank do not seem strictly necessary.
 
     """
     def __init__(self, modelYmls, namespace, host=None, rank=0,
                  ygg_debug_level=None, rmq_debug_level=None,
-                 ygg_debug_prefix=None):
+                 ygg_debug_prefix=None, connection_workers=None,
+                 connection_engine=None, parallel_startup=None,
+                 multiplex_output=None, prefix_output=None, model_log_dir=None,
+                 python_zygote=None, metrics_file=None,
+                 metrics_interval=None, trace_file=None, profile_dir=None):
         super(YggRunner, self).__init__('runner')
         self.namespace = namespace
         self.host = host
@@ -87,6 +180,77 @@ class YggRunner(YggClass):
         self._outputchannels = {}
         self._old_handlers = {}
         self.error_flag = False
+        if connection_workers is None:
+            connection_workers = int(ygg_cfg.get('parallel', 'connection_workers',
+                                                 0))
+        self.connection_workers = connection_workers
+        self.connection_pool = None
+        if connection_engine is None:
+            connection_engine = ygg_cfg.get('parallel', 'connection_engine',
+                                            'thread')
+        if connection_engine not in ['thread', 'async']:
+            raise ValueError("Invalid connection engine '%s'." % connection_engine)
+        self.connection_engine = connection_engine
+        self.engine = None
+        if parallel_startup is None:
+            parallel_startup = (ygg_cfg.get('parallel', 'parallel_startup',
+                                            'False').lower() == 'true')
+        self.parallel_startup = parallel_startup
+        if model_log_dir is None:
+            model_log_dir = ygg_cfg.get('debug', 'model_log_dir', None)
+        if multiplex_output is None:
+            multiplex_output = (
+                (model_log_dir is not None)
+                or (ygg_cfg.get('debug', 'multiplex_output',
+                                'False').lower() == 'true'))
+        if prefix_output is None:
+            prefix_output = (ygg_cfg.get('debug', 'prefix_output',
+                                         'True').lower() == 'true')
+        if multiplex_output and (not OutputMultiplexer.is_installed()):
+            self.info("Model output cannot be multiplexed on this platform.")
+            multiplex_output = False
+        self.multiplex_output = multiplex_output
+        self.prefix_output = prefix_output
+        self.model_log_dir = model_log_dir
+        self.output_mux = None
+        if python_zygote is None:
+            python_zygote = (ygg_cfg.get('parallel', 'python_zygote',
+                                         'False').lower() == 'true')
+        if python_zygote:
+            from yggdrasil import zygote
+            if not zygote.is_installed():
+                self.info("The Python zygote is not supported on this platform.")
+                python_zygote = False
+        self.python_zygote = python_zygote
+        self.zygote = None
+        if metrics_file is None:
+            metrics_file = ygg_cfg.get('debug', 'metrics_file', None)
+        if metrics_interval is None:
+            metrics_interval = float(ygg_cfg.get('debug', 'metrics_interval',
+                                                 0))
+        self.metrics_file = metrics_file
+        self.metrics_interval = metrics_interval
+        self.metrics_reporter = None
+        if trace_file is None:
+            trace_file = ygg_cfg.get('debug', 'trace_file', None)
+        self.trace_file = trace_file
+        self.trace_dir = None
+        if trace_file:
+            self.trace_dir = tempfile.mkdtemp(prefix='ygg_trace_')
+            os.environ['YGG_TRACE_DIR'] = self.trace_dir
+        if profile_dir is None:
+            profile_dir = ygg_cfg.get('debug', 'profile_dir', None)
+        if profile_dir:
+            profile_dir = os.path.abspath(profile_dir)
+            if not os.path.isdir(profile_dir):
+                os.makedirs(profile_dir)
+            os.environ['YGG_PROFILE_DIR'] = profile_dir
+        self.profile_dir = profile_dir
+        self._profiler = None
+        self.phase_times = {}
+        self._phase_timer = time.time
+        self._phase_lock = threading.RLock()
+        self._cwd_lock = threading.RLock()
         # Setup logging
         # if ygg_debug_prefix is None:
         #     ygg_debug_prefix = namespace
@@ -188,17 +352,26 @@ class YggRunner(YggClass):
         if t0 is None:
             t0 = timer()
         times = {}
+        self._phase_timer = timer
         times['init'] = timer()
+        self._profiler = profiling.start()
         self.loadDrivers()
         times['load drivers'] = timer()
         self.startDrivers()
         times['start drivers'] = timer()
+        self.start_metrics_reporter()
         self.set_signal_handler(signal_handler)
         self.waitModels()
         times['run models'] = timer()
         self.reset_signal_handler()
         self.closeChannels()
         times['close channels'] = timer()
+        # Stop periodic writes so they do not race with the final write
+        if self.metrics_reporter is not None:
+            self.metrics_reporter.stop()
+        self.write_metrics()
+        self.write_trace()
+        self.write_profile()
         self.cleanup()
         times['clean up'] = timer()
         tprev = t0
@@ -209,8 +382,60 @@ class YggRunner(YggClass):
             tprev = times[k]
         self.info(40 * '=')
         self.info('%20s\t%f', "Total", tprev - t0)
+        phase_order = ['create connections', 'create models',
+                       'start connections', 'start models']
+        for k in phase_order:
+            if k in self.phase_times:
+                times[k] = self.phase_times[k]
+                self.info('%20s\t%f (from start)', k, times[k] - t0)
         return times
 
+    def record_phase(self, phase):
+        r"""Record the time that a phase of loading/starting drivers was
+        completed. If called more than once for the same phase (e.g. once per
+        driver), the latest time is kept.
+
+        Args:
+            phase (str): Name of the phase.
+
+        """
+        t = self._phase_timer()
+        with self._phase_lock:
+            self.phase_times[phase] = max(t, self.phase_times.get(phase, t))
+
+    def call_parallel(self, tasks, msg):
+        r"""Call a set of functions concurrently, each in its own thread,
+        and wait for them to finish.
+
+        Args:
+            tasks (list): Tuples containing a name and a function that takes
+                no arguments for each task.
+            msg (str): Format string for the error message logged with the
+                name of each task that fails.
+
+        Raises:
+            Exception: The first error raised by any of the tasks.
+
+        """
+        errors = []
+
+        def wrapped(name, func):
+            try:
+                func()
+            except BaseException as e:
+                self.error(msg, name)
+                errors.append(e)
+
+        threads = [threading.Thread(target=wrapped, args=(name, func),
+                                    name='runner.%s' % name)
+                   for name, func in tasks]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            raise errors[0]
+
     @property
     def all_drivers(self):
         r"""iterator: For all drivers."""
@@ -236,26 +461,55 @@ class YggRunner(YggClass):
                         driver.get('output_drivers', dict()))
         return out
 
-    def createDriver(self, yml):
+    def createDriver(self, yml, is_connection=False):
         r"""Create a driver instance from the yaml information.
 
         Args:
             yml (yaml): Yaml object containing driver information.
+            is_connection (bool, optional): If True, the driver is a
+                connection driver and will be created on one of the
+                connection workers or run on the connection engine if either
+                is in use. Defaults to False.
 
         Returns:
             object: An instance of the specified driver.
 
         """
         self.debug('Creating %s, a %s', yml['name'], yml['driver'])
-        curpath = os.getcwd()
         if 'ClientDriver' in yml['driver']:
             yml.setdefault('comm_address', self.serverdrivers[yml['args']])
-        if 'working_dir' in yml:
-            os.chdir(yml['working_dir'])
-        instance = create_driver(yml=yml, namespace=self.namespace,
-                                 rank=self.rank, **yml)
+        # Connection paths are absolute so the working directory (which is
+        # shared by all threads) is only changed for models
+        if is_connection and self.parallel_startup:
+            return self._createDriver(yml, is_connection=is_connection)
+        with self._cwd_lock:
+            curpath = os.getcwd()
+            if 'working_dir' in yml:
+                os.chdir(yml['working_dir'])
+            try:
+                instance = self._createDriver(yml, is_connection=is_connection)
+            finally:
+                os.chdir(curpath)
+        return instance
+
+    def _createDriver(self, yml, is_connection=False):
+        r"""Create a driver instance without changing directories."""
+        if is_connection and (self.connection_pool is not None):
+            instance = ConnectionWorkerDriver(yml['name'], yml,
+                                              self.connection_pool,
+                                              namespace=self.namespace,
+                                              rank=self.rank)
+        else:
+            instance = create_driver(yml=yml, namespace=self.namespace,
+                                     rank=self.rank, **yml)
+            if is_connection and (self.engine is not None):
+                instance.engine = self.engine
+            elif not is_connection:
+                if self.output_mux is not None:
+                    instance.output_mux = self.output_mux
+                if (self.zygote is not None) and hasattr(instance, 'zygote'):
+                    instance.zygote = self.zygote
         yml['instance'] = instance
-        os.chdir(curpath)
         if 'ServerDriver' in yml['driver']:
             self.serverdrivers[yml['args']] = instance.comm_address
         return instance
@@ -300,7 +554,28 @@ class YggRunner(YggClass):
                         ("Input driver %s could not locate a "
                          + "corresponding file or output channel %s") % (
                              x["name"], yml["args"]))
-        drv = self.createDriver(yml)
+        # Containers sent only to Python models can be encoded as blocks,
+        # pickles can use the highest protocol that all of the models load,
+        # and messages can only be compressed if all of the models can
+        # decompress them
+        if ('ocomm_kws' in yml) and yml['model_driver']:
+            receivers = [import_driver(self.modeldrivers[x]['driver'])
+                         for x in yml['model_driver']]
+            protocols = [x._pickle_protocol for x in receivers]
+            for x in yml['ocomm_kws']['comm']:
+                if 'filetype' in x:
+                    continue
+                if all(drv._decodes_blocks for drv in receivers):
+                    x.setdefault('block_encode', True)
+                if None not in protocols:
+                    x.setdefault('pickle_protocol', min(protocols))
+                if ((x.get('compression', None)
+                     and not all(drv._decompresses for drv in receivers))):
+                    self.warning(("Compression is disabled for %s as it sends "
+                                  + "to models that cannot decompress "
+                                  + "messages."), x['name'])
+                    x.pop('compression')
+        drv = self.createDriver(yml, is_connection=True)
         return drv
 
     def createOutputDriver(self, yml):
@@ -324,7 +599,7 @@ class YggRunner(YggClass):
                         ("Output driver %s could not locate a "
                          + "corresponding file or input channel %s") % (
                              x["name"], yml["args"]))
-        drv = self.createDriver(yml)
+        drv = self.createDriver(yml, is_connection=True)
         return drv
         
     def loadDrivers(self):
@@ -333,6 +608,28 @@ class YggRunner(YggClass):
         self.debug('')
         driver = dict(name='name')
         try:
+            # Start workers for connection drivers
+            if (self.connection_workers > 0) and (self.connection_pool is None):
+                self.debug("Starting %d connection workers",
+                           self.connection_workers)
+                self.connection_pool = ConnectionWorkerPool(
+                    self.connection_workers, namespace=self.namespace,
+                    rank=self.rank)
+            if (self.connection_engine == 'async') and (self.engine is None):
+                self.engine = AsyncConnectionEngine()
+            if self.multiplex_output and (self.output_mux is None):
+                self.output_mux = OutputMultiplexer(prefix=self.prefix_output,
+                                                    log_dir=self.model_log_dir)
+            if ((self.python_zygote and (self.zygote is None)
+                 and any(x['driver'] == 'PythonModelDriver'
+                         for x in self.modeldrivers.values()))):
+                # The zygote imports modules while the drivers are created
+                from yggdrasil import zygote
+                self.zygote = zygote.PythonZygote()
+            if self.parallel_startup:
+                driver = dict(name='One or more drivers')
+                self.loadDriversParallel()
+                return
             # Create input drivers
             self.debug("Loading input drivers")
             for driver in self.inputdrivers.values():
@@ -341,15 +638,55 @@ class YggRunner(YggClass):
             self.debug("Loading output drivers")
             for driver in self.outputdrivers.values():
                 self.createOutputDriver(driver)
+            self.record_phase('create connections')
             # Create model drivers
             self.debug("Loading model drivers")
             for driver in self.modeldrivers.values():
                 self.createModelDriver(driver)
+            self.record_phase('create models')
         except BaseException:  # pragma: debug
             self.error("%s could not be created.", driver['name'])
             self.terminate()
             raise
 
+    def loadDriversParallel(self):
+        r"""Load drivers concurrently. Input drivers are created first, output
+        drivers are created once the input driver for the same channel (if
+        there is one) exists, and model drivers are created once all of
+        their I/O drivers exist."""
+        self.debug('')
+        created = dict((id(x), threading.Event()) for x in self.all_drivers)
+
+        def create_task(method, yml, deps, phase):
+            def task():
+                try:
+                    for x in deps:
+                        created[id(x)].wait()
+                        if 'instance' not in x:
+                            raise RuntimeError("Dependency %s was not created."
+                                               % x['name'])
+                    method(yml)
+                    self.record_phase(phase)
+                finally:
+                    created[id(yml)].set()
+            return (yml['name'], task)
+
+        tasks = []
+        for x in self.inputdrivers.values():
+            tasks.append(create_task(self.createInputDriver, x, [],
+                                     'create connections'))
+        for x in self.outputdrivers.values():
+            deps = []
+            if x['args'] in self._inputchannels:
+                deps.append(self._inputchannels[x['args']])
+            tasks.append(create_task(self.createOutputDriver, x, deps,
+                                     'create connections'))
+        for x in self.modeldrivers.values():
+            deps = list(self.io_drivers(x['name']))
+            tasks.append(create_task(self.createModelDriver, x, deps,
+                                     'create models'))
+        self.call_parallel(tasks, "%s could not be created.")
+
     def startDrivers(self):
         r"""Start drivers, starting with the IO drivers."""
         self.info('Starting I/O drivers and models on system '
@@ -357,6 +694,11 @@ class YggRunner(YggClass):
                       self.host, self.namespace, self.rank))
         driver = dict(name='name')
         try:
+            if self.parallel_startup:
+                driver = dict(name='One or more drivers')
+                self.startDriversParallel()
+                self.debug('ALL DRIVERS STARTED')
+                return
             # Start connections
             for driver in self.io_drivers():
                 self.debug("Starting driver %s", driver['name'])
@@ -370,6 +712,7 @@ class YggRunner(YggClass):
                 d.wait_for_loop()
                 assert(d.was_loop)
                 assert(not d.errors)
+            self.record_phase('start connections')
             # Start models
             # self.sleep(1)  # on windows comms can take a while start
             for driver in self.modeldrivers.values():
@@ -382,12 +725,65 @@ class YggRunner(YggClass):
                         d2.start()
                 if not d.was_started:
                     d.start()
+            self.record_phase('start models')
         except BaseException:  # pragma: debug
             self.error("%s did not start", driver['name'])
             self.terminate()
             raise
         self.debug('ALL DRIVERS STARTED')
 
+    def startDriversParallel(self):
+        r"""Start drivers concurrently. Each connection is started and waited
+        on in its own thread and each model is started as soon as its own
+        connections (and any servers that it is a client of) are ready."""
+        self.debug('')
+        ready = dict((id(x), threading.Event()) for x in self.all_drivers)
+        failed = []
+
+        def wait_for(deps):
+            for x in deps:
+                ready[id(x)].wait()
+            if failed:
+                raise RuntimeError("Dependency did not start.")
+
+        def start_connection(yml):
+            def task():
+                try:
+                    d = yml['instance']
+                    if not d.was_started:
+                        d.start()
+                    d.wait_for_loop()
+                    assert(d.was_loop)
+                    assert(not d.errors)
+                    self.record_phase('start connections')
+                except BaseException:
+                    failed.append(yml['name'])
+                    raise
+                finally:
+                    ready[id(yml)].set()
+            return (yml['name'], task)
+
+        def start_model(yml):
+            def task():
+                try:
+                    deps = list(self.io_drivers(yml['name']))
+                    deps += [self.modeldrivers[n] for n in yml.get('client_of', [])]
+                    wait_for(deps)
+                    d = yml['instance']
+                    if not d.was_started:
+                        d.start()
+                    self.record_phase('start models')
+                except BaseException:
+                    failed.append(yml['name'])
+                    raise
+                finally:
+                    ready[id(yml)].set()
+            return (yml['name'], task)
+
+        tasks = [start_connection(x) for x in self.io_drivers()]
+        tasks += [start_model(x) for x in self.modeldrivers.values()]
+        self.call_parallel(tasks, "%s did not start")
+
     def waitModels(self):
         r"""Wait for all model drivers to finish. When a model finishes,
         join the thread and perform exits for associated IO drivers."""
@@ -476,14 +872,32 @@ class YggRunner(YggClass):
                 assert(not driver['instance'].is_alive())
                 # if driver['instance'].is_alive():
                 #     driver['instance'].join()
+        self.shutdown_pool()
         self.debug('Returning')
 
+    def shutdown_pool(self):
+        r"""Stop the metrics reporter, connection worker processes, engine,
+        output multiplexer, and zygote if there are any."""
+        if self.metrics_reporter is not None:
+            self.metrics_reporter.stop()
+        self.disable_tracing()
+        self.disable_profiling()
+        if self.connection_pool is not None:
+            self.connection_pool.shutdown()
+        if self.engine is not None:
+            self.engine.stop()
+        if self.output_mux is not None:
+            self.output_mux.stop()
+        if self.zygote is not None:
+            self.zygote.stop()
+
     def cleanup(self):
         r"""Perform cleanup operations for all drivers."""
         self.debug('')
         for driver in self.all_drivers:
             if 'instance' in driver:
                 driver['instance'].cleanup()
+        self.shutdown_pool()
 
     def printStatus(self):
         r"""Print the status of all drivers, starting with the IO drivers."""
@@ -492,6 +906,116 @@ class YggRunner(YggClass):
             if 'instance' in driver:
                 driver['instance'].printStatus()
 
+    def collect_metrics(self):
+        r"""Collect the performance metrics from the connection drivers.
+
+        Returns:
+            dict: Metrics for each connection (under 'connections') and the
+                totals for all of the comms (under 'totals').
+
+        """
+        connections = OrderedDict()
+        for drv in self.io_drivers():
+            instance = drv.get('instance', None)
+            if not hasattr(instance, 'get_metrics'):
+                continue
+            try:
+                x = instance.get_metrics()
+            except RuntimeError:  # pragma: debug
+                self.exception("Error getting metrics for %s", drv['name'])
+                continue
+            if x is not None:
+                connections[drv['name']] = x
+        return OrderedDict([('time', time.time()),
+                            ('connections', connections),
+                            ('totals', metrics.summarize(connections))])
+
+    def write_metrics(self, fname=None):
+        r"""Write the performance metrics for the connections to a file.
+
+        Args:
+            fname (str, optional): File that the metrics should be written
+                to. Defaults to metrics_file. If neither is set, the metrics
+                are not written.
+
+        Returns:
+            dict: Metrics that were written, None if they were not.
+
+        """
+        if fname is None:
+            fname = self.metrics_file
+        if not fname:
+            return None
+        out = self.collect_metrics()
+        metrics.write_metrics(fname, out)
+        self.debug("Wrote metrics to %s", fname)
+        return out
+
+    def write_trace(self):
+        r"""Write the message traces recorded during the run to trace_file
+        and disable tracing.
+
+        Returns:
+            dict: Trace that was written, None if tracing is not enabled.
+
+        """
+        if self.trace_dir is None:
+            return None
+        try:
+            out = tracing.write_trace_file(self.trace_file, self.trace_dir)
+            self.debug("Wrote trace to %s", self.trace_file)
+        finally:
+            self.disable_tracing()
+        return out
+
+    def disable_tracing(self):
+        r"""Stop recording traces and remove the trace directory."""
+        if self.trace_dir is None:
+            return
+        if os.environ.get('YGG_TRACE_DIR', None) == self.trace_dir:
+            del os.environ['YGG_TRACE_DIR']
+        shutil.rmtree(self.trace_dir, ignore_errors=True)
+        self.trace_dir = None
+
+    def write_profile(self):
+        r"""Write the profile for the runner and a summary merging the
+        profiles recorded during the run to profile_dir and disable
+        profiling.
+
+        Returns:
+            str: Summary that was written, None if profiling is not enabled.
+
+        """
+        if not self.profile_dir:
+            return None
+        try:
+            profiling.stop(self._profiler, label='runner')
+            self._profiler = None
+            out = profiling.write_summary(self.profile_dir)
+            self.info("Wrote profiles to %s", self.profile_dir)
+        finally:
+            self.disable_profiling()
+        return out
+
+    def disable_profiling(self):
+        r"""Stop profiling the runner and the processes it starts."""
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler = None
+        if ((self.profile_dir and (os.environ.get('YGG_PROFILE_DIR', None)
+                                   == self.profile_dir))):
+            del os.environ['YGG_PROFILE_DIR']
+
+    def start_metrics_reporter(self):
+        r"""Start writing connection metrics periodically if metrics_file
+        is set and metrics_interval is greater than 0."""
+        if ((self.metrics_file and (self.metrics_interval > 0)
+             and (self.metrics_reporter is None))):
+            self.metrics_reporter = metrics.MetricsReporter(
+                self.collect_metrics, self.metrics_file,
+                self.metrics_interval)
+            self.metrics_reporter.start()
+
     def closeChannels(self, force_stop=False):
         r"""Stop IO drivers and join the threads.
 
@@ -1,10 +1,17 @@
 import os
+import sys
 import copy
+import glob
+import uuid
 import pprint
+import pickle
+import hashlib
 import yaml
 from collections import OrderedDict
 from jsonschema.exceptions import ValidationError
-from yggdrasil import metaschema
+import yggdrasil
+from yggdrasil import metaschema, platform, backwards
+from yggdrasil.config import ygg_cfg
 from yggdrasil.drivers import import_all_drivers
 from yggdrasil.communication import import_all_comms
 
@@ -14,6 +21,7 @@ _schema_fname = os.path.abspath(os.path.join(
 _schema = None
 _registry = {}
 _registry_complete = False
+_cache_version = 1
 
 
 def ordered_load(stream, Loader=yaml.Loader, object_pairs_hook=OrderedDict):
@@ -114,6 +122,133 @@ def create_schema():
     return x
 
 
+def get_cache_dir():
+    r"""Get the directory where the loaded schema and normalized YAMLs are
+    cached. This is set by the config option ('yaml', 'cache_dir') and
+    defaults to ~/.cache/yggdrasil/yaml.
+
+    Returns:
+        str: Full path to the cache directory.
+
+    """
+    out = ygg_cfg.get('yaml', 'cache_dir', None)
+    if out is None:
+        out = os.path.join(os.path.expanduser('~'), '.cache', 'yggdrasil',
+                           'yaml')
+    return os.path.abspath(os.path.expanduser(out))
+
+
+def is_cache_enabled():
+    r"""Determine if the loaded schema and normalized YAMLs should be cached
+    based on the config option ('yaml', 'cache').
+
+    Returns:
+        bool: True if the cache should be used, False otherwise.
+
+    """
+    return (ygg_cfg.get('yaml', 'cache', 'True').lower() == 'true')
+
+
+def get_cache_key(*contents):
+    r"""Get a key identifying cached results derived from the provided
+    contents in the current environment. The key changes with the cache
+    format, the yggdrasil and Python versions, the platform, and the
+    configuration options.
+
+    Args:
+        *contents: Strings or bytes that the cached result depends on.
+
+    Returns:
+        str: Hex digest identifying the cached result.
+
+    """
+    h = hashlib.sha256()
+    env = [str(_cache_version), yggdrasil.__version__, sys.version,
+           platform._platform]
+    for section in sorted(ygg_cfg.sections()):
+        for k, v in sorted(ygg_cfg.items(section, raw=True)):
+            env.append('%s.%s=%s' % (section, k, v))
+    for x in env + list(contents):
+        h.update(backwards.as_bytes(x))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def _get_cache_file(prefix, key):
+    r"""Get the path to the file where a cached result is stored.
+
+    Args:
+        prefix (str): Type of cached result.
+        key (str): Key identifying the result.
+
+    Returns:
+        str: Full path to the cache file.
+
+    """
+    return os.path.join(get_cache_dir(), '%s_%s.pkl' % (prefix, key))
+
+
+def load_cache(prefix, key):
+    r"""Load a result from the cache.
+
+    Args:
+        prefix (str): Type of cached result.
+        key (str): Key identifying the result.
+
+    Returns:
+        object: Cached result, None if caching is disabled, the result is not
+            cached, or the cache file cannot be read.
+
+    """
+    if (key is None) or (not is_cache_enabled()):
+        return None
+    fname = _get_cache_file(prefix, key)
+    if not os.path.isfile(fname):
+        return None
+    try:
+        with open(fname, 'rb') as fd:
+            return pickle.load(fd)
+    except BaseException:  # pragma: debug
+        # Corrupt or out of date cache files are regenerated
+        return None
+
+
+def save_cache(prefix, key, obj):
+    r"""Save a result to the cache. Errors writing to the cache (e.g. if the
+    directory is not writable) are ignored.
+
+    Args:
+        prefix (str): Type of cached result.
+        key (str): Key identifying the result.
+        obj (object): Result that should be cached.
+
+    """
+    if (key is None) or (not is_cache_enabled()):
+        return
+    fname = _get_cache_file(prefix, key)
+    tmp = '%s.%s.tmp' % (fname, str(uuid.uuid4()))
+    try:
+        if not os.path.isdir(os.path.dirname(fname)):
+            os.makedirs(os.path.dirname(fname))
+        with open(tmp, 'wb') as fd:
+            pickle.dump(obj, fd, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            os.rename(tmp, fname)
+        except OSError:  # pragma: windows
+            if os.path.isfile(fname):
+                os.remove(fname)
+            os.rename(tmp, fname)
+    except (IOError, OSError, pickle.PicklingError):  # pragma: debug
+        if os.path.isfile(tmp):
+            os.remove(tmp)
+
+
+def clear_cache():
+    r"""Remove all cached schemas and normalized YAMLs."""
+    for x in glob.glob(os.path.join(get_cache_dir(), '*.pkl')):
+        os.remove(x)
+
+
 def load_schema(fname=None):
     r"""Return the yggdrasil schema for YAML options.
 
@@ -419,6 +554,8 @@ class SchemaRegistry(object):
     def __init__(self, registry=None, required=None):
         super(SchemaRegistry, self).__init__()
         self._storage = OrderedDict()
+        self._schema = None
+        self.cache_key = None
         if registry is not None:
             if required is None:
                 required = ['comm', 'file', 'model', 'connection']
@@ -430,10 +567,20 @@ class SchemaRegistry(object):
                 icomp = ComponentSchema.from_registry(k, v, schema_registry=self)
                 self.add(k, icomp)
 
-    def add(self, k, v):
-        r"""Add a new component schema to the registry."""
+    def add(self, k, v, validate=True):
+        r"""Add a new component schema to the registry.
+
+        Args:
+            k (str): Name of the component.
+            v (ComponentSchema): Schema for the component.
+            validate (bool, optional): If True, the resulting schema will be
+                validated against the metaschema. Defaults to True.
+
+        """
         self._storage[k] = v
-        metaschema.validate_schema(self.schema)
+        self._schema = None
+        if validate:
+            metaschema.validate_schema(self.schema)
 
     def get(self, k):
         r"""Return a component schema from the registry."""
@@ -442,6 +589,17 @@ class SchemaRegistry(object):
     @property
     def schema(self):
         r"""dict: Schema for evaluating YAML input file."""
+        if self._schema is None:
+            self._schema = self._create_schema()
+        return copy.deepcopy(self._schema)
+
+    def _create_schema(self):
+        r"""Create the schema for evaluating YAML input file.
+
+        Returns:
+            dict: Schema.
+
+        """
         required = ['comm', 'file', 'model', 'connection']
         out = {'title': 'YAML Schema',
                'description': 'Schema for yggdrasil YAML input files.',
@@ -483,14 +641,22 @@ class SchemaRegistry(object):
 
     @classmethod
     def from_file(cls, fname):
-        r"""Create a SchemaRegistry from a file.
+        r"""Create a SchemaRegistry from a file. The loaded registry is cached
+        so that the file does not need to be parsed and validated again
+        unless it changes.
 
         Args:
             fname (str): Full path to the file the schema should be loaded from.
 
         """
-        out = cls()
-        out.load(fname)
+        with open(fname, 'rb') as fd:
+            key = get_cache_key(fd.read())
+        out = load_cache('schema', key)
+        if not isinstance(out, cls):
+            out = cls()
+            out.load(fname)
+            out.cache_key = key
+            save_cache('schema', key, out)
         return out
 
     def load(self, fname):
@@ -508,7 +674,8 @@ class SchemaRegistry(object):
         # Create components
         for k, v in schema.get('definitions', {}).items():
             icomp = ComponentSchema.from_schema(v, schema_registry=self)
-            self.add(k, icomp)
+            self.add(k, icomp, validate=False)
+        metaschema.validate_schema(self.schema)
 
     def save(self, fname):
         r"""Save the schema to a file.
@@ -609,7 +776,7 @@ class SchemaRegistry(object):
 
         """
         out = self._storage[comp_name].schema
-        out['definitions'] = copy.deepcopy(self.schema['definitions'])
+        out['definitions'] = self.schema['definitions']
         return out
 
     def get_component_keys(self, comp_name):
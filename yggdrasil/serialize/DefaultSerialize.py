@@ -12,6 +12,7 @@ from yggdrasil.metaschema.properties.ScalarMetaschemaProperties import (
     definition2dtype, _flexible_types)
 from yggdrasil.metaschema.datatypes.ArrayMetaschemaType import (
     OneDArrayMetaschemaType)
+from yggdrasil.metaschema.datatypes.MetaschemaType import block_encoding
 
 
 @register_serializer
@@ -419,7 +420,8 @@ class DefaultSerialize(tools.YggClass):
                        'commtype', 'filetype', 'response_address', 'request_id',
                        'append', 'in_temp', 'is_series', 'working_dir', 'fmts',
                        'model_driver', 'env', 'send_converter', 'recv_converter',
-                       'typedef_base']
+                       'typedef_base', 'compression', 'compression_threshold',
+                       'block_encode']
         kws = list(kwargs.keys())
         for k in kws:
             if (k in _remove_kws) or k.startswith('zmq'):
@@ -547,7 +549,8 @@ class DefaultSerialize(tools.YggClass):
         return typedef
 
     def serialize(self, args, header_kwargs=None, add_serializer_info=False,
-                  no_metadata=False):
+                  no_metadata=False, compression=None,
+                  compression_threshold=None, block_encode=False):
         r"""Serialize a message.
 
         Args:
@@ -558,12 +561,23 @@ class DefaultSerialize(tools.YggClass):
                 will be added to the metadata. Defaults to False.
             no_metadata (bool, optional): If True, no metadata will be added to
                 the serialized message. Defaults to False.
+            compression (str, optional): Name of the codec that should be used
+                to compress the message body. Defaults to None and the body is
+                not compressed (see MetaschemaType.serialize).
+            compression_threshold (int, optional): Size (in bytes) that the
+                message body must reach for it to be compressed. Defaults to
+                None and the default threshold is used.
+            block_encode (bool, optional): If True, homogeneous containers
+                with enough elements are encoded as a single block that can
+                only be decoded by Python (see MetaschemaType.serialize).
+                Defaults to False.
 
         Returns:
-            bytes, str: Serialized message.
+            bytes, str, tools.MessageFrames: Serialized message.
 
         Raises:
-            TypeError: If returned msg is not bytes type (str on Python 2).
+            TypeError: If returned msg is not bytes type (str on Python 2) or
+                tools.MessageFrames.
 
 
         """
@@ -571,8 +585,11 @@ class DefaultSerialize(tools.YggClass):
             header_kwargs = {}
         if isinstance(args, backwards.bytes_type) and (args == tools.YGG_MSG_EOF):
             header_kwargs['raw'] = True
-        self.initialize_from_message(args, **header_kwargs)
-        metadata = {'no_metadata': no_metadata}
+        with block_encoding(block_encode):
+            self.initialize_from_message(args, **header_kwargs)
+        metadata = {'no_metadata': no_metadata, 'compression': compression,
+                    'compression_threshold': compression_threshold,
+                    'block_encode': block_encode}
         if add_serializer_info:
             self.debug("serializer_info = %s", str(self.serializer_info))
             metadata.update(self.serializer_info)
@@ -585,7 +602,8 @@ class DefaultSerialize(tools.YggClass):
             else:
                 data = self.func_serialize(args)
                 if not self.encode_func_serialize:
-                    if not isinstance(data, backwards.bytes_type):
+                    if not isinstance(data, (backwards.bytes_type,
+                                             tools.MessageFrames)):
                         raise TypeError(("Serialization function returned object "
                                          + "of type '%s', not required '%s' type.")
                                         % (type(data), backwards.bytes_type))
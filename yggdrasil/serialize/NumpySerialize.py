@@ -0,0 +1,210 @@
+import numpy as np
+from yggdrasil import backwards, units
+from yggdrasil.serialize import register_serializer, list2numpy
+from yggdrasil.serialize.AsciiTableSerialize import AsciiTableSerialize
+from yggdrasil.metaschema.datatypes.ArrayMetaschemaType import (
+    OneDArrayMetaschemaType)
+
+
+_npy_magic = b'\x93NUMPY'
+_npy_align = 64
+# Number of digits reserved in the header so that the number of rows can be
+# updated in place when rows are appended
+_npy_growth = 21
+
+
+def write_npy_header(dtype, shape, offset=None):
+    r"""Create the header for a .npy file containing an array.
+
+    Args:
+        dtype (np.dtype): Data type of the array.
+        shape (tuple): Shape of the array.
+        offset (int, optional): Size of the header (including the magic
+            string) in bytes. Defaults to None and the size is set so that
+            the header contains space for the number of rows to grow to
+            _npy_growth digits and the data is aligned.
+
+    Returns:
+        bytes: Header.
+
+    Raises:
+        ValueError: If the header will not fit in offset bytes.
+
+    """
+    header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+        np.lib.format.dtype_to_descr(dtype), tuple(shape))
+    header = backwards.as_bytes(header)
+    if (len(header) + _npy_growth + 11) < 65536:
+        version, prefix = b'\x01\x00', 10
+    else:  # pragma: debug
+        version, prefix = b'\x02\x00', 12
+    if offset is None:
+        offset = prefix + len(header) + _npy_growth + 1
+        offset += (-offset) % _npy_align
+    hlen = offset - prefix
+    if (len(header) + 1) > hlen:
+        raise ValueError("Header (%d bytes) will not fit in %d bytes."
+                         % (len(header) + 1, hlen))
+    header += b' ' * (hlen - len(header) - 1) + b'\n'
+    if prefix == 10:
+        hlen = np.array(hlen, '<u2').tobytes()
+    else:  # pragma: debug
+        hlen = np.array(hlen, '<u4').tobytes()
+    return _npy_magic + version + hlen + header
+
+
+def read_npy_header(msg):
+    r"""Read the header from the contents of a .npy file.
+
+    Args:
+        msg (bytes, file): Contents of a .npy file or a file object
+            positioned at the start of a .npy file. Only the header is read
+            from the file.
+
+    Returns:
+        tuple(np.dtype, tuple, int): Data type and shape of the array and the
+            size of the header (including the magic string) in bytes.
+
+    Raises:
+        ValueError: If the array is stored in Fortran order.
+
+    """
+    if isinstance(msg, backwards.bytes_type):
+        fd = backwards.BytesIO(msg)
+    else:
+        fd = msg
+    version = np.lib.format.read_magic(fd)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fd)
+    else:  # pragma: debug
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fd)
+    if fortran_order and (len(shape) > 1):  # pragma: debug
+        raise ValueError("Arrays stored in Fortran order are not supported.")
+    offset = fd.tell()
+    if fd is not msg:
+        fd.close()
+    return dtype, shape, offset
+
+
+@register_serializer
+class NumpySerialize(AsciiTableSerialize):
+    r"""Class for serializing/deserializing tables as structured arrays in the
+    numpy .npy format. Field names are stored in the array's data type and
+    units are stored as field titles of the form '<name> [<units>]' so that
+    the result can be loaded (and memory mapped) by numpy.load. Space is
+    reserved in the header so that the number of rows can be updated when
+    rows are appended.
+
+    Deserialized columns are read-only views of the message.
+
+    """
+
+    _seritype = 'numpy'
+
+    def __init__(self, *args, **kwargs):
+        # Columns are always arrays
+        kwargs['as_array'] = True
+        super(NumpySerialize, self).__init__(*args, **kwargs)
+
+    def get_structured_array(self, args):
+        r"""Get a structured array with units stored in field titles from a
+        list of columns.
+
+        Args:
+            args (list, np.ndarray): Columns or structured array.
+
+        Returns:
+            np.ndarray: Structured array.
+
+        """
+        field_names = self.get_field_names()
+        if not (isinstance(args, np.ndarray) and (args.dtype.names is not None)):
+            args = self.datatype.coerce_type(args, key_order=field_names)
+            args = list2numpy([units.get_data(x) for x in args],
+                              names=field_names)
+        field_units = self.get_field_units()
+        if field_units is None:
+            return args
+        titles = []
+        for n, u in zip(args.dtype.names, field_units):
+            if units.is_null_unit(u):
+                titles.append(None)
+            else:
+                titles.append('%s [%s]' % (n, u))
+        dtype = np.dtype({'names': list(args.dtype.names),
+                          'formats': [args.dtype[n] for n in args.dtype.names],
+                          'offsets': [args.dtype.fields[n][1]
+                                      for n in args.dtype.names],
+                          'itemsize': args.dtype.itemsize,
+                          'titles': titles})
+        return args.view(dtype)
+
+    def func_serialize(self, args):
+        r"""Serialize a message.
+
+        Args:
+            args (list, np.ndarray): Columns or structured array to be
+                serialized.
+
+        Returns:
+            bytes, str: Serialized message.
+
+        """
+        arr = np.ascontiguousarray(self.get_structured_array(args))
+        return write_npy_header(arr.dtype, arr.shape) + arr.tobytes()
+
+    def func_deserialize(self, msg):
+        r"""Deserialize a message.
+
+        Args:
+            msg (str, bytes): Message to be deserialized.
+
+        Returns:
+            list: Columns in the table.
+
+        """
+        dtype, shape, offset = read_npy_header(msg)
+        arr = np.frombuffer(msg, dtype=dtype, offset=offset,
+                            count=int(np.prod(shape)))
+        if dtype.names is None:
+            arr = arr.reshape(shape)
+            names = ['f0']
+            field_units = ['']
+            columns = [arr]
+        else:
+            names = list(dtype.names)
+            field_units = []
+            for n in names:
+                title = dtype.fields[n][2] if len(dtype.fields[n]) > 2 else None
+                u = ''
+                if title and title.startswith(n + ' [') and title.endswith(']'):
+                    u = title[(len(n) + 2):-1]
+                field_units.append(u)
+            columns = [arr[n] for n in names]
+        if not self._initialized:
+            typedef = {'type': 'array', 'items': []}
+            for n, u, x in zip(names, field_units, columns):
+                item = OneDArrayMetaschemaType.encode_type(x, title=n)
+                if u:
+                    item['units'] = u
+                typedef['items'].append(item)
+            self.update_serializer(extract=True, **typedef)
+        return [units.add_units(x, u) for x, u in zip(columns, field_units)]
+
+    @classmethod
+    def get_testing_options(cls, **kwargs):
+        r"""Method to return a dictionary of testing options for this class.
+
+        Returns:
+            dict: Dictionary of variables to use for testing.
+
+        """
+        out = super(NumpySerialize, cls).get_testing_options(as_array=True)
+        for k in ['as_array']:
+            del out['kwargs'][k]
+        out['extra_kwargs'] = {}
+        out['kwargs'].update(out['typedef'])
+        rows = [np.hstack([units.get_data(x[i]) for x in out['objects']])
+                for i in range(len(out['field_names']))]
+        out['contents'] = cls(**out['kwargs']).func_serialize(rows)
+        return out
@@ -1,17 +1,159 @@
-from yggdrasil import backwards
+import struct
+from yggdrasil import backwards, tools
 from yggdrasil.serialize import register_serializer
 from yggdrasil.serialize.DefaultSerialize import DefaultSerialize
 
 
+# Protocol 5 adds support for out-of-band buffers (Python >= 3.8)
+_oob_protocol = 5
+_oob_available = (backwards.pickle.HIGHEST_PROTOCOL >= _oob_protocol)
+# Prefix for messages containing out-of-band buffers. Pickles always start
+# with the PROTO opcode (b'\x80') for protocols >= 2, so messages without
+# buffers can be distinguished from those with them.
+_oob_prefix = b'YGG_PICKLE_OOB:'
+_oob_size = struct.Struct('<Q')
+
+
+def dumps_oob(args, protocol=None):
+    r"""Pickle an object, storing any buffers that support out-of-band
+    pickling (e.g. contiguous numpy arrays) as separate frames after the
+    pickle stream.
+
+    Args:
+        args (obj): Python object to be pickled.
+        protocol (int, optional): Pickle protocol. Must be >= 5 for buffers
+            to be stored out-of-band. Defaults to 5 if it is supported and
+            the default pickle protocol otherwise.
+
+    Returns:
+        bytes, tools.MessageFrames: Pickle stream if there are not any
+            out-of-band buffers, otherwise frames containing 1) the prefix,
+            the number of buffers, the size of the pickle stream and each
+            buffer, and the pickle stream followed by 2) each of the buffers.
+            The buffers are not copied so they should not be modified until
+            the message has been sent.
+
+    """
+    if protocol is None:
+        if not _oob_available:  # pragma: no cover
+            return backwards.pickle.dumps(args)
+        protocol = _oob_protocol
+    if protocol < _oob_protocol:
+        return backwards.pickle.dumps(args, protocol)
+    buffers = []
+    data = backwards.pickle.dumps(args, protocol,
+                                  buffer_callback=buffers.append)
+    if not buffers:
+        return data
+    buffers = [x.raw() for x in buffers]
+    header = [_oob_prefix, _oob_size.pack(len(buffers)),
+              _oob_size.pack(len(data))]
+    header += [_oob_size.pack(x.nbytes) for x in buffers]
+    return tools.MessageFrames([b''.join(header + [data])] + buffers)
+
+
+def get_oob_frames(msg):
+    r"""Split a message containing out-of-band buffers into frames.
+
+    Args:
+        msg (bytes, tools.MessageFrames): Message produced by dumps_oob with
+            out-of-band buffers. Any data following the message is ignored.
+
+    Returns:
+        list: memoryview objects for the pickle stream and each buffer.
+
+    """
+    if isinstance(msg, tools.MessageFrames):
+        frames = get_oob_frames(msg.frames[0])[:1]
+        return frames + [memoryview(x) for x in msg.frames[1:]]
+    view = memoryview(msg)
+    pos = len(_oob_prefix)
+    nbuf = _oob_size.unpack_from(view, pos)[0]
+    pos += _oob_size.size
+    sizes = [_oob_size.unpack_from(view, pos + i * _oob_size.size)[0]
+             for i in range(nbuf + 1)]
+    pos += (nbuf + 1) * _oob_size.size
+    frames = []
+    for x in sizes:
+        frames.append(view[pos:(pos + x)])
+        pos += x
+    return frames
+
+
+def loads_oob(msg):
+    r"""Unpickle an object that may contain out-of-band buffers. Buffers are
+    not copied so arrays in the returned object are read-only views of the
+    message.
+
+    Args:
+        msg (bytes, tools.MessageFrames): Message produced by dumps_oob or
+            pickle.dumps.
+
+    Returns:
+        obj: Unpickled Python object.
+
+    """
+    if isinstance(msg, tools.MessageFrames):
+        if not msg.frames[0].startswith(_oob_prefix):
+            return backwards.pickle.loads(msg.join())
+    elif not msg.startswith(_oob_prefix):
+        return backwards.pickle.loads(msg)
+    frames = get_oob_frames(msg)
+    return backwards.pickle.loads(frames[0], buffers=frames[1:])
+
+
 @register_serializer
 class PickleSerialize(DefaultSerialize):
     r"""Class for serializing a python object into a bytes message by pickling.
+
+    Args:
+        protocol (int, optional): Pickle protocol that should be used. Defaults
+            to None and the protocol negotiated with the receiver (see
+            negotiate_protocol) is used if there is one, otherwise the default
+            protocol of the pickle module (or 5 if out_of_band is True).
+        out_of_band (bool, optional): If True and protocol 5 is available,
+            buffers that support out-of-band pickling (e.g. contiguous numpy
+            arrays) are placed in separate frames after the pickle stream
+            instead of being copied into it. Comms that support multipart
+            messages send the frames without copying them and the buffers
+            are not copied when the message is deserialized. This requires
+            the receiver to use a version of yggdrasil that understands these
+            messages and Python >= 3.8. Defaults to None and out-of-band
+            buffers are used if the protocol negotiated with the receiver
+            supports them. Messages with and without out-of-band buffers can
+            always be deserialized.
+
     """
 
     _seritype = 'pickle'
-    _schema_properties = dict()
+    _schema_properties = {'protocol': {'type': 'int'},
+                          'out_of_band': {'type': 'boolean'}}
     _default_type = {'type': 'bytes'}
 
+    @property
+    def serializer_info(self):
+        r"""dict: Serializer info. The protocol and out_of_band options are
+        not included as they are negotiated separately for each receiver."""
+        out = super(PickleSerialize, self).serializer_info
+        for k in ['protocol', 'out_of_band']:
+            out.pop(k, None)
+        return out
+
+    def negotiate_protocol(self, protocol):
+        r"""Select the pickle protocol and whether out-of-band buffers are used
+        based on the highest protocol that the receiver can load. Options that
+        were set explicitly are not changed.
+
+        Args:
+            protocol (int): Highest pickle protocol that the receiver can load.
+
+        """
+        if self.protocol is None:
+            self.protocol = min(protocol, backwards.pickle.HIGHEST_PROTOCOL)
+        if self.out_of_band is None:
+            self.out_of_band = (_oob_available
+                                and (self.protocol >= _oob_protocol))
+
     def func_serialize(self, args):
         r"""Serialize a message.
 
@@ -19,10 +161,12 @@ class PickleSerialize(DefaultSerialize):
             args (obj): Python object to be serialized.
 
         Returns:
-            bytes, str: Serialized message.
+            bytes, str, tools.MessageFrames: Serialized message.
 
         """
-        out = backwards.pickle.dumps(args)
+        if self.out_of_band:
+            return dumps_oob(args, protocol=self.protocol)
+        out = backwards.pickle.dumps(args, self.protocol)
         return backwards.as_bytes(out)
 
     def func_deserialize(self, msg):
@@ -35,7 +179,7 @@ class PickleSerialize(DefaultSerialize):
             obj: Deserialized Python object.
 
         """
-        out = backwards.pickle.loads(msg)
+        out = loads_oob(msg)
         return out
 
     @classmethod
@@ -51,6 +195,6 @@ class PickleSerialize(DefaultSerialize):
             out['contents'] = ("S'Test message\\n'\np1\n."
                                + "S'Test message 2\\n'\np1\n.")
         else:  # pragma: Python 3
-            out['contents'] = (b'\x80\x03C\rTest message\nq\x00.'
-                               + b'\x80\x03C\x0fTest message 2\nq\x00.')
+            out['contents'] = b''.join(
+                [backwards.pickle.dumps(x) for x in out['objects']])
         return out
@@ -1,24 +1,12 @@
 import re
+import sys
 import copy
 import os
 import glob
 import importlib
+import threading
 import numpy as np
-import pandas
-from yggdrasil import backwards, platform, units
-try:
-    if not backwards.PY2:  # pragma: Python 3
-        from astropy.io import ascii as apy_ascii
-        from astropy.table import Table as apy_Table
-        _use_astropy = True
-    else:  # pragma: Python 2
-        apy_ascii, apy_Table = None, None
-        _use_astropy = False
-except ImportError:  # pragma: no cover
-    apy_ascii, apy_Table = None, None
-    # print("astropy is not installed, reading/writing as an array will be "
-    #       + "disabled. astropy can be installed using 'pip install astropy'.")
-    _use_astropy = False
+from yggdrasil import backwards, platform, units, registry
 
 
 _fmt_char = b'%'
@@ -26,6 +14,10 @@ _default_comment = b'# '
 _default_delimiter = b'\t'
 _default_newline = b'\n'
 _serializer_registry = {}
+_serializer_registry_complete = False
+_serializer_registry_importing = False
+_serializer_registry_lock = threading.RLock()
+_astropy = None
 
 
 def register_serializer(seri_class):
@@ -56,11 +48,30 @@ def get_registered_serializers():
         dict: Registered serializer/class pairs.
 
     """
+    import_all_serializers()
     return _serializer_registry
 
 
 def import_all_serializers():
     r"""Import all serializers to ensure they are registered."""
+    global _serializer_registry_complete, _serializer_registry_importing
+    if _serializer_registry_complete:
+        return
+    with _serializer_registry_lock:
+        # Calls made by this thread while the serializers are imported return
+        # immediately, other threads wait for the imports to finish
+        if _serializer_registry_complete or _serializer_registry_importing:
+            return
+        _serializer_registry_importing = True
+        try:
+            _import_all_serializers()
+            _serializer_registry_complete = True
+        finally:
+            _serializer_registry_importing = False
+
+
+def _import_all_serializers():
+    r"""Import the modules containing the serializers."""
     for x in glob.glob(os.path.join(os.path.dirname(__file__), '*Serialize.py')):
         seri_mod = os.path.basename(x)[:-3]
         if not seri_mod.startswith('__'):
@@ -77,11 +88,38 @@ def get_serializer_class(seri_name):
         class: Serializer class.
 
     """
+    if seri_name not in _serializer_registry:
+        # Components registered dynamically are not in the index
+        if not registry.import_component('serializer', seri_name):
+            import_all_serializers()
     if seri_name not in _serializer_registry:
         raise ValueError("Class for serializer '%s' could not be found." % seri_name)
     return _serializer_registry[seri_name]
 
 
+def import_astropy():
+    r"""Import the astropy modules used to read/write tables. Astropy is
+    only imported the first time it is needed as it is slow to import.
+
+    Returns:
+        tuple: The astropy.io.ascii module and astropy.table.Table class.
+            Both are None if astropy is not installed.
+
+    """
+    global _astropy
+    if _astropy is None:
+        try:
+            if not backwards.PY2:  # pragma: Python 3
+                from astropy.io import ascii as apy_ascii
+                from astropy.table import Table as apy_Table
+                _astropy = (apy_ascii, apy_Table)
+            else:  # pragma: Python 2
+                _astropy = (None, None)
+        except ImportError:  # pragma: no cover
+            _astropy = (None, None)
+    return _astropy
+
+
 def get_serializer(seritype='default', **kwargs):
     r"""Create a serializer from the provided information.
 
@@ -718,8 +756,9 @@ def array_to_table(arrs, fmt_str, use_astropy=False):
         bytes: ASCII table.
 
     """
-    if not _use_astropy:
-        use_astropy = False
+    if use_astropy:
+        apy_ascii, apy_Table = import_astropy()
+        use_astropy = (apy_ascii is not None)
     dtype = cformat2nptype(fmt_str)
     info = format2table(fmt_str)
     comment = info.get('comment', None)
@@ -773,8 +812,9 @@ def table_to_array(msg, fmt_str=None, use_astropy=False, names=None,
         np.ndarray: Table contents as an array.
     
     """
-    if not _use_astropy:
-        use_astropy = False
+    if use_astropy:
+        apy_ascii, apy_Table = import_astropy()
+        use_astropy = (apy_ascii is not None)
     if fmt_str is None:
         dtype = None
         info = dict(delimiter=delimiter, comment=comment)
@@ -1296,6 +1336,21 @@ def dict2numpy(d, order=None):
     return out
 
 
+class _PandasDataFrameType(type):
+    r"""Metaclass for PandasDataFrame that checks instances against
+    pandas.DataFrame without importing pandas. A data frame can only exist if
+    pandas has already been imported."""
+
+    def __instancecheck__(cls, obj):
+        pandas = sys.modules.get('pandas', None)
+        return (pandas is not None) and isinstance(obj, pandas.DataFrame)
+
+
+#: Stand-in for pandas.DataFrame in isinstance checks (e.g. the python_types
+#: of datatypes) that does not require pandas to be imported.
+PandasDataFrame = _PandasDataFrameType('PandasDataFrame', (object, ), {})
+
+
 def numpy2pandas(arr):
     r"""Covert a numpy structured array to a Pandas DataFrame.
 
@@ -1308,6 +1363,7 @@ def numpy2pandas(arr):
     """
     if not isinstance(arr, np.ndarray):
         raise TypeError("arr must be a numpy array, not %s." % type(arr))
+    import pandas
     out = pandas.DataFrame(arr)
     return out
 
@@ -1324,6 +1380,7 @@ def pandas2numpy(frame, index=False):
         np.ndarray: Structured numpy array.
 
     """
+    import pandas
     if not isinstance(frame, pandas.DataFrame):
         raise TypeError("frame must be a pandas data frame, not %s." % type(frame))
     if frame.empty:
@@ -1377,6 +1434,7 @@ def pandas2dict(frame):
         dict: Dictionary with contents from the input frame.
 
     """
+    import pandas
     if not isinstance(frame, pandas.DataFrame):
         raise TypeError("frame must be a pandas data frame, not %s." % type(frame))
     if frame.empty:
@@ -1414,7 +1472,4 @@ def pandas2list(frame):
     return numpy2list(pandas2numpy(frame))
 
 
-import_all_serializers()
-
-
 __all__ = []
@@ -0,0 +1,48 @@
+import numpy as np
+from yggdrasil import backwards
+from yggdrasil.tests import assert_equal, assert_raises
+from yggdrasil.serialize import NumpySerialize
+from yggdrasil.serialize.tests import test_AsciiTableSerialize as parent
+
+
+def test_npy_header():
+    r"""Test writing/reading .npy headers."""
+    arr = np.zeros(3, dtype=[('a', 'i4'), ('b', 'f8')])
+    header = NumpySerialize.write_npy_header(arr.dtype, arr.shape)
+    assert((len(header) % NumpySerialize._npy_align) == 0)
+    x = np.load(backwards.BytesIO(header + arr.tobytes()))
+    np.testing.assert_array_equal(x, arr)
+    assert_equal(NumpySerialize.read_npy_header(header),
+                 (arr.dtype, arr.shape, len(header)))
+    # Grow the number of rows in place
+    new_header = NumpySerialize.write_npy_header(arr.dtype, (10 ** 20, ),
+                                                 offset=len(header))
+    assert_equal(len(new_header), len(header))
+    assert_raises(ValueError, NumpySerialize.write_npy_header, arr.dtype,
+                  arr.shape, offset=64)
+
+
+class TestNumpySerialize(parent.TestAsciiTableSerialize):
+    r"""Test class for NumpySerialize class."""
+
+    _cls = 'NumpySerialize'
+
+    def test_load(self):
+        r"""Test that serialized messages can be loaded by numpy."""
+        msg = self.instance.func_serialize(self.testing_options['objects'][0])
+        arr = np.load(backwards.BytesIO(msg))
+        self.assert_equal(list(arr.dtype.names),
+                          self.testing_options['field_names'])
+        self.assert_equal(arr.dtype.fields['size'][2], 'size [cm]')
+        self.assert_equal(len(arr), 3)
+
+    def test_deserialize_uninitialized(self):
+        r"""Test deserializing without field information."""
+        msg = self.instance.func_serialize(self.testing_options['objects'][0])
+        x = NumpySerialize.NumpySerialize()
+        out = x.func_deserialize(msg)
+        self.assert_result_equal(out, self.testing_options['objects'][0])
+        self.assert_equal(x.get_field_names(),
+                          self.testing_options['field_names'])
+        self.assert_equal(x.get_field_units()[1:],
+                          self.testing_options['field_units'][1:])
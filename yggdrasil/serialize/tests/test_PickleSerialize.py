@@ -1,3 +1,6 @@
+import numpy as np
+from yggdrasil import backwards, tools
+from yggdrasil.serialize import PickleSerialize
 from yggdrasil.serialize.tests import test_DefaultSerialize as parent
 
 
@@ -5,3 +8,52 @@ class TestPickleSerialize(parent.TestDefaultSerialize):
     r"""Test class for TestPickleSerialize class."""
 
     _cls = 'PickleSerialize'
+
+    def test_out_of_band(self):
+        r"""Test serialization of arrays using out-of-band buffers."""
+        obj = {'a': np.arange(10), 'b': [np.ones((3, 4)), 'c']}
+        # Out-of-band buffers are only used if enabled or negotiated
+        msg = self.instance.func_serialize(obj)
+        assert(not msg.startswith(PickleSerialize._oob_prefix))
+        self.assert_equal(msg, backwards.pickle.dumps(obj))
+        x = self.import_cls(out_of_band=True)
+        msg = x.func_serialize(obj)
+        if PickleSerialize._oob_available:
+            # Buffers are not copied into the message
+            assert(isinstance(msg, tools.MessageFrames))
+            assert(msg.frames[0].startswith(PickleSerialize._oob_prefix))
+            self.assert_equal(len(msg.frames), 3)
+            self.assert_equal(len(msg), len(msg.join()))
+            # Frames can be deserialized joined or separately
+            msgs = [msg, msg.join()]
+        else:  # pragma: no cover
+            assert(not msg.startswith(PickleSerialize._oob_prefix))
+            msgs = [msg]
+        for m in msgs:
+            out = self.instance.func_deserialize(m)
+            np.testing.assert_array_equal(out['a'], obj['a'])
+            np.testing.assert_array_equal(out['b'][0], obj['b'][0])
+            self.assert_equal(out['b'][1], obj['b'][1])
+        # Messages from peers using older protocols can be deserialized
+        x = self.import_cls(protocol=2)
+        msg = x.func_serialize(obj)
+        self.assert_equal(msg, backwards.pickle.dumps(obj, 2))
+        out = self.instance.func_deserialize(msg)
+        np.testing.assert_array_equal(out['a'], obj['a'])
+
+    def test_negotiate_protocol(self):
+        r"""Test selecting options based on the protocol of the receiver."""
+        x = self.import_cls()
+        x.negotiate_protocol(2)
+        self.assert_equal(x.protocol, 2)
+        self.assert_equal(x.out_of_band, False)
+        x = self.import_cls()
+        x.negotiate_protocol(backwards.pickle.HIGHEST_PROTOCOL + 1)
+        self.assert_equal(x.protocol, backwards.pickle.HIGHEST_PROTOCOL)
+        self.assert_equal(x.out_of_band, PickleSerialize._oob_available)
+        assert('out_of_band' not in x.serializer_info)
+        # Explicit options are not changed
+        x = self.import_cls(protocol=2, out_of_band=False)
+        x.negotiate_protocol(backwards.pickle.HIGHEST_PROTOCOL)
+        self.assert_equal(x.protocol, 2)
+        self.assert_equal(x.out_of_band, False)
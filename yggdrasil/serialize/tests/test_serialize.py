@@ -1,3 +1,4 @@
+import threading
 import numpy as np
 from yggdrasil import serialize, backwards, platform
 from yggdrasil.tests import assert_raises, assert_equal
@@ -67,6 +68,43 @@ def test_get_registered_serializers():
     assert_equal(registry[DefaultSerialize._seritype], DefaultSerialize)
 
 
+def test_import_all_serializers_concurrent():
+    r"""Test that concurrent calls to import_all_serializers wait for the
+    serializers to be imported."""
+    started = threading.Event()
+    release = threading.Event()
+    done = threading.Event()
+    old_import = serialize._import_all_serializers
+
+    def slow_import():
+        started.set()
+        release.wait(10)
+        old_import()
+
+    def other():
+        serialize.import_all_serializers()
+        done.set()
+
+    serialize._import_all_serializers = slow_import
+    serialize._serializer_registry_complete = False
+    try:
+        t1 = threading.Thread(target=serialize.import_all_serializers)
+        t1.start()
+        assert(started.wait(10))
+        t2 = threading.Thread(target=other)
+        t2.start()
+        assert(not done.wait(0.1))
+        release.set()
+        assert(done.wait(10))
+        t1.join(10)
+        t2.join(10)
+        assert(serialize._serializer_registry_complete)
+    finally:
+        release.set()
+        serialize._import_all_serializers = old_import
+        serialize._serializer_registry_complete = True
+
+
 def test_register_serializer_errors():
     r"""Test errors in register_serializer for duplicate."""
     assert_raises(ValueError, serialize.register_serializer, DefaultSerialize)
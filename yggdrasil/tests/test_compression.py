@@ -0,0 +1,57 @@
+import zlib
+from yggdrasil import compression
+from yggdrasil.metaschema.datatypes import YGG_MSG_HEAD, get_type_class
+from yggdrasil.tests import assert_equal, assert_raises
+
+
+def test_codecs():
+    r"""Test compressing/decompressing data with each codec."""
+    data = 1000 * b'name\t1\t1.0\n'
+    for name in compression._codecs.keys():
+        cdata = compression.compress(data, name)
+        assert(len(cdata) < len(data))
+        assert_equal(compression.decompress(cdata, name), data)
+    assert_raises(ValueError, compression.compress, data, 'invalid')
+    # Custom codecs
+    compression.register_codec('test_zlib9', lambda x: zlib.compress(x, 9),
+                               zlib.decompress)
+    try:
+        cdata = compression.compress(data, 'test_zlib9')
+        assert_equal(compression.decompress(cdata, 'test_zlib9'), data)
+    finally:
+        compression._codecs.pop('test_zlib9')
+
+
+def test_benchmark():
+    r"""Test timing the codecs."""
+    data = 1000 * b'name\t1\t1.0\n'
+    out = compression.benchmark(data, codecs=['zlib'], nrep=2)
+    assert_equal(list(out.keys()), ['zlib'])
+    assert(out['zlib']['ratio'] < 1.0)
+    assert(out['zlib']['compress'] > 0)
+    assert(out['zlib']['decompress'] > 0)
+
+
+def test_serialize():
+    r"""Test compressing message bodies above the threshold."""
+    x = get_type_class('array')()
+    small = [1.0, 2]
+    large = list(range(1000))
+    # Below threshold
+    msg = x.serialize(small, compression='zlib')
+    assert('compression' not in x.deserialize(msg)[1])
+    # Above threshold
+    msg = x.serialize(large, compression='zlib')
+    body = msg.split(YGG_MSG_HEAD, 2)[-1]
+    obj, meta = x.deserialize(msg)
+    assert_equal(meta['compression'], 'zlib')
+    assert_equal(meta['size'], len(body))
+    assert_equal(obj, large)
+    assert(len(msg) < len(x.serialize(large)))
+    # Incomplete messages are not decompressed until they are complete
+    msg = x.serialize(large, compression='zlib', compression_threshold=0)
+    head, body = msg.split(YGG_MSG_HEAD, 2)[1:]
+    meta = x.deserialize(msg[:-10])[1]
+    assert(meta['incomplete'])
+    obj, meta = x.deserialize(body, metadata=meta)
+    assert_equal(obj, large)
@@ -0,0 +1,85 @@
+import os
+import json
+import shutil
+import tempfile
+from yggdrasil import metrics
+from yggdrasil.tests import assert_equal
+
+
+def test_Histogram():
+    r"""Test adding values to a histogram."""
+    x = metrics.Histogram()
+    assert_equal(x.to_dict()['mean'], None)
+    for v in [0, 0.5, 1, 3, 3]:
+        x.add(v)
+    out = x.to_dict()
+    assert_equal(out['count'], 5)
+    assert_equal(out['total'], 7.5)
+    assert_equal(out['mean'], 1.5)
+    assert_equal(out['min'], 0)
+    assert_equal(out['max'], 3)
+    assert_equal(out['bins'], {'1': 2, '2': 1, '4': 2})
+    x.reset()
+    assert_equal(x.to_dict()['count'], 0)
+
+
+def test_merge_histograms():
+    r"""Test combining histogram summaries."""
+    a = metrics.Histogram(scale=1.0e-6)
+    b = metrics.Histogram(scale=1.0e-6)
+    for v in [1.0e-6, 1.0e-3]:
+        a.add(v)
+    b.add(1.0e-3)
+    out = metrics.merge_histograms(a.to_dict(), b.to_dict())
+    assert_equal(out['count'], 3)
+    assert_equal(out['min'], 1.0e-6)
+    assert_equal(out['max'], 1.0e-3)
+    assert_equal(sum(out['bins'].values()), 3)
+    assert_equal(list(out['bins'].values()), [1, 2])
+    empty = metrics.merge_histograms(metrics.Histogram().to_dict(),
+                                     metrics.Histogram().to_dict())
+    assert_equal(empty['count'], 0)
+    assert_equal(empty['max'], None)
+
+
+def test_summarize():
+    r"""Test totalling the metrics for a set of connections."""
+    x = metrics.CommMetrics()
+    x.bytes_sent = 10
+    x.add('serialize_time', 1.0e-5)
+    comm = dict(x.to_dict(), messages_sent=1)
+    connections = {'a': {'icomm': comm, 'ocomm': dict(comm, comms=[comm])},
+                   'b': {'state': 'done'}}
+    out = metrics.summarize(connections)
+    assert_equal(out['messages_sent'], 3)
+    assert_equal(out['bytes_sent'], 30)
+    assert_equal(out['serialize_time']['count'], 3)
+    assert_equal(out['recv_time']['count'], 0)
+    x.reset()
+    assert_equal(x.to_dict()['bytes_sent'], 0)
+
+
+def test_write_metrics():
+    r"""Test writing metrics to a file, both directly and periodically."""
+    tmpdir = tempfile.mkdtemp()
+    fname = os.path.join(tmpdir, 'metrics', 'metrics.json')
+    try:
+        metrics.write_metrics(fname, {'a': 1})
+        metrics.write_metrics(fname, {'a': 2})
+        with open(fname, 'r') as fd:
+            assert_equal(json.load(fd), {'a': 2})
+        x = metrics.MetricsReporter(lambda: {'b': 1}, fname, 0.01)
+        x.start()
+        T = x.start_timeout()
+        while (not T.is_out):  # pragma: debug
+            with open(fname, 'r') as fd:
+                if json.load(fd) == {'b': 1}:
+                    break
+            x.sleep()
+        x.stop_timeout()
+        x.stop()
+        assert(not x.is_alive())
+        with open(fname, 'r') as fd:
+            assert_equal(json.load(fd), {'b': 1})
+    finally:
+        shutil.rmtree(tmpdir)
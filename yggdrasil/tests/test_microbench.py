@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+from yggdrasil import microbench
+from yggdrasil.tests import assert_equal, assert_raises
+
+
+def test_get_message():
+    r"""Test creating messages of different types and sizes."""
+    assert_equal(len(microbench.get_message('bytes', 10)), 10)
+    assert_equal(len(microbench.get_message('ndarray', 80)), 10)
+    assert_equal(len(microbench.get_message('table', 170)[0]), 10)
+    assert_equal(len(microbench.get_message('ply', 240)['vertices']), 10)
+    assert_equal(len(microbench.get_message('obj', 240)['faces']), 8)
+    assert_raises(ValueError, microbench.get_message, 'invalid', 10)
+
+
+def test_run_benchmarks():
+    r"""Test running, saving, and comparing benchmarks."""
+    results = microbench.run_benchmarks(msg_types=['bytes', 'scalar'],
+                                        sizes=[10, 100], nmsg=2, nrep=2)
+    names = microbench.get_values(results)
+    assert_equal(len(names), 3 * len(microbench._layers))
+    for k, v in names.items():
+        assert(k.startswith('micro('))
+        assert_equal(len(v), 2)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(tmpdir, 'micro.json')
+        microbench.save(fname, results)
+        baseline = microbench.load(fname)
+        assert_equal(baseline, results)
+    finally:
+        shutil.rmtree(tmpdir)
+    out = microbench.compare(results, baseline)
+    assert_equal(list(out.keys()), list(names.keys()))
+    for v in out.values():
+        assert_equal(v['ratio'], 1.0)
+        assert(not v['regression'])
+    # Slow down one benchmark
+    bench = baseline['benchmarks'][0]
+    for r in bench['runs']:
+        r['values'] = [x / 2.0 for x in r['values']]
+    out = microbench.compare(results, baseline, threshold=0.5)
+    assert(out[bench['metadata']['name']]['regression'])
+    assert_equal(sum([v['regression'] for v in out.values()]), 1)
+
+
+def test_run_benchmarks_compression():
+    r"""Test running benchmarks with compressed messages."""
+    results = microbench.run_benchmarks(layers=['datatype', 'serialize'],
+                                        msg_types=['table'], sizes=[10000],
+                                        nmsg=2, nrep=1, compression='zlib')
+    names = microbench.get_values(results)
+    assert_equal(len(names), 2)
+    for k in names.keys():
+        assert(',none+zlib,' in k)
+
+
+def test_run_benchmarks_log_level():
+    r"""Test running benchmarks at a specific log level."""
+    results = microbench.run_benchmarks(layers=['serialize'],
+                                        msg_types=['bytes'], sizes=[100],
+                                        nmsg=2, nrep=1, log_level='INFO')
+    assert_equal(results['metadata']['log_level'], 'INFO')
+    names = microbench.get_values(results)
+    assert_equal(len(names), 1)
+    for k in names.keys():
+        assert(',none+info,' in k)
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from yggdrasil import model_cache
+from yggdrasil.tests import assert_equal
+
+
+def test_get_cache_key():
+    r"""Test that get_cache_key changes with everything that can change the
+    output of a model."""
+    tempdir = tempfile.mkdtemp()
+    try:
+        src = os.path.join(tempdir, 'model.py')
+        extra = os.path.join(tempdir, 'extra.c')
+        for x in [src, extra]:
+            with open(x, 'w') as fd:
+                fd.write('a')
+        inputs = OrderedDict([('input', (None, [b'1']))])
+        kws = dict(working_dir=tempdir, env={'A': '1'},
+                   parameters={'source_files': ['extra.c']})
+        key = model_cache.get_cache_key('python', ['model.py'], inputs, **kws)
+        assert_equal(model_cache.get_cache_key('python', ['model.py'], inputs,
+                                               **kws), key)
+        keys = [key]
+        keys.append(model_cache.get_cache_key(
+            'python', ['model.py'], inputs, working_dir=tempdir,
+            env={'A': '2'}, parameters=kws['parameters']))
+        keys.append(model_cache.get_cache_key(
+            'python', ['model.py'], inputs, working_dir=tempdir,
+            env=kws['env'], parameters={'source_files': []}))
+        keys.append(model_cache.get_cache_key(
+            'python', ['model.py'], OrderedDict([('input', (None, [b'2']))]),
+            **kws))
+        with open(extra, 'w') as fd:
+            fd.write('b')
+        keys.append(model_cache.get_cache_key('python', ['model.py'], inputs,
+                                              **kws))
+        with open(src, 'w') as fd:
+            fd.write('b')
+        keys.append(model_cache.get_cache_key('python', ['model.py'], inputs,
+                                              **kws))
+        os.mkdir(os.path.join(tempdir, 'sub'))
+        shutil.copy(src, os.path.join(tempdir, 'sub'))
+        shutil.copy(extra, os.path.join(tempdir, 'sub'))
+        kws['working_dir'] = os.path.join(tempdir, 'sub')
+        keys.append(model_cache.get_cache_key('python', ['model.py'], inputs,
+                                              **kws))
+        assert_equal(len(set(keys)), len(keys))
+    finally:
+        shutil.rmtree(tempdir)
@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+from yggdrasil import profiling
+from yggdrasil.tests import assert_equal
+
+
+def _work(n):
+    return sum([i * i for i in range(n)])
+
+
+def test_get_filename():
+    r"""Test getting the file a profile is written to."""
+    assert_equal(profiling.get_filename('a:b c', profile_dir='dir'),
+                 os.path.join('dir', 'a_b_c.prof'))
+
+
+def test_profile():
+    r"""Test recording profiles and summarizing them."""
+    old_dir = os.environ.pop('YGG_PROFILE_DIR', None)
+    profile_dir = tempfile.mkdtemp()
+    try:
+        assert(profiling.get_filename('a') is None)
+        assert(profiling.start() is None)
+        assert(profiling.stop(None, label='a') is None)
+        assert_equal(profiling.summarize(profile_dir), '')
+        os.environ['YGG_PROFILE_DIR'] = profile_dir
+        assert(profiling.is_enabled())
+        for label in ['a', 'b']:
+            prof = profiling.start()
+            _work(1000)
+            assert_equal(profiling.stop(prof, label=label),
+                         os.path.join(profile_dir, '%s.prof' % label))
+        out = profiling.write_summary(profile_dir, nfunc=5)
+        assert('a.prof' in out)
+        assert('b.prof' in out)
+        assert('_work' in out)
+        with open(os.path.join(profile_dir, 'summary.txt'), 'r') as fd:
+            assert_equal(fd.read(), out)
+    finally:
+        if old_dir is None:
+            os.environ.pop('YGG_PROFILE_DIR', None)
+        else:  # pragma: debug
+            os.environ['YGG_PROFILE_DIR'] = old_dir
+        shutil.rmtree(profile_dir)
@@ -0,0 +1,54 @@
+import os
+import tempfile
+from yggdrasil import registry
+from yggdrasil.tests import assert_raises, assert_equal
+
+
+def test_index_current():
+    r"""Test that the index distributed with the package is current."""
+    assert_equal(registry.create_index(), registry.load_index())
+
+
+def test_index_complete():
+    r"""Test that the index locates the registered components."""
+    from yggdrasil.serialize import get_registered_serializers
+    from yggdrasil.metaschema.datatypes import get_registered_types
+    from yggdrasil.metaschema.properties import get_registered_properties
+    index = registry.load_index()
+    for k, reg in [('serializer', get_registered_serializers()),
+                   ('type', get_registered_types()),
+                   ('property', get_registered_properties())]:
+        for name, mod in index[k].items():
+            assert_equal(reg[name].__module__, mod)
+        # Only classes created dynamically (e.g. fixed types) are missing
+        for name, cls in reg.items():
+            if name not in index[k]:
+                assert(cls.__module__.endswith('FixedMetaschemaType'))
+
+
+def test_get_module():
+    r"""Test locating the module for a component."""
+    assert_equal(registry.get_module('serializer', 'pandas'),
+                 'yggdrasil.serialize.PandasSerialize')
+    assert_equal(registry.get_module('type', 'ply'),
+                 'yggdrasil.metaschema.datatypes.PlyMetaschemaType')
+    assert_equal(registry.get_module('property', 'units'),
+                 'yggdrasil.metaschema.properties.ScalarMetaschemaProperties')
+    assert(registry.get_module('type', 'invalid') is None)
+    assert_raises(ValueError, registry.get_module, 'invalid', 'pandas')
+    assert(registry.import_component('serializer', 'json'))
+    assert(not registry.import_component('serializer', 'invalid'))
+
+
+def test_write_index():
+    r"""Test writing the index to a file."""
+    fname = os.path.join(tempfile.gettempdir(), 'test_ygg_registry.json')
+    try:
+        out = registry.write_index(fname)
+        assert(os.path.isfile(fname))
+        assert_equal(out, registry.create_index())
+    finally:
+        if os.path.isfile(fname):
+            os.remove(fname)
+    registry.clear_index()
+    assert_equal(registry.load_index(), registry.create_index())
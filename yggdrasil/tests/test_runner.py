@@ -1,9 +1,15 @@
 import os
+import shutil
+import tempfile
 import unittest
 import signal
 import uuid
-from yggdrasil import runner, tools, platform
-from yggdrasil.tests import YggTestBase, assert_raises
+import json
+from yggdrasil import runner, tools, platform, backwards, zygote
+from yggdrasil.config import ygg_cfg
+from yggdrasil.communication import ReplayFileComm
+from yggdrasil.drivers.OutputMultiplexer import OutputMultiplexer
+from yggdrasil.tests import YggTestBase, assert_raises, assert_equal
 # from yggdrasil.tests import yamls as sc_yamls
 from yggdrasil.examples import yamls as ex_yamls
 
@@ -77,3 +83,339 @@ class TestYggRunner(YggTestBase):
         assert_raises(Exception, self.runner.createInputDriver, yml)
         yml['driver'] = 'OutputDriver'
         assert_raises(Exception, self.runner.createOutputDriver, yml)
+
+
+def test_runner_block_encode():
+    r"""Test that containers are only block encoded by connections that send
+    to Python models."""
+    for lang, expected in [('python', True), ('c', None)]:
+        cr = runner.YggRunner([ex_yamls['hello'][lang]],
+                              'test_runner_block_encode_%s' % lang)
+        for yml in cr.inputdrivers.values():
+            drv = cr.createInputDriver(yml)
+            try:
+                assert_equal(drv.ocomm.block_encode, expected)
+            finally:
+                drv.terminate()
+
+
+def test_runner_pickle_protocol():
+    r"""Test that the pickle protocol is only negotiated by connections that
+    send to Python models."""
+    for lang, expected in [('python', backwards.pickle.HIGHEST_PROTOCOL),
+                           ('c', None)]:
+        cr = runner.YggRunner([ex_yamls['hello'][lang]],
+                              'test_runner_pickle_protocol_%s' % lang)
+        for yml in cr.inputdrivers.values():
+            drv = cr.createInputDriver(yml)
+            try:
+                assert_equal(drv.ocomm.pickle_protocol, expected)
+            finally:
+                drv.terminate()
+
+
+def test_runner_compression():
+    r"""Test that messages are only compressed by connections that send to
+    Python models."""
+    for lang, expected in [('python', 'zlib'), ('c', None)]:
+        cr = runner.YggRunner([ex_yamls['hello'][lang]],
+                              'test_runner_compression_%s' % lang)
+        for yml in cr.inputdrivers.values():
+            for x in yml['ocomm_kws']['comm']:
+                x['compression'] = 'zlib'
+            drv = cr.createInputDriver(yml)
+            try:
+                assert_equal(drv.ocomm.compression, expected)
+            finally:
+                drv.terminate()
+
+
+def test_runner_connection_workers():
+    r"""Start a run with connection drivers on worker processes."""
+    namespace = "test_runner_connection_workers_%s" % str(uuid.uuid4())
+    cr = runner.get_runner([ex_yamls['hello']['python']],
+                           namespace=namespace, connection_workers=2)
+    cr.run()
+    assert(not cr.error_flag)
+    assert(not cr.connection_pool.is_alive(0))
+
+
+def test_runner_async_engine():
+    r"""Start a run with connection drivers on the async engine."""
+    namespace = "test_runner_async_engine_%s" % str(uuid.uuid4())
+    cr = runner.get_runner([ex_yamls['hello']['python']],
+                           namespace=namespace, connection_engine='async')
+    cr.run()
+    assert(not cr.error_flag)
+    assert(not cr.engine.is_alive())
+    assert_raises(ValueError, runner.YggRunner, [ex_yamls['hello']['python']],
+                  'test_ygg_run', connection_engine='invalid')
+
+
+def test_runner_async_engine_profile():
+    r"""Start a run with profiling enabled and connection drivers on the
+    async engine."""
+    namespace = "test_runner_async_engine_profile_%s" % str(uuid.uuid4())
+    profile_dir = tempfile.mkdtemp()
+    try:
+        cr = runner.get_runner([ex_yamls['hello']['python']],
+                               namespace=namespace, connection_engine='async',
+                               profile_dir=profile_dir)
+        cr.run()
+        assert(not cr.error_flag)
+        fnames = sorted(os.listdir(profile_dir))
+        assert(any([x.startswith('connection_') for x in fnames]))
+    finally:
+        shutil.rmtree(profile_dir)
+
+
+def test_runner_parallel_startup():
+    r"""Start a run with drivers created and started concurrently."""
+    namespace = "test_runner_parallel_startup_%s" % str(uuid.uuid4())
+    cr = runner.get_runner([ex_yamls['hello']['python']],
+                           namespace=namespace, parallel_startup=True)
+    times = cr.run()
+    assert(not cr.error_flag)
+    for k in ['create connections', 'create models',
+              'start connections', 'start models']:
+        assert(k in times)
+
+
+@unittest.skipIf(not OutputMultiplexer.is_installed(),
+                 "Multiplexer not supported")
+def test_runner_multiplex_output():
+    r"""Start a run with model output forwarded by the multiplexer."""
+    namespace = "test_runner_multiplex_output_%s" % str(uuid.uuid4())
+    log_dir = tempfile.mkdtemp()
+    try:
+        cr = runner.get_runner([ex_yamls['hello']['python']],
+                               namespace=namespace, model_log_dir=log_dir)
+        assert(cr.multiplex_output)
+        cr.run()
+        assert(not cr.error_flag)
+        assert(not cr.output_mux.is_alive())
+        assert(os.listdir(log_dir))
+    finally:
+        shutil.rmtree(log_dir)
+
+
+@unittest.skipIf(not zygote.is_installed(), "Zygote not supported")
+def test_runner_python_zygote():
+    r"""Start a run with Python models forked from a zygote."""
+    namespace = "test_runner_python_zygote_%s" % str(uuid.uuid4())
+    cr = runner.get_runner([ex_yamls['hello']['python']],
+                           namespace=namespace, python_zygote=True)
+    cr.run()
+    assert(not cr.error_flag)
+    assert(cr.zygote is not None)
+    assert(not cr.zygote.is_running)
+
+
+def test_runner_metrics():
+    r"""Start a run with connection metrics written to a file."""
+    namespace = "test_runner_metrics_%s" % str(uuid.uuid4())
+    log_dir = tempfile.mkdtemp()
+    fname = os.path.join(log_dir, 'metrics.json')
+    try:
+        cr = runner.get_runner([ex_yamls['hello']['python']],
+                               namespace=namespace, metrics_file=fname,
+                               metrics_interval=0.1)
+        cr.run()
+        assert(not cr.error_flag)
+        assert(not cr.metrics_reporter.is_alive())
+        with open(fname, 'r') as fd:
+            out = json.load(fd)
+        assert(out['connections'])
+        assert(out['totals']['messages_sent'] > 0)
+        assert(out['totals']['bytes_recv'] > 0)
+    finally:
+        shutil.rmtree(log_dir)
+
+
+def test_runner_trace():
+    r"""Start a run with message traces written to a file."""
+    namespace = "test_runner_trace_%s" % str(uuid.uuid4())
+    log_dir = tempfile.mkdtemp()
+    fname = os.path.join(log_dir, 'trace.json')
+    try:
+        cr = runner.get_runner([ex_yamls['hello']['python']],
+                               namespace=namespace, trace_file=fname)
+        trace_dir = cr.trace_dir
+        assert(os.path.isdir(trace_dir))
+        cr.run()
+        assert(not cr.error_flag)
+        assert(not os.path.isdir(trace_dir))
+        assert('YGG_TRACE_DIR' not in os.environ)
+        with open(fname, 'r') as fd:
+            out = json.load(fd)
+        assert(out['traceEvents'])
+        assert(out['otherData'])
+    finally:
+        shutil.rmtree(log_dir)
+
+
+def test_runner_profile():
+    r"""Start a run with profiling enabled."""
+    namespace = "test_runner_profile_%s" % str(uuid.uuid4())
+    profile_dir = tempfile.mkdtemp()
+    try:
+        cr = runner.get_runner([ex_yamls['hello']['python']],
+                               namespace=namespace, profile_dir=profile_dir)
+        assert_equal(os.environ['YGG_PROFILE_DIR'], profile_dir)
+        cr.run()
+        assert(not cr.error_flag)
+        assert('YGG_PROFILE_DIR' not in os.environ)
+        fnames = sorted(os.listdir(profile_dir))
+        for x in ['runner.prof', 'model_hello_python.prof', 'summary.txt']:
+            assert(x in fnames)
+        assert(any([x.startswith('connection_') for x in fnames]))
+        with open(os.path.join(profile_dir, 'summary.txt'), 'r') as fd:
+            assert('Merged profiles' in fd.read())
+    finally:
+        shutil.rmtree(profile_dir)
+
+
+def test_runner_cache():
+    r"""Run a model with its output cached twice, checking that the model is
+    only run the first time."""
+    tempdir = tempfile.mkdtemp()
+    old_cache = ygg_cfg.get('model', 'cache_dir', '')
+    ygg_cfg.set('model', 'cache_dir', os.path.join(tempdir, 'cache'))
+    srcdir = os.path.dirname(ex_yamls['formatted_io1']['python'])
+    yml = os.path.join(tempdir, 'cached.yml')
+    out = os.path.join(tempdir, 'output.txt')
+    with open(yml, 'w') as fd:
+        fd.write('\n'.join([
+            'model:',
+            '  name: cached_model',
+            '  language: python',
+            '  args: %s' % os.path.join(srcdir, 'src',
+                                        'formatted_io1_modelA.py'),
+            '  cache: true',
+            '  inputs: inputA',
+            '  outputs: outputA',
+            'connections:',
+            '  - input: %s' % os.path.join(srcdir, 'Input', 'input.txt'),
+            '    output: inputA',
+            '    filetype: ascii',
+            '  - input: outputA',
+            '    output: %s' % out,
+            '    filetype: ascii']))
+    try:
+        contents = []
+        for i in range(2):
+            namespace = "test_runner_cache_%s" % str(uuid.uuid4())
+            cr = runner.get_runner([yml], namespace=namespace)
+            cr.run()
+            assert(not cr.error_flag)
+            drv = cr.modeldrivers['cached_model']['instance']
+            assert_equal(drv._cache_hit, (i == 1))
+            with open(out, 'r') as fd:
+                contents.append(fd.read())
+            os.remove(out)
+        assert_equal(contents[1], contents[0])
+        assert('Input1' in contents[0])
+    finally:
+        ygg_cfg.set('model', 'cache_dir', old_cache)
+        shutil.rmtree(tempdir)
+
+
+def test_runner_cache_order():
+    r"""Run a cached model that is started before the model producing its
+    input, checking that recording the input does not block the runner."""
+    tempdir = tempfile.mkdtemp()
+    old_cache = ygg_cfg.get('model', 'cache_dir', '')
+    ygg_cfg.set('model', 'cache_dir', os.path.join(tempdir, 'cache'))
+    srcdir = os.path.dirname(ex_yamls['formatted_io1']['python'])
+    yml = os.path.join(tempdir, 'cached.yml')
+    out = os.path.join(tempdir, 'output.txt')
+    with open(yml, 'w') as fd:
+        fd.write('\n'.join([
+            'models:',
+            '  - name: modelB',
+            '    language: python',
+            '    args: %s' % os.path.join(srcdir, 'src',
+                                          'formatted_io1_modelB.py'),
+            '    cache: true',
+            '    inputs: inputB',
+            '    outputs: outputB',
+            '  - name: modelA',
+            '    language: python',
+            '    args: %s' % os.path.join(srcdir, 'src',
+                                          'formatted_io1_modelA.py'),
+            '    inputs: inputA',
+            '    outputs: outputA',
+            'connections:',
+            '  - input: outputA',
+            '    output: inputB',
+            '  - input: %s' % os.path.join(srcdir, 'Input', 'input.txt'),
+            '    output: inputA',
+            '    filetype: ascii',
+            '  - input: outputB',
+            '    output: %s' % out,
+            '    filetype: ascii']))
+    try:
+        contents = []
+        for i in range(2):
+            namespace = "test_runner_cache_order_%s" % str(uuid.uuid4())
+            cr = runner.get_runner([yml], namespace=namespace)
+            assert_equal(list(cr.modeldrivers.keys())[0], 'modelB')
+            cr.run()
+            assert(not cr.error_flag)
+            drv = cr.modeldrivers['modelB']['instance']
+            assert_equal(drv._cache_hit, (i == 1))
+            with open(out, 'r') as fd:
+                contents.append(fd.read())
+            os.remove(out)
+        assert_equal(contents[1], contents[0])
+        assert('Input1' in contents[0])
+    finally:
+        ygg_cfg.set('model', 'cache_dir', old_cache)
+        shutil.rmtree(tempdir)
+
+
+def test_runner_record_replay():
+    r"""Record the messages sent by a model and replay them into a second
+    run of the model."""
+    tempdir = tempfile.mkdtemp()
+    srcdir = os.path.dirname(ex_yamls['formatted_io1']['python'])
+    log = os.path.join(tempdir, 'traffic.ygglog')
+    inputs = [(os.path.join(srcdir, 'Input', 'input.txt'), 'ascii'),
+              (log, 'replay')]
+    contents = []
+    try:
+        for i, (fin, ftype) in enumerate(inputs):
+            yml = os.path.join(tempdir, 'record%d.yml' % i)
+            out = os.path.join(tempdir, 'output%d.txt' % i)
+            lines = [
+                'model:',
+                '  name: record_model',
+                '  language: python',
+                '  args: %s' % os.path.join(srcdir, 'src',
+                                            'formatted_io1_modelA.py'),
+                '  inputs: inputA',
+                '  outputs: outputA',
+                'connections:',
+                '  - input: %s' % fin,
+                '    output: inputA',
+                '    filetype: %s' % ftype,
+                '  - input: outputA',
+                '    output: %s' % out,
+                '    filetype: ascii']
+            if i == 0:
+                lines.append('    record: %s' % log)
+            with open(yml, 'w') as fd:
+                fd.write('\n'.join(lines))
+            namespace = "test_runner_record_%s" % str(uuid.uuid4())
+            cr = runner.get_runner([yml], namespace=namespace)
+            cr.run()
+            assert(not cr.error_flag)
+            with open(out, 'r') as fd:
+                contents.append(fd.read())
+            if i == 0:
+                assert(os.path.isfile(log))
+                assert_equal(len(ReplayFileComm.read_index(log)), 1)
+        assert_equal(contents[1], contents[0])
+        assert('Input1' in contents[0])
+    finally:
+        shutil.rmtree(tempdir)
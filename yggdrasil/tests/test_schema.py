@@ -1,7 +1,9 @@
 import os
 import pprint
+import shutil
 import tempfile
 from yggdrasil import schema
+from yggdrasil.config import ygg_cfg
 from yggdrasil.tests import assert_raises, assert_equal
 
 
@@ -81,6 +83,34 @@ def test_create_schema():
     os.remove(fname)
 
 
+def test_schema_cache():
+    r"""Test caching of the loaded schema."""
+    tempdir = tempfile.mkdtemp()
+    old_cache = ygg_cfg.get('yaml', 'cache_dir', '')
+    ygg_cfg.set('yaml', 'cache_dir', tempdir)
+    try:
+        key = schema.get_cache_key('a')
+        assert_equal(key, schema.get_cache_key('a'))
+        assert(key != schema.get_cache_key('b'))
+        assert(schema.load_cache('test', key) is None)
+        schema.save_cache('test', key, {'a': 1})
+        assert_equal(schema.load_cache('test', key), {'a': 1})
+        s0 = schema.SchemaRegistry.from_file(schema._schema_fname)
+        assert(s0.cache_key is not None)
+        s1 = schema.SchemaRegistry.from_file(schema._schema_fname)
+        assert_equal(s1, s0)
+        assert_equal(s1.cache_key, s0.cache_key)
+        schema.clear_cache()
+        assert(schema.load_cache('test', key) is None)
+        ygg_cfg.set('yaml', 'cache', 'False')
+        schema.save_cache('test', key, {'a': 1})
+        assert(not os.listdir(tempdir))
+    finally:
+        ygg_cfg.set('yaml', 'cache', 'True')
+        ygg_cfg.set('yaml', 'cache_dir', old_cache)
+        shutil.rmtree(tempdir)
+
+
 def test_cdriver2filetype_error():
     r"""Test errors in cdriver2filetype."""
     assert_raises(ValueError, schema.cdriver2filetype, 'invalid')
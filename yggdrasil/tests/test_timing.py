@@ -1,7 +1,9 @@
 import os
+import sys
 import copy
 import unittest
-from yggdrasil import tools, timing, backwards, platform
+from yggdrasil import tools, timing, backwards, platform, zygote
+from yggdrasil.config import ygg_cfg
 from yggdrasil.tests import YggTestClass, assert_raises, long_running
 
 
@@ -49,6 +51,32 @@ def test_platform_error():
     assert_raises(RuntimeError, x.can_run, raise_error=True)
 
 
+def test_topology_error():
+    r"""Test error when an unsupported topology is requested."""
+    assert_raises(ValueError, timing.TimedTopologyRun, 'invalid')
+
+
+@unittest.skipIf(not zygote.is_installed(), "Zygote not supported")
+def test_time_model_startup():
+    r"""Test timing cold and warm model launches."""
+    out = timing.time_model_startup(nrep=2)
+    for k in ['cold', 'warm']:
+        assert(len(out[k]) == 2)
+
+
+@unittest.skipIf(sys.version_info[:2] < (3, 7), "Requires -X importtime")
+def test_time_import():
+    r"""Test that importing the interface is within the time budget and does
+    not import modules that are only needed for testing or that are imported
+    on demand."""
+    budget = float(ygg_cfg.get('timing', 'import_budget_s', 2.0))
+    out = timing.time_import(nrep=3)
+    assert(out['total'] > 0)
+    for x in ['pytest', 'nose', 'astropy', 'pandas', 'yggdrasil.tests']:
+        assert(x not in out['modules'])
+    assert(out['total'] < budget)
+
+
 class TimedRunTestBase(YggTestClass):
     r"""Base test class for the TimedRun class."""
 
@@ -360,3 +388,44 @@ class TestTimedRunTempNoPerf(TestTimedRunTemp):
     def test_comm_types(self):
         r"""Disabled: Test different comm types."""
         pass
+
+
+@long_running
+class TestTimedTopologyRun(TestTimedRunTempNoPerf):
+    r"""Test class for the TimedTopologyRun class."""
+
+    _cls = 'TimedTopologyRun'
+    test_name = None
+    language = 'python'
+    topology = 'fan_in'
+    nmodel = 2
+
+    @property
+    def inst_args(self):
+        r"""list: Arguments for creating a class instance."""
+        return [self.topology]
+
+    @property
+    def inst_kwargs(self):
+        r"""dict: Keyword arguments for creating a class instance."""
+        out = super(TestTimedTopologyRun, self).inst_kwargs
+        out['nmodel'] = self.nmodel
+        return out
+
+    def test_entry_name(self):
+        r"""Test that the number of models is included in the entry name."""
+        assert(self.entry_name.startswith('timed_%s(' % self.topology))
+        assert(self.entry_name.endswith(',%d)' % self.instance.nmodel))
+
+    def test_topologies(self):
+        r"""Test the other topologies."""
+        kwargs = copy.deepcopy(self.inst_kwargs)
+        for t in timing._topologies:
+            if t == self.topology:
+                continue
+            x = timing.TimedTopologyRun(t, **kwargs)
+            try:
+                x.time_run(*self.time_run_args, **self.time_run_kwargs)
+            finally:
+                if os.path.isfile(x.filename):
+                    os.remove(x.filename)
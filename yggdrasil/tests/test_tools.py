@@ -1,4 +1,5 @@
 import os
+import logging
 from yggdrasil import tools, platform
 from yggdrasil.tests import YggTestClass, assert_equal
 
@@ -62,6 +63,21 @@ def test_eval_kwarg():
     assert_equal(tools.eval_kwarg('"one"'), 'one')
 
 
+def test_LazyFormat():
+    r"""Test deferred formatting of log arguments."""
+    calls = []
+
+    def func(x, y=1):
+        calls.append(x)
+        return x + y
+
+    x = tools.LazyFormat(func, 1, y=2)
+    assert_equal(len(calls), 0)
+    assert_equal(str(x), '3')
+    assert_equal(repr(x), '3')
+    assert_equal(len(calls), 2)
+
+
 class TestYggClass(YggTestClass):
     r"""Test basic behavior of YggTestClass."""
 
@@ -101,6 +117,19 @@ class TestYggClass(YggTestClass):
         self.instance.suppress_special_debug = True
         self.instance.special_debug(1)
         self.instance.suppress_special_debug = False
+        self.instance.debug('%s', self.instance.lazy_pprint({'a': 1}, 1))
+
+    def test_disabled_debug(self):
+        r"""Test that debug methods are not called when disabled."""
+        old_level = self.instance.logger.level
+        self.instance.logger.setLevel(logging.INFO)
+        try:
+            assert_equal(self.instance.special_debug,
+                         self.instance.dummy_log)
+            assert_equal(self.instance.periodic_debug('test'),
+                         self.instance.dummy_log)
+        finally:
+            self.instance.logger.setLevel(old_level)
 
     def test_timeout(self):
         r"""Test functionality of timeout."""
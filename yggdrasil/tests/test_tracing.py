@@ -0,0 +1,55 @@
+import os
+import json
+import shutil
+import tempfile
+from yggdrasil import tracing
+from yggdrasil.tests import assert_equal
+
+
+def test_add_hop():
+    r"""Test adding hops to a trace."""
+    x = tracing.add_hop(None, 'a:send', t=1.0)
+    trace_id, hops = tracing.parse_trace(x)
+    assert(trace_id)
+    assert_equal(hops, [('a:send', 1.0)])
+    x = tracing.add_hop(x, 'a:recv', t=1.5)
+    assert_equal(tracing.parse_trace(x), (trace_id, [('a:send', 1.0),
+                                                     ('a:recv', 1.5)]))
+    assert(tracing.add_hop(None, 'a:send') != tracing.add_hop(None, 'a:send'))
+
+
+def test_record():
+    r"""Test recording traces and combining them into a trace file."""
+    old_dir = os.environ.pop('YGG_TRACE_DIR', None)
+    trace_dir = tempfile.mkdtemp()
+    try:
+        tracing.record('ignored;a:send@1.0')
+        assert(not tracing.is_enabled())
+        os.environ['YGG_TRACE_DIR'] = trace_dir
+        assert(tracing.is_enabled())
+        # Partial traces recorded by intermediate hops are discarded
+        x = tracing.add_hop(None, 'a:send', t=1.0)
+        x = tracing.add_hop(x, 'a:recv', t=1.5)
+        tracing.record(x)
+        x = tracing.add_hop(x, 'b:send', t=2.0)
+        x = tracing.add_hop(x, 'b:recv', t=4.0)
+        tracing.record(x)
+        tracing.record(x)
+        assert_equal(tracing.load_traces(trace_dir), [x])
+        fname = os.path.join(trace_dir, 'trace.json')
+        out = tracing.write_trace_file(fname, trace_dir)
+        with open(fname, 'r') as fd:
+            assert_equal(json.load(fd), json.loads(json.dumps(out)))
+        assert_equal(list(out['otherData'].keys()),
+                     ['a:send -> a:recv', 'a:recv -> b:send',
+                      'b:send -> b:recv'])
+        assert_equal(out['otherData']['b:send -> b:recv']['max'], 2.0)
+        events = [e for e in out['traceEvents'] if e['ph'] == 'X']
+        assert_equal(len(events), 3)
+        assert_equal(events[0]['dur'], 0.5e6)
+    finally:
+        if old_dir is None:
+            os.environ.pop('YGG_TRACE_DIR', None)
+        else:  # pragma: debug
+            os.environ['YGG_TRACE_DIR'] = old_dir
+        shutil.rmtree(trace_dir)
@@ -1,7 +1,9 @@
 import tempfile
 import os
+import shutil
 from jsonschema.exceptions import ValidationError
 from yggdrasil import yamlfile
+from yggdrasil.config import ygg_cfg
 from yggdrasil.tests import YggTestClass, assert_raises
 _yaml_env = 'TEST_YAML_FILE'
 
@@ -115,6 +117,24 @@ class TestYamlModelOnly(YamlTestBase):
                   '  driver: GCCModelDriver',
                   '  args: ./src/modelD.c'], )
 
+    def test_normalize_yaml_cache(self):
+        r"""Test that normalized YAMLs are cached."""
+        tempdir = tempfile.mkdtemp()
+        old_cache = ygg_cfg.get('yaml', 'cache_dir', '')
+        ygg_cfg.set('yaml', 'cache_dir', tempdir)
+        try:
+            yml_prep = yamlfile.prep_yaml(self.files)
+            x = yamlfile.normalize_yaml(yml_prep)
+            nfiles = len(os.listdir(tempdir))
+            assert(nfiles > 0)
+            self.assert_equal(yamlfile.normalize_yaml(yml_prep), x)
+            assert(len(os.listdir(tempdir)) == nfiles)
+            self.assert_equal(yamlfile.parse_yaml(self.files),
+                              yamlfile.parse_yaml(self.files))
+        finally:
+            ygg_cfg.set('yaml', 'cache_dir', old_cache)
+            shutil.rmtree(tempdir)
+
 
 class TestYamlServerClient(YamlTestBase):
     r"""Test specification of server/client models."""
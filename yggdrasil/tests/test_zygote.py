@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+from yggdrasil import zygote, backwards
+from yggdrasil.tests import assert_equal, assert_raises
+
+
+_script = '''import os
+import sys
+print('%s %s %s' % (os.getcwd(), sys.argv[1], os.environ['TEST_ZYGOTE']))
+sys.exit(int(sys.argv[1]))
+'''
+
+
+@unittest.skipIf(not zygote.is_installed(), "Zygote not supported")
+class TestPythonZygote(unittest.TestCase):
+    r"""Test launching models from the zygote."""
+
+    def setUp(self):
+        self.tempdir = os.path.realpath(tempfile.mkdtemp())
+        self.script = os.path.join(self.tempdir, 'model.py')
+        with open(self.script, 'w') as fd:
+            fd.write(_script)
+        self.env = dict(os.environ, TEST_ZYGOTE='zygote', YGG_SUBPROCESS='True')
+        self.instance = zygote.PythonZygote(modules=['json'])
+
+    def tearDown(self):
+        self.instance.stop()
+        assert(not self.instance.is_running)
+        self.instance.stop()
+        shutil.rmtree(self.tempdir)
+
+    def test_launch(self):
+        r"""Test output, environment, and exit codes of forked models."""
+        for code in [0, 3]:
+            p = self.instance.launch([self.script, str(code)], self.env,
+                                     self.tempdir)
+            assert_equal(backwards.as_str(p.stdout.read()).strip(),
+                         '%s %d zygote' % (self.tempdir, code))
+            assert_equal(p.wait(self.instance.timeout), code)
+            assert_equal(p.poll(), code)
+
+    def test_kill(self):
+        r"""Test killing a forked model."""
+        with open(self.script, 'w') as fd:
+            fd.write('import time\ntime.sleep(60)\n')
+        p = self.instance.launch([self.script], self.env, self.tempdir)
+        assert(p.poll() is None)
+        p.kill()
+        assert(p.wait(self.instance.timeout) < 0)
+
+    def test_not_running(self):
+        r"""Test error when launching from a stopped zygote."""
+        self.instance.stop()
+        assert_raises(RuntimeError, self.instance.launch, [self.script],
+                      self.env, self.tempdir)
+
+
+def test_get_preload_modules():
+    r"""Test get_preload_modules."""
+    assert(isinstance(zygote.get_preload_modules(), list))
@@ -7,6 +7,7 @@ import yaml
 import uuid
 import perf
 import subprocess
+import shutil
 import warnings
 import tempfile
 import itertools
@@ -34,6 +35,7 @@ for k in ['lpy', 'make', 'cmake']:
     if k in _lang_list:
         _lang_list.remove(k)
 _comm_list = tools.get_installed_comm(language=_lang_list)
+_topologies = ['fan_in', 'fan_out', 'rpc', 'file']
 if ((len(_lang_list) == 0) or (len(_comm_list) == 0)):  # pragma: debug
     raise Exception("Timings cannot be performed if there is not at least one valid "
                     + "language and one valid communication mechanism. "
@@ -50,7 +52,8 @@ if ((len(_lang_list) == 0) or (len(_comm_list) == 0)):  # pragma: debug
 
 def write_perf_script(script_file, nmsg, msg_size,
                       lang_src, lang_dst, comm_type,
-                      nrep=10, max_errors=5, matlab_running=False):
+                      nrep=10, max_errors=5, matlab_running=False,
+                      connection_engine='thread', topology=None, nmodel=2):
     r"""Write a script to run perf.
 
     Args:
@@ -71,6 +74,13 @@ def write_perf_script(script_file, nmsg, msg_size,
             there is an existing Matlab engine before starting, otherwise the
             test will assert that there is not an existing Matlab engine.
             Defaults to False.
+        connection_engine (str, optional): Engine that the runner should use
+            for connection drivers ('thread' or 'async'). Defaults to 'thread'.
+        topology (str, optional): Topology of the integration that should be
+            timed (see TimedTopologyRun). Defaults to None and the two model
+            pipe is timed.
+        nmodel (int, optional): Number of models on the many side of the
+            topology. Defaults to 2. Ignored if topology is None.
 
     """
     lines = [
@@ -90,14 +100,27 @@ def write_perf_script(script_file, nmsg, msg_size,
         'lang_src = "%s"' % lang_src,
         'lang_dst = "%s"' % lang_dst,
         'comm_type = "%s"' % comm_type,
-        'matlab_running = %s' % str(matlab_running)]
+        'matlab_running = %s' % str(matlab_running),
+        'connection_engine = "%s"' % connection_engine]
     if os.environ.get('TMPDIR', ''):
         lines += [
             'os.environ["TMPDIR"] = "%s"' % os.environ['TMPDIR']]
+    if topology is None:
+        lines += [
+            'timer = timing.TimedRun(lang_src, lang_dst,'
+            '                        comm_type=comm_type,'
+            '                        matlab_running=matlab_running,'
+            '                        connection_engine=connection_engine)']
+    else:
+        lines += [
+            'timer = timing.TimedTopologyRun("%s", nmodel=%d,'
+            '                                lang_src=lang_src,'
+            '                                lang_dst=lang_dst,'
+            '                                comm_type=comm_type,'
+            '                                matlab_running=matlab_running,'
+            '                                connection_engine=connection_engine)'
+            % (topology, nmodel)]
     lines += [
-        'timer = timing.TimedRun(lang_src, lang_dst,'
-        '                        comm_type=comm_type,'
-        '                        matlab_running=matlab_running)',
         'runner = perf.Runner(values=1, processes=nrep, warmups=warmups)',
         'out = runner.bench_time_func(timer.entry_name(nmsg, msg_size),',
         '                             timing.perf_func,',
@@ -193,6 +216,8 @@ class TimedRun(YggTestBase, tools.YggClass):
             Defaults to False.
         dont_use_perf (bool, optional): If True, the timings will be run without
             using the perf package. Defaults to False.
+        connection_engine (str, optional): Engine that the runner should use
+            for connection drivers ('thread' or 'async'). Defaults to 'thread'.
 
     Attributes:
         lang_src (str): Language that messages should be sent from.
@@ -208,12 +233,15 @@ class TimedRun(YggTestBase, tools.YggClass):
             the test was created. False otherwise.
         dont_use_perf (bool): If True, the timings will be run without using the
             perf package.
+        connection_engine (str): Engine that the runner uses for connection
+            drivers.
 
     """
 
     def __init__(self, lang_src, lang_dst, test_name='timed_pipe', filename=None,
                  comm_type=None, platform=None, python_ver=None, max_errors=5,
-                 matlab_running=False, dont_use_perf=False, **kwargs):
+                 matlab_running=False, dont_use_perf=False,
+                 connection_engine='thread', **kwargs):
         if comm_type is None:
             comm_type = tools.get_default_comm()
         if platform is None:
@@ -228,6 +256,7 @@ class TimedRun(YggTestBase, tools.YggClass):
             else:
                 filename = os.path.join(os.getcwd(), 'scaling_%s.json' % suffix)
         self.matlab_running = matlab_running
+        self.connection_engine = connection_engine
         self.filename = filename
         self.comm_type = comm_type
         self.platform = platform
@@ -297,6 +326,8 @@ class TimedRun(YggTestBase, tools.YggClass):
         if ((self.matlab_running
              and ('matlab' in [self.lang_src, self.lang_dst]))):  # pragma: matlab
             out += '-MLStarted'
+        if self.connection_engine != 'thread':
+            out += '-%s' % self.connection_engine
         return out
 
     @property
@@ -425,6 +456,11 @@ class TimedRun(YggTestBase, tools.YggClass):
         r"""str: Format string for creating a perf script."""
         return os.path.join(self.tempdir, 'runperf.py')
 
+    @property
+    def perf_script_kwargs(self):
+        r"""dict: Additional keyword arguments for write_perf_script."""
+        return {}
+
     def make_yamlfile(self, path):
         r"""Create a YAML file for running the test.
 
@@ -541,7 +577,8 @@ class TimedRun(YggTestBase, tools.YggClass):
         if t0 is None:
             t0 = timer()
         r = runner.get_runner(self.fyaml[run_uuid],
-                              namespace=self.name + run_uuid)
+                              namespace=self.name + run_uuid,
+                              connection_engine=self.connection_engine)
         times = r.run(timer=timer, t0=t0)
         assert(not r.error_flag)
         return times
@@ -603,7 +640,9 @@ class TimedRun(YggTestBase, tools.YggClass):
         write_perf_script(self.perfscript, nmsg, msg_size,
                           self.lang_src, self.lang_dst, self.comm_type,
                           nrep=nrep, matlab_running=self.matlab_running,
-                          max_errors=self.max_errors)
+                          max_errors=self.max_errors,
+                          connection_engine=self.connection_engine,
+                          **self.perf_script_kwargs)
         copy_env = ['TMPDIR']
         if platform._is_win:  # pragma: windows
             copy_env += ['HOMEPATH', 'NUMBER_OF_PROCESSORS',
@@ -652,7 +691,8 @@ class TimedRun(YggTestBase, tools.YggClass):
             lang_dst (str, optional): Language that messages should be sent to.
                 Defaults to 'python'.
             **kwargs: Additional keywords are passed to either the class
-                constructor or plot_scaling_joint as appropriate.
+                constructor or plot_scaling_joint as appropriate. If
+                'topology' is provided, a TimedTopologyRun is created.
 
         Returns:
             tuple(matplotlib.Axes, matplotlib.Axes): Pair of axes containing the
@@ -661,12 +701,17 @@ class TimedRun(YggTestBase, tools.YggClass):
         """
         cls_kwargs_keys = ['test_name', 'filename', 'matlab_running',
                            'comm_type', 'platform', 'python_ver',
-                           'dont_use_perf', 'max_errors']
+                           'dont_use_perf', 'max_errors', 'connection_engine',
+                           'topology', 'nmodel']
         cls_kwargs = {}
         for k in cls_kwargs_keys:
             if k in kwargs:
                 cls_kwargs[k] = kwargs.pop(k)
-        x = TimedRun(lang_src, lang_dst, **cls_kwargs)
+        if 'topology' in cls_kwargs:
+            x = TimedTopologyRun(lang_src=lang_src, lang_dst=lang_dst,
+                                 **cls_kwargs)
+        else:
+            x = TimedRun(lang_src, lang_dst, **cls_kwargs)
         axs, fit = x.plot_scaling_joint(**kwargs)
         return axs, fit
 
@@ -1121,15 +1166,330 @@ class TimedRun(YggTestBase, tools.YggClass):
                         fd.write("\n")
 
 
+class TimedTopologyRun(TimedRun):
+    r"""Class to time sending messages through integrations with different
+    topologies.
+
+    Args:
+        topology (str): Topology of the integration. Supported values are:
+
+            * 'fan_in': nmodel source models send messages to one destination
+              model via a single connection (ForkComm).
+            * 'fan_out': One source model sends messages to nmodel destination
+              models via a single connection (ForkComm).
+            * 'rpc': nmodel client models call one server model that returns
+              each request as the response.
+            * 'file': A destination model receives the rows of an ASCII table
+              from a file and sends them to another ASCII table file.
+
+        nmodel (int, optional): Number of models on the many side of the
+            topology (sources for 'fan_in', destinations for 'fan_out', and
+            clients for 'rpc'). Defaults to 2. Ignored for 'file'.
+        lang_src (str, optional): Language of the source/client models.
+            Defaults to 'python'.
+        lang_dst (str, optional): Language of the destination/server models.
+            Defaults to 'python'.
+        test_name (str, optional): Name of the test. Defaults to
+            'timed_{topology}'.
+        **kwargs: Additional keyword arguments are passed to the parent class.
+
+    Attributes:
+        topology (str): Topology of the integration.
+        nmodel (int): Number of models on the many side of the topology.
+
+    Raises:
+        ValueError: If topology is not supported.
+
+    """
+
+    def __init__(self, topology, nmodel=2, lang_src='python', lang_dst='python',
+                 test_name=None, **kwargs):
+        if topology not in _topologies:
+            raise ValueError("Unsupported topology: '%s'" % topology)
+        if topology == 'file':
+            nmodel = 1
+        self.topology = topology
+        self.nmodel = int(nmodel)
+        if test_name is None:
+            test_name = 'timed_%s' % topology
+        super(TimedTopologyRun, self).__init__(lang_src, lang_dst,
+                                               test_name=test_name, **kwargs)
+
+    def can_run(self, raise_error=False):
+        r"""Determine if the test can be run from the current platform and
+        python version and if there are sources for the requested languages.
+
+        Args:
+            raise_error (bool, optional): If True, an error will be raised if
+                the test cannot be completed from the current platform. Defaults
+                to False.
+
+        Returns:
+            bool: True if the test can be run, False otherwise.
+
+        """
+        out = super(TimedTopologyRun, self).can_run(raise_error=raise_error)
+        for x in [self.source_src, self.source_dst]:
+            if out and (not os.path.isfile(x)):
+                if raise_error:
+                    raise RuntimeError("Source file does not exist: %s" % x)
+                out = False
+        return out
+
+    def entry_name(self, nmsg, msg_size):
+        r"""Get a unique identifier for a run. The number of models is added
+        after the message size.
+
+        Args:
+            nmsg (int): Number of messages that should be sent.
+            msg_size (int): Size of each message that should be sent.
+
+        """
+        out = super(TimedTopologyRun, self).entry_name(nmsg, msg_size)
+        return out.replace(')', ',%d)' % self.nmodel, 1)
+
+    @property
+    def perf_script_kwargs(self):
+        r"""dict: Additional keyword arguments for write_perf_script."""
+        return {'topology': self.topology, 'nmodel': self.nmodel}
+
+    @property
+    def source_src(self):
+        r"""str: Source file for the source/client models."""
+        if self.topology == 'rpc':
+            direction = 'client'
+        else:
+            direction = 'src'
+        return get_source(self.lang_src, direction, test_name='timed_topology')
+
+    @property
+    def source_dst(self):
+        r"""str: Source file for the destination/server models."""
+        if self.topology == 'rpc':
+            direction = 'server'
+        else:
+            direction = 'dst'
+        return get_source(self.lang_dst, direction, test_name='timed_topology')
+
+    @property
+    def noutput(self):
+        r"""int: Number of output files created by a run."""
+        if self.topology in ['fan_out', 'rpc']:
+            return self.nmodel
+        return 1
+
+    def output_files(self, fout):
+        r"""Get the output files created by a run.
+
+        Args:
+            fout (str): Output file for the run (see output_file_format).
+
+        Returns:
+            list: Full paths to the output files.
+
+        """
+        base = os.path.splitext(fout)[0]
+        return ['%s_%d.txt' % (base, i) for i in range(self.noutput)]
+
+    def input_file(self, fout):
+        r"""Get the input file read during a run of the 'file' topology.
+
+        Args:
+            fout (str): Output file for the run (see output_file_format).
+
+        Returns:
+            str: Full path to the input file.
+
+        """
+        return '%s_input.txt' % os.path.splitext(fout)[0]
+
+    def input_content(self, nmsg, msg_size):
+        r"""Get the contents of the input table for the 'file' topology. Each
+        row of the table contains the row index and a string with msg_size
+        characters.
+
+        Args:
+            nmsg (int): The number of rows in the table.
+            msg_size (int): The size of the string in each row.
+
+        Returns:
+            str: The contents of the table.
+
+        """
+        lines = ['# count\tname\n', '# %%d\t%%%ds\n' % msg_size]
+        row = '0' * msg_size
+        lines += ['%d\t%s\n' % (i, row) for i in range(nmsg)]
+        return ''.join(lines)
+
+    def output_content(self, nmsg, msg_size):
+        r"""Get the result that should be output to each file during the run.
+
+        Args:
+            nmsg: The number of messages that will be sent.
+            msg_sizze: The size of the the messages that will be sent.
+
+        Returns:
+            str: The contents expected in each file. For the 'file' topology,
+                this is the table rows without the header.
+
+        """
+        if self.topology == 'file':
+            return ''.join(self.input_content(nmsg, msg_size).splitlines(True)[2:])
+        out = super(TimedTopologyRun, self).output_content(nmsg, msg_size)
+        if self.topology == 'fan_in':
+            out *= self.nmodel
+        return out
+
+    def check_output(self, fout, nmsg, msg_size):
+        r"""Assert that the output files contain the expected result.
+
+        Args:
+            fout (str): Output file for the run (see output_file_format).
+            nmsg (int): The number of messages that will be sent.
+            msg_sizze (int): The size of the the messages that will be sent.
+
+        """
+        fres = self.output_content(nmsg, msg_size)
+        for x in self.output_files(fout):
+            if self.topology == 'file':
+                self.check_file_exists(x)
+                with open(x, 'r') as fd:
+                    rows = [line for line in fd.readlines()
+                            if not line.startswith('#')]
+                self.assert_equal(''.join(rows), fres)
+            else:
+                self.check_file(x, fres)
+
+    def cleanup_output(self, fout):
+        r"""Cleanup the output files and input file.
+
+        Args:
+           fout (str): Output file for the run (see output_file_format).
+        
+        """
+        for x in self.output_files(fout) + [self.input_file(fout)]:
+            super(TimedTopologyRun, self).cleanup_output(x)
+
+    def get_yaml_models(self):
+        r"""Get the yaml entries for the models.
+
+        Returns:
+            list: Model entries.
+
+        """
+        src = {'language': self.lang_src,
+               'args': [self.source_src, "{{PIPE_MSG_COUNT}}",
+                        "{{PIPE_MSG_SIZE}}"]}
+        dst = {'language': self.lang_dst, 'args': [self.source_dst]}
+        out = []
+        if self.topology == 'rpc':
+            server = 'timed_topology_server'
+            out.append(dict(dst, name=server, args=dst['args'] + [server],
+                            is_server=True))
+            for i in range(self.nmodel):
+                name = 'timed_topology_client_%d' % i
+                out.append(dict(src, name=name, client_of=[server],
+                                args=src['args'] + ['%s_%s' % (server, name),
+                                                    'output_file_%d' % i],
+                                outputs=['output_file_%d' % i]))
+            return out
+        if self.topology == 'fan_in':
+            for i in range(self.nmodel):
+                out.append(dict(src, name='timed_topology_src_%d' % i,
+                                args=src['args'] + ['output_pipe_%d' % i],
+                                outputs=['output_pipe_%d' % i]))
+        elif self.topology == 'fan_out':
+            out.append(dict(src, name='timed_topology_src',
+                            args=src['args'] + ['output_pipe'],
+                            outputs=['output_pipe']))
+        ndst = self.nmodel if (self.topology == 'fan_out') else 1
+        for i in range(ndst):
+            if ndst == 1:
+                iin = 'input_pipe'
+            else:
+                iin = 'input_pipe_%d' % i
+            out.append(dict(dst, name='timed_topology_dst_%d' % i,
+                            args=dst['args'] + [iin, 'output_file_%d' % i],
+                            inputs=[iin], outputs=['output_file_%d' % i]))
+        return out
+
+    def get_yaml_connections(self):
+        r"""Get the yaml entries for the connections.
+
+        Returns:
+            list: Connection entries.
+
+        """
+        if self.topology == 'file':
+            filetype = 'table'
+        else:
+            filetype = 'ascii'
+        out = []
+        if self.topology == 'fan_in':
+            out.append({'inputs': ['output_pipe_%d' % i
+                                   for i in range(self.nmodel)],
+                        'outputs': ['input_pipe']})
+        elif self.topology == 'fan_out':
+            out.append({'inputs': ['output_pipe'],
+                        'outputs': ['input_pipe_%d' % i
+                                    for i in range(self.nmodel)]})
+        elif self.topology == 'file':
+            out.append({'input_file': {'name': "{{PIPE_IN_FILE}}",
+                                       'filetype': filetype},
+                        'output': 'input_pipe'})
+        for i in range(self.noutput):
+            out.append({'input': 'output_file_%d' % i,
+                        'output_file': {'name': "{{PIPE_OUT_FILE_%d}}" % i,
+                                        'filetype': filetype}})
+        return out
+
+    def make_yamlfile(self, path):
+        r"""Create a YAML file for running the test.
+
+        Args:
+            path (str): Full path to file where the YAML should be saved.
+
+        """
+        out = {'models': self.get_yaml_models(),
+               'connections': self.get_yaml_connections()}
+        lines = yaml.dump(out, default_flow_style=False)
+        with open(path, 'w') as fd:
+            fd.write(lines)
+
+    def before_run(self, nmsg, msg_size):
+        r"""Actions that should be performed before a run.
+
+        Args:
+            nmsg (int): Number of messages that should be sent.
+            msg_size (int): Size of each message that should be sent.
+
+        Returns:
+            str: Unique identifier for the run.
+
+        """
+        run_uuid = super(TimedTopologyRun, self).before_run(nmsg, msg_size)
+        fout = self.foutput[run_uuid]
+        for i, x in enumerate(self.output_files(fout)):
+            os.environ['PIPE_OUT_FILE_%d' % i] = x
+        if self.topology == 'file':
+            fin = self.input_file(fout)
+            os.environ['PIPE_IN_FILE'] = fin
+            with open(fin, 'w') as fd:
+                fd.write(self.input_content(int(nmsg), int(msg_size)))
+        return run_uuid
+
+
 def plot_scalings(compare='comm_type', compare_values=None,
-                  plotfile=None, test_name='timed_pipe',
+                  plotfile=None, test_name=None,
                   cleanup_plot=False, use_paper_values=False, **kwargs):
     r"""Plot comparison of scaling for chosen variable.
 
     Args:
         compare (str, optional): Name of variable that should be compared.
-            Valid values are 'language', 'comm_type', 'platform', 'python_ver'.
-            Defaults to 'comm_type'.
+            Valid values are 'language', 'comm_type', 'platform', 'python_ver',
+            'connection_engine', 'topology', and 'nmodel' (requires
+            'topology' be passed as a keyword argument). Defaults to
+            'comm_type'.
         compare_values (list, optional): Values that should be plotted.
             If not provided, the values will be determined based on the
             current platform.
@@ -1137,7 +1497,7 @@ def plot_scalings(compare='comm_type', compare_values=None,
             saved. If not provided, one is created based on the test parameters
             in the current working directory.
         test_name (str, optional): Name of the test that should be used. Defaults
-            to 'timed_pipe'.
+            to 'timed_pipe' if a topology is not being timed.
         cleanup_plot (bool, optional): If True, the create plotfile will be
             removed before the function returns. This is generally only useful
             for testing. Defaults to False.
@@ -1170,7 +1530,17 @@ def plot_scalings(compare='comm_type', compare_values=None,
         default_vals = {'comm_type': _comm_list,
                         'language': _lang_list,
                         'platform': ['Linux', 'MacOS', 'Windows'],
-                        'python_ver': ['2.7', '3.5']}
+                        'python_ver': ['2.7', '3.5'],
+                        'connection_engine': ['thread', 'async']}
+    default_vals['topology'] = _topologies
+    default_vals['nmodel'] = [1, 2, 4, 8]
+    if test_name is None:
+        if compare == 'topology':
+            test_name = 'timed_topology'
+        elif 'topology' in kwargs:
+            test_name = 'timed_%s' % kwargs['topology']
+        else:
+            test_name = 'timed_pipe'
     if compare_values is None:
         compare_values = default_vals.get(compare, None)
     else:
@@ -1219,6 +1589,36 @@ def plot_scalings(compare='comm_type', compare_values=None,
                 var_kws.append({color_var: k, 'lang_src': 'c', 'lang_dst': 'c'})
         kws2label = lambda x: '%s (%s)' % (x[color_var], x[style_var])  # noqa: E731
         yscale = 'linear'
+    elif compare == 'connection_engine':
+        color_var = 'connection_engine'
+        color_map = {'thread': 'b', 'async': 'r'}
+        style_var = None
+        style_map = None
+        var_list = compare_values
+        var_kws = [{color_var: k} for k in var_list]
+        kws2label = lambda x: x[color_var]  # noqa: E731
+        yscale = 'linear'
+    elif compare == 'topology':
+        color_var = 'topology'
+        color_map = {'fan_in': 'b', 'fan_out': 'r', 'rpc': 'g', 'file': 'm'}
+        style_var = None
+        style_map = None
+        var_list = compare_values
+        var_kws = [{color_var: k} for k in var_list]
+        kws2label = lambda x: x[color_var]  # noqa: E731
+        yscale = 'linear'
+    elif compare == 'nmodel':
+        if 'topology' not in kwargs:
+            raise ValueError("A topology must be provided to compare the "
+                             "number of models.")
+        color_var = 'nmodel'
+        color_map = None
+        style_var = None
+        style_map = None
+        var_list = compare_values
+        var_kws = [{color_var: k} for k in var_list]
+        kws2label = lambda x: '%d models' % x[color_var]  # noqa: E731
+        yscale = 'linear'
     else:
         raise ValueError("Invalid compare: '%s'" % compare)
     assert(len(var_kws) > 0)
@@ -1268,8 +1668,10 @@ def plot_scalings(compare='comm_type', compare_values=None,
                 ml_sessions.append(MatlabModelDriver.start_matlab())
             label += ' (Existing)'
             plot_kws['color'] = 'orange'
-        axs, fit = TimedRun.class_plot(test_name=test_name, axs=axs, label=label,
-                                       yscale=yscale, plot_kws=plot_kws, **kws)
+        if 'topology' not in kws:
+            kws['test_name'] = test_name
+        axs, fit = TimedRun.class_plot(axs=axs, label=label, yscale=yscale,
+                                       plot_kws=plot_kws, **kws)
         fits[label] = fit
         if ((kws.get('matlab_running', False)
              and MatlabModelDriver._matlab_installed)):  # pragma: matlab
@@ -1324,3 +1726,113 @@ def perfjson_to_pandas(json_file):
                     data[mk].append(mv)
     x_pd = pd.DataFrame(data)
     return x_pd
+
+
+def time_model_startup(nrep=10, modules=None):
+    r"""Time how long it takes to launch a Python model that imports the
+    yggdrasil interface, both in a new Python process (cold) and forked from
+    a zygote that already has the interface imported (warm).
+
+    Args:
+        nrep (int, optional): Number of times each type of launch should be
+            timed. Defaults to 10.
+        modules (list, optional): Modules that the zygote should import.
+            Defaults to :func:`yggdrasil.zygote.get_preload_modules`.
+
+    Returns:
+        dict: Launch times (in seconds) for 'cold' and 'warm' launches.
+
+    Raises:
+        RuntimeError: If the zygote is not supported on this platform.
+
+    """
+    from yggdrasil import zygote
+    if not zygote.is_installed():  # pragma: windows
+        raise RuntimeError("The Python zygote is not supported on this "
+                           "platform.")
+    tempdir = tempfile.mkdtemp()
+    script = os.path.join(tempdir, 'startup_model.py')
+    with open(script, 'w') as fd:
+        fd.write('from yggdrasil.interface import YggInterface\n')
+    env = copy.deepcopy(os.environ)
+    env['YGG_SUBPROCESS'] = 'True'
+    out = {'cold': [], 'warm': []}
+    zyg = zygote.PythonZygote(modules=modules)
+    try:
+        # Ensure the zygote has finished importing before timing
+        zyg.launch([script], env, tempdir).wait()
+        for i in range(nrep):
+            t0 = time.time()
+            subprocess.check_call([sys.executable, script], env=env, cwd=tempdir)
+            out['cold'].append(time.time() - t0)
+            t0 = time.time()
+            p = zyg.launch([script], env, tempdir)
+            p.stdout.read()
+            if p.wait() != 0:  # pragma: debug
+                raise RuntimeError("Warm launch failed with code %d."
+                                   % p.returncode)
+            out['warm'].append(time.time() - t0)
+    finally:
+        zyg.stop()
+        shutil.rmtree(tempdir)
+    for k in ['cold', 'warm']:
+        logging.info("%s launch: %f +/- %f s" % (k, np.mean(out[k]),
+                                                 np.std(out[k])))
+    return out
+
+
+def time_import(module='yggdrasil.interface.YggInterface', nrep=1):
+    r"""Time how long it takes to import a module in a new Python process
+    using the import profiling provided by 'python -X importtime'.
+
+    Args:
+        module (str, optional): Name of the module that should be imported.
+            Defaults to 'yggdrasil.interface.YggInterface'.
+        nrep (int, optional): Number of times the import should be timed.
+            The minimum is returned. Defaults to 1.
+
+    Returns:
+        dict: The cumulative time (in seconds) spent importing the package
+            containing the module ('total') and the cumulative time spent
+            importing each module ('modules') for the fastest import.
+
+    Raises:
+        RuntimeError: If the version of Python does not support import
+            profiling.
+
+    """
+    if sys.version_info[:2] < (3, 7):  # pragma: Python 2
+        raise RuntimeError("Import profiling requires Python 3.7 or higher.")
+    root = module.split('.')[0]
+    env = copy.deepcopy(os.environ)
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+    out = None
+    for i in range(nrep):
+        p = subprocess.Popen([sys.executable, '-X', 'importtime', '-c',
+                              'import %s' % module],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             env=env)
+        _, err = p.communicate()
+        if p.returncode != 0:  # pragma: debug
+            raise RuntimeError("Error importing %s:\n%s"
+                               % (module, backwards.as_str(err)))
+        modules = {}
+        total = 0.0
+        for line in backwards.as_str(err).splitlines():
+            if not line.startswith('import time:'):
+                continue
+            cols = line.split(':', 1)[1].split('|')
+            try:
+                cumulative = float(cols[1]) / 1.0e6
+            except (IndexError, ValueError):
+                continue  # Header
+            name = cols[2][1:].rstrip()
+            modules[name.strip()] = cumulative
+            # Entries that are not nested are imported directly by the
+            # statement and their cumulative times sum to the total
+            if (not name.startswith(' ')) and (name.split('.')[0] == root):
+                total += cumulative
+        if (out is None) or (total < out['total']):
+            out = {'total': total, 'modules': modules}
+    logging.info("import %s: %f s" % (module, out['total']))
+    return out
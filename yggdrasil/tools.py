@@ -462,6 +462,81 @@ def print_encoded(msg, *args, **kwargs):
             print(backwards.as_bytes(msg), *args, **kwargs)
 
 
+class LazyFormat(object):
+    r"""Class for deferring the creation of an argument to a log message
+    until the message is emitted so that expensive representations (e.g.
+    pretty printed dictionaries) are not created if the log level is
+    disabled.
+
+    Args:
+        func (callable): Function that returns the object that should be
+            represented in the log message.
+        *args: Additional arguments are passed to func.
+        **kwargs: Additional keyword arguments are passed to func.
+
+    """
+
+    __slots__ = ['func', 'args', 'kwargs']
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return str(self.func(*self.args, **self.kwargs))
+
+    def __repr__(self):
+        return repr(self.func(*self.args, **self.kwargs))
+
+
+class MessageFrames(object):
+    r"""Class for serialized messages made up of several frames (e.g. a
+    pickle stream followed by out-of-band buffers). The message is equivalent
+    to the concatenation of the frames, but comms that support multipart
+    messages send the frames without joining them so that large buffers are
+    not copied. Objects referenced by the frames should not be modified
+    until the message has been sent.
+
+    Args:
+        frames (list): Bytes-like objects making up the message.
+
+    Attributes:
+        frames (list): Bytes-like objects making up the message.
+
+    """
+
+    __slots__ = ['frames']
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def __len__(self):
+        return sum(memoryview(x).nbytes for x in self.frames)
+
+    def prepend(self, prefix):
+        r"""Get a message with bytes added to the start of the first frame.
+
+        Args:
+            prefix (bytes): Bytes to add to the start of the message.
+
+        Returns:
+            MessageFrames: Message with the prefix.
+
+        """
+        first = prefix + memoryview(self.frames[0]).tobytes()
+        return MessageFrames([first] + self.frames[1:])
+
+    def join(self):
+        r"""Concatenate the frames.
+
+        Returns:
+            bytes: Message as a single bytes object.
+
+        """
+        return b''.join(self.frames)
+
+
 class TimeOut(object):
     r"""Class for checking if a period of time has been elapsed.
 
@@ -673,6 +748,8 @@ class YggClass(logging.LoggerAdapter):
             method: Logging method to be used.
 
         """
+        if not self.isEnabledFor(logging.DEBUG):
+            return self.dummy_log
         if key in self._periodic_logs:
             self._periodic_logs[key] += 1
         else:
@@ -684,12 +761,31 @@ class YggClass(logging.LoggerAdapter):
 
     @property
     def special_debug(self):
-        r"""Log debug level message contingent of supression flag."""
-        if not self.suppress_special_debug:
+        r"""Log debug level message contingent of supression flag. The check
+        of the log level is done here so that no work is done for each call
+        when debug messages are disabled."""
+        if (((not self.suppress_special_debug)
+             and self.isEnabledFor(logging.DEBUG))):
             return self.debug
         else:
             return self.dummy_log
 
+    def lazy_pprint(self, obj, *args, **kwargs):
+        r"""Defer representing an object using pprint until the log message
+        it is passed to is emitted.
+
+        Args:
+            obj (object): Python object to represent.
+            *args: Additional arguments are passed to pprint.
+            **kwargs: Additional keyword arguments are passed to pprint.
+
+        Returns:
+            LazyFormat: Object that will call pprint when converted to a
+                string.
+
+        """
+        return LazyFormat(self.pprint, obj, *args, **kwargs)
+
     @property
     def error(self):
         r"""Log an error level message."""
@@ -0,0 +1,198 @@
+r"""Tracing of messages as they pass through the comms in an integration.
+When tracing is enabled (by setting the environment variable
+'YGG_TRACE_DIR'), comms add a 'trace' entry to the header of each message
+sent that contains a trace ID and a timestamp for each hop (send or recv)
+the message has made. Each process appends the traces of the messages it
+receives to a file in the trace directory and the runner combines them into
+a single trace file in the Chrome trace event format once the run is
+complete.
+
+Traces are encoded as strings of the form
+'<trace id>;<label>@<time>;<label>@<time>...' so that they can be encoded
+in the header without changing the static part of the header (see
+MetaschemaType.encode_header)."""
+import os
+import glob
+import json
+import time
+import uuid
+import threading
+from collections import OrderedDict
+
+
+_spool = None
+_spool_pid = None
+_spool_lock = threading.Lock()
+
+
+def get_trace_dir():
+    r"""Get the directory that traces should be written to.
+
+    Returns:
+        str: Directory, None if tracing is not enabled.
+
+    """
+    return os.environ.get('YGG_TRACE_DIR', None) or None
+
+
+def is_enabled():
+    r"""Determine if tracing is enabled.
+
+    Returns:
+        bool: True if tracing is enabled, False otherwise.
+
+    """
+    return (get_trace_dir() is not None)
+
+
+def add_hop(trace, label, t=None):
+    r"""Add a hop to a trace, starting a new trace if one is not provided.
+
+    Args:
+        trace (str): Existing trace. If None or empty, a new trace ID is
+            generated.
+        label (str): Label for the hop (e.g. '<comm name>:send').
+        t (float, optional): Time of the hop. Defaults to the current time.
+
+    Returns:
+        str: Trace including the new hop.
+
+    """
+    if t is None:
+        t = time.time()
+    if not trace:
+        trace = uuid.uuid4().hex[:16]
+    return '%s;%s@%.6f' % (trace, label, t)
+
+
+def parse_trace(trace):
+    r"""Split a trace into its ID and hops.
+
+    Args:
+        trace (str): Trace.
+
+    Returns:
+        tuple(str, list): Trace ID and list of (label, time) tuples for each
+            hop.
+
+    """
+    parts = trace.split(';')
+    hops = []
+    for x in parts[1:]:
+        label, t = x.rsplit('@', 1)
+        hops.append((label, float(t)))
+    return parts[0], hops
+
+
+def record(trace):
+    r"""Append a trace to the file for the current process in the trace
+    directory. Nothing is recorded if tracing is not enabled.
+
+    Args:
+        trace (str): Trace to record.
+
+    """
+    global _spool, _spool_pid
+    trace_dir = get_trace_dir()
+    if trace_dir is None:
+        return
+    with _spool_lock:
+        pid = os.getpid()
+        if (((_spool is None) or (_spool_pid != pid)
+             or (os.path.dirname(_spool.name) != trace_dir))):
+            _spool = open(os.path.join(trace_dir, '%d.trace' % pid), 'a')
+            _spool_pid = pid
+        _spool.write(trace + '\n')
+        _spool.flush()
+
+
+def load_traces(trace_dir):
+    r"""Load the traces recorded in a directory, discarding traces that are
+    a partial record of another trace (e.g. those recorded by a connection
+    driver for a message that was then received by a model).
+
+    Args:
+        trace_dir (str): Directory containing trace files.
+
+    Returns:
+        list: Complete traces.
+
+    """
+    traces = []
+    for fname in sorted(glob.glob(os.path.join(trace_dir, '*.trace'))):
+        with open(fname, 'r') as fd:
+            traces += [x for x in fd.read().splitlines() if x]
+    partial = set()
+    for x in traces:
+        idx = x.rfind(';')
+        while idx > 0:
+            partial.add(x[:idx])
+            idx = x.rfind(';', 0, idx)
+    out = []
+    for x in traces:
+        if x not in partial:
+            out.append(x)
+            partial.add(x)
+    return out
+
+
+def to_chrome_trace(traces):
+    r"""Convert traces into the Chrome trace event format. Each segment
+    between two hops of a trace becomes a complete event on a track for that
+    pair of hops so that the segments where latency accumulates stand out.
+
+    Args:
+        traces (list): Traces.
+
+    Returns:
+        dict: Chrome trace events (under 'traceEvents') and the number,
+            mean, and maximum duration (in seconds) of each segment (under
+            'otherData').
+
+    """
+    events = []
+    tracks = OrderedDict()
+    stats = OrderedDict()
+    for trace in traces:
+        trace_id, hops = parse_trace(trace)
+        for (l0, t0), (l1, t1) in zip(hops[:-1], hops[1:]):
+            name = '%s -> %s' % (l0, l1)
+            if name not in tracks:
+                tracks[name] = len(tracks) + 1
+                stats[name] = OrderedDict([('count', 0), ('mean', 0.0),
+                                           ('max', 0.0)])
+            dt = max(t1 - t0, 0.0)
+            events.append({'name': name, 'cat': 'message', 'ph': 'X',
+                           'ts': t0 * 1.0e6, 'dur': dt * 1.0e6,
+                           'pid': 1, 'tid': tracks[name],
+                           'args': {'trace': trace_id}})
+            x = stats[name]
+            x['count'] += 1
+            x['mean'] += (dt - x['mean']) / x['count']
+            x['max'] = max(x['max'], dt)
+    for name, tid in tracks.items():
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1,
+                       'tid': tid, 'args': {'name': name}})
+    return OrderedDict([('traceEvents', events),
+                        ('displayTimeUnit', 'ms'),
+                        ('otherData', stats)])
+
+
+def write_trace_file(fname, trace_dir):
+    r"""Combine the traces recorded in a directory into a Chrome trace file.
+
+    Args:
+        fname (str): Full path to the file that should be written.
+        trace_dir (str): Directory containing trace files.
+
+    Returns:
+        dict: Trace that was written.
+
+    """
+    out = to_chrome_trace(load_traces(trace_dir))
+    fdir = os.path.dirname(os.path.abspath(fname))
+    if not os.path.isdir(fdir):
+        os.makedirs(fdir)
+    with open(fname, 'w') as fd:
+        json.dump(out, fd)
+    return out
@@ -1,9 +1,11 @@
 import os
+import json
 import pprint
 import pystache
 import yaml
 from yggdrasil import backwards
-from yggdrasil.schema import standardize, get_schema
+from yggdrasil.schema import (
+    standardize, get_schema, get_cache_key, load_cache, save_cache)
 
 
 def load_yaml(fname):
@@ -66,6 +68,35 @@ def prep_yaml(files):
     return yml_all
 
 
+def normalize_yaml(yml_prep, s=None):
+    r"""Validate and normalize prepared YAML contents. Normalized results are
+    cached, keyed by the prepared contents (which include the rendered
+    contents of the files and their locations), the schema, and the
+    environment, so that repeated runs of the same integration skip
+    normalization.
+
+    Args:
+        yml_prep (dict): YAML contents prepared by prep_yaml.
+        s (SchemaRegistry, optional): Schema that should be used to normalize
+            the YAML. Defaults to the yggdrasil schema.
+
+    Returns:
+        dict: Normalized YAML contents.
+
+    """
+    if s is None:
+        s = get_schema()
+    key = None
+    if s.cache_key is not None:
+        key = get_cache_key(s.cache_key, json.dumps(yml_prep, sort_keys=True,
+                                                    default=str))
+    out = load_cache('yaml', key)
+    if out is None:
+        out = s.validate(yml_prep, normalize=True)
+        save_cache('yaml', key, out)
+    return out
+
+
 def parse_yaml(files):
     r"""Parse list of yaml files.
 
@@ -88,7 +119,7 @@ def parse_yaml(files):
     yml_prep = prep_yaml(files)
     # print('prepped')
     # pprint.pprint(yml_prep)
-    yml_norm = s.validate(yml_prep, normalize=True)
+    yml_norm = normalize_yaml(yml_prep, s)
     # print('normalized')
     # pprint.pprint(yml_norm)
     # Parse models, then connections to ensure connections can be processed
@@ -0,0 +1,451 @@
+"""This module provides a pre-forked launcher (zygote) for Python models. The
+zygote is a process that imports yggdrasil and other common dependencies once
+and then forks a new process for each model rather than starting (and
+re-importing everything in) a fresh interpreter."""
+import os
+import sys
+import json
+import errno
+import shutil
+import signal
+import select
+import socket
+import struct
+import tempfile
+import importlib
+import subprocess
+from yggdrasil import tools, platform, backwards
+from yggdrasil.config import ygg_cfg
+
+
+_default_modules = ['yggdrasil.interface.YggInterface',
+                    'yggdrasil.metaschema', 'yggdrasil.serialize', 'numpy']
+_header = struct.Struct('!Q')
+
+
+def is_installed():
+    r"""Determine if the zygote can be used on the current machine.
+
+    Returns:
+        bool: True if processes can be forked and file descriptors passed
+            between processes, False otherwise.
+
+    """
+    return ((not platform._is_win) and hasattr(os, 'fork')
+            and hasattr(socket, 'AF_UNIX') and hasattr(socket.socket, 'sendmsg'))
+
+
+def get_preload_modules():
+    r"""Get the modules that the zygote should import before forking models
+    from the config option ('parallel', 'zygote_modules').
+
+    Returns:
+        list: Names of modules that should be imported.
+
+    """
+    out = ygg_cfg.get('parallel', 'zygote_modules', None)
+    if out is None:
+        return list(_default_modules)
+    return [x.strip() for x in out.split(',') if x.strip()]
+
+
+def send_message(sock, msg):
+    r"""Send a JSON message over a socket, prefixed by its size.
+
+    Args:
+        sock (socket.socket): Socket that the message should be sent on.
+        msg (dict): Message that should be sent.
+
+    """
+    data = backwards.as_bytes(json.dumps(msg))
+    sock.sendall(_header.pack(len(data)) + data)
+
+
+def _recv_exact(sock, size):
+    r"""Receive an exact number of bytes from a socket."""
+    out = b''
+    while len(out) < size:
+        data = sock.recv(size - len(out))
+        if not data:
+            raise EOFError("Socket closed while receiving message.")
+        out += data
+    return out
+
+
+def recv_message(sock):
+    r"""Receive a JSON message sent by send_message.
+
+    Args:
+        sock (socket.socket): Socket that the message should be received on.
+
+    Returns:
+        dict: Received message.
+
+    Raises:
+        EOFError: If the socket is closed before the message is complete.
+
+    """
+    size = _header.unpack(_recv_exact(sock, _header.size))[0]
+    return json.loads(backwards.as_str(_recv_exact(sock, size)))
+
+
+def connect(address, timeout=60.0):
+    r"""Connect to the zygote, waiting for it to start listening.
+
+    Args:
+        address (str): Path to the zygote's socket.
+        timeout (float, optional): Time that should be waited for the zygote
+            to start listening. Defaults to 60.
+
+    Returns:
+        socket.socket: Socket connected to the zygote.
+
+    Raises:
+        RuntimeError: If a connection cannot be made before the timeout.
+
+    """
+    T = tools.TimeOut(timeout)
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(address)
+            return sock
+        except (IOError, OSError):
+            sock.close()
+            if T.is_out:
+                raise RuntimeError("Could not connect to zygote at %s."
+                                   % address)
+            tools.sleep(0.01)
+
+
+def _run_child(request, fd):  # pragma: no cover
+    r"""Run a model in a process forked from the zygote. This function does
+    not return.
+
+    Args:
+        request (dict): Arguments, environment, and working directory for
+            the model.
+        fd (int): File descriptor that output should be written to.
+
+    """
+    code = 0
+    try:
+        os.setpgrp()
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(fd, 1)
+        os.dup2(fd, 2)
+        for x in [devnull, fd]:
+            os.close(x)
+        if backwards.PY2:  # pragma: Python 2
+            sys.stdout = os.fdopen(1, 'w', 0)
+            sys.stderr = os.fdopen(2, 'w', 0)
+        else:
+            import io
+            sys.stdout = io.TextIOWrapper(os.fdopen(1, 'wb', 0),
+                                          write_through=True)
+            sys.stderr = io.TextIOWrapper(os.fdopen(2, 'wb', 0),
+                                          write_through=True)
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        # Contexts from the zygote cannot be used after the fork
+        zmq_comm = sys.modules.get('yggdrasil.communication.ZMQComm', None)
+        if zmq_comm is not None:
+            zmq_comm._global_context = zmq_comm.zmq.Context.instance()
+        from yggdrasil.config import cfg_logging
+        cfg_logging()
+        import runpy
+        script = request['args'][0]
+        sys.argv = list(request['args'])
+        sys.path[0] = os.path.dirname(os.path.abspath(script))
+        prof = None
+        if os.environ.get('YGG_PROFILE_FILE', None):
+            import cProfile
+            prof = cProfile.Profile()
+            prof.enable()
+        try:
+            runpy.run_path(script, run_name='__main__')
+        finally:
+            if prof is not None:
+                prof.disable()
+                prof.dump_stats(os.environ['YGG_PROFILE_FILE'])
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            code = e.code
+        elif e.code is not None:
+            sys.stderr.write('%s\n' % e.code)
+            code = 1
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        code = 1
+    try:
+        import atexit
+        atexit._run_exitfuncs()
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code)
+
+
+def serve(address, modules=None):  # pragma: no cover
+    r"""Run the zygote server, forking a process for each model requested
+    until a shutdown request is received. This is run by the process started
+    by :class:`PythonZygote`.
+
+    Args:
+        address (str): Path to the Unix socket that requests are received on.
+        modules (list, optional): Modules that should be imported before
+            forking models. Defaults to get_preload_modules().
+
+    """
+    if modules is None:
+        modules = get_preload_modules()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(address)
+    listener.listen(128)
+    # Requests can be queued while modules are imported
+    for m in modules:
+        try:
+            importlib.import_module(m)
+        except ImportError:
+            pass
+    # Child exits are signaled by SIGCHLD which interrupts the select
+    import fcntl
+    wake_r, wake_w = os.pipe()
+    for fd in [wake_r, wake_w]:
+        fcntl.fcntl(fd, fcntl.F_SETFL,
+                    fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda *args: None)
+    children = {}
+    running = True
+    while running or children:
+        try:
+            ready = select.select([listener, wake_r] if running else [wake_r],
+                                  [], [])[0]
+        except (select.error, OSError) as e:
+            if e.args[0] == errno.EINTR:
+                continue
+            raise
+        if wake_r in ready:
+            try:
+                os.read(wake_r, 1024)
+            except OSError:
+                pass
+        while children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except OSError:
+                break
+            if pid == 0:
+                break
+            if os.WIFSIGNALED(status):
+                code = -os.WTERMSIG(status)
+            else:
+                code = os.WEXITSTATUS(status)
+            conn = children.pop(pid, None)
+            if conn is not None:
+                try:
+                    send_message(conn, {'returncode': code})
+                except (IOError, OSError):
+                    pass
+                conn.close()
+        if running and (listener in ready):
+            conn = listener.accept()[0]
+            msg, ancdata, flags, addr = conn.recvmsg(
+                1, socket.CMSG_LEN(struct.calcsize('i')))
+            fds = [struct.unpack('i', x[2][:struct.calcsize('i')])[0]
+                   for x in ancdata if x[1] == socket.SCM_RIGHTS]
+            request = recv_message(conn)
+            if request.get('command', None) == 'shutdown':
+                running = False
+                conn.close()
+                continue
+            sys.stdout.flush()
+            sys.stderr.flush()
+            pid = os.fork()
+            if pid == 0:
+                signal.set_wakeup_fd(-1)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                for x in [listener, conn] + list(children.values()):
+                    x.close()
+                for x in [wake_r, wake_w]:
+                    os.close(x)
+                _run_child(request, fds[0])
+            os.close(fds[0])
+            children[pid] = conn
+            send_message(conn, {'pid': pid})
+    listener.close()
+
+
+class ZygoteProcess(object):
+    r"""Handle for a model process forked by the zygote that provides the
+    parts of the Popen interface used by model drivers.
+
+    Args:
+        address (str): Path to the zygote's socket.
+        args (list): Path to the Python script and its arguments.
+        env (dict): Environment variables for the model.
+        cwd (str): Working directory for the model.
+        timeout (float, optional): Time that should be waited for the zygote
+            to accept the request. Defaults to 60.
+
+    Attributes:
+        pid (int): Process ID of the model.
+        returncode (int): Exit code of the model once it has finished,
+            None otherwise.
+        stdout (file): Pipe that the model's output can be read from.
+
+    Raises:
+        RuntimeError: If the zygote cannot be reached.
+
+    """
+
+    def __init__(self, address, args, env, cwd, timeout=60.0):
+        self.returncode = None
+        self._sock = connect(address, timeout=timeout)
+        r, w = os.pipe()
+        try:
+            self._sock.sendmsg([b'\0'], [(socket.SOL_SOCKET, socket.SCM_RIGHTS,
+                                          struct.pack('i', w))])
+        finally:
+            os.close(w)
+        send_message(self._sock, {'args': list(args), 'env': dict(env),
+                                  'cwd': cwd})
+        self.pid = recv_message(self._sock)['pid']
+        self.stdout = os.fdopen(r, 'rb')
+
+    def _recv_returncode(self):
+        r"""Receive the exit code from the zygote."""
+        try:
+            self.returncode = recv_message(self._sock)['returncode']
+        except EOFError:  # pragma: debug
+            self.returncode = -signal.SIGKILL
+        self._sock.close()
+
+    def poll(self):
+        r"""Check if the model has finished.
+
+        Returns:
+            int: Exit code if the model has finished, None otherwise.
+
+        """
+        if self.returncode is None:
+            if select.select([self._sock], [], [], 0)[0]:
+                self._recv_returncode()
+        return self.returncode
+
+    def wait(self, timeout=None):
+        r"""Wait for the model to finish.
+
+        Args:
+            timeout (float, optional): Time that should be waited. Defaults
+                to None and is infinite.
+
+        Returns:
+            int: Exit code if the model has finished, None otherwise.
+
+        """
+        if self.returncode is None:
+            if select.select([self._sock], [], [], timeout)[0]:
+                self._recv_returncode()
+        return self.returncode
+
+    def kill(self):
+        r"""Kill the model process."""
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except OSError:  # pragma: debug
+                pass
+
+
+class PythonZygote(tools.YggClass):
+    r"""Process that has yggdrasil and common dependencies imported and that
+    forks Python model processes on request.
+
+    Args:
+        modules (list, optional): Modules that should be imported by the
+            zygote. Defaults to get_preload_modules().
+        **kwargs: Additional keyword arguments are passed to the parent class.
+
+    Attributes:
+        address (str): Path to the Unix socket that the zygote listens on.
+        zygote_process (subprocess.Popen): Zygote process.
+
+    Raises:
+        RuntimeError: If the zygote is not supported on this platform.
+
+    """
+
+    def __init__(self, modules=None, **kwargs):
+        if not is_installed():  # pragma: windows
+            raise RuntimeError("The Python zygote is not supported on this "
+                               "platform.")
+        super(PythonZygote, self).__init__('PythonZygote', **kwargs)
+        if modules is None:
+            modules = get_preload_modules()
+        self._tempdir = tempfile.mkdtemp()
+        self.address = os.path.join(self._tempdir, 'zygote.sock')
+        self.zygote_process = subprocess.Popen(
+            [sys.executable, '-m', 'yggdrasil.zygote', self.address]
+            + modules, preexec_fn=os.setpgrp)
+        self.debug("Started zygote with pid %d", self.zygote_process.pid)
+
+    @property
+    def is_running(self):
+        r"""bool: True if the zygote process is running."""
+        return (self.zygote_process is not None) and (self.zygote_process.poll() is None)
+
+    def launch(self, args, env, cwd):
+        r"""Fork a model process from the zygote.
+
+        Args:
+            args (list): Path to the Python script and its arguments.
+            env (dict): Environment variables for the model.
+            cwd (str): Working directory for the model.
+
+        Returns:
+            ZygoteProcess: Handle for the model process.
+
+        Raises:
+            RuntimeError: If the zygote is not running.
+
+        """
+        if not self.is_running:
+            raise RuntimeError("The zygote is not running.")
+        return ZygoteProcess(self.address, args, env, cwd, timeout=self.timeout)
+
+    def stop(self):
+        r"""Stop the zygote once any running models have finished."""
+        if self.zygote_process is None:
+            return
+        if self.is_running:
+            try:
+                sock = connect(self.address, timeout=self.timeout)
+                try:
+                    sock.sendmsg([b'\0'])
+                    send_message(sock, {'command': 'shutdown'})
+                finally:
+                    sock.close()
+            except (IOError, OSError, RuntimeError):  # pragma: debug
+                pass
+            # Popen.wait does not take a timeout on Python 2
+            T = tools.TimeOut(self.timeout)
+            while (not T.is_out) and (self.zygote_process.poll() is None):
+                self.sleep()
+            if self.zygote_process.poll() is None:  # pragma: debug
+                self.error("Zygote did not exit, killing it.")
+                self.zygote_process.kill()
+                self.zygote_process.wait()
+        self.zygote_process = None
+        shutil.rmtree(self._tempdir, ignore_errors=True)
+        self.debug('Returning')
+
+
+if __name__ == '__main__':  # pragma: no cover
+    serve(sys.argv[1], modules=sys.argv[2:])